@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark for swarm's screen pattern scanning.
+
+The ralph monitor checks every pane capture for stuck and fatal
+substrings, and its last 3 non-blank lines for the context percentage.
+This script builds a 2000-line screen and 50 literal patterns, and
+measures three ways of doing both checks:
+- separate: one `in` test per literal, and the screen split into lines
+  to find the last ones (the scan swarm did before PatternScanner)
+- aho-corasick: a pure-Python Aho-Corasick automaton, for reference
+- scanner: swarm.PatternScanner, a prefix-trie regex run by re
+
+Usage:
+    python3 benchmark_pattern_scan.py [--iterations N] [--json]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from collections import deque
+
+import swarm
+
+
+LINES = 2000
+LITERALS = 50
+CONTEXT = r"(\d+)%\s*(?:context\s+)?used"
+
+
+def make_patterns(rng: random.Random) -> list[str]:
+    """Literal patterns that look like agent prompts and share prefixes."""
+    words = ["Select", "Choose", "Paste", "Press", "Enter", "login", "method", "style",
+             "code", "here", "to", "continue", "the", "text", "theme", "Compacting"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(2, 4))) + f" {i}"
+            for i in range(LITERALS)]
+
+
+def make_screen(rng: random.Random, patterns: list[str]) -> str:
+    """LINES lines of tool output with a few patterns and context lines."""
+    lines = []
+    for i in range(LINES):
+        roll = rng.random()
+        if roll < 0.005:
+            lines.append(f"  > {rng.choice(patterns)}")
+        elif roll < 0.01:
+            lines.append(f"  {rng.randint(1, 99)}% context used")
+        else:
+            lines.append(f"{i:5d}  " + " ".join(rng.choice("abcdefghij") * rng.randint(1, 8)
+                                               for _ in range(8)))
+    return "\n".join(lines)
+
+
+def context_percents(screen: str, context: re.Pattern) -> list[int]:
+    percents = []
+    for start, end in swarm.non_empty_line_spans(screen, 3):
+        match = context.search(screen, start, end)
+        if match:
+            percents.append(int(match.group(1)))
+    return percents
+
+
+def scan_separate(screen: str, patterns: list[str], context: re.Pattern) -> tuple:
+    found = [p for p in patterns if p in screen]
+    lines = [line for line in screen.split("\n") if line.strip()]
+    percents = [int(m.group(1)) for line in lines[-3:] for m in [context.search(line)] if m]
+    return found, percents
+
+
+class AhoCorasick:
+    """Textbook Aho-Corasick automaton over str characters."""
+
+    def __init__(self, words: list[str]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.out: list[list[str]] = [[]]
+        for word in words:
+            state = 0
+            for char in word:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.out.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.out[state].append(word)
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                f = self.fail[state]
+                while f and char not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text: str) -> set[str]:
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.out[state]:
+                found.update(self.out[state])
+        return found
+
+
+def scan_aho_corasick(screen: str, automaton: AhoCorasick, context: re.Pattern) -> tuple:
+    return automaton.find(screen), context_percents(screen, context)
+
+
+def scan_scanner(screen: str, scanner: swarm.PatternScanner, context: re.Pattern) -> tuple:
+    return scanner.scan(screen), context_percents(screen, context)
+
+
+def time_scan(scan, iterations: int) -> float:
+    """Return the mean time of scan() in milliseconds."""
+    scan()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        scan()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def run_benchmark(iterations: int) -> list[dict]:
+    rng = random.Random(1)
+    patterns = make_patterns(rng)
+    screen = make_screen(rng, patterns)
+    context = re.compile(CONTEXT)
+    automaton = AhoCorasick(patterns)
+    scanner = swarm.PatternScanner({f"p{i}": p for i, p in enumerate(patterns)})
+
+    # All three find the same literals
+    expected = set(scan_separate(screen, patterns, context)[0])
+    assert automaton.find(screen) == expected
+    assert {patterns[int(name[1:])] for name, _ in scanner.scan(screen)} == expected
+
+    results = []
+    for name, scan in (
+        ("separate", lambda: scan_separate(screen, patterns, context)),
+        ("aho-corasick", lambda: scan_aho_corasick(screen, automaton, context)),
+        ("scanner", lambda: scan_scanner(screen, scanner, context)),
+    ):
+        results.append({"method": name, "ms": round(time_scan(scan, iterations), 3)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark screen pattern scanning")
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="Timed scans per method (default: 50)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.iterations)
+
+    if args.json:
+        print(json.dumps({"lines": LINES, "literals": LITERALS, "scans": results}, indent=2))
+        return
+
+    print(f"{LINES} lines, {LITERALS} literals")
+    print(f"{'METHOD':<14}{'TIME':>12}")
+    for r in results:
+        print(f"{r['method']:<14}{r['ms']:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
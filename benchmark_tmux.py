@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark for swarm's tmux command paths.
+
+This script starts a private tmux server (its own -L socket) with one window
+running `cat`, and measures the per-operation latency of the tmux commands
+swarm issues most often:
+- has-session (worker status checks)
+- capture-pane (peek, logs, ralph inactivity detection)
+- send-keys -l (send, ralph prompts, heartbeats)
+
+Each operation is timed through a new `tmux` process per command
+(subprocess.run, the default path) and through a persistent control-mode
+connection (TmuxClient, used inside tmux_control_pool()).
+
+It also times prompt delivery with tmux_send for 1KB, 16KB and 128KB
+prompts, typed (send-keys -l) and pasted (load-buffer + paste-buffer),
+until the text has reached the program in the pane (`cat` into a file).
+
+Usage:
+    python3 benchmark_tmux.py [--iterations N] [--delivery-iterations N] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import swarm
+
+
+OPERATIONS = {
+    "has-session": ["has-session", "-t", "bench:w1"],
+    "capture-pane": ["capture-pane", "-p", "-t", "bench:w1"],
+    "send-keys": ["send-keys", "-t", "bench:w1", "-l", "x"],
+}
+
+
+PROMPT_SIZES = {"1KB": 1024, "16KB": 16 * 1024, "128KB": 128 * 1024}
+
+# Longest wait for a delivered prompt to reach the pane's program
+DELIVERY_TIMEOUT = 30.0
+
+
+def time_operation(run, args: list[str], iterations: int) -> float:
+    """Return the mean latency of run(args) in milliseconds."""
+    run(args)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run(args)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def run_benchmark(iterations: int) -> list[dict]:
+    socket = f"swarm-bench-{uuid.uuid4().hex[:8]}"
+    subprocess.run(
+        ["tmux", "-L", socket, "new-session", "-d", "-s", "bench", "-n", "w1", "cat"],
+        check=True, capture_output=True,
+    )
+    client = swarm.TmuxClient(socket, "bench")
+    try:
+        def via_subprocess(args):
+            subprocess.run(["tmux", "-L", socket] + args, capture_output=True)
+
+        def via_control(args):
+            if client.run(args) is None:
+                raise RuntimeError("control-mode connection unavailable")
+
+        results = []
+        for name, args in OPERATIONS.items():
+            subprocess_ms = time_operation(via_subprocess, args, iterations)
+            control_ms = time_operation(via_control, args, iterations)
+            results.append({
+                "operation": name,
+                "subprocess_ms": round(subprocess_ms, 3),
+                "control_ms": round(control_ms, 3),
+                "speedup": round(subprocess_ms / control_ms, 1) if control_ms else None,
+            })
+        return results
+    finally:
+        client.close()
+        subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
+
+
+def make_prompt(size: int) -> str:
+    """Markdown-like text of exactly size bytes, ending in a newline."""
+    line = "- " + "lorem ipsum dolor sit amet " * 2 + "\n"
+    text = (line * (size // len(line) + 1))[:size - 1]
+    return text + "\n"
+
+
+def time_delivery(socket: str, output: str, text: str, paste: bool, iterations: int) -> float:
+    """Return the mean ms for tmux_send to get text to `cat` in the pane."""
+    expected = len(text.encode())
+    total = 0.0
+    for _ in range(iterations):
+        with open(output, "w"):
+            pass
+        start = time.perf_counter()
+        swarm.tmux_send("bench", "w2", text, enter=False, socket=socket,
+                        pre_clear=False, paste=paste)
+        deadline = time.monotonic() + DELIVERY_TIMEOUT
+        while os.path.getsize(output) < expected:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{expected} bytes not delivered")
+            time.sleep(0.001)
+        total += time.perf_counter() - start
+    return total * 1000 / iterations
+
+
+def run_delivery_benchmark(iterations: int) -> list[dict]:
+    socket = f"swarm-bench-{uuid.uuid4().hex[:8]}"
+    output = tempfile.NamedTemporaryFile(prefix="swarm-bench-", delete=False).name
+    subprocess.run(
+        ["tmux", "-L", socket, "new-session", "-d", "-s", "bench", "-n", "w2",
+         f"cat > {output}"],
+        check=True, capture_output=True,
+    )
+    try:
+        results = []
+        for name, size in PROMPT_SIZES.items():
+            text = make_prompt(size)
+            row = {"prompt": name}
+            for path, paste in (("send_keys", False), ("paste", True)):
+                try:
+                    row[f"{path}_ms"] = round(time_delivery(socket, output, text, paste, iterations), 1)
+                except (OSError, subprocess.CalledProcessError, TimeoutError) as e:
+                    stderr = getattr(e, "stderr", None)
+                    row[f"{path}_ms"] = None
+                    row[f"{path}_error"] = (stderr.strip() if stderr else str(e))
+            results.append(row)
+        return results
+    finally:
+        subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
+        os.unlink(output)
+
+
+def format_ms(row: dict, key: str) -> str:
+    if row[f"{key}_ms"] is None:
+        return "failed"
+    return f"{row[f'{key}_ms']:.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tmux command latency")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="Timed runs per operation and path (default: 200)")
+    parser.add_argument("--delivery-iterations", type=int, default=5,
+                        help="Timed deliveries per prompt size and path (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if not shutil.which("tmux"):
+        print("benchmark_tmux: tmux not installed", file=sys.stderr)
+        sys.exit(1)
+
+    results = run_benchmark(args.iterations)
+    delivery = run_delivery_benchmark(args.delivery_iterations)
+
+    if args.json:
+        print(json.dumps({"operations": results, "delivery": delivery}, indent=2))
+        return
+
+    print(f"{'OPERATION':<14}{'SUBPROCESS':>14}{'CONTROL MODE':>16}{'SPEEDUP':>10}")
+    for r in results:
+        print(f"{r['operation']:<14}{r['subprocess_ms']:>11.3f} ms"
+              f"{r['control_ms']:>13.3f} ms{r['speedup']:>9.1f}x")
+
+    print()
+    print(f"{'PROMPT':<14}{'SEND-KEYS':>14}{'PASTE':>16}")
+    for r in delivery:
+        print(f"{r['prompt']:<14}{format_ms(r, 'send_keys'):>14}{format_ms(r, 'paste'):>16}")
+    for r in delivery:
+        for path in ("send_keys", "paste"):
+            if r.get(f"{path}_error"):
+                print(f"  {r['prompt']} {path}: {r[f'{path}_error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Shared fixtures for the state backend tests.
+
+make_worker() builds the workers these tests store, and StateTestCase
+redirects every state path into a temporary SWARM_DIR with the backend
+named by its `backend` attribute. Test files subclass it, set `backend`
+and add their own patches in extra_patches().
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+
+
+def make_worker(name: str, status: str = "running", tags=None,
+                session=None, socket=None, stopped_ago: timedelta = None,
+                **tmux_fields) -> swarm.Worker:
+    """Create a worker for state tests.
+
+    A tmux worker in window `name` if session is given, with any further
+    TmuxInfo fields in tmux_fields; a PID worker otherwise. With
+    stopped_ago, metadata records that it stopped that long ago.
+    """
+    tmux = (swarm.TmuxInfo(session=session, window=name, socket=socket, **tmux_fields)
+            if session else None)
+    metadata = {}
+    if stopped_ago is not None:
+        metadata["stopped_at"] = (datetime.now() - stopped_ago).isoformat()
+    return swarm.Worker(
+        name=name,
+        status=status,
+        cmd=["echo", name],
+        started="2026-01-01T00:00:00",
+        cwd="/tmp",
+        tmux=tmux,
+        pid=None if tmux else 1234,
+        tags=tags or [],
+        metadata=metadata,
+    )
+
+
+class StateTestCase(unittest.TestCase):
+    """Base class: isolated SWARM_DIR with the `backend` state backend."""
+
+    backend = "json"
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.state_file = self.temp_dir / "state.json"
+        self.workers_dir = self.temp_dir / "workers"
+        self.db_file = self.temp_dir / "state.db"
+        self.journal_file = self.temp_dir / "state.journal"
+        self.archive_dir = self.temp_dir / "archive"
+        self.patches = [
+            patch.object(swarm, 'SWARM_DIR', self.temp_dir),
+            patch.object(swarm, 'STATE_FILE', self.state_file),
+            patch.object(swarm, 'STATE_LOCK_FILE', self.temp_dir / "state.lock"),
+            patch.object(swarm, 'WORKERS_DIR', self.workers_dir),
+            patch.object(swarm, 'STATE_DB_FILE', self.db_file),
+            patch.object(swarm, 'STATE_JOURNAL_FILE', self.journal_file),
+            patch.object(swarm, 'LOGS_DIR', self.temp_dir / "logs"),
+            patch.object(swarm, 'RALPH_DIR', self.temp_dir / "ralph"),
+            patch.object(swarm, 'HEARTBEATS_DIR', self.temp_dir / "heartbeats"),
+            patch.object(swarm, 'HEARTBEAT_LOCK_FILE', self.temp_dir / "heartbeat.lock"),
+            patch.object(swarm, 'ARCHIVE_DIR', self.archive_dir),
+            patch.object(swarm, 'STATE_BACKEND', self.backend),
+        ] + self.extra_patches()
+        for p in self.patches:
+            p.start()
+
+    def extra_patches(self) -> list:
+        """Patches a test file needs on top of the isolated state paths."""
+        return []
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        swarm._state_cache.clear()
+        shutil.rmtree(self.temp_dir)
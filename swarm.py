@@ -5,15 +5,24 @@ A minimal CLI tool for spawning, tracking, and controlling agent processes via t
 """
 
 import argparse
+import atexit
+import codecs
+import copy
 import fcntl
+import gzip
 import hashlib
 import json
 import os
+import re
+import select
 import shlex
 import signal
 import subprocess
 import sys
 import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone, timedelta
@@ -26,9 +35,108 @@ from typing import Optional
 SWARM_DIR = Path(os.environ.get("SWARM_DIR", str(Path.home() / ".swarm")))
 STATE_FILE = SWARM_DIR / "state.json"
 STATE_LOCK_FILE = SWARM_DIR / "state.lock"
+WORKERS_DIR = SWARM_DIR / "workers"  # Per-worker state files (sharded backend)
+STATE_DB_FILE = SWARM_DIR / "state.db"  # SQLite database (sqlite backend)
+STATE_JOURNAL_FILE = SWARM_DIR / "state.journal"  # Mutation log (journal backend)
 LOGS_DIR = SWARM_DIR / "logs"
 RALPH_DIR = SWARM_DIR / "ralph"  # Ralph loop state directory
 HEARTBEATS_DIR = SWARM_DIR / "heartbeats"  # Heartbeat state directory
+ARCHIVE_DIR = SWARM_DIR / "archive"  # Archived stopped workers (gzipped JSON lines)
+STATUS_CACHE_FILE = SWARM_DIR / "status.cache"  # Recent tmux window listings
+PEEK_CURSORS_DIR = SWARM_DIR / "peek"  # What `peek --since-last` last showed per worker
+SNAPSHOTS_DIR = SWARM_DIR / "snapshots"  # Latest pane captures published by monitors
+PROFILES_FILE = SWARM_DIR / "profiles.json"  # User-defined agent profiles
+
+# Tmux workers' pane output is appended to LOGS_DIR/<name>.pane.log through
+# `tmux pipe-pane`. A log that reaches PANE_LOG_MAX_BYTES is renamed to
+# <name>.pane.log.1 (replacing the previous one), capping each worker at
+# twice this size on disk.
+PANE_LOG_MAX_BYTES = 10 * 1024 * 1024
+PANE_LOG_POLL_INTERVAL = 0.2  # Seconds between reads in `logs --follow`
+
+# wait_for_agent_ready() reads new output from the worker's pane log every
+# READY_STREAM_INTERVAL seconds and captures the screen as soon as it
+# matches a ready or not-ready pattern. Otherwise, and for panes without a
+# log, the screen is captured after READY_POLL_MIN_INTERVAL, doubling up to
+# READY_POLL_MAX_INTERVAL while nothing changes. A not-ready prompt is
+# dismissed with Enter again only once the screen changed or after
+# READY_DISMISS_RETRY seconds.
+READY_STREAM_INTERVAL = 0.02
+READY_STREAM_CARRY = 256  # Characters of output kept for matches across reads
+READY_POLL_MIN_INTERVAL = 0.05
+READY_POLL_MAX_INTERVAL = 1.0
+READY_DISMISS_RETRY = 2.0
+
+# State storage backend, selected via SWARM_STATE_BACKEND:
+# - "json" (default): all workers in the single STATE_FILE document
+# - "sharded": one file per worker under WORKERS_DIR, so mutating one worker
+#   costs O(1) I/O regardless of how many workers are registered
+# - "sqlite": workers, ralph state and heartbeat state as rows in the WAL-mode
+#   STATE_DB_FILE, with indexed lookups and lock-free concurrent readers
+# - "journal": STATE_FILE as a checkpoint plus small records appended to
+#   STATE_JOURNAL_FILE; ralph and heartbeat state are journaled the same way
+STATE_BACKEND = os.environ.get("SWARM_STATE_BACKEND", "json")
+
+# Workers stopped for longer than this are moved from the state backend into
+# ARCHIVE_DIR by `swarm ls`, keeping the hot state bounded by the live workers.
+# A duration such as "24h" or "90m"; "off" disables archiving.
+ARCHIVE_AFTER = os.environ.get("SWARM_ARCHIVE_AFTER", "24h")
+
+# Seconds a tmux window listing in STATUS_CACHE_FILE answers the status checks
+# of polling loops (ralph and heartbeat monitors, wait) in any swarm process
+# before tmux is asked again. Swarm's own window creation and kills clear it;
+# other changes are seen at most this late. Interactive commands always ask
+# tmux. "0" disables the shared cache.
+STATUS_CACHE_TTL = os.environ.get("SWARM_STATUS_CACHE_TTL", "1")
+
+# Long-running loops (ralph and heartbeat monitors, logs --follow) send tmux
+# commands over a persistent `tmux -C` connection per socket instead of
+# starting a tmux process for each one. SWARM_TMUX_CONTROL=0 disables this.
+TMUX_CONTROL_MODE = os.environ.get("SWARM_TMUX_CONTROL", "1")
+TMUX_CLIENT_TIMEOUT = 10.0  # Seconds to wait for a control-mode reply
+TMUX_CLIENT_RETRY_INTERVAL = 5.0  # Seconds before reconnecting after a failure
+TMUX_SEND_ENTER_WAIT = 0.1  # Max seconds between typed text and Enter
+TMUX_SEND_ENTER_WAIT_MULTILINE = 0.5  # Same, for multiline text
+TMUX_SEND_POLL_INTERVAL = 0.01  # Seconds between cursor checks while text lands
+TMUX_PASTE_THRESHOLD = 1024  # Bytes above which tmux_send pastes instead of typing
+
+# PaneCapture keeps the last PANE_CAPTURE_HISTORY scrollback lines of a pane
+# and fetches only the lines added since its previous poll: at first the
+# full depth, then a span that adapts to recent output (at least
+# PANE_CAPTURE_MIN_SPAN lines). New lines are counted by #{history_size} and
+# checked, or once tmux drops old lines at history-limit found, by matching
+# the last PANE_CAPTURE_ANCHOR_LINES known lines in the fetched span.
+PANE_CAPTURE_HISTORY = 2000
+PANE_CAPTURE_MIN_SPAN = 64
+PANE_CAPTURE_ANCHOR_LINES = 8
+
+# DoneScanner searches only output added since its previous check, plus the
+# last DONE_SCAN_OVERLAP_LINES lines before it so that matches spanning
+# lines are still found
+DONE_SCAN_OVERLAP_LINES = 20
+
+# Lines at the end of a prompt baseline whose rolling hash is stored to find
+# the baseline's end again (see PromptBaseline)
+PROMPT_BASELINE_TAIL_LINES = 8
+
+# A ralph monitor writes screen change times (last_screen_change) to ralph
+# state at most every RALPH_STATE_FLUSH_INTERVAL seconds (see RalphStateWriter);
+# `ralph status` reports no output change only after 60s
+RALPH_STATE_FLUSH_INTERVAL = 15.0
+
+# Panes captured per chained tmux call; tmux rejects commands over ~16 KB
+TMUX_CAPTURE_BATCH = 32
+
+# Ralph and heartbeat monitors publish every pane capture, with up to
+# SNAPSHOT_HISTORY_LINES lines of scrollback, to SNAPSHOTS_DIR/<name>.
+# `peek`, `logs` and `ralph status` print a snapshot at most
+# SWARM_SNAPSHOT_MAX_AGE seconds old instead of capturing the pane again.
+# "0" makes them always capture.
+SNAPSHOT_MAX_AGE = os.environ.get("SWARM_SNAPSHOT_MAX_AGE", "5")
+SNAPSHOT_HISTORY_LINES = 100
+
+# Workers handled at once by send/peek/interrupt/kill --all (--parallel)
+DEFAULT_PARALLEL = 16
 
 # Stuck patterns: screen content substrings that indicate the worker is stuck
 # at an interactive prompt and not making progress. Maps pattern to warning message.
@@ -511,6 +619,7 @@ Command Groups:
     status              Show detailed status of a single worker
     logs                View worker output (supports --follow)
     attach              Attach to worker's tmux window
+    tmux-stats          Show tmux server memory and scrollback per worker
 
   Interaction:
     send                Send text/commands to a running worker
@@ -656,6 +765,14 @@ Examples:
   # Count running workers
   swarm ls --status running --format names | wc -l
 
+  # Workers moved to the archive after being stopped for SWARM_ARCHIVE_AFTER
+  swarm ls --archived
+
+Archive:
+  Workers stopped longer than SWARM_ARCHIVE_AFTER (default 24h, "off" to
+  disable) are moved from the state file to ~/.swarm/archive/*.jsonl.gz when
+  `swarm ls` runs. `swarm respawn <name>` restores an archived worker.
+
 See Also:
   swarm status --help    Detailed info for single worker
   swarm spawn --help     Create new workers
@@ -736,6 +853,9 @@ Output Format:
   For --all: each worker's output is preceded by a header:
     === worker-name ===
     [last N lines of terminal output]
+  With --since-last: only lines not shown by the previous --since-last peek
+  (at most N lines of scrollback plus the screen); workers without new
+  output print nothing, not even a header.
 
 Examples:
   # Peek at a worker's terminal output (last 30 lines)
@@ -750,12 +870,51 @@ Examples:
   # Peek all with custom line count
   swarm peek --all -n 50
 
+  # Show only what changed since the last --since-last peek
+  swarm peek --all --since-last
+
 See Also:
   swarm attach --help    Attach to worker's tmux window (interactive)
   swarm logs --help      View worker log files
   swarm status --help    Check worker status
 """
 
+# Tmux-stats command help
+TMUX_STATS_HELP_DESCRIPTION = """\
+Show how much memory the tmux servers running workers use.
+
+Reports the resident memory (RSS) of the tmux server on each socket that
+workers use, and the scrollback each worker's pane holds, so history
+limits can be sized against memory. Use --history-limit on spawn or
+ralph spawn to change a worker's scrollback.
+"""
+
+TMUX_STATS_HELP_EPILOG = """\
+Output Format:
+  Servers (one row per tmux socket with workers):
+    SOCKET       Socket name ("default" for the default server)
+    PID          tmux server process
+    RSS          Resident memory of the server
+    PANES        Panes on the server, including non-swarm ones
+    HISTORY      Scrollback lines held by all of them
+    HISTORY MEM  Memory tmux reports for that scrollback
+
+  Workers (one row per running tmux worker):
+    HISTORY      Scrollback lines held by the pane
+    LIMIT        The pane's history-limit
+
+Examples:
+  # Scrollback and server memory for all workers
+  swarm tmux-stats
+
+  # Workers with the most scrollback
+  swarm tmux-stats --format json | jq '.windows | sort_by(-.history_size)'
+
+See Also:
+  swarm spawn --help     --history-limit sets a worker's scrollback
+  swarm ls --help        List workers
+"""
+
 # Send command help
 SEND_HELP_DESCRIPTION = """\
 Send text input to tmux-based workers.
@@ -891,6 +1050,10 @@ For tmux workers, captures output directly from the tmux pane. By default,
 shows only the visible pane content. Use --history to include scrollback
 buffer (up to --lines lines). Use --follow for live tailing.
 
+Everything a tmux worker prints is also appended to its pane log,
+~/.swarm/logs/<name>.pane.log. --follow streams new output from it, and
+once the tmux window is gone, logs shows its last --lines lines.
+
 For background (non-tmux) workers, reads from log files stored in
 ~/.swarm/logs/<name>.stdout.log. Use --follow to tail the log file.
 
@@ -899,7 +1062,9 @@ use: swarm ralph logs <name>
 """
 
 LOGS_HELP_EPILOG = r"""Log Storage:
-  Tmux workers:     Output captured directly from tmux pane
+  Tmux workers:     Output captured directly from tmux pane, and
+                    ~/.swarm/logs/<name>.pane.log (raw pane output,
+                    rotated to <name>.pane.log.1 at 10 MB)
   Non-tmux workers: ~/.swarm/logs/<name>.stdout.log
 
 Examples:
@@ -1031,7 +1196,8 @@ use: swarm ralph clean <name>
 
 What Gets Cleaned:
   - Worker entry in state file (~/.swarm/state.json)
-  - Log files (~/.swarm/logs/<name>.stdout.log, <name>.stderr.log)
+  - Log files (~/.swarm/logs/<name>.stdout.log, <name>.stderr.log,
+    <name>.pane.log)
   - Git worktree directory (with --rm-worktree, default: enabled)
   - Empty tmux sessions (automatically destroyed if no other workers)
 """
@@ -1984,6 +2150,19 @@ class TmuxInfo:
     session: str
     window: str
     socket: Optional[str] = None
+    history_limit: Optional[int] = None  # Scrollback lines of the pane (None: tmux's history-limit)
+    window_id: Optional[str] = None  # tmux window ID ("@N"), unique for the server's lifetime
+    pane_id: Optional[str] = None  # tmux pane ID ("%N")
+
+    @property
+    def pane(self) -> str:
+        """The worker's pane for the tmux helpers' `window` argument.
+
+        The pane ID when known, so a reused window name never resolves to
+        another worker's window; the window name for state recorded before
+        IDs were stored.
+        """
+        return self.pane_id or self.window
 
 
 @dataclass
@@ -2046,6 +2225,82 @@ class Worker:
         )
 
 
+@dataclass
+class PromptBaseline:
+    """Where the pane content captured after sending a prompt ended.
+
+    Instead of the content, ralph state keeps the pane line its last
+    non-blank line was on (counted from the oldest line of the capture
+    poll, None if unknown), the column where that line ended, and a
+    polynomial rolling hash of the last `tail` lines up to there (CRC-32
+    per line). end_in() checks the hash at the recorded line first; if
+    the lines have moved, e.g. because tmux dropped scrollback at
+    history-limit, it rolls the hash over the whole content to find them.
+    """
+    line: Optional[int]
+    column: int
+    tail: int
+    hash: int
+
+    HASH_BASE = 1_000_003
+    HASH_MOD = (1 << 61) - 1
+
+    @classmethod
+    def from_content(cls, content: str, first_line: Optional[int] = None) -> Optional["PromptBaseline"]:
+        """Describe a pane capture, or return None if it is blank.
+
+        Args:
+            content: Captured pane text (scrollback and screen)
+            first_line: Pane line number of the content's first line, if known
+        """
+        # The screen's blank rows below the prompt fill up with output later
+        lines = content.rstrip().split("\n")
+        if lines == [""]:
+            return None
+        tail = min(PROMPT_BASELINE_TAIL_LINES, len(lines))
+        acc = 0
+        for line in lines[-tail:]:
+            acc = (acc * cls.HASH_BASE + zlib.crc32(line.encode())) % cls.HASH_MOD
+        return cls(
+            line=None if first_line is None else first_line + len(lines) - 1,
+            column=len(lines[-1]),
+            tail=tail,
+            hash=acc,
+        )
+
+    def end_in(self, content: str, first_line: Optional[int] = None) -> int:
+        """Return the offset in content just after the baseline, or 0 if it is not there.
+
+        Args:
+            content: Pane text to look in
+            first_line: Pane line number of the content's first line, if known
+        """
+        lines = content.split("\n")
+        base, mod = self.HASH_BASE, self.HASH_MOD
+        # prefix[i]: hash of lines[:i]; lines[a:b] hash to
+        # prefix[b] - prefix[a] * base^(b - a)
+        prefix = [0]
+        for line in lines:
+            prefix.append((prefix[-1] * base + zlib.crc32(line.encode())) % mod)
+        shift = pow(base, self.tail - 1, mod)
+
+        def matches(end: int) -> bool:
+            if end < self.tail - 1 or end >= len(lines) or len(lines[end]) < self.column:
+                return False
+            start = end - self.tail + 1
+            head = (prefix[end] - prefix[start] * shift) % mod
+            last = zlib.crc32(lines[end][:self.column].encode())
+            return (head * base + last) % mod == self.hash
+
+        candidates = range(len(lines) - 1, -1, -1)
+        if self.line is not None and first_line is not None:
+            candidates = [self.line - first_line, *candidates]
+        for end in candidates:
+            if matches(end):
+                return sum(len(line) + 1 for line in lines[:end]) + self.column
+        return 0
+
+
 @dataclass
 class RalphState:
     """Ralph loop state for a worker."""
@@ -2064,7 +2319,7 @@ class RalphState:
     inactivity_timeout: int = 180
     check_done_continuous: bool = False
     exit_reason: Optional[str] = None  # done_pattern, max_iterations, killed, failed, monitor_disconnected
-    prompt_baseline_content: str = ""  # Pane content snapshot after prompt injection, for done-pattern baseline filtering
+    prompt_baseline: Optional[PromptBaseline] = None  # End of the pane content after prompt injection, for done-pattern baseline filtering
     last_screen_change: Optional[str] = None  # ISO format timestamp of last screen content change
     monitor_pid: Optional[int] = None  # PID of background monitoring loop process
     max_context: Optional[int] = None  # Context percentage threshold for nudge/kill
@@ -2088,7 +2343,7 @@ class RalphState:
             "inactivity_timeout": self.inactivity_timeout,
             "check_done_continuous": self.check_done_continuous,
             "exit_reason": self.exit_reason,
-            "prompt_baseline_content": self.prompt_baseline_content,
+            "prompt_baseline": asdict(self.prompt_baseline) if self.prompt_baseline else None,
             "last_screen_change": self.last_screen_change,
             "monitor_pid": self.monitor_pid,
             "max_context": self.max_context,
@@ -2098,6 +2353,11 @@ class RalphState:
     @classmethod
     def from_dict(cls, d: dict) -> "RalphState":
         """Create RalphState from dictionary."""
+        if d.get("prompt_baseline"):
+            prompt_baseline = PromptBaseline(**d["prompt_baseline"])
+        else:
+            # State written before baselines were hashed kept the whole content
+            prompt_baseline = PromptBaseline.from_content(d.get("prompt_baseline_content", ""))
         return cls(
             worker_name=d["worker_name"],
             prompt_file=d["prompt_file"],
@@ -2114,7 +2374,7 @@ class RalphState:
             inactivity_timeout=d.get("inactivity_timeout", 180),
             check_done_continuous=d.get("check_done_continuous", False),
             exit_reason=d.get("exit_reason"),
-            prompt_baseline_content=d.get("prompt_baseline_content", ""),
+            prompt_baseline=prompt_baseline,
             last_screen_change=d.get("last_screen_change"),
             monitor_pid=d.get("monitor_pid"),
             max_context=d.get("max_context"),
@@ -2227,14 +2487,28 @@ def load_heartbeat_state(worker_name: str) -> Optional[HeartbeatState]:
     Returns:
         HeartbeatState if it exists, None otherwise
     """
+    if STATE_BACKEND == "sqlite":
+        return SqliteStateStore().load_heartbeat_state(worker_name)
     with heartbeat_file_lock():
         state_path = get_heartbeat_state_path(worker_name)
         if not state_path.exists():
             return None
 
+        data = _read_heartbeat_state_file(state_path)
+        if data is None:
+            return None
+        return HeartbeatState.from_dict(data)
+
+
+def _read_heartbeat_state_file(state_path: Path) -> Optional[dict]:
+    """Read a heartbeat state file, replaying its journal with the journal backend."""
+    def read_checkpoint() -> dict:
         with open(state_path, "r") as f:
-            data = json.load(f)
-            return HeartbeatState.from_dict(data)
+            return json.load(f)
+
+    if STATE_BACKEND == "journal":
+        return state_document_journal(state_path).load_document(read_checkpoint)
+    return read_checkpoint()
 
 
 def save_heartbeat_state(heartbeat_state: HeartbeatState) -> None:
@@ -2246,9 +2520,15 @@ def save_heartbeat_state(heartbeat_state: HeartbeatState) -> None:
     Args:
         heartbeat_state: HeartbeatState to save
     """
+    if STATE_BACKEND == "sqlite":
+        SqliteStateStore().save_heartbeat_state(heartbeat_state)
+        return
     with heartbeat_file_lock():
         HEARTBEATS_DIR.mkdir(parents=True, exist_ok=True)
         state_path = get_heartbeat_state_path(heartbeat_state.worker_name)
+        if STATE_BACKEND == "journal":
+            state_document_journal(state_path).save_document(heartbeat_state.to_dict())
+            return
 
         tmp_path = state_path.with_suffix('.json.tmp')
         with open(tmp_path, "w") as f:
@@ -2267,8 +2547,12 @@ def delete_heartbeat_state(worker_name: str) -> bool:
     Returns:
         True if file was deleted, False if it didn't exist
     """
+    if STATE_BACKEND == "sqlite":
+        return SqliteStateStore().delete_heartbeat_state(worker_name)
     with heartbeat_file_lock():
         state_path = get_heartbeat_state_path(worker_name)
+        if STATE_BACKEND == "journal":
+            state_document_journal(state_path).remove()
         if state_path.exists():
             state_path.unlink()
             return True
@@ -2284,6 +2568,8 @@ def list_heartbeat_states() -> list[HeartbeatState]:
     Returns:
         List of HeartbeatState objects, sorted by worker name
     """
+    if STATE_BACKEND == "sqlite":
+        return SqliteStateStore().list_heartbeat_states()
     with heartbeat_file_lock():
         if not HEARTBEATS_DIR.exists():
             return []
@@ -2291,8 +2577,8 @@ def list_heartbeat_states() -> list[HeartbeatState]:
         states = []
         for state_file in HEARTBEATS_DIR.glob("*.json"):
             try:
-                with open(state_file, "r") as f:
-                    data = json.load(f)
+                data = _read_heartbeat_state_file(state_file)
+                if data is not None:
                     states.append(HeartbeatState.from_dict(data))
             except (json.JSONDecodeError, KeyError):
                 # Skip invalid state files
@@ -2362,8 +2648,9 @@ def run_heartbeat_monitor(worker_name: str) -> None:
             save_heartbeat_state(heartbeat_state)
             return
 
-        # Check actual worker status
-        actual_status = refresh_worker_status(worker)
+        # Check actual worker status (alongside other monitors' checks)
+        with tmux_status_snapshot(shared=True):
+            actual_status = refresh_worker_status(worker)
         if actual_status != "running":
             # Worker died
             heartbeat_state.status = "stopped"
@@ -2377,11 +2664,12 @@ def run_heartbeat_monitor(worker_name: str) -> None:
             try:
                 pane_content = tmux_capture_pane(
                     worker.tmux.session,
-                    worker.tmux.window,
+                    worker.tmux.pane,
                     socket=worker.tmux.socket
                 )
-                lines = [l for l in pane_content.rstrip().split('\n') if l.strip()]
-                last_line = lines[-1] if lines else ""
+                publish_snapshot(worker, pane_content)
+                spans = non_empty_line_spans(pane_content, 1)
+                last_line = pane_content[spans[0][0]:spans[0][1]] if spans else ""
                 if heartbeat_state.message in last_line:
                     # Previous beat unconsumed, skip this one
                     last_beat_monotonic = time.monotonic()
@@ -2393,7 +2681,7 @@ def run_heartbeat_monitor(worker_name: str) -> None:
             try:
                 tmux_send(
                     worker.tmux.session,
-                    worker.tmux.window,
+                    worker.tmux.pane,
                     heartbeat_state.message,
                     enter=True,
                     socket=worker.tmux.socket,
@@ -2454,7 +2742,8 @@ def start_heartbeat_monitor(worker_name: str) -> int:
 
     # Run the monitor loop
     try:
-        run_heartbeat_monitor(worker_name)
+        with tmux_control_pool():
+            run_heartbeat_monitor(worker_name)
     except Exception:
         pass
     finally:
@@ -2686,6 +2975,15 @@ def get_ralph_state_path(worker_name: str) -> Path:
     return RALPH_DIR / worker_name / "state.json"
 
 
+def state_document_journal(state_path: Path) -> "StateJournal":
+    """Get the journal kept next to a ralph or heartbeat state file.
+
+    With the journal backend, state.json / <name>.json is the checkpoint
+    and field updates are appended to state.journal / <name>.journal.
+    """
+    return StateJournal(state_path, state_path.with_suffix('.journal'))
+
+
 def load_ralph_state(worker_name: str) -> Optional[RalphState]:
     """Load ralph state for a worker.
 
@@ -2697,14 +2995,24 @@ def load_ralph_state(worker_name: str) -> Optional[RalphState]:
         If the state file is corrupt JSON, backs up to state.json.corrupted
         and returns a fresh default RalphState.
     """
+    if STATE_BACKEND == "sqlite":
+        return SqliteStateStore().load_ralph_state(worker_name)
     state_path = get_ralph_state_path(worker_name)
     if not state_path.exists():
         return None
 
-    try:
+    def read_checkpoint() -> dict:
         with open(state_path, "r") as f:
-            data = json.load(f)
-            return RalphState.from_dict(data)
+            return json.load(f)
+
+    try:
+        if STATE_BACKEND == "journal":
+            data = state_document_journal(state_path).load_document(read_checkpoint)
+            if data is None:
+                return None
+        else:
+            data = read_checkpoint()
+        return RalphState.from_dict(data)
     except json.JSONDecodeError:
         print(f"swarm: warning: corrupt ralph state for '{worker_name}', resetting",
               file=sys.stderr)
@@ -2729,7 +3037,13 @@ def save_ralph_state(ralph_state: RalphState) -> None:
     Args:
         ralph_state: RalphState to save
     """
+    if STATE_BACKEND == "sqlite":
+        SqliteStateStore().save_ralph_state(ralph_state)
+        return
     state_path = get_ralph_state_path(ralph_state.worker_name)
+    if STATE_BACKEND == "journal":
+        state_document_journal(state_path).save_document(ralph_state.to_dict())
+        return
     state_path.parent.mkdir(parents=True, exist_ok=True)
 
     tmp_path = state_path.with_suffix('.json.tmp')
@@ -2738,6 +3052,110 @@ def save_ralph_state(ralph_state: RalphState) -> None:
     os.replace(tmp_path, state_path)
 
 
+class RalphStateWriter:
+    """Coalesces a ralph monitor's writes of its RalphState.
+
+    detect_inactivity() records every screen change in last_screen_change.
+    Instead of saving the state each time, screen_changed() marks it dirty
+    and flush() writes it at most every flush_interval seconds (the first
+    change right away), and once more when monitoring ends. Such a flush
+    only sets last_screen_change in the saved state, so fields changed by
+    other processes meanwhile (e.g. `swarm ralph pause`) are kept. If the
+    status or iteration of the monitor's copy changed, the whole state is
+    saved right away.
+    """
+
+    def __init__(self, ralph_state: RalphState, flush_interval: float = RALPH_STATE_FLUSH_INTERVAL):
+        self.ralph_state = ralph_state
+        self.flush_interval = flush_interval
+        self.dirty = False
+        self.flushed_at: Optional[float] = None  # time.monotonic() of the last write
+        self.saved = (ralph_state.status, ralph_state.current_iteration)
+
+    def screen_changed(self) -> None:
+        """Record a screen change now, writing it if the interval has passed."""
+        self.ralph_state.last_screen_change = datetime.now(timezone.utc).isoformat()
+        self.dirty = True
+        self.flush(force=False)
+
+    def flush(self, force: bool = True) -> None:
+        """Write pending changes.
+
+        Args:
+            force: Write a pending screen change even if the interval has
+                not passed since the last write
+        """
+        now = time.monotonic()
+        if (self.ralph_state.status, self.ralph_state.current_iteration) != self.saved:
+            save_ralph_state(self.ralph_state)
+        elif not self.dirty:
+            return
+        elif not force and self.flushed_at is not None and now - self.flushed_at < self.flush_interval:
+            return
+        else:
+            saved_state = load_ralph_state(self.ralph_state.worker_name)
+            if saved_state is None:
+                # Removed meanwhile (ralph clean); don't bring it back
+                self.dirty = False
+                return
+            saved_state.last_screen_change = self.ralph_state.last_screen_change
+            save_ralph_state(saved_state)
+        self.dirty = False
+        self.flushed_at = now
+        self.saved = (self.ralph_state.status, self.ralph_state.current_iteration)
+
+
+def list_ralph_states() -> list[RalphState]:
+    """List ralph state for every worker that has it.
+
+    Returns:
+        List of RalphState objects, sorted by worker name
+    """
+    if STATE_BACKEND == "sqlite":
+        return SqliteStateStore().list_ralph_states()
+    if not RALPH_DIR.exists():
+        return []
+    states = []
+    for worker_dir in sorted(RALPH_DIR.iterdir()):
+        if worker_dir.is_dir() and (worker_dir / "state.json").exists():
+            ralph_state = load_ralph_state(worker_dir.name)
+            if ralph_state:
+                states.append(ralph_state)
+    return states
+
+
+def has_ralph_state(worker_name: str) -> bool:
+    """Check whether a worker has ralph state to clean up.
+
+    With the sqlite backend the state is a row, and the worker's ralph
+    directory exists only once an iteration has been logged.
+
+    Args:
+        worker_name: Name of the worker
+    """
+    return (RALPH_DIR / worker_name).exists() or load_ralph_state(worker_name) is not None
+
+
+def remove_ralph_state(worker_name: str) -> None:
+    """Delete a worker's ralph state directory (state and iterations log).
+
+    With the sqlite backend the worker's ralph state row is deleted too.
+    A missing directory is not an error.
+
+    Args:
+        worker_name: Name of the worker
+
+    Raises:
+        OSError: If the directory cannot be removed
+    """
+    if STATE_BACKEND == "sqlite":
+        SqliteStateStore().delete_ralph_state(worker_name)
+    ralph_state_dir = RALPH_DIR / worker_name
+    if ralph_state_dir.exists():
+        import shutil
+        shutil.rmtree(ralph_state_dir)
+
+
 def get_ralph_iterations_log_path(worker_name: str) -> Path:
     """Get the path to a worker's ralph iterations log file."""
     return RALPH_DIR / worker_name / "iterations.log"
@@ -2796,24 +3214,28 @@ def log_ralph_iteration(worker_name: str, event: str, **kwargs) -> None:
 
 
 @contextmanager
-def state_file_lock():
-    """Context manager for exclusive locking of state file.
+def state_file_lock(shared: bool = False):
+    """Context manager for locking of state file.
 
     This prevents race conditions when multiple swarm processes
     attempt to read/modify/write the state file concurrently.
 
-    Uses fcntl.flock() for exclusive (LOCK_EX) file locking.
+    Uses fcntl.flock() for exclusive (LOCK_EX) file locking, or shared
+    (LOCK_SH) locking for readers that must not see a write in progress.
     The lock is automatically released when the context exits,
     even if an exception occurs.
 
+    Args:
+        shared: Take a shared lock (concurrent readers, excludes writers)
+
     Yields:
         File object for the lock file (callers don't need to use this)
     """
     ensure_dirs()
     lock_file = open(STATE_LOCK_FILE, 'w')
     try:
-        # Acquire exclusive lock (blocks if another process holds it)
-        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        # Acquire lock (blocks if another process holds a conflicting lock)
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
         yield lock_file
     finally:
         # Release lock and close file
@@ -2821,245 +3243,1651 @@ def state_file_lock():
         lock_file.close()
 
 
-class State:
-    """Manages the swarm state file."""
+# Decoded STATE_FILE snapshots, keyed by path. Each entry is
+# ((st_ino, st_mtime_ns, st_size), generation, workers); a load whose file
+# stat matches reuses the workers instead of parsing the document again.
+_state_cache: dict[Path, tuple[tuple[int, int, int], int, list[Worker]]] = {}
 
-    def __init__(self):
-        self.workers: list[Worker] = []
-        self._load()
+# A snapshot is only cached once its mtime is this old. A newer file could
+# be replaced again within the filesystem's timestamp granularity by one
+# with the same stat, which the cache would not notice.
+STATE_CACHE_MIN_AGE_NS = 2_000_000_000
 
-    def _load(self) -> None:
-        """Load state from disk with exclusive locking.
 
-        Acquires an exclusive lock before reading to prevent race conditions
-        where another process might be writing to the file simultaneously.
-        """
-        with state_file_lock():
-            ensure_dirs()
-            if STATE_FILE.exists():
-                with open(STATE_FILE, "r") as f:
-                    try:
-                        data = json.load(f)
-                    except json.JSONDecodeError:
-                        print("swarm: warning: corrupt state file, resetting",
-                              file=sys.stderr)
-                        # Back up corrupted file
-                        corrupted_path = STATE_FILE.parent / "state.json.corrupted"
-                        try:
-                            import shutil
-                            shutil.copy2(STATE_FILE, corrupted_path)
-                        except OSError:
-                            pass  # Best-effort backup
-                        self.workers = []
-                        return
-                    self.workers = [Worker.from_dict(w) for w in data.get("workers", [])]
-            else:
-                self.workers = []
+class JsonStateStore:
+    """Single-document state store: every worker lives in STATE_FILE.
 
-    def save(self) -> None:
-        """Save state to disk with exclusive locking.
+    Each mutation reloads and rewrites the whole document, so add/remove/update
+    cost O(N) in the number of workers. This is the default backend and the
+    on-disk format documented in specs/state-management.md.
 
-        Acquires an exclusive lock before writing to prevent race conditions
-        where multiple processes might try to update the state file concurrently.
-        This ensures that:
-        1. We read the most current state
-        2. Our writes aren't overwritten by concurrent operations
-        3. No partial/corrupted data is written
+    The document is only ever replaced atomically, so readers need no lock:
+    each load sees one complete snapshot, stamped with the generation counter
+    that every write increments. Decoded snapshots are kept in _state_cache,
+    so repeated loads of an unchanged file cost one fstat.
 
-        IMPORTANT: This method does NOT reload state before saving. The caller
-        must ensure they have current state. For atomic updates, use the pattern:
-        1. Create State() - loads current state
-        2. Modify state
-        3. Call save() - writes with lock
-        """
-        with state_file_lock():
-            ensure_dirs()
-            data = {"workers": [w.to_dict() for w in self.workers]}
-            tmp_path = STATE_FILE.with_suffix('.json.tmp')
-            with open(tmp_path, "w") as f:
-                json.dump(data, f, indent=2)
-            os.replace(tmp_path, STATE_FILE)
+    All methods except load() assume the caller holds state_file_lock().
+    """
 
-    def get_worker(self, name: str) -> Optional[Worker]:
-        """Get a worker by name."""
-        for w in self.workers:
-            if w.name == name:
-                return w
-        return None
+    lazy = False
+    # Mutations inside State.transaction() are applied in memory and the
+    # document is written once when the transaction ends
+    batch_writes = True
 
-    def add_worker(self, worker: Worker) -> None:
-        """Add a worker to state atomically.
+    def __init__(self):
+        self.generation = 0
+        # (st_ino, st_mtime_ns, st_size) of the snapshot generation came from
+        self._snapshot_stat: Optional[tuple[int, int, int]] = None
 
-        This method reloads state, adds the worker, and saves - all within
-        a single lock to prevent race conditions with concurrent operations.
-        """
-        with state_file_lock():
-            # Reload to get latest state
-            self._load_unlocked()
-            # Add worker
-            self.workers.append(worker)
-            # Save immediately while holding lock
-            self._save_unlocked()
+    def lock(self):
+        """Get the lock that serializes writers."""
+        return state_file_lock()
 
-    def remove_worker(self, name: str) -> None:
-        """Remove a worker from state atomically.
+    def transaction(self):
+        """Hold the writer lock for a State.transaction() block."""
+        return self.lock()
 
-        This method reloads state, removes the worker, and saves - all within
-        a single lock to prevent race conditions with concurrent operations.
-        """
-        with state_file_lock():
-            # Reload to get latest state
-            self._load_unlocked()
-            # Remove worker
-            self.workers = [w for w in self.workers if w.name != name]
-            # Save immediately while holding lock
-            self._save_unlocked()
+    def read_lock(self):
+        """Readers take no lock: os.replace makes every snapshot atomic."""
+        from contextlib import nullcontext
+        return nullcontext()
 
-    def update_worker(self, name: str, **kwargs) -> None:
-        """Update a worker's fields atomically.
+    def _stat(self) -> Optional[tuple[int, int, int]]:
+        try:
+            st = os.stat(STATE_FILE)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
 
-        This method reloads state, updates the worker, and saves - all within
-        a single lock to prevent race conditions with concurrent operations.
-        """
-        with state_file_lock():
-            # Reload to get latest state
-            self._load_unlocked()
-            # Update worker
-            worker = self.get_worker(name)
-            if worker:
-                for key, value in kwargs.items():
-                    setattr(worker, key, value)
-            # Save immediately while holding lock
-            self._save_unlocked()
+    def load(self, recover: bool = False) -> list[Worker]:
+        """Read all workers from STATE_FILE.
 
-    def _load_unlocked(self) -> None:
-        """Load state from disk WITHOUT acquiring lock.
+        If the file's (st_ino, st_mtime_ns, st_size) matches the cached
+        snapshot, the cached workers are returned without parsing. Callers
+        always get their own shallow copies, so attribute changes made by one
+        State never leak into another.
 
-        This is used internally when the lock is already held.
-        External callers should use _load() or State() constructor.
+        Args:
+            recover: If True, a corrupt file is backed up to
+                state.json.corrupted and an empty list is returned (with a
+                warning). If False, json.JSONDecodeError propagates.
+
+        Returns:
+            Workers in file order (empty if the file does not exist)
         """
-        ensure_dirs()
-        if STATE_FILE.exists():
-            with open(STATE_FILE, "r") as f:
+        try:
+            f = open(STATE_FILE, "r")
+        except FileNotFoundError:
+            self.generation, self._snapshot_stat = 0, None
+            return []
+        with f:
+            # Stat the open file, not the path, so it matches what is read
+            st = os.fstat(f.fileno())
+            self._snapshot_stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+            cached = _state_cache.get(STATE_FILE)
+            if cached is not None and cached[0] == self._snapshot_stat:
+                self.generation = cached[1]
+                return [copy.copy(w) for w in cached[2]]
+            self.generation = 0
+            try:
                 data = json.load(f)
-                self.workers = [Worker.from_dict(w) for w in data.get("workers", [])]
-        else:
-            self.workers = []
-
-    def _save_unlocked(self) -> None:
-        """Save state to disk WITHOUT acquiring lock.
-
-        This is used internally when the lock is already held.
-        External callers should use save().
+            except json.JSONDecodeError:
+                if not recover:
+                    raise
+                print("swarm: warning: corrupt state file, resetting",
+                      file=sys.stderr)
+                # Back up corrupted file
+                corrupted_path = STATE_FILE.parent / "state.json.corrupted"
+                try:
+                    import shutil
+                    shutil.copy2(STATE_FILE, corrupted_path)
+                except OSError:
+                    pass  # Best-effort backup
+                return []
+        self.generation = data.get("generation", 0)
+        workers = [Worker.from_dict(w) for w in data.get("workers", [])]
+        if time.time_ns() - st.st_mtime_ns >= STATE_CACHE_MIN_AGE_NS:
+            _state_cache[STATE_FILE] = (self._snapshot_stat, self.generation, workers)
+            return [copy.copy(w) for w in workers]
+        _state_cache.pop(STATE_FILE, None)
+        return workers
+
+    def save(self, workers: list[Worker]) -> None:
+        """Write all workers to STATE_FILE via temp file + atomic rename.
+
+        The written snapshot's generation is one past the file's current
+        generation, even if another writer replaced it since our last load.
         """
-        ensure_dirs()
-        data = {"workers": [w.to_dict() for w in self.workers]}
+        if self._stat() != self._snapshot_stat:
+            try:
+                self.load()
+            except json.JSONDecodeError:
+                pass  # Overwriting a corrupt file; keep our generation
+        data = {"generation": self.generation + 1, "workers": [w.to_dict() for w in workers]}
         tmp_path = STATE_FILE.with_suffix('.json.tmp')
         with open(tmp_path, "w") as f:
             json.dump(data, f, indent=2)
         os.replace(tmp_path, STATE_FILE)
+        self.generation = data["generation"]
+        self._snapshot_stat = self._stat()
+
+    def add(self, state: "State", worker: Worker) -> None:
+        """Reload, append worker, and rewrite the document."""
+        state.workers = self.load()
+        state.workers.append(worker)
+        self.save(state.workers)
+
+    def remove(self, state: "State", name: str) -> None:
+        """Reload, drop the named worker, and rewrite the document."""
+        state.workers = [w for w in self.load() if w.name != name]
+        self.save(state.workers)
+
+    def update(self, state: "State", name: str, fields: dict) -> None:
+        """Reload, set fields on the named worker, and rewrite the document."""
+        state.workers = self.load()
+        for worker in state.workers:
+            if worker.name == name:
+                for key, value in fields.items():
+                    setattr(worker, key, value)
+                break
+        self.save(state.workers)
 
 
-def ensure_dirs() -> None:
-    """Create swarm directories if they don't exist."""
-    SWARM_DIR.mkdir(parents=True, exist_ok=True)
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+class ShardedStateStore:
+    """Per-worker state store: one JSON file per worker under WORKERS_DIR.
 
+    Each worker is stored in WORKERS_DIR/<name>.json and replaced atomically
+    on its own, so add/remove/update touch a single small file instead of
+    rewriting the whole registry. WORKERS_DIR/MANIFEST records the layout
+    version, the next insertion sequence number (which keeps listing order
+    stable across loads) and the generation counter bumped by every write.
 
-def get_default_session_name() -> str:
-    """Generate default session name with hash suffix for isolation."""
-    h = hashlib.sha256(str(SWARM_DIR.resolve()).encode()).hexdigest()[:8]
-    return f"swarm-{h}"
+    An existing STATE_FILE is migrated into shards the first time the store
+    is used and then renamed to state.json.migrated.
 
+    A load reads many files, so readers take a shared lock to see a
+    consistent snapshot. All other methods assume the caller holds
+    state_file_lock().
+    """
 
-# =============================================================================
-# Git Operations
-# =============================================================================
+    MANIFEST_VERSION = 1
 
-def get_git_root() -> Path:
-    """Get root of current git repo."""
-    result = subprocess.run(
-        ["git", "rev-parse", "--show-toplevel"],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-    return Path(result.stdout.strip())
+    lazy = False
+    # Single-shard writes are already cheap, so transactions write through
+    batch_writes = False
 
+    def __init__(self):
+        self.generation = 0
 
-def _check_and_fix_core_bare() -> bool:
-    """Check if core.bare is misconfigured and fix it.
+    def lock(self):
+        """Get the lock that serializes writers."""
+        return state_file_lock()
 
-    Returns:
-        True if core.bare was fixed, False if no fix was needed.
-    """
-    result = subprocess.run(
-        ["git", "config", "--get", "core.bare"],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode == 0 and result.stdout.strip().lower() == "true":
-        # Fix the misconfiguration
-        subprocess.run(
-            ["git", "config", "core.bare", "false"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        print("swarm: warning: Fixed core.bare=true in git config", file=sys.stderr)
-        return True
-    return False
+    def transaction(self):
+        """Hold the writer lock for a State.transaction() block."""
+        return self.lock()
 
+    def read_lock(self):
+        """Get a shared lock: concurrent readers, but no writer mid-update.
 
-def _is_truly_bare_repo() -> bool:
-    """Check if this is actually a bare repository (not just misconfigured).
+        Before the layout exists the first load migrates (writes), so it
+        takes the exclusive lock instead.
+        """
+        if not self.manifest_path().exists():
+            return state_file_lock()
+        return state_file_lock(shared=True)
 
-    Returns:
-        True if the repository is genuinely bare (no working directory).
-    """
-    # A bare repo has no worktree, check if we can get the git dir
-    result = subprocess.run(
-        ["git", "rev-parse", "--is-bare-repository"],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode == 0 and result.stdout.strip().lower() == "true":
-        # Double-check: a truly bare repo won't have a working tree
-        wt_result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-        )
-        # If we can't get the toplevel, it's truly bare
-        return wt_result.returncode != 0
-    return False
+    def shard_path(self, name: str) -> Path:
+        """Get the shard file for a worker (name is percent-encoded)."""
+        from urllib.parse import quote
+        return WORKERS_DIR / f"{quote(name, safe='')}.json"
 
+    def manifest_path(self) -> Path:
+        """Get the manifest path (no .json suffix, so it never collides with a shard)."""
+        return WORKERS_DIR / "MANIFEST"
 
-def create_worktree(path: Path, branch: str) -> None:
-    """Create a git worktree.
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path(), "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {"version": self.MANIFEST_VERSION, "next_seq": 0, "generation": 0}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Write the manifest, bumping its generation."""
+        manifest["generation"] = manifest.get("generation", 0) + 1
+        self.generation = manifest["generation"]
+        path = self.manifest_path()
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
 
-    Creates a new worktree at the specified path with the given branch name.
-    If the branch doesn't exist, it's created from the current HEAD.
+    def _write_shard(self, worker: Worker, seq: int) -> None:
+        path = self.shard_path(worker.name)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, "w") as f:
+            json.dump({"seq": seq, "worker": worker.to_dict()}, f)
+        os.replace(tmp_path, path)
 
-    Raises:
-        RuntimeError: If worktree creation fails or the repository is bare.
-    """
-    path = Path(path)
+    def _read_shard(self, path: Path) -> Optional[tuple[int, Worker]]:
+        """Read one shard, quarantining it if it is corrupt.
 
-    # Step 1: Check for and fix core.bare misconfiguration
-    _check_and_fix_core_bare()
+        Returns:
+            (seq, worker) tuple, or None if the shard is missing or corrupt
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return data.get("seq", 0), Worker.from_dict(data["worker"])
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, TypeError):
+            print(f"swarm: warning: corrupt worker state file {path.name}, skipping",
+                  file=sys.stderr)
+            try:
+                os.replace(path, path.with_name(path.name + ".corrupted"))
+            except OSError:
+                pass  # Best-effort quarantine
+            return None
 
-    # Step 2: Check if this is a truly bare repository
-    if _is_truly_bare_repo():
-        raise RuntimeError(
-            "Cannot create worktree: repository is bare. "
-            "Worktrees require a working directory."
-        )
+    def ensure_migrated(self) -> None:
+        """Create the shard layout, importing a legacy STATE_FILE if present."""
+        if self.manifest_path().exists():
+            return
+        WORKERS_DIR.mkdir(parents=True, exist_ok=True)
+        legacy_workers = JsonStateStore().load(recover=True)
+        for seq, worker in enumerate(legacy_workers):
+            self._write_shard(worker, seq)
+        # Manifest is written last: its presence marks a completed migration
+        self._write_manifest({
+            "version": self.MANIFEST_VERSION,
+            "next_seq": len(legacy_workers),
+            "generation": 0,
+        })
+        if STATE_FILE.exists():
+            os.replace(STATE_FILE, STATE_FILE.with_suffix('.json.migrated'))
 
-    # Step 3: Create parent directory if needed
-    path.parent.mkdir(parents=True, exist_ok=True)
+    def load(self, recover: bool = False) -> list[Worker]:
+        """Read all shards, ordered by insertion sequence.
 
-    # Step 4: Try to create with new branch first, fall back to existing branch
+        Corrupt shards are always skipped with a warning, so recover has no
+        additional effect; it is accepted for interface parity.
+        """
+        self.ensure_migrated()
+        self.generation = self._read_manifest().get("generation", 0)
+        entries = []
+        for path in WORKERS_DIR.glob("*.json"):
+            entry = self._read_shard(path)
+            if entry is not None:
+                entries.append(entry)
+        entries.sort(key=lambda e: e[0])
+        return [worker for _, worker in entries]
+
+    def save(self, workers: list[Worker]) -> None:
+        """Replace the whole registry with workers (O(N); prefer add/remove/update)."""
+        self.ensure_migrated()
+        keep = set()
+        for seq, worker in enumerate(workers):
+            self._write_shard(worker, seq)
+            keep.add(self.shard_path(worker.name).name)
+        for path in WORKERS_DIR.glob("*.json"):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+        manifest = self._read_manifest()
+        manifest["next_seq"] = len(workers)
+        self._write_manifest(manifest)
+
+    def _reload_if_changed(self, state: "State") -> dict:
+        """Reload state.workers if another writer changed the registry.
+
+        Every write bumps the manifest generation, so a generation other
+        than the one last loaded or written here means the in-memory
+        workers are stale; they are then reloaded from the shards, as the
+        json backend reloads its document.
+
+        Returns:
+            The current manifest
+        """
+        self.ensure_migrated()
+        manifest = self._read_manifest()
+        if manifest.get("generation", 0) != self.generation:
+            state.workers = self.load()
+        return manifest
+
+    def add(self, state: "State", worker: Worker) -> None:
+        """Write a single new shard, after reloading workers changed by others."""
+        manifest = self._reload_if_changed(state)
+        seq = manifest.get("next_seq", 0)
+        manifest["next_seq"] = seq + 1
+        self._write_manifest(manifest)
+        self._write_shard(worker, seq)
+        state.workers = [w for w in state.workers if w.name != worker.name]
+        state.workers.append(worker)
+
+    def remove(self, state: "State", name: str) -> None:
+        """Delete a single shard, after reloading workers changed by others."""
+        manifest = self._reload_if_changed(state)
+        self.shard_path(name).unlink(missing_ok=True)
+        self._write_manifest(manifest)
+        state.workers = [w for w in state.workers if w.name != name]
+
+    def update(self, state: "State", name: str, fields: dict) -> None:
+        """Rewrite a single shard with fields applied to its on-disk copy.
+
+        Workers changed by others are reloaded first.
+        """
+        manifest = self._reload_if_changed(state)
+        entry = self._read_shard(self.shard_path(name))
+        if entry is None:
+            return
+        seq, worker = entry
+        for key, value in fields.items():
+            setattr(worker, key, value)
+        self._write_shard(worker, seq)
+        self._write_manifest(manifest)
+        state.workers = [worker if w.name == name else w for w in state.workers]
+
+
+class SqliteStateStore:
+    """SQLite state store: workers, ralph state and heartbeat state in STATE_DB_FILE.
+
+    The database runs in WAL mode, so readers never wait for a writer and
+    State() needs no file lock to load. Each mutation is one short
+    transaction touching a single row. Workers are indexed by name, status,
+    tag and tmux session/socket, which lets State.get_worker(),
+    State.find_workers() and State.session_has_workers() answer without
+    reading every worker.
+
+    An existing STATE_FILE, ralph state files and heartbeat files are
+    imported when the database is first created; STATE_FILE is then renamed
+    to state.json.migrated.
+
+    Write serialization is handled by SQLite itself, so no method requires
+    state_file_lock().
+    """
+
+    SCHEMA_VERSION = 1
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS workers (
+            name TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            tmux_session TEXT,
+            tmux_socket TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS workers_by_seq ON workers (seq);
+        CREATE INDEX IF NOT EXISTS workers_by_status ON workers (status, seq);
+        CREATE INDEX IF NOT EXISTS workers_by_tmux ON workers (tmux_session, tmux_socket);
+        CREATE TABLE IF NOT EXISTS worker_tags (
+            tag TEXT NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (tag, name)
+        );
+        CREATE INDEX IF NOT EXISTS worker_tags_by_name ON worker_tags (name);
+        CREATE TABLE IF NOT EXISTS ralph_state (
+            worker_name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS heartbeat_state (
+            worker_name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    # Workers are read on demand rather than when State() is constructed
+    lazy = True
+    # Row writes inside State.transaction() join one SQLite transaction
+    batch_writes = False
+
+    def __init__(self):
+        self._conn = None
+        self._in_transaction = False
+
+    def lock(self):
+        """No file lock is needed; SQLite serializes writers."""
+        from contextlib import nullcontext
+        return nullcontext()
+
+    def read_lock(self):
+        """No file lock is needed; WAL readers see a consistent snapshot."""
+        from contextlib import nullcontext
+        return nullcontext()
+
+    @property
+    def generation(self) -> int:
+        """Generation counter, bumped by every write transaction."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    @property
+    def conn(self):
+        """Open (and on first use, create and migrate) the database."""
+        if self._conn is None:
+            import sqlite3
+            SWARM_DIR.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(STATE_DB_FILE), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+            self._ensure_migrated()
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run a write transaction (BEGIN IMMEDIATE takes the write lock up front).
+
+        Nested calls join the enclosing transaction, which commits once.
+        """
+        conn = self.conn
+        if self._in_transaction:
+            yield conn
+            return
+        self._in_transaction = True
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('generation', 1) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._in_transaction = False
+
+    def transaction(self):
+        """Run a State.transaction() block as one SQLite transaction."""
+        return self._transaction()
+
+    def _ensure_migrated(self) -> None:
+        """Import legacy file-based state into a freshly created database."""
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'schema_version'").fetchone():
+                return
+            for seq, worker in enumerate(JsonStateStore().load(recover=True)):
+                self._put_worker(conn, worker, seq)
+            for table, paths in (
+                ("ralph_state", RALPH_DIR.glob("*/state.json")),
+                ("heartbeat_state", HEARTBEATS_DIR.glob("*.json")),
+            ):
+                for path in paths:
+                    try:
+                        data = json.loads(path.read_text())
+                        worker_name = data["worker_name"]
+                    except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                        continue  # Skip unreadable state files
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {table} (worker_name, data) VALUES (?, ?)",
+                        (worker_name, json.dumps(data)),
+                    )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(self.SCHEMA_VERSION),),
+            )
+        if STATE_FILE.exists():
+            os.replace(STATE_FILE, STATE_FILE.with_suffix('.json.migrated'))
+
+    def _put_worker(self, conn, worker: Worker, seq: int) -> None:
+        session = worker.tmux.session if worker.tmux else None
+        socket = worker.tmux.socket if worker.tmux else None
+        conn.execute(
+            "INSERT OR REPLACE INTO workers (name, seq, status, tmux_session, tmux_socket, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (worker.name, seq, worker.status, session, socket, json.dumps(worker.to_dict())),
+        )
+        conn.execute("DELETE FROM worker_tags WHERE name = ?", (worker.name,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO worker_tags (tag, name) VALUES (?, ?)",
+            [(tag, worker.name) for tag in worker.tags],
+        )
+
+    def _delete_worker(self, conn, name: str) -> None:
+        conn.execute("DELETE FROM workers WHERE name = ?", (name,))
+        conn.execute("DELETE FROM worker_tags WHERE name = ?", (name,))
+
+    def load(self, recover: bool = False) -> list[Worker]:
+        """Read all workers in insertion order (recover is accepted for interface parity)."""
+        rows = self.conn.execute("SELECT data FROM workers ORDER BY seq")
+        return [Worker.from_dict(json.loads(data)) for (data,) in rows]
+
+    def get(self, name: str) -> Optional[Worker]:
+        """Look up one worker by name."""
+        row = self.conn.execute("SELECT data FROM workers WHERE name = ?", (name,)).fetchone()
+        return Worker.from_dict(json.loads(row[0])) if row else None
+
+    def find(self, status: Optional[str] = None, tag: Optional[str] = None) -> list[Worker]:
+        """Find workers by stored status and/or tag, in insertion order."""
+        sql = "SELECT w.data FROM workers w"
+        params: list = []
+        if tag is not None:
+            sql += " JOIN worker_tags t ON t.name = w.name AND t.tag = ?"
+            params.append(tag)
+        if status is not None:
+            sql += " WHERE w.status = ?"
+            params.append(status)
+        sql += " ORDER BY w.seq"
+        return [Worker.from_dict(json.loads(data)) for (data,) in self.conn.execute(sql, params)]
+
+    def session_has_workers(self, session: str, socket: Optional[str], exclude) -> bool:
+        """Check whether any worker outside exclude uses the tmux session/socket."""
+        rows = self.conn.execute(
+            "SELECT name FROM workers WHERE tmux_session = ? AND tmux_socket IS ?",
+            (session, socket),
+        )
+        return any(name not in exclude for (name,) in rows)
+
+    def save(self, workers: list[Worker]) -> None:
+        """Replace the whole registry with workers in one transaction."""
+        names = {w.name for w in workers}
+        with self._transaction() as conn:
+            for (name,) in conn.execute("SELECT name FROM workers").fetchall():
+                if name not in names:
+                    self._delete_worker(conn, name)
+            for seq, worker in enumerate(workers):
+                self._put_worker(conn, worker, seq)
+
+    def add(self, state: "State", worker: Worker) -> None:
+        """Insert a single row; in-memory workers are updated in place."""
+        with self._transaction() as conn:
+            (seq,) = conn.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM workers").fetchone()
+            self._put_worker(conn, worker, seq)
+        state._replace_cached(worker.name, worker)
+
+    def remove(self, state: "State", name: str) -> None:
+        """Delete a single row; in-memory workers are updated in place."""
+        with self._transaction() as conn:
+            self._delete_worker(conn, name)
+        state._replace_cached(name, None)
+
+    def update(self, state: "State", name: str, fields: dict) -> None:
+        """Rewrite a single row with fields applied to its stored copy."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT seq, data FROM workers WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return
+            worker = Worker.from_dict(json.loads(row[1]))
+            for key, value in fields.items():
+                setattr(worker, key, value)
+            self._put_worker(conn, worker, row[0])
+        state._replace_cached(name, worker)
+
+    def load_ralph_state(self, worker_name: str) -> Optional[RalphState]:
+        row = self.conn.execute(
+            "SELECT data FROM ralph_state WHERE worker_name = ?", (worker_name,)
+        ).fetchone()
+        return RalphState.from_dict(json.loads(row[0])) if row else None
+
+    def save_ralph_state(self, ralph_state: RalphState) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO ralph_state (worker_name, data) VALUES (?, ?)",
+            (ralph_state.worker_name, json.dumps(ralph_state.to_dict())),
+        )
+
+    def delete_ralph_state(self, worker_name: str) -> None:
+        self.conn.execute("DELETE FROM ralph_state WHERE worker_name = ?", (worker_name,))
+
+    def list_ralph_states(self) -> list[RalphState]:
+        rows = self.conn.execute("SELECT data FROM ralph_state ORDER BY worker_name")
+        return [RalphState.from_dict(json.loads(data)) for (data,) in rows]
+
+    def load_heartbeat_state(self, worker_name: str) -> Optional[HeartbeatState]:
+        row = self.conn.execute(
+            "SELECT data FROM heartbeat_state WHERE worker_name = ?", (worker_name,)
+        ).fetchone()
+        return HeartbeatState.from_dict(json.loads(row[0])) if row else None
+
+    def save_heartbeat_state(self, heartbeat_state: HeartbeatState) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO heartbeat_state (worker_name, data) VALUES (?, ?)",
+            (heartbeat_state.worker_name, json.dumps(heartbeat_state.to_dict())),
+        )
+
+    def delete_heartbeat_state(self, worker_name: str) -> bool:
+        cursor = self.conn.execute(
+            "DELETE FROM heartbeat_state WHERE worker_name = ?", (worker_name,)
+        )
+        return cursor.rowcount > 0
+
+    def list_heartbeat_states(self) -> list[HeartbeatState]:
+        rows = self.conn.execute("SELECT data FROM heartbeat_state ORDER BY worker_name")
+        return [HeartbeatState.from_dict(json.loads(data)) for (data,) in rows]
+
+
+# Journals are compacted into their checkpoint once they grow past this size
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Appends are fsynced at most this often per process; later appends are
+# fsynced together by the next append after the interval, or at exit
+JOURNAL_FSYNC_INTERVAL = 1.0
+
+# Journal paths with appends that have not been fsynced yet
+_journal_unsynced: set[Path] = set()
+_journal_last_fsync = 0.0
+
+# Last document version seen by this process, per journal path:
+# (checkpoint st_ino, document). save_document() appends only the fields
+# that changed since then.
+_journal_views: dict[Path, tuple[int, dict]] = {}
+
+
+@atexit.register
+def _fsync_pending_journals() -> None:
+    """Fsync journals that still have batched, unsynced appends."""
+    for path in list(_journal_unsynced):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue  # Compacted away; the checkpoint was fsynced
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    _journal_unsynced.clear()
+
+
+class StateJournal:
+    """A JSON checkpoint file plus an append-only JSON-lines journal.
+
+    Changes are appended to the journal as one JSON object per line instead
+    of rewriting the checkpoint. Loading reads the checkpoint and replays
+    the journal; once the journal passes JOURNAL_COMPACT_BYTES the current
+    document is written back to the checkpoint and the journal is replaced
+    with an empty one.
+
+    Readers take no lock. They open the journal before reading the
+    checkpoint, and compaction writes the checkpoint before replacing the
+    journal, so a reader never misses records; at worst it replays records
+    already folded into the checkpoint, so records must be safe to apply
+    twice. Appends and compaction take an exclusive flock on the journal
+    file itself.
+
+    A final line without its newline is a torn or in-progress write and is
+    never replayed; the next append truncates it. A complete line that is
+    not valid JSON is skipped with a warning.
+    """
+
+    def __init__(self, checkpoint_path: Path, journal_path: Path):
+        self.checkpoint_path = checkpoint_path
+        self.journal_path = journal_path
+
+    def read(self, load_checkpoint):
+        """Read the checkpoint and the journal records to replay on top of it.
+
+        Args:
+            load_checkpoint: Called with no arguments to read the checkpoint
+
+        Returns:
+            Tuple of (checkpoint, records)
+        """
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return load_checkpoint(), []
+        with f:
+            checkpoint = load_checkpoint()
+            records, _ = self.read_records(f, 0)
+        return checkpoint, records
+
+    def read_records(self, f, offset: int) -> tuple[list[dict], int]:
+        """Decode the complete records in an open journal from offset.
+
+        Returns:
+            Tuple of (records, offset just past the last complete line)
+        """
+        f.seek(offset)
+        records = []
+        for line in f.read().splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # Torn or still being written
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"swarm: warning: corrupt record in {self.journal_path.name}, skipping",
+                      file=sys.stderr)
+        return records, offset
+
+    @contextmanager
+    def locked(self):
+        """Open the current journal for appending with an exclusive flock.
+
+        If compaction replaced the journal while we waited for the lock, the
+        new file is opened and locked instead.
+
+        Yields:
+            Binary file object positioned for appending
+        """
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            f = open(self.journal_path, "ab")
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.journal_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(f.fileno()).st_ino:
+                break
+            f.close()
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            f.close()
+
+    def append(self, records: list[dict]) -> int:
+        """Append records in a single write.
+
+        Returns:
+            Journal size in bytes after the append
+        """
+        global _journal_last_fsync
+        data = b"".join(
+            json.dumps(r, separators=(",", ":")).encode() + b"\n" for r in records
+        )
+        with self.locked() as f:
+            self._truncate_torn_tail(f)
+            f.write(data)
+            f.flush()
+            now = time.monotonic()
+            if now - _journal_last_fsync >= JOURNAL_FSYNC_INTERVAL:
+                os.fsync(f.fileno())
+                _journal_last_fsync = now
+                _journal_unsynced.discard(self.journal_path)
+            else:
+                _journal_unsynced.add(self.journal_path)
+            return f.tell()
+
+    def _truncate_torn_tail(self, f) -> None:
+        """Drop a final line left without its newline by a crashed writer."""
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with open(self.journal_path, "rb") as r:
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                r.seek(start)
+                chunk = r.read(end - start)
+                if end == size and chunk.endswith(b"\n"):
+                    return
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+        f.truncate(end)
+
+    def write_checkpoint(self, data: dict, indent: Optional[int] = None) -> None:
+        """Write the checkpoint (fsynced, since it replaces journal records)."""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix('.json.tmp')
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def reset(self) -> None:
+        """Replace the journal with an empty file (after writing a checkpoint)."""
+        tmp_path = self.journal_path.with_suffix('.journal.tmp')
+        open(tmp_path, "wb").close()
+        os.replace(tmp_path, self.journal_path)
+        _journal_unsynced.discard(self.journal_path)
+
+    def _checkpoint_ino(self) -> Optional[int]:
+        try:
+            return os.stat(self.checkpoint_path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def load_document(self, load_checkpoint) -> Optional[dict]:
+        """Load a single JSON document: the checkpoint with field updates applied.
+
+        Each record is {"set": {field: value, ...}}. The loaded document
+        becomes this process's view for save_document().
+
+        Args:
+            load_checkpoint: Reads and returns the checkpoint dict (may raise)
+
+        Returns:
+            The document, or None if the checkpoint does not exist
+        """
+        def read_checkpoint():
+            ino = self._checkpoint_ino()
+            if ino is None:
+                return ino, None
+            return ino, load_checkpoint()
+
+        (ino, data), records = self.read(read_checkpoint)
+        if data is None:
+            return None
+        for record in records:
+            data.update(record.get("set", {}))
+        _journal_views[self.journal_path] = (ino, dict(data))
+        return data
+
+    def save_document(self, data: dict, indent: Optional[int] = 2) -> None:
+        """Save a single JSON document as a journal record of changed fields.
+
+        Only fields that differ from this process's view of the document
+        (its last load or save) are appended, so a concurrent change to
+        another field, such as a status set by `ralph pause`, is kept. The
+        first save of a document writes the checkpoint directly.
+
+        Args:
+            data: Full document
+            indent: Indentation used when writing the checkpoint
+        """
+        view = _journal_views.get(self.journal_path)
+        ino = self._checkpoint_ino()
+        if ino is None:
+            self.write_checkpoint(data, indent=indent)
+            if self.journal_path.exists():
+                self.reset()
+            _journal_views[self.journal_path] = (self._checkpoint_ino(), dict(data))
+            return
+        base = view[1] if view is not None and view[0] == ino else {}
+        changes = {k: v for k, v in data.items() if k not in base or base[k] != v}
+        if changes:
+            size = self.append([{"set": changes}])
+            if size > JOURNAL_COMPACT_BYTES:
+                self.compact_document(indent=indent)
+        ino = self._checkpoint_ino()
+        _journal_views[self.journal_path] = (ino, dict(data))
+
+    def compact_document(self, indent: Optional[int] = 2) -> None:
+        """Fold a single document's journal into its checkpoint."""
+        with self.locked() as f:
+            with open(self.checkpoint_path, "r") as c:
+                data = json.load(c)
+            with open(self.journal_path, "rb") as r:
+                records, _ = self.read_records(r, 0)
+            for record in records:
+                data.update(record.get("set", {}))
+            self.write_checkpoint(data, indent=indent)
+            self.reset()
+
+    def remove(self) -> None:
+        """Delete the journal (the caller removes the checkpoint)."""
+        self.journal_path.unlink(missing_ok=True)
+        _journal_unsynced.discard(self.journal_path)
+        _journal_views.pop(self.journal_path, None)
+
+
+class JournalStateStore:
+    """Append-only state store: STATE_FILE checkpoint plus STATE_JOURNAL_FILE.
+
+    Each mutation appends one small record to the journal instead of
+    rewriting the whole document:
+        {"gen": 5, "op": "add", "worker": {...}}
+        {"gen": 6, "op": "put", "worker": {...}}    (update_worker)
+        {"gen": 7, "op": "remove", "name": "..."}
+    Records carry the generation they produce, and loading replays only
+    records newer than the checkpoint's generation. STATE_FILE keeps the
+    json backend's format, so an existing state.json is used as the first
+    checkpoint. save() and compaction (when the journal passes
+    JOURNAL_COMPACT_BYTES) write a new checkpoint and start an empty
+    journal.
+
+    Readers take no lock (see StateJournal). Writers hold state_file_lock()
+    and catch up by reading only the journal records appended since their
+    last look, unless another writer compacted in between. Inside
+    State.transaction() records are buffered and appended in one write.
+    """
+
+    lazy = False
+    # Each mutation is already a small append; transactions buffer records
+    batch_writes = False
+
+    def __init__(self):
+        self.generation = 0
+        self._journal = StateJournal(STATE_FILE, STATE_JOURNAL_FILE)
+        # Current workers by name, in listing order
+        self._workers: dict[str, Worker] = {}
+        # (checkpoint stat, journal st_ino, journal offset) the view is current to
+        self._position: Optional[tuple] = None
+        # Records buffered by transaction(), or None outside one
+        self._pending: Optional[list[dict]] = None
+
+    def lock(self):
+        """Get the lock that serializes writers."""
+        return state_file_lock()
+
+    @contextmanager
+    def transaction(self):
+        """Hold the writer lock and append the block's records in one write."""
+        with self.lock():
+            self._pending = []
+            try:
+                yield
+                if self._pending:
+                    self._append(self._pending)
+            except BaseException:
+                # The view holds records that were never written
+                self._position = None
+                raise
+            finally:
+                self._pending = None
+
+    def read_lock(self):
+        """Readers take no lock: journal and checkpoint are read in a safe order."""
+        from contextlib import nullcontext
+        return nullcontext()
+
+    def _apply(self, record: dict) -> None:
+        op = record.get("op")
+        if op == "add":
+            worker = Worker.from_dict(record["worker"])
+            self._workers.pop(worker.name, None)
+            self._workers[worker.name] = worker
+        elif op == "put":
+            worker = Worker.from_dict(record["worker"])
+            if worker.name in self._workers:
+                self._workers[worker.name] = worker
+        elif op == "remove":
+            self._workers.pop(record["name"], None)
+        self.generation = max(self.generation, record.get("gen", 0))
+
+    def load(self, recover: bool = False) -> list[Worker]:
+        """Read the checkpoint and replay the journal records newer than it."""
+        checkpoint = JsonStateStore()
+        try:
+            f = open(STATE_JOURNAL_FILE, "rb")
+        except FileNotFoundError:
+            f = None
+        try:
+            workers = checkpoint.load(recover=recover)
+            self._workers = {}
+            for worker in workers:
+                self._workers.setdefault(worker.name, worker)
+            self.generation = checkpoint.generation
+            offset, ino = 0, None
+            if f is not None:
+                records, offset = self._journal.read_records(f, 0)
+                ino = os.fstat(f.fileno()).st_ino
+                for record in records:
+                    if record.get("gen", 0) > checkpoint.generation:
+                        self._apply(record)
+        finally:
+            if f is not None:
+                f.close()
+        self._position = (checkpoint._snapshot_stat, ino, offset)
+        # Copies, so unsaved changes made by the caller never reach a record
+        return [copy.copy(w) for w in self._workers.values()]
+
+    def _catch_up(self) -> None:
+        """Bring the view up to date while holding the writer lock."""
+        if self._position is not None:
+            checkpoint_stat, ino, offset = self._position
+            try:
+                f = open(STATE_JOURNAL_FILE, "rb")
+            except FileNotFoundError:
+                f = None
+            if f is not None:
+                with f:
+                    if (JsonStateStore()._stat() == checkpoint_stat
+                            and os.fstat(f.fileno()).st_ino == ino):
+                        records, offset = self._journal.read_records(f, offset)
+                        for record in records:
+                            self._apply(record)
+                        self._position = (checkpoint_stat, ino, offset)
+                        return
+        self.load()
+
+    def _append(self, records: list[dict]) -> None:
+        size = self._journal.append(records)
+        checkpoint_stat, _, _ = self._position
+        self._position = (checkpoint_stat, os.stat(STATE_JOURNAL_FILE).st_ino, size)
+        if size > JOURNAL_COMPACT_BYTES:
+            self._checkpoint()
+
+    def _record(self, record: dict) -> None:
+        """Apply a new record to the view and append it (or buffer it)."""
+        record = {"gen": self.generation + 1, **record}
+        self._apply(record)
+        if self._pending is not None:
+            self._pending.append(record)
+        else:
+            self._append([record])
+
+    def _checkpoint(self) -> None:
+        """Write the current view as the checkpoint and start an empty journal."""
+        with self._journal.locked():
+            self._journal.write_checkpoint({
+                "generation": self.generation,
+                "workers": [w.to_dict() for w in self._workers.values()],
+            }, indent=2)
+            self._journal.reset()
+        self._position = (JsonStateStore()._stat(), os.stat(STATE_JOURNAL_FILE).st_ino, 0)
+
+    def save(self, workers: list[Worker]) -> None:
+        """Replace the whole registry: written as a new checkpoint (O(N))."""
+        if self._pending:
+            # Earlier records in this transaction are superseded
+            self._pending.clear()
+        self._catch_up()
+        self._workers = {}
+        for worker in workers:
+            self._workers.setdefault(worker.name, worker)
+        self.generation += 1
+        self._checkpoint()
+
+    def add(self, state: "State", worker: Worker) -> None:
+        """Append an add record; in-memory workers are updated in place."""
+        self._catch_up()
+        self._record({"op": "add", "worker": worker.to_dict()})
+        state.workers = [w for w in state.workers if w.name != worker.name]
+        state.workers.append(worker)
+
+    def remove(self, state: "State", name: str) -> None:
+        """Append a remove record; in-memory workers are updated in place."""
+        self._catch_up()
+        if name in self._workers:
+            self._record({"op": "remove", "name": name})
+        state.workers = [w for w in state.workers if w.name != name]
+
+    def update(self, state: "State", name: str, fields: dict) -> None:
+        """Append the updated worker; in-memory workers are updated in place."""
+        self._catch_up()
+        current = self._workers.get(name)
+        if current is None:
+            return
+        worker = Worker.from_dict(current.to_dict())
+        for key, value in fields.items():
+            setattr(worker, key, value)
+        self._record({"op": "put", "worker": worker.to_dict()})
+        state.workers = [worker if w.name == name else w for w in state.workers]
+
+
+STATE_BACKENDS = {
+    "json": JsonStateStore,
+    "sharded": ShardedStateStore,
+    "sqlite": SqliteStateStore,
+    "journal": JournalStateStore,
+}
+
+
+def get_state_store():
+    """Get the state store selected by STATE_BACKEND (SWARM_STATE_BACKEND)."""
+    store_cls = STATE_BACKENDS.get(STATE_BACKEND)
+    if store_cls is None:
+        print(f"swarm: error: unknown state backend '{STATE_BACKEND}' "
+              f"(SWARM_STATE_BACKEND must be one of: {', '.join(STATE_BACKENDS)})",
+              file=sys.stderr)
+        sys.exit(1)
+    return store_cls()
+
+
+class State:
+    """Manages the swarm state file.
+
+    Persistence is delegated to a state store (see STATE_BACKEND). The public
+    API is the same for every backend.
+    """
+
+    def __init__(self):
+        self._workers: Optional[list[Worker]] = []
+        # Workers handed out before the full list was loaded (lazy stores)
+        self._fetched: dict[str, Worker] = {}
+        # name -> position in _workers, valid while _index_key matches
+        self._index: dict[str, int] = {}
+        self._index_key: Optional[tuple[int, int]] = None
+        self._in_transaction = False
+        self._dirty = False
+        self._store = get_state_store()
+        self._load()
+
+    @property
+    def workers(self) -> list[Worker]:
+        """All workers, in insertion order.
+
+        Lazy stores (sqlite) read the list on first access. Workers already
+        returned by get_worker() or find_workers() keep their identity, so
+        changes made to them are included in a later save().
+        """
+        if self._workers is None:
+            self._workers = [
+                self._fetched.get(w.name, w) for w in self._store.load(recover=True)
+            ]
+        return self._workers
+
+    @workers.setter
+    def workers(self, workers: list[Worker]) -> None:
+        self._workers = workers
+        self._index_key = None
+
+    def _name_index(self) -> dict[str, int]:
+        """Get the name -> position index for the loaded workers list.
+
+        The index is rebuilt when the list is replaced or changes length
+        (append/remove). If a name appears twice, the first position wins,
+        as with a linear scan.
+        """
+        key = (id(self._workers), len(self._workers))
+        if self._index_key != key:
+            self._index = {}
+            for i, w in enumerate(self._workers):
+                self._index.setdefault(w.name, i)
+            self._index_key = key
+        return self._index
+
+    def _replace_cached(self, name: str, worker: Optional[Worker]) -> None:
+        """Apply a single-worker change from the store to the in-memory copy.
+
+        Args:
+            name: Name of the changed worker
+            worker: New value for the worker, or None if it was removed
+        """
+        self._fetched.pop(name, None)
+        if self._workers is None:
+            if worker is not None:
+                self._fetched[name] = worker
+            return
+        index = self._name_index()[name] if self.get_worker(name) is not None else None
+        self._index_key = None
+        if worker is None:
+            if index is not None:
+                del self._workers[index]
+        elif index is None:
+            self._workers.append(worker)
+        else:
+            self._workers[index] = worker
+
+    def _write_lock(self):
+        """Get the writer lock, unless an enclosing transaction already holds it."""
+        if self._in_transaction:
+            from contextlib import nullcontext
+            return nullcontext()
+        return self._store.lock()
+
+    @contextmanager
+    def transaction(self):
+        """Apply several mutations under one hold of the lock and write once.
+
+        Reloads current state under the exclusive lock and yields this State.
+        Inside the block, add_worker(), remove_worker(), update_worker() and
+        save() do not take the lock again. The json backend applies them in
+        memory and writes the document once when the block exits; the
+        sharded and sqlite backends write each change as it is made (one
+        shard or row), with sqlite committing once at the end. If the block
+        raises, the json document is not written and the sqlite transaction
+        is rolled back.
+
+        Changes must go through the mutation methods (or save()); editing a
+        Worker's attributes directly is not recorded.
+
+        Usage:
+            state = State()
+            with state.transaction() as st:
+                for name in names:
+                    st.remove_worker(name)
+        """
+        if self._in_transaction:
+            yield self
+            return
+        with self._store.transaction():
+            self._load_unlocked()
+            self._in_transaction = True
+            self._dirty = False
+            try:
+                yield self
+                if self._dirty:
+                    self._save_unlocked()
+            finally:
+                self._in_transaction = False
+                self._dirty = False
+
+    def _load(self) -> None:
+        """Load state from disk under the store's read lock.
+
+        Readers never take the exclusive lock, so polling commands do not
+        serialize against writers. Each store provides a read lock that is
+        just enough to see a complete snapshot: none for the json document
+        (replaced atomically) or sqlite (WAL), a shared lock for sharded
+        files. Lazy stores defer reading until workers are first needed.
+        """
+        if self._store.lazy:
+            self._workers = None
+            self._fetched = {}
+            return
+        with self._store.read_lock():
+            ensure_dirs()
+            self.workers = self._store.load(recover=True)
+
+    @property
+    def generation(self) -> int:
+        """Generation counter of the loaded snapshot (bumped by every write)."""
+        return self._store.generation
+
+    def save(self) -> None:
+        """Save state to disk with exclusive locking.
+
+        Acquires an exclusive lock before writing to prevent race conditions
+        where multiple processes might try to update the state file concurrently.
+        This ensures that:
+        1. We read the most current state
+        2. Our writes aren't overwritten by concurrent operations
+        3. No partial/corrupted data is written
+
+        IMPORTANT: This method does NOT reload state before saving. The caller
+        must ensure they have current state. For atomic updates, use the pattern:
+        1. Create State() - loads current state
+        2. Modify state
+        3. Call save() - writes with lock
+
+        Inside transaction(), the write is deferred to the end of the block
+        for the json backend.
+        """
+        if self._in_transaction and self._store.batch_writes:
+            self._dirty = True
+            return
+        with self._write_lock():
+            ensure_dirs()
+            self._store.save(self.workers)
+
+    def get_worker(self, name: str) -> Optional[Worker]:
+        """Get a worker by name.
+
+        Loaded workers are looked up through a name index, so this is O(1)
+        rather than a scan of the list.
+        """
+        if self._workers is None:
+            if name not in self._fetched:
+                worker = self._store.get(name)
+                if worker is None:
+                    return None
+                self._fetched[name] = worker
+            return self._fetched[name]
+        index = self._name_index()
+        pos = index.get(name)
+        if pos is None:
+            return None
+        if self._workers[pos].name != name:
+            # An entry was replaced in place; rebuild and look again
+            self._index_key = None
+            pos = self._name_index().get(name)
+            if pos is None:
+                return None
+        return self._workers[pos]
+
+    def find_workers(self, status: Optional[str] = None, tag: Optional[str] = None) -> list[Worker]:
+        """Get workers matching a stored status and/or tag, in insertion order.
+
+        Lazy stores answer from their indexes without loading every worker.
+
+        Args:
+            status: Only include workers with this stored status
+            tag: Only include workers carrying this tag
+        """
+        if self._workers is None:
+            return [
+                self._fetched.setdefault(w.name, w)
+                for w in self._store.find(status=status, tag=tag)
+            ]
+        return [
+            w for w in self._workers
+            if (status is None or w.status == status) and (tag is None or tag in w.tags)
+        ]
+
+    def session_has_workers(self, session: str, socket: Optional[str] = None,
+                            exclude: Optional[set[str]] = None) -> bool:
+        """Check if any worker outside exclude uses a tmux session.
+
+        Lazy stores answer from their tmux session index.
+
+        Args:
+            session: Tmux session name to check
+            socket: Tmux socket name (workers must match both session and socket)
+            exclude: Worker names to ignore
+
+        Returns:
+            True if another worker uses the same session and socket
+        """
+        exclude = exclude or set()
+        if self._workers is None:
+            return self._store.session_has_workers(session, socket, exclude)
+        return any(
+            w.name not in exclude and
+            w.tmux is not None and
+            w.tmux.session == session and
+            w.tmux.socket == socket
+            for w in self._workers
+        )
+
+    def add_worker(self, worker: Worker) -> None:
+        """Add a worker to state atomically.
+
+        The store applies the change while the lock is held. The json backend
+        reloads and rewrites the whole file; the sharded and sqlite backends
+        write only the new worker.
+        """
+        if self._in_transaction and self._store.batch_writes:
+            self._replace_cached(worker.name, worker)
+            self._dirty = True
+            return
+        with self._write_lock():
+            ensure_dirs()
+            self._store.add(self, worker)
+
+    def remove_worker(self, name: str) -> None:
+        """Remove a worker from state atomically.
+
+        The store applies the change while the lock is held. The json backend
+        reloads and rewrites the whole file; the sharded and sqlite backends
+        delete only the worker's entry.
+        """
+        if self._in_transaction and self._store.batch_writes:
+            self._replace_cached(name, None)
+            self._dirty = True
+            return
+        with self._write_lock():
+            ensure_dirs()
+            self._store.remove(self, name)
+
+    def update_worker(self, name: str, **kwargs) -> None:
+        """Update a worker's fields atomically.
+
+        The store applies the change while the lock is held. The json backend
+        reloads and rewrites the whole file; the sharded and sqlite backends
+        rewrite only the worker's entry.
+        """
+        if self._in_transaction and self._store.batch_writes:
+            worker = self.get_worker(name)
+            if worker is not None:
+                for key, value in kwargs.items():
+                    setattr(worker, key, value)
+                self._dirty = True
+            return
+        with self._write_lock():
+            ensure_dirs()
+            self._store.update(self, name, kwargs)
+
+    def _load_unlocked(self) -> None:
+        """Load state from disk WITHOUT acquiring lock.
+
+        This is used internally when the lock is already held.
+        External callers should use _load() or State() constructor.
+        """
+        if self._store.lazy:
+            self._workers = None
+            self._fetched = {}
+            return
+        ensure_dirs()
+        self.workers = self._store.load()
+
+    def _save_unlocked(self) -> None:
+        """Save state to disk WITHOUT acquiring lock.
+
+        This is used internally when the lock is already held.
+        External callers should use save().
+        """
+        ensure_dirs()
+        self._store.save(self.workers)
+
+
+def ensure_dirs() -> None:
+    """Create swarm directories if they don't exist."""
+    SWARM_DIR.mkdir(parents=True, exist_ok=True)
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def get_default_session_name() -> str:
+    """Generate default session name with hash suffix for isolation."""
+    h = hashlib.sha256(str(SWARM_DIR.resolve()).encode()).hexdigest()[:8]
+    return f"swarm-{h}"
+
+
+# =============================================================================
+# Worker Archive
+# =============================================================================
+
+def get_archive_after() -> Optional[int]:
+    """Get the archive age in seconds from SWARM_ARCHIVE_AFTER.
+
+    Returns:
+        Seconds a worker must have been stopped before it is archived, or
+        None if archiving is disabled
+    """
+    value = ARCHIVE_AFTER.strip().lower()
+    if value in ("off", "never", "0"):
+        return None
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        print(f"swarm: error: invalid SWARM_ARCHIVE_AFTER '{ARCHIVE_AFTER}': {e}",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+def mark_stopped(state: "State", name: str, now: Optional[datetime] = None) -> None:
+    """Set a worker's status to stopped and record when it stopped.
+
+    The first time a worker is seen stopped, metadata["stopped_at"] is set;
+    the archive age is measured from it. Must be called inside
+    state.transaction().
+    """
+    current = state.get_worker(name)
+    if current is None:
+        return
+    if "stopped_at" in current.metadata:
+        state.update_worker(name, status="stopped")
+        return
+    stopped_at = (now or datetime.now()).isoformat()
+    state.update_worker(name, status="stopped",
+                        metadata={**current.metadata, "stopped_at": stopped_at})
+
+
+def archive_workers(state: "State", names: list[str]) -> list[str]:
+    """Move workers from state into the current month's archive file.
+
+    Records are appended to ARCHIVE_DIR/YYYY-MM.jsonl.gz as a new gzip member
+    before the workers are removed from state, so a crash in between leaves
+    a duplicate rather than losing the worker. Must be called inside
+    state.transaction(), which also serializes appends.
+
+    Returns:
+        Names of the workers that were archived
+    """
+    now = datetime.now()
+    records = []
+    for name in names:
+        worker = state.get_worker(name)
+        if worker is None:
+            continue
+        data = worker.to_dict()
+        data["metadata"] = {**worker.metadata, "archived_at": now.isoformat()}
+        records.append(data)
+    if not records:
+        return []
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    archive_path = ARCHIVE_DIR / f"{now:%Y-%m}.jsonl.gz"
+    payload = "".join(json.dumps(data) + "\n" for data in records)
+    with open(archive_path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            f.write(payload.encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    for data in records:
+        state.remove_worker(data["name"])
+    return [data["name"] for data in records]
+
+
+def load_archived_workers() -> list[Worker]:
+    """Load workers from the archive files, oldest first.
+
+    A worker archived more than once (archived, respawned, archived again)
+    is reported once, with its latest record. A truncated or corrupt archive
+    file is read up to the damage.
+    """
+    latest: dict[str, Worker] = {}
+    if not ARCHIVE_DIR.exists():
+        return []
+    for archive_path in sorted(ARCHIVE_DIR.glob("*.jsonl.gz")):
+        try:
+            with gzip.open(archive_path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    worker = Worker.from_dict(json.loads(line))
+                    latest.pop(worker.name, None)
+                    latest[worker.name] = worker
+        except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+            print(f"swarm: warning: archive {archive_path.name} is damaged ({e}), "
+                  f"skipping the rest of it", file=sys.stderr)
+    return list(latest.values())
+
+
+def get_archived_worker(name: str) -> Optional[Worker]:
+    """Get the latest archived record for a worker, or None."""
+    for worker in reversed(load_archived_workers()):
+        if worker.name == name:
+            return worker
+    return None
+
+
+def sweep_stopped_workers(state: "State", workers: list[Worker]) -> list[str]:
+    """Record newly stopped workers and archive those stopped long enough.
+
+    Args:
+        state: State the workers were loaded from
+        workers: Workers whose status was just refreshed
+
+    Returns:
+        Names of the workers moved to the archive
+    """
+    max_age = get_archive_after()
+    now = datetime.now()
+    newly_stopped = []
+    expired = []
+    for worker in workers:
+        if worker.status != "stopped":
+            continue
+        stopped_at = worker.metadata.get("stopped_at")
+        if stopped_at is None:
+            newly_stopped.append(worker)
+            continue
+        try:
+            age = (now - datetime.fromisoformat(stopped_at)).total_seconds()
+        except (TypeError, ValueError):
+            continue
+        if max_age is not None and age >= max_age:
+            expired.append(worker)
+
+    if not newly_stopped and not expired:
+        return []
+
+    def same_worker(st: "State", worker: Worker) -> bool:
+        # Skip workers that were respawned since they were loaded
+        current = st.get_worker(worker.name)
+        return current is not None and current.started == worker.started
+
+    with state.transaction() as st:
+        for worker in newly_stopped:
+            if same_worker(st, worker):
+                mark_stopped(st, worker.name, now)
+        return archive_workers(st, [w.name for w in expired if same_worker(st, w)])
+
+
+# =============================================================================
+# Git Operations
+# =============================================================================
+
+def get_git_root() -> Path:
+    """Get root of current git repo."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return Path(result.stdout.strip())
+
+
+def _check_and_fix_core_bare() -> bool:
+    """Check if core.bare is misconfigured and fix it.
+
+    Returns:
+        True if core.bare was fixed, False if no fix was needed.
+    """
+    result = subprocess.run(
+        ["git", "config", "--get", "core.bare"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode == 0 and result.stdout.strip().lower() == "true":
+        # Fix the misconfiguration
+        subprocess.run(
+            ["git", "config", "core.bare", "false"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        print("swarm: warning: Fixed core.bare=true in git config", file=sys.stderr)
+        return True
+    return False
+
+
+def _is_truly_bare_repo() -> bool:
+    """Check if this is actually a bare repository (not just misconfigured).
+
+    Returns:
+        True if the repository is genuinely bare (no working directory).
+    """
+    # A bare repo has no worktree, check if we can get the git dir
+    result = subprocess.run(
+        ["git", "rev-parse", "--is-bare-repository"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode == 0 and result.stdout.strip().lower() == "true":
+        # Double-check: a truly bare repo won't have a working tree
+        wt_result = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"],
+            capture_output=True,
+            text=True,
+        )
+        # If we can't get the toplevel, it's truly bare
+        return wt_result.returncode != 0
+    return False
+
+
+def create_worktree(path: Path, branch: str) -> None:
+    """Create a git worktree.
+
+    Creates a new worktree at the specified path with the given branch name.
+    If the branch doesn't exist, it's created from the current HEAD.
+
+    Raises:
+        RuntimeError: If worktree creation fails or the repository is bare.
+    """
+    path = Path(path)
+
+    # Step 1: Check for and fix core.bare misconfiguration
+    _check_and_fix_core_bare()
+
+    # Step 2: Check if this is a truly bare repository
+    if _is_truly_bare_repo():
+        raise RuntimeError(
+            "Cannot create worktree: repository is bare. "
+            "Worktrees require a working directory."
+        )
+
+    # Step 3: Create parent directory if needed
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Step 4: Try to create with new branch first, fall back to existing branch
     result = subprocess.run(
         ["git", "worktree", "add", "-b", branch, str(path)],
         capture_output=True,
@@ -3199,43 +5027,629 @@ def remove_worktree(path: Path, force: bool = False) -> tuple[bool, str]:
     return (True, "")
 
 
+# =============================================================================
+# Agent Profiles
+# =============================================================================
+
+def compile_alternation(patterns: list[str]) -> re.Pattern:
+    """Compile regexes into one MULTILINE alternation.
+
+    Returns:
+        The compiled alternation; one that never matches if patterns is empty
+    """
+    return re.compile("|".join(f"(?:{p})" for p in patterns) or "(?!)", re.MULTILINE)
+
+
+def literal_trie_regex(words: list[str]) -> str:
+    """Build a regex matching the longest of words at a position.
+
+    The words are merged into a prefix trie, so the regex reads each
+    character once for all words sharing a prefix: "ab" and "abc" become
+    `ab(?:c)?`.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def non_empty_line_spans(text: str, count: int) -> list[tuple[int, int]]:
+    """Return the (start, end) offsets of the last count non-blank lines of text."""
+    spans = []
+    end = len(text)
+    while end >= 0 and len(spans) < count:
+        start = text.rfind("\n", 0, end) + 1
+        if text[start:end].strip():
+            spans.append((start, end))
+        end = start - 1
+    return spans[::-1]
+
+
+class PatternScanner:
+    """Find many literal substrings in one pass over a text.
+
+    The literals are merged into a prefix trie (literal_trie_regex()) and
+    compiled into one regex, so re's C matcher walks the text once and
+    follows the shared prefixes of all literals together, like an
+    Aho-Corasick automaton. Each search resumes one character after the
+    previous match, so overlapping literals are found too; Python code
+    only runs where something matches.
+    """
+
+    def __init__(self, literals: dict[str, str]):
+        """
+        Args:
+            literals: Name -> substring to find (empty ones are ignored)
+        """
+        self.literal_names: dict[str, list[str]] = {}
+        for name, text in literals.items():
+            if text:
+                self.literal_names.setdefault(text, []).append(name)
+        # Literals found with each longest match: itself and its prefixes
+        self.found_with = {
+            word: [w for w in self.literal_names if word.startswith(w)]
+            for word in self.literal_names
+        }
+        self.regex = re.compile(literal_trie_regex(list(self.literal_names)) or "(?!)")
+
+    def scan(self, text: str, start: int = 0, end: Optional[int] = None) -> list[tuple[str, int]]:
+        """Find every literal in text[start:end].
+
+        Returns:
+            (name, position) for each match, in text order
+        """
+        hits = []
+        end = len(text) if end is None else end
+        search = self.regex.search
+        match = search(text, start, end)
+        while match:
+            pos = match.start()
+            for word in self.found_with[match.group()]:
+                hits.extend((name, pos) for name in self.literal_names[word])
+            match = search(text, pos + 1, end)
+        return hits
+
+
+@dataclass
+class AgentProfile:
+    """Screen patterns of one kind of agent CLI.
+
+    The ready and not-ready regexes are compiled once into a single
+    alternation, and the stuck and fatal substrings into one
+    PatternScanner, so a pane capture is checked in one pass however many
+    patterns there are. Regexes are matched against the whole capture in
+    MULTILINE mode (`^` anchors at every line start).
+    """
+    name: str
+    commands: list[str] = field(default_factory=list)  # Basenames of cmd[0] that select the profile
+    ready: list[str] = field(default_factory=list)  # Regexes: waiting for input
+    not_ready: list[str] = field(default_factory=list)  # Regexes: blocking prompt, dismissed with Enter
+    stuck: dict[str, str] = field(default_factory=dict)  # Substring -> warning message
+    fatal: list[str] = field(default_factory=list)  # Substrings: restart the agent at once
+    context: str = r"(\d+)%"  # Regex whose first group is the context usage percentage
+
+    def __post_init__(self):
+        # Blocking prompts come first, so they win where both could match
+        self.screen_regex = re.compile(
+            f"(?P<not_ready>{compile_alternation(self.not_ready).pattern})"
+            f"|(?P<ready>{compile_alternation(self.ready).pattern})",
+            re.MULTILINE,
+        )
+        self.stuck_texts = list(self.stuck)
+        literals = {f"stuck{i}": text for i, text in enumerate(self.stuck_texts)}
+        literals.update((f"fatal{i}", text) for i, text in enumerate(self.fatal))
+        self.scanner = PatternScanner(literals)
+        self.context_regex = re.compile(self.context)
+
+    def readiness(self, output: str) -> Optional[bool]:
+        """Check a pane capture for readiness.
+
+        Returns:
+            False if a not-ready prompt is shown anywhere, True if a ready
+            pattern is, None if neither
+        """
+        ready = None
+        for match in self.screen_regex.finditer(output):
+            if match.lastgroup == "not_ready":
+                return False
+            ready = True
+        return ready
+
+    def stuck_matches(self, text: str, start: int = 0,
+                      hits: Optional[list] = None) -> dict[str, str]:
+        """Return the stuck substrings found in text[start:], mapped to their messages.
+
+        hits, if given, is the result of self.scanner.scan(text).
+        """
+        if hits is None:
+            hits = self.scanner.scan(text, start)
+        found = {self.stuck_texts[int(name[5:])] for name, pos in hits
+                 if name.startswith("stuck") and pos >= start}
+        return {s: self.stuck[s] for s in self.stuck_texts if s in found}
+
+    def scan_screen(self, screen: str) -> tuple[dict[str, str], bool, list[int]]:
+        """Check an ANSI-stripped screen for stuck, fatal and context patterns.
+
+        One scan finds the stuck and fatal substrings; its hits are then
+        assigned to the screen areas each check looks at. The context
+        regex is only searched in the last 3 non-blank lines.
+
+        Returns:
+            (stuck substrings in the last 20 lines mapped to their messages,
+            whether a fatal substring is shown anywhere, the context
+            percentage of each of the last 3 non-blank lines that shows
+            one, top to bottom)
+        """
+        hits = self.scanner.scan(screen)
+
+        # Start of the last 20 lines
+        stuck_from = len(screen) + 1
+        for _ in range(20):
+            stuck_from = screen.rfind("\n", 0, stuck_from - 1) + 1
+            if stuck_from == 0:
+                break
+        stuck = self.stuck_matches(screen, stuck_from, hits)
+
+        fatal = any(name.startswith("fatal") for name, _ in hits)
+
+        percents = []
+        for line_start, line_end in non_empty_line_spans(screen, 3):
+            match = self.context_regex.search(screen, line_start, line_end)
+            if match:
+                percents.append(int(match.group(1)))
+        return stuck, fatal, percents
+
+
+# Claude Code. Patterns are matched across the whole capture, so spaces are
+# matched with [^\S\n]: \s would also match a line break, and ">\n" or
+# "bypass\npermissions" would count as ready.
+CLAUDE_READY_PATTERNS = [
+    # Permission mode indicators (most reliable, version-independent)
+    r"bypass[^\S\n]+permissions",           # "bypass permissions on" or similar
+    r"permissions?[^\S\n]+mode",            # "permission mode" variants
+    r"shift\+tab[^\S\n]+to[^\S\n]+cycle",   # UI hint in permission line
+    # Version banner (catches startup completion)
+    r"Claude[^\S\n]+Code[^\S\n]+v\d+",      # "Claude Code v2.1.4" etc
+    # Prompt patterns (ANSI-aware)
+    r"(?:^|\x1b\[[0-9;]*m)>[^\S\n]",        # "> " prompt with optional ANSI
+    r"❯[^\S\n]",                            # Unicode prompt character
+]
+
+# Interactive prompts that block Claude Code before it is ready (e.g., theme
+# picker in fresh Docker containers); Enter dismisses them
+CLAUDE_NOT_READY_PATTERNS = [
+    r"Choose the text style",           # First-time theme picker
+    r"looks best with your terminal",   # Theme picker subtitle
+    r"Select login method",             # Login/OAuth prompt
+    r"Paste code here",                 # OAuth code entry prompt
+]
+
+OPENCODE_READY_PATTERNS = [
+    r"opencode[^\S\n]+v\d+",                # "opencode v1.0.115" version banner
+    r"tab[^\S\n]+switch[^\S\n]+agent",      # UI hint at bottom
+    r"ctrl\+p[^\S\n]+commands",             # UI hint at bottom
+]
+
+# Generic CLI prompts (ANSI-aware)
+SHELL_READY_PATTERNS = [
+    r"(?:^|\x1b\[[0-9;]*m)\$[^\S\n]",       # Shell "$ " prompt
+    r"(?:^|\x1b\[[0-9;]*m)>>>[^\S\n]",      # Python REPL ">>> "
+]
+
+# Built-in profiles, selected by agent_profile(). "default" is used for any
+# other command (e.g. a sandbox.sh wrapper) and knows every built-in pattern.
+BUILTIN_AGENT_PROFILES = {
+    "claude": dict(commands=["claude"], ready=CLAUDE_READY_PATTERNS,
+                   not_ready=CLAUDE_NOT_READY_PATTERNS, stuck=STUCK_PATTERNS,
+                   fatal=FATAL_PATTERNS),
+    "opencode": dict(commands=["opencode"], ready=OPENCODE_READY_PATTERNS),
+    "shell": dict(commands=["bash", "sh", "zsh", "fish", "dash", "python", "python3"],
+                  ready=SHELL_READY_PATTERNS),
+    "default": dict(ready=CLAUDE_READY_PATTERNS + OPENCODE_READY_PATTERNS + SHELL_READY_PATTERNS,
+                    not_ready=CLAUDE_NOT_READY_PATTERNS, stuck=STUCK_PATTERNS,
+                    fatal=FATAL_PATTERNS),
+}
+
+# PROFILES_FILE path -> (mtime_ns, profiles) of the last load
+_agent_profiles_cache: dict[str, tuple[int, dict[str, AgentProfile]]] = {}
+
+
+def load_agent_profiles() -> dict[str, AgentProfile]:
+    """Load the built-in agent profiles and those in PROFILES_FILE.
+
+    PROFILES_FILE maps profile names to objects with any of the AgentProfile
+    fields. A profile named like a built-in one starts from its fields;
+    others start empty. User profiles are listed first, so their commands
+    take precedence. Reloaded only when the file changes.
+
+    Returns:
+        Profiles by name
+    """
+    try:
+        mtime = PROFILES_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _agent_profiles_cache.get(str(PROFILES_FILE))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    specs = {}
+    try:
+        if mtime is not None:
+            specs = json.loads(PROFILES_FILE.read_text())
+            if not isinstance(specs, dict):
+                raise ValueError("expected an object of profiles")
+        profiles = {}
+        for name, spec in specs.items():
+            if not isinstance(spec, dict):
+                raise ValueError(f"profile '{name}' is not an object")
+            fields = dict(BUILTIN_AGENT_PROFILES.get(name, {}))
+            fields.update(spec)
+            profiles[name] = AgentProfile(name=name, **fields)
+        for name, fields in BUILTIN_AGENT_PROFILES.items():
+            profiles.setdefault(name, AgentProfile(name=name, **fields))
+    except (OSError, ValueError, TypeError, re.error) as e:
+        print(f"swarm: error: invalid agent profiles in {PROFILES_FILE}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    _agent_profiles_cache[str(PROFILES_FILE)] = (mtime, profiles)
+    return profiles
+
+
+def agent_profile(cmd: list[str]) -> AgentProfile:
+    """Select the agent profile for a worker command.
+
+    The profile is chosen by the basename of cmd[0], skipping an `env`
+    wrapper and its VAR=value arguments. Unknown commands get "default",
+    and so does a `sh -c` style script, which is a wrapper around whatever
+    it starts.
+    """
+    args = [str(arg) for arg in cmd]
+    if args and os.path.basename(args[0]) == "env":
+        args = args[1:]
+        while args and "=" in args[0]:
+            args = args[1:]
+    command = os.path.basename(args[0]) if args else ""
+    if "-c" in args[1:2]:
+        command = ""
+
+    profiles = load_agent_profiles()
+    for profile in profiles.values():
+        if command in profile.commands:
+            return profile
+    return profiles["default"]
+
+
 # =============================================================================
 # Tmux Operations
 # =============================================================================
 
-def tmux_cmd_prefix(socket: Optional[str] = None) -> list[str]:
-    """Build tmux command prefix with optional socket.
+def tmux_cmd_prefix(socket: Optional[str] = None) -> list[str]:
+    """Build tmux command prefix with optional socket.
+
+    Args:
+        socket: Optional tmux socket name for isolated tmux servers
+
+    Returns:
+        List starting with ["tmux"] or ["tmux", "-L", socket]
+    """
+    if socket:
+        return ["tmux", "-L", socket]
+    return ["tmux"]
+
+
+def tmux_target(session: str, window: str) -> str:
+    """Build a tmux target from a session and a window name or pane ID.
+
+    Pane IDs ("%N", see TmuxInfo.pane) are unique on their server and are
+    used as they are; tmux would reject them behind a session name.
+    """
+    if window.startswith("%"):
+        return window
+    return f"{session}:{window}"
+
+
+class TmuxClient:
+    """Run tmux commands over one persistent control-mode connection.
+
+    A `tmux -C attach-session` client is started on first use and kept open,
+    so each command is a line written to its stdin instead of a new tmux
+    process. Replies are read from the %begin/%end (or %error) block tmux
+    sends for every command; notifications between blocks are skipped.
+
+    run() returns None whenever the connection cannot be used (no server or
+    session to attach to, or the client exited before the command was sent),
+    and the caller falls back to subprocess. After a failed connect, no new
+    connection is tried for TMUX_CLIENT_RETRY_INTERVAL seconds.
+
+    Not thread-safe; each long-running process owns its clients.
+    """
+
+    def __init__(self, socket: Optional[str] = None, session: Optional[str] = None):
+        self.socket = socket
+        self.session = session
+        self._proc: Optional[subprocess.Popen] = None
+        self._buffer = b""
+        self._retry_at = 0.0
+
+    # Characters that cannot appear inside a single-quoted tmux argument
+    _QUOTE_ESCAPES = {"'": "\"'\"", "\n": '"\\n"', "\r": '"\\r"', "\t": '"\\t"'}
+
+    @classmethod
+    def quote(cls, arg: str) -> str:
+        """Quote an argument for the tmux command parser.
+
+        Text is single-quoted, which tmux keeps literal (no ~, $ or format
+        expansion); quotes and line breaks are spliced in as double-quoted
+        escapes, which tmux joins into the same argument.
+        """
+        parts = []
+        literal = []
+        for ch in arg:
+            if ch in cls._QUOTE_ESCAPES:
+                if literal:
+                    parts.append("'" + "".join(literal) + "'")
+                    literal = []
+                parts.append(cls._QUOTE_ESCAPES[ch])
+            else:
+                literal.append(ch)
+        if literal or not parts:
+            parts.append("'" + "".join(literal) + "'")
+        return "".join(parts)
+
+    def connected(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self) -> None:
+        """Close the connection; the next run() reconnects."""
+        proc, self._proc = self._proc, None
+        self._buffer = b""
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    def _connect(self) -> bool:
+        if self.connected():
+            return True
+        self.close()
+        if time.monotonic() < self._retry_at:
+            return False
+
+        cmd = tmux_cmd_prefix(self.socket) + ["-C", "attach-session"]
+        if self.session:
+            cmd += ["-t", self.session]
+        env = {k: v for k, v in os.environ.items() if k != "TMUX"}
+        try:
+            self._proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, env=env,
+            )
+            # The attach itself is answered with the first block
+            self._read_block(time.monotonic() + TMUX_CLIENT_TIMEOUT)
+            # Pane output is not needed, and the client must not size windows
+            self._command(["refresh-client", "-f", "no-output,ignore-size"])
+        except (OSError, EOFError, TimeoutError):
+            self.close()
+            self._retry_at = time.monotonic() + TMUX_CLIENT_RETRY_INTERVAL
+            return False
+        return True
+
+    def _read_line(self, deadline: float) -> bytes:
+        fd = self._proc.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("tmux control client did not answer")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("tmux control client exited")
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line
+
+    def _read_block(self, deadline: float) -> tuple[int, str]:
+        # Skip notifications (%window-add, %exit, ...) until the next block
+        while True:
+            line = self._read_line(deadline)
+            if line.startswith(b"%exit"):
+                raise EOFError("tmux control client exited")
+            if line.startswith(b"%begin "):
+                break
+        tag = line.split(b" ")[1:3]
+        output = []
+        while True:
+            line = self._read_line(deadline)
+            if line.startswith((b"%end ", b"%error ")) and line.split(b" ")[1:3] == tag:
+                returncode = 0 if line.startswith(b"%end ") else 1
+                text = b"".join(l + b"\n" for l in output).decode("utf-8", errors="replace")
+                return returncode, text
+            output.append(line)
+
+    @classmethod
+    def command_line(cls, args: list[str]) -> tuple[str, int]:
+        """Build a command line from tmux argv, and count its commands.
+
+        Follows tmux's own argv rules: an argument ending in ";" ends the
+        command (so "x;" is "x" then a separator), while a trailing "\\;"
+        is a literal ";".
+        """
+        words = []
+        count = 1
+        for i, arg in enumerate(args):
+            if not arg.endswith(";"):
+                words.append(cls.quote(arg))
+                continue
+            arg = arg[:-1]
+            if arg.endswith("\\"):
+                words.append(cls.quote(arg[:-1] + ";"))
+                continue
+            if arg:
+                words.append(cls.quote(arg))
+            if i < len(args) - 1:
+                words.append(";")
+                count += 1
+        return " ".join(words), count
+
+    def _send(self, args: list[str]) -> int:
+        line, count = self.command_line(args)
+        self._proc.stdin.write((line + "\n").encode())
+        self._proc.stdin.flush()
+        return count
+
+    def _command(self, args: list[str]) -> tuple[int, str]:
+        self._send(args)
+        return self._read_block(time.monotonic() + TMUX_CLIENT_TIMEOUT)
+
+    def _read_blocks(self, count: int) -> tuple[int, str]:
+        # One block per command of a chain; tmux stops at the first error
+        deadline = time.monotonic() + TMUX_CLIENT_TIMEOUT
+        output = []
+        for _ in range(count):
+            returncode, text = self._read_block(deadline)
+            if returncode != 0:
+                return returncode, text
+            output.append(text)
+        return 0, "".join(output)
+
+    def run(self, args: list[str]) -> Optional[tuple[int, str]]:
+        """Run a tmux command (without the tmux/-L prefix).
+
+        args may chain several commands with ";" arguments, as on the tmux
+        command line.
+
+        Returns:
+            (returncode, output) where output is the commands' stdout, or
+            the error message of the command that failed; None if the
+            connection could not be used and the command was not sent
+        """
+        if not self._connect():
+            return None
+        try:
+            count = self._send(args)
+        except OSError:
+            self.close()
+            return None
+        try:
+            return self._read_blocks(count)
+        except EOFError:
+            # The client went away with the command in flight, typically
+            # because the command destroyed the attached session. Running it
+            # again through subprocess reports the real outcome.
+            self.close()
+            return None
+        except TimeoutError as e:
+            self.close()
+            return 1, f"{e}\n"
+
+
+# Control-mode clients by socket while tmux_control_pool() is active
+_tmux_clients: Optional[dict[Optional[str], TmuxClient]] = None
+
+
+@contextmanager
+def tmux_control_pool():
+    """Route run_tmux() through persistent TmuxClient connections.
+
+    Used by long-running loops (ralph monitor, heartbeat monitor, logs
+    --follow) that issue tmux commands every few seconds. One client per
+    socket is opened on first use, attached to the session the first
+    command targets, and closed when the context exits. Nested uses share
+    the outer pool.
+    """
+    global _tmux_clients
+    if _tmux_clients is not None or TMUX_CONTROL_MODE.strip().lower() in ("0", "off", "false"):
+        yield
+        return
+    _tmux_clients = {}
+    try:
+        yield
+    finally:
+        clients, _tmux_clients = _tmux_clients, None
+        for client in clients.values():
+            client.close()
 
-    Args:
-        socket: Optional tmux socket name for isolated tmux servers
 
-    Returns:
-        List starting with ["tmux"] or ["tmux", "-L", socket]
+def run_tmux(args: list[str], socket: Optional[str] = None, **kwargs) -> subprocess.CompletedProcess:
+    """Run a tmux command, over the control-mode pool when one is active.
+
+    Without a pool, if its connection cannot be used, or if the command
+    reads stdin (input=...), this is exactly
+    subprocess.run(tmux_cmd_prefix(socket) + args, **kwargs). Through the
+    pool, the result is built to match: stdout/stderr as str if text=True
+    (bytes otherwise), and CalledProcessError on failure if check=True.
     """
-    if socket:
-        return ["tmux", "-L", socket]
-    return ["tmux"]
+    cmd = tmux_cmd_prefix(socket) + args
+    clients = _tmux_clients
+    if clients is None or "input" in kwargs:
+        # Control mode has no stdin for commands such as load-buffer -
+        return subprocess.run(cmd, **kwargs)
+    client = clients.get(socket)
+    if client is None:
+        session = None
+        if "-t" in args[:-1]:
+            session = args[args.index("-t") + 1].split(":")[0]
+        client = clients[socket] = TmuxClient(socket, session)
+    result = client.run(args)
+    if result is None:
+        return subprocess.run(cmd, **kwargs)
+
+    returncode, output = result
+    stdout, stderr = (output, "") if returncode == 0 else ("", output)
+    if not kwargs.get("text"):
+        stdout, stderr = stdout.encode(), stderr.encode()
+    if kwargs.get("check") and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
 
 
 def ensure_tmux_session(session: str, socket: Optional[str] = None) -> None:
     """Create tmux session if it doesn't exist."""
     # Check if session exists
-    cmd_prefix = tmux_cmd_prefix(socket)
-    result = subprocess.run(
-        cmd_prefix + ["has-session", "-t", shlex.quote(session)],
+    result = run_tmux(
+        ["has-session", "-t", shlex.quote(session)], socket,
         capture_output=True,
     )
     if result.returncode != 0:
         # Create detached session
-        subprocess.run(
-            cmd_prefix + ["new-session", "-d", "-s", session],
+        run_tmux(
+            ["new-session", "-d", "-s", session], socket,
             capture_output=True,
             check=True,
         )
 
 
-def create_tmux_window(session: str, window: str, cwd: Path, cmd: list[str], socket: Optional[str] = None, env: Optional[dict[str, str]] = None) -> None:
-    """Create a tmux window and run command."""
+def create_tmux_window(session: str, window: str, cwd: Path, cmd: list[str], socket: Optional[str] = None, env: Optional[dict[str, str]] = None,
+                       history_limit: Optional[int] = None) -> dict[str, str]:
+    """Create a tmux window and run command.
+
+    history_limit sets the pane's scrollback size. tmux reads its
+    history-limit option only when a pane is created, so the session's
+    value is swapped around new-window in the same chained command.
+
+    Returns:
+        The new window's IDs as TmuxInfo fields ({"window_id": "@N",
+        "pane_id": "%N"}), or {} if tmux did not print them
+    """
     ensure_tmux_session(session, socket)
 
     # Build the command string safely
@@ -3248,24 +5662,225 @@ def create_tmux_window(session: str, window: str, cwd: Path, cmd: list[str], soc
         )
         cmd_str = f"env {env_prefix} {cmd_str}"
 
-    cmd_prefix = tmux_cmd_prefix(socket)
-    subprocess.run(
-        cmd_prefix + [
-            "new-window",
-            "-a",  # Append after current window (avoids index conflicts with base-index)
-            "-t", session,
-            "-n", window,
-            "-c", str(cwd),
-            cmd_str,
-        ],
-        capture_output=True,
-        check=True,
+    # Copy everything the pane prints to LOGS_DIR/<window>.pane.log. Chained
+    # after new-window, pipe-pane targets the new pane before it has run.
+    args = [
+        "new-window",
+        "-a",  # Append after current window (avoids index conflicts with base-index)
+        "-P", "-F", "#{window_id} #{pane_id}",  # Print the new window's IDs
+        "-t", session,
+        "-n", window,
+        "-c", str(cwd),
+        cmd_str,
+        ";",
+        "pipe-pane", "-o", pane_log_command(pane_log_path(window)),
+    ]
+    if history_limit is not None:
+        # Restore the session's own value afterwards, or unset it again so
+        # later windows keep following the global option
+        previous = run_tmux(
+            ["show-options", "-t", session, "-v", "history-limit"], socket,
+            capture_output=True, text=True,
+        ).stdout.strip()
+        restore = (["set-option", "-t", session, "history-limit", previous] if previous
+                   else ["set-option", "-u", "-t", session, "history-limit"])
+        args = (["set-option", "-t", session, "history-limit", str(history_limit), ";"]
+                + args + [";"] + restore)
+    result = run_tmux(args, socket, capture_output=True, text=True, check=True)
+    invalidate_status_cache(socket)
+
+    ids = result.stdout.split() if isinstance(result.stdout, str) else []
+    if len(ids) != 2 or not ids[0].startswith("@") or not ids[1].startswith("%"):
+        return {}
+    return {"window_id": ids[0], "pane_id": ids[1]}
+
+
+# Program run by `tmux pipe-pane` for every tmux worker: appends pane output
+# to the log and renames it to <log>.1 once it would pass the size cap. It
+# must not contain "#", which tmux would expand as a format.
+PANE_LOG_WRITER = """\
+import os, sys
+path, limit = sys.argv[1], int(sys.argv[2])
+os.makedirs(os.path.dirname(path), exist_ok=True)
+out = open(path, "ab")
+size = out.tell()
+while True:
+    data = os.read(0, 65536)
+    if not data:
+        break
+    if size and size + len(data) > limit:
+        out.close()
+        os.replace(path, path + ".1")
+        out = open(path, "ab")
+        size = 0
+    out.write(data)
+    out.flush()
+    size += len(data)
+"""
+
+
+def pane_log_path(name: str) -> Path:
+    """Path of a tmux worker's pane output log."""
+    return LOGS_DIR / f"{name}.pane.log"
+
+
+def pane_log_command(path: Path) -> str:
+    """Shell command for `tmux pipe-pane` that writes pane output to path."""
+    return " ".join([
+        "exec", shlex.quote(sys.executable), "-c", shlex.quote(PANE_LOG_WRITER),
+        shlex.quote(str(path)), str(PANE_LOG_MAX_BYTES),
+    ])
+
+
+def read_pane_log(path: Path, offset: int = 0) -> tuple[bytes, int]:
+    """Read a pane log from a byte offset.
+
+    Returns:
+        (data, next_offset); data is empty if nothing new was written. If
+        the log was rotated since offset was taken (it is now shorter),
+        reading restarts at the beginning of the new file.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if offset > size:
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return b"", 0
+    return data, offset + len(data)
+
+
+# Terminal escape sequences in raw pane output: CSI, OSC and two-byte escapes
+TERMINAL_ESCAPE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)?|\x1b[@-_]")
+
+
+def pane_output_text(text: str) -> str:
+    """Turn raw pane output into plain text for pattern matching.
+
+    Colors are dropped; any other escape sequence (cursor movement, line
+    erases) and carriage returns become line breaks, so text drawn at a
+    new position starts a new line for `^` anchored patterns.
+    """
+    text = TERMINAL_ESCAPE.sub(lambda m: "" if m.group().endswith("m") else "\n", text)
+    return text.replace("\r", "\n")
+
+
+def tail_pane_log(path: Path, lines: int, data: Optional[bytes] = None) -> bytes:
+    """Return the last `lines` lines of a pane log (with its rotated part).
+
+    data, if given, is the log content already read from path.
+    """
+    if data is None:
+        data, _ = read_pane_log(path)
+    if data.count(b"\n") <= lines:
+        rotated, _ = read_pane_log(path.with_name(path.name + ".1"))
+        data = rotated + data
+    return b"".join(data.splitlines(keepends=True)[-lines:])
+
+
+def follow_pane_log(path: Path, lines: int = 30) -> None:
+    """Print the end of a pane log, then stream new output until Ctrl-C.
+
+    Like `tail -F`: after a rotation the rest of the old file is printed
+    before switching to the new one.
+    """
+    out = getattr(sys.stdout, "buffer", None)
+
+    def emit(data: bytes) -> None:
+        if out is not None:
+            out.write(data)
+            out.flush()
+        else:
+            sys.stdout.write(data.decode(errors="replace"))
+            sys.stdout.flush()
+
+    f = open(path, "rb")
+    try:
+        emit(tail_pane_log(path, lines, f.read()))
+        while True:
+            data = f.read()
+            if data:
+                emit(data)
+                continue
+            try:
+                rotated = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+            except FileNotFoundError:
+                rotated = False
+            if rotated:
+                f.close()
+                f = open(path, "rb")
+                continue
+            time.sleep(PANE_LOG_POLL_INTERVAL)
+    finally:
+        f.close()
+
+
+def tmux_literal(text: str) -> str:
+    """Protect a send-keys -l argument that ends in ";".
+
+    tmux treats a trailing ";" on any argument as a command separator; a
+    trailing "\\;" is sent as a literal ";".
+    """
+    if text.endswith(";"):
+        return text[:-1] + "\\;"
+    return text
+
+
+def _tmux_cursor(target: str, socket: Optional[str] = None) -> Optional[str]:
+    """Return a pane's cursor position as "x,y", or None if unknown."""
+    result = run_tmux(
+        ["display-message", "-p", "-t", target, "#{cursor_x},#{cursor_y}"], socket,
+        capture_output=True, text=True,
     )
+    if result.returncode != 0 or not isinstance(result.stdout, str):
+        return None
+    lines = result.stdout.strip().splitlines()
+    return lines[-1] if lines else None
+
+
+def wait_for_text_landed(target: str, before: Optional[str], timeout: float,
+                         socket: Optional[str] = None) -> None:
+    """Wait until text typed into a pane has been echoed, at most timeout.
+
+    The text has landed once the cursor has moved away from where it was
+    before sending and then stays put for one poll. If the cursor position
+    cannot be read, this waits the full timeout.
+    """
+    deadline = time.monotonic() + timeout
+    if before is None:
+        time.sleep(timeout)
+        return
+    last = before
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(TMUX_SEND_POLL_INTERVAL, remaining))
+        position = _tmux_cursor(target, socket)
+        if position is None:
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            return
+        if position != before and position == last:
+            return
+        last = position
 
 
-def tmux_send(session: str, window: str, text: str, enter: bool = True, socket: Optional[str] = None, pre_clear: bool = True) -> None:
+def tmux_send(session: str, window: str, text: str, enter: bool = True, socket: Optional[str] = None, pre_clear: bool = True, paste: Optional[bool] = None) -> None:
     """Send text to a tmux window.
 
+    The pre-clear keys and the text go out as one chained tmux command.
+    Enter follows once the text has landed in the pane (see
+    wait_for_text_landed), after at most TMUX_SEND_ENTER_WAIT seconds
+    (TMUX_SEND_ENTER_WAIT_MULTILINE for multiline text).
+
+    Text longer than TMUX_PASTE_THRESHOLD bytes is pasted instead of typed:
+    it is loaded from stdin into a buffer named after the window, and
+    pasted with `paste-buffer -p` (bracketed paste if the program asked
+    for it), which deletes the buffer. This avoids tmux's command size
+    limit, and lets agent CLIs take the text as one paste.
+
     Args:
         session: Tmux session name
         window: Tmux window name
@@ -3275,48 +5890,267 @@ def tmux_send(session: str, window: str, text: str, enter: bool = True, socket:
         pre_clear: If True, send Escape + Ctrl-U before text to clear any
                    partial input on the command line. Default True for
                    user-facing sends; internal callers should pass False.
+        paste: Force (True) or disable (False) paste-buffer delivery;
+               None picks it by text size
     """
-    target = f"{session}:{window}"
-    cmd_prefix = tmux_cmd_prefix(socket)
+    target = tmux_target(session, window)
+    if paste is None:
+        paste = len(text.encode()) > TMUX_PASTE_THRESHOLD
+    buffer = f"swarm-{session}-{window}"
 
-    # Pre-clear: send Escape (exit any mode) + Ctrl-U (clear line) before text
+    args = []
+    if enter:
+        # Cursor position before sending, to tell when the text has landed
+        args += ["display-message", "-p", "-t", target, "#{cursor_x},#{cursor_y}", ";"]
+    if paste:
+        args += ["load-buffer", "-b", buffer, "-", ";"]
     if pre_clear:
-        subprocess.run(
-            cmd_prefix + ["send-keys", "-t", target, "Escape"],
-            capture_output=True, check=True,
-        )
-        subprocess.run(
-            cmd_prefix + ["send-keys", "-t", target, "C-u"],
-            capture_output=True, check=True,
-        )
-
-    # Use send-keys with literal text
-    cmd = cmd_prefix + ["send-keys", "-t", target, "-l", text]
-    subprocess.run(cmd, capture_output=True, check=True)
+        # Escape (exit any mode) + Ctrl-U (clear line) before text
+        args += ["send-keys", "-t", target, "Escape", ";",
+                 "send-keys", "-t", target, "C-u", ";"]
+    if paste:
+        args += ["paste-buffer", "-p", "-d", "-b", buffer, "-t", target]
+        try:
+            result = run_tmux(args, socket, input=text, capture_output=True, check=True, text=True)
+        except subprocess.CalledProcessError:
+            run_tmux(["delete-buffer", "-b", buffer], socket, capture_output=True)
+            raise
+    else:
+        args += ["send-keys", "-t", target, "-l"]
+        if text.startswith("-"):
+            # Otherwise tmux parses the text as flags
+            args.append("--")
+        args.append(tmux_literal(text))
+        result = run_tmux(args, socket, capture_output=True, check=True, text=True)
 
     if enter:
-        # Delay to ensure text is fully received before Enter
-        # Longer delay for multiline content which takes more time to process
-        delay = 0.5 if '\n' in text else 0.1
-        time.sleep(delay)
-        subprocess.run(
-            cmd_prefix + ["send-keys", "-t", target, "Enter"],
+        before = None
+        if isinstance(result.stdout, str) and result.stdout.strip():
+            before = result.stdout.strip().splitlines()[0]
+        timeout = TMUX_SEND_ENTER_WAIT_MULTILINE if '\n' in text else TMUX_SEND_ENTER_WAIT
+        wait_for_text_landed(target, before, timeout, socket)
+        run_tmux(
+            ["send-keys", "-t", target, "Enter"], socket,
             capture_output=True,
             check=True,
         )
 
 
-def tmux_window_exists(session: str, window: str, socket: Optional[str] = None) -> bool:
-    """Check if a tmux window exists."""
+# Pane listings taken inside tmux_status_snapshot(), keyed by socket. While
+# it is active, tmux_window_exists() answers from them instead of has-session.
+_tmux_windows_snapshot: Optional[dict[Optional[str], Optional[dict[tuple[str, str], dict[str, tuple[int, bool]]]]]] = None
+_tmux_snapshot_shared = False  # Whether the active snapshot uses the shared status cache
+
+
+def tmux_list_windows(socket: Optional[str] = None) -> Optional[dict[tuple[str, str], dict[str, tuple[int, bool]]]]:
+    """List every window of a tmux server, with all its panes, in one call.
+
+    Args:
+        socket: Optional tmux socket name
+
+    Returns:
+        Mapping of (session, window) to {pane_id: (pane_pid, pane_dead)}
+        for every pane of each window; an empty dict if no server is
+        running on the socket, or None if tmux could not be queried
+    """
+    result = run_tmux(
+        ["list-panes", "-a", "-F",
+         "#{session_name}\t#{window_name}\t#{pane_id}\t#{pane_pid}\t#{pane_dead}"], socket,
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr if isinstance(result.stderr, str) else ""
+        if "no server running" in stderr or "error connecting" in stderr:
+            return {}
+        return None
+    if not isinstance(result.stdout, str):
+        return None
+
+    windows = {}
+    for line in result.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 5:
+            return None
+        session, window, pane_id, pane_pid, pane_dead = parts
+        try:
+            windows.setdefault((session, window), {})[pane_id] = (int(pane_pid), pane_dead == "1")
+        except ValueError:
+            return None
+    return windows
+
+
+# Time of this process's last window change per socket; cached listings
+# probed before it are ignored even if another process has rewritten them.
+_status_cache_invalidated: dict[Optional[str], float] = {}
+
+
+def get_status_cache_ttl() -> float:
+    """Get the shared status cache TTL in seconds from SWARM_STATUS_CACHE_TTL.
+
+    Returns:
+        TTL in seconds; 0 if the shared cache is disabled
+    """
+    try:
+        ttl = float(STATUS_CACHE_TTL)
+    except ValueError:
+        ttl = -1.0
+    if ttl < 0:
+        print(f"swarm: error: invalid SWARM_STATUS_CACHE_TTL '{STATUS_CACHE_TTL}': "
+              f"must be a number of seconds", file=sys.stderr)
+        sys.exit(1)
+    return ttl
+
+
+def read_status_cache() -> dict:
+    """Read the shared status cache, or {} if it is missing or unreadable."""
+    try:
+        data = json.loads(STATUS_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def invalidate_status_cache(socket: Optional[str] = None) -> None:
+    """Forget cached window listings after swarm creates or kills a window."""
+    _status_cache_invalidated[socket] = time.time()
+    try:
+        STATUS_CACHE_FILE.unlink()
+    except OSError:
+        pass
+
+
+def probe_tmux_windows(socket: Optional[str] = None) -> Optional[dict[tuple[str, str], dict[str, tuple[int, bool]]]]:
+    """Get a tmux server's windows, shared between swarm processes.
+
+    A listing in STATUS_CACHE_FILE that is at most STATUS_CACHE_TTL seconds
+    old is used as is; otherwise tmux is listed and the cache rewritten.
+    Each entry records when its probe started, so its age bounds staleness.
+
+    Returns:
+        Same as tmux_list_windows()
+    """
+    ttl = get_status_cache_ttl()
+    key = socket or ""
+    if ttl > 0:
+        entry = read_status_cache().get(key)
+        try:
+            probed_at = float(entry["probed_at"])
+            age = time.time() - probed_at
+            if 0 <= age <= ttl and probed_at > _status_cache_invalidated.get(socket, 0.0):
+                cached: dict[tuple[str, str], dict[str, tuple[int, bool]]] = {}
+                for session, window, pane_pid, dead, pane_id in entry["windows"]:
+                    cached.setdefault((session, window), {})[pane_id] = (int(pane_pid), bool(dead))
+                return cached
+        except (TypeError, KeyError, ValueError):
+            pass
+
+    probed_at = time.time()
+    windows = tmux_list_windows(socket)
+    if ttl <= 0 or windows is None:
+        return windows
+
+    # Rewrite the cache, keeping other sockets' listings that are still fresh
+    data = {
+        k: v for k, v in read_status_cache().items()
+        if isinstance(v, dict) and isinstance(v.get("probed_at"), (int, float))
+        and 0 <= probed_at - v["probed_at"] <= ttl
+    }
+    data[key] = {
+        "probed_at": probed_at,
+        "windows": [[session, window, pane_pid, dead, pane_id]
+                    for (session, window), panes in windows.items()
+                    for pane_id, (pane_pid, dead) in panes.items()],
+    }
+    tmp_path = STATUS_CACHE_FILE.with_name(f"{STATUS_CACHE_FILE.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, STATUS_CACHE_FILE)
+    except OSError:
+        pass
+    return windows
+
+
+@contextmanager
+def tmux_status_snapshot(enabled: bool = True, shared: bool = False):
+    """Resolve tmux worker status from one list-panes call per socket.
+
+    Fleet commands wrap their refresh_worker_status() loop in this, so N
+    workers cost one tmux call per distinct socket instead of N has-session
+    calls. Each socket is listed the first time a window on it is checked.
+    A window counts as running only if it exists with that exact name and
+    one of its panes (the worker's own, if its ID is known) has not exited.
+    Sockets that could not be listed fall back to has-session.
+
+    Args:
+        enabled: If False, do nothing (single-worker code paths)
+        shared: Take listings from the status cache shared between swarm
+            processes (see probe_tmux_windows()). Only for polling loops,
+            which can afford to see changes made outside swarm a moment late
+    """
+    global _tmux_windows_snapshot, _tmux_snapshot_shared
+    if not enabled:
+        yield
+        return
+    previous = _tmux_windows_snapshot, _tmux_snapshot_shared
+    _tmux_windows_snapshot, _tmux_snapshot_shared = {}, shared
+    try:
+        yield
+    finally:
+        _tmux_windows_snapshot, _tmux_snapshot_shared = previous
+
+
+def tmux_window_exists(session: str, window: str, socket: Optional[str] = None,
+                       pane_id: Optional[str] = None) -> bool:
+    """Check if a tmux window exists.
+
+    Answers from the active tmux_status_snapshot() when there is one, and
+    asks tmux about this window otherwise. With pane_id
+    (TmuxInfo.pane_id) the window must also still hold that pane: tmux
+    numbers panes from %0 again after a server restart, so an old ID may
+    belong to another window by now.
+    """
+    snapshot = _tmux_windows_snapshot
+    windows = None
+    if snapshot is not None:
+        if socket not in snapshot:
+            snapshot[socket] = (probe_tmux_windows(socket) if _tmux_snapshot_shared
+                                else tmux_list_windows(socket))
+        windows = snapshot[socket]
+    if windows is not None:
+        window_panes = windows.get((session, window), {})
+        if pane_id is not None:
+            return pane_id in window_panes and not window_panes[pane_id][1]
+        return any(not dead for _, dead in window_panes.values())
+
+    if pane_id is not None:
+        result = run_tmux(
+            ["display-message", "-p", "-t", pane_id, "#{session_name}\t#{window_name}"], socket,
+            capture_output=True, text=True,
+        )
+        return result.returncode == 0 and result.stdout == f"{session}\t{window}\n"
+
     target = f"{session}:{window}"
-    cmd_prefix = tmux_cmd_prefix(socket)
-    result = subprocess.run(
-        cmd_prefix + ["has-session", "-t", target],
+    result = run_tmux(
+        ["has-session", "-t", target], socket,
         capture_output=True,
     )
     return result.returncode == 0
 
 
+def tmux_kill_target(tmux: TmuxInfo) -> str:
+    """Target for killing a worker's tmux window.
+
+    The pane ID is used only while it still belongs to the worker's
+    window (see tmux_window_exists()), so a stale ID left over from a
+    restarted server never kills someone else's window. Otherwise the
+    window name is used, as for state saved before IDs were recorded.
+    """
+    if tmux.pane_id and tmux_window_exists(tmux.session, tmux.window, tmux.socket,
+                                           pane_id=tmux.pane_id):
+        return tmux.pane_id
+    return tmux_target(tmux.session, tmux.window)
+
+
 def tmux_capture_pane(session: str, window: str, history_lines: int = 0, socket: Optional[str] = None) -> str:
     """Capture contents of a tmux pane.
 
@@ -3329,18 +6163,417 @@ def tmux_capture_pane(session: str, window: str, history_lines: int = 0, socket:
     Returns:
         Captured pane content as string
     """
-    target = f"{session}:{window}"
-    cmd_prefix = tmux_cmd_prefix(socket)
-    cmd = cmd_prefix + ["capture-pane", "-t", target, "-p"]
+    target = tmux_target(session, window)
+    args = ["capture-pane", "-t", target, "-p"]
 
     if history_lines > 0:
         # Include scrollback history
-        cmd.extend(["-S", f"-{history_lines}"])
+        args.extend(["-S", f"-{history_lines}"])
 
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    result = run_tmux(args, socket, capture_output=True, text=True, check=True)
     return result.stdout
 
 
+class PaneCapture:
+    """Incremental capture of a tmux pane for monitors that poll it.
+
+    Each poll() reads the pane's #{history_size} and cursor row, the
+    scrollback lines added since the previous poll and the visible screen
+    in one tmux call, so its cost follows the new output rather than the
+    scrollback depth. The last `history_lines` scrollback lines are kept in
+    `history`; content() joins them with the screen into what
+    `capture-pane -S -<history_lines>` would print.
+
+    If the incremental call fails or its output cannot be read, the poll
+    falls back to full captures through tmux_capture_pane(), which raises
+    CalledProcessError when the pane is gone.
+    """
+
+    def __init__(self, session: str, window: str, socket: Optional[str] = None,
+                 history_lines: int = PANE_CAPTURE_HISTORY):
+        self.session = session
+        self.window = window
+        self.socket = socket
+        self.history_lines = history_lines
+        self.history: deque[str] = deque(maxlen=history_lines)
+        self.screen = ""
+        self.history_size: Optional[int] = None
+        self.cursor_y: Optional[int] = None
+        self._span = history_lines
+        self._full_content: Optional[str] = None
+        # Times the kept scrollback was started over; poll() then returns all of it
+        self.restarts = 0
+
+    def poll(self) -> tuple[list[str], str]:
+        """Capture the pane.
+
+        Returns:
+            Tuple of (scrollback lines added since the previous poll, visible
+            screen). The first poll, and any poll after a full capture,
+            returns all kept scrollback lines.
+        """
+        new_lines = self._poll_incremental()
+        if new_lines is None:
+            new_lines = self._poll_full()
+        return new_lines, self.screen
+
+    def content(self, history_lines: Optional[int] = None) -> str:
+        """Return the kept scrollback (at most history_lines of it) and the screen."""
+        if self._full_content is not None:
+            return self._full_content
+        lines = self.tail(len(self.history) if history_lines is None else history_lines)
+        return "".join(line + "\n" for line in lines) + self.screen
+
+    def first_line(self) -> Optional[int]:
+        """Pane line number (0 = oldest line tmux holds) of content()'s first line, if known."""
+        if self.history_size is None:
+            return None
+        return self.history_size - len(self.history)
+
+    def tail(self, n: int) -> list[str]:
+        """Return the last n kept scrollback lines."""
+        kept = len(self.history)
+        return [self.history[i] for i in range(max(0, kept - n), kept)]
+
+    def _poll_full(self) -> list[str]:
+        self.screen = tmux_capture_pane(self.session, self.window, socket=self.socket)
+        self.restarts += 1
+        self.history.clear()
+        self.history_size = None
+        self._span = self.history_lines
+        if self.history_lines <= 0:
+            self._full_content = self.screen
+            return []
+        try:
+            self._full_content = tmux_capture_pane(
+                self.session, self.window, history_lines=self.history_lines, socket=self.socket)
+        except subprocess.CalledProcessError:
+            self._full_content = self.screen
+        return self._full_content.splitlines()
+
+    def _poll_incremental(self) -> Optional[list[str]]:
+        """Fetch new scrollback and the screen, or None if tmux could not."""
+        target = tmux_target(self.session, self.window)
+        for _ in range(2):
+            span = self._span
+            args = ["display-message", "-p", "-t", target,
+                    "#{history_size} #{history_limit} #{pane_height} #{cursor_y}"]
+            if span > 0:
+                args += [";", "capture-pane", "-p", "-t", target, "-S", f"-{span}", "-E", "-1"]
+            args += [";", "capture-pane", "-p", "-t", target]
+            result = run_tmux(args, self.socket, capture_output=True, text=True)
+            if result.returncode != 0 or not isinstance(result.stdout, str):
+                return None
+            lines = result.stdout.split("\n")
+            try:
+                size, limit, height, cursor_y = (int(v) for v in lines[0].split())
+            except ValueError:
+                return None
+            # Every line ends in a newline; -E -1 without history still
+            # prints the screen's first line, which is not scrollback
+            body = lines[1:-1]
+            if len(body) < height or (span <= 0 and len(body) != height):
+                return None
+            captured = body[:len(body) - height] if size > 0 else []
+            new_lines = self._new_lines(size, limit, captured)
+            if new_lines is not None or span >= self.history_lines or len(captured) >= size:
+                break
+            # More output scrolled in than was fetched
+            self._span = self.history_lines
+        if new_lines is None:
+            # First poll, or nothing known is left in the pane's history
+            # (cleared, or rewrapped by a resize): start over from it
+            self.restarts += 1
+            self.history.clear()
+            new_lines = captured
+
+        self.history.extend(new_lines)
+        self.history_size = size
+        self.cursor_y = cursor_y
+        self.screen = "".join(line + "\n" for line in body[len(body) - height:])
+        self._full_content = None
+        self._span = min(self.history_lines, max(PANE_CAPTURE_MIN_SPAN, 2 * len(new_lines)))
+        return new_lines
+
+    def _new_lines(self, size: int, limit: int, captured: list[str]) -> Optional[list[str]]:
+        """Pick the lines added since the last poll from the fetched span.
+
+        Returns None if the last known lines are not in the span.
+        """
+        if self.history_lines <= 0:
+            return []
+        if self.history_size is None:
+            return None
+        anchor = self.tail(PANE_CAPTURE_ANCHOR_LINES)
+        grown = size - self.history_size
+        # Each time the history reaches history-limit, tmux drops its oldest
+        # tenth; below that floor the size counts every new line
+        if size < limit - limit // 10 and 0 <= grown <= len(captured):
+            before = captured[:len(captured) - grown]
+            n = min(len(before), len(anchor))
+            if before[len(before) - n:] == anchor[len(anchor) - n:]:
+                return captured[len(captured) - grown:]
+        if not anchor:
+            return None
+        for end in range(len(captured), len(anchor) - 1, -1):
+            if captured[end - len(anchor):end] == anchor:
+                return captured[end:]
+        return None
+
+
+class DoneScanner:
+    """Incremental done-pattern search over the output a PaneCapture polls.
+
+    Each check() searches the scrollback lines added since the previous
+    check, the DONE_SCAN_OVERLAP_LINES lines before them and the screen,
+    so its cost follows the new output rather than the scrollback depth.
+    A match spanning more lines than the overlap may be missed.
+
+    The prompt baseline (the end of the pane content captured after the
+    prompt was sent) is skipped, so the pattern does not match the prompt
+    itself: when the capture starts over (its first poll, a cleared or
+    resized pane, or full captures), the baseline's end is looked up in its
+    content and everything up to it is skipped from then on. If it is not
+    found, all of the content is searched, as when the terminal was cleared.
+    """
+
+    def __init__(self, regex: re.Pattern, baseline: Optional[PromptBaseline] = None):
+        self.regex = regex
+        self.baseline = baseline
+        self.restarts: Optional[int] = None  # capture.restarts at the last check
+        self.lines = 0  # Scrollback lines seen since the capture started over
+        self.skip = (0, 0)  # (line, column) where the output after the baseline starts
+
+    def check(self, capture: PaneCapture, new_lines: list[str]) -> bool:
+        """Search the output of capture's latest poll, which returned new_lines."""
+        if capture.restarts != self.restarts:
+            self.restarts = capture.restarts
+            self.lines = len(capture.history)
+            content = capture.content()
+            start = 0
+            if self.baseline:
+                start = self.baseline.end_in(content, capture.first_line())
+            line_start = content.rfind("\n", 0, start) + 1
+            self.skip = (content.count("\n", 0, line_start), start - line_start)
+            return self.regex.search(content[start:]) is not None
+
+        self.lines += len(new_lines)
+        skip_line, skip_column = self.skip
+        first = max(skip_line, self.lines - len(new_lines) - DONE_SCAN_OVERLAP_LINES)
+        text = "".join(line + "\n" for line in capture.tail(self.lines - first)) + capture.screen
+        cut = 0
+        # The baseline ends on the screen: skip its lines there
+        for _ in range(first - self.lines):
+            cut = text.find("\n", cut) + 1 or len(text)
+        if first == skip_line:
+            cut += skip_column
+        return self.regex.search(text[cut:]) is not None
+
+
+def tmux_capture_panes(targets: list[str], history_lines: int = 0,
+                       socket: Optional[str] = None) -> Optional[list[tuple[int, list[str], list[str]]]]:
+    """Capture several panes on one tmux server in one call per TMUX_CAPTURE_BATCH.
+
+    Args:
+        targets: Pane targets ("session:window")
+        history_lines: Scrollback lines to include per pane (0 = visible only)
+        socket: Optional tmux socket name
+
+    Returns:
+        A (history_size, scrollback lines, screen lines) tuple per target, in
+        order, or None if any capture failed (e.g. a window is gone).
+    """
+    captures = []
+    for i in range(0, len(targets), TMUX_CAPTURE_BATCH):
+        batch = targets[i:i + TMUX_CAPTURE_BATCH]
+        args = []
+        for target in batch:
+            if args:
+                args.append(";")
+            args += ["display-message", "-p", "-t", target, "#{history_size} #{pane_height}"]
+            if history_lines > 0:
+                args += [";", "capture-pane", "-p", "-t", target, "-S", f"-{history_lines}", "-E", "-1"]
+            args += [";", "capture-pane", "-p", "-t", target]
+        result = run_tmux(args, socket, capture_output=True, text=True)
+        if result.returncode != 0 or not isinstance(result.stdout, str):
+            return None
+
+        lines = result.stdout.split("\n")
+        pos = 0
+        try:
+            for _ in batch:
+                size, height = (int(v) for v in lines[pos].split())
+                pos += 1
+                history = []
+                if history_lines > 0:
+                    # Without scrollback, -E -1 prints the screen's first line
+                    count = min(history_lines, size) if size > 0 else 1
+                    history = lines[pos:pos + count] if size > 0 else []
+                    pos += count
+                screen = lines[pos:pos + height]
+                pos += height
+                if len(screen) != height:
+                    return None
+                captures.append((size, history, screen))
+        except (IndexError, ValueError):
+            return None
+    return captures
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Resident memory of a process in bytes, or None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    # No procfs (macOS): ps reports RSS in KiB
+    try:
+        result = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)],
+                                capture_output=True, text=True)
+        return int(result.stdout.strip()) * 1024
+    except (OSError, ValueError):
+        return None
+
+
+def tmux_server_stats(socket: Optional[str] = None) -> Optional[dict]:
+    """Memory use of a tmux server and the scrollback of each of its panes.
+
+    Returns:
+        {"pid", "rss_bytes", "panes": [{"session", "window", "pane_id",
+        "history_size", "history_limit", "history_bytes"}]}, or None if no server is running
+        on the socket. rss_bytes is None if the server's memory is unknown.
+    """
+    result = run_tmux(
+        ["display-message", "-p", "#{pid}", ";",
+         "list-panes", "-a", "-F",
+         "#{session_name}\t#{window_name}\t#{pane_id}\t#{history_size}\t#{history_limit}\t#{history_bytes}"],
+        socket, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return None
+
+    lines = result.stdout.splitlines()
+    try:
+        pid = int(lines[0])
+        panes = []
+        for line in lines[1:]:
+            session, window, pane_id, size, limit, size_bytes = line.split("\t")
+            panes.append({
+                "session": session,
+                "window": window,
+                "pane_id": pane_id,
+                "history_size": int(size),
+                "history_limit": int(limit),
+                "history_bytes": int(size_bytes),
+            })
+    except (IndexError, ValueError):
+        return None
+    return {"pid": pid, "rss_bytes": process_rss(pid), "panes": panes}
+
+
+def get_snapshot_max_age() -> float:
+    """Get the pane snapshot max age in seconds from SWARM_SNAPSHOT_MAX_AGE.
+
+    Returns:
+        Max age in seconds; 0 if snapshots are not used
+    """
+    try:
+        max_age = float(SNAPSHOT_MAX_AGE)
+    except ValueError:
+        max_age = -1.0
+    if max_age < 0:
+        print(f"swarm: error: invalid SWARM_SNAPSHOT_MAX_AGE '{SNAPSHOT_MAX_AGE}': "
+              f"must be a number of seconds", file=sys.stderr)
+        sys.exit(1)
+    return max_age
+
+
+def snapshot_path(name: str) -> Path:
+    """Path of the pane snapshot published for a worker."""
+    return SNAPSHOTS_DIR / name
+
+
+def publish_snapshot(worker: "Worker", screen: str, history: Optional[list[str]] = None,
+                     history_size: Optional[int] = None) -> None:
+    """Publish a monitor's latest capture of a worker's pane.
+
+    The snapshot records the screen, its hash, the capture time and, when
+    known, the pane's history size with the last SNAPSHOT_HISTORY_LINES
+    scrollback lines. It is written atomically; failures are ignored.
+
+    Args:
+        worker: The tmux worker whose pane was captured
+        screen: The visible pane, as capture-pane printed it
+        history: Scrollback lines directly above the screen, oldest first
+        history_size: The pane's #{history_size} at the capture
+    """
+    history = (history or [])[-SNAPSHOT_HISTORY_LINES:]
+    data = {
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+        "hash": hashlib.md5(screen.encode()).hexdigest(),
+        "started": worker.started,
+        "target": f"{worker.tmux.session}:{worker.tmux.window}",
+        "socket": worker.tmux.socket,
+        "history_size": history_size,
+        "history": history if history_size is not None else [],
+        "screen": screen,
+    }
+    path = snapshot_path(worker.name)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def read_snapshot(worker: "Worker", history_lines: int = 0) -> Optional[dict]:
+    """Return the worker's published snapshot if it can stand in for a capture.
+
+    It must be at most SWARM_SNAPSHOT_MAX_AGE seconds old, come from this
+    worker's current pane, and hold the scrollback that
+    `capture-pane -S -<history_lines>` would include.
+    """
+    max_age = get_snapshot_max_age()
+    if max_age <= 0 or not worker.tmux:
+        return None
+    try:
+        data = json.loads(snapshot_path(worker.name).read_text())
+        captured_at = datetime.fromisoformat(data["captured_at"])
+        age = (datetime.now(timezone.utc) - captured_at).total_seconds()
+        if not 0 <= age <= max_age or not isinstance(data["screen"], str):
+            return None
+        if (data["started"] != worker.started
+                or data["target"] != f"{worker.tmux.session}:{worker.tmux.window}"
+                or data["socket"] != worker.tmux.socket):
+            return None
+        if history_lines > 0:
+            size = data["history_size"]
+            if not isinstance(size, int) or len(data["history"]) < min(history_lines, size):
+                return None
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    return data
+
+
+def snapshot_content(snapshot: dict, history_lines: int = 0) -> str:
+    """Render a snapshot as `capture-pane -p -S -<history_lines>` would print it."""
+    _, history, screen = snapshot_capture(snapshot, history_lines)
+    return "".join(line + "\n" for line in history + screen)
+
+
+def snapshot_capture(snapshot: dict, history_lines: int = 0) -> tuple[int, list[str], list[str]]:
+    """Return a snapshot in the form tmux_capture_panes() returns a capture."""
+    history = snapshot["history"]
+    size = snapshot["history_size"] or 0
+    n = min(history_lines, size, len(history))
+    return size, history[len(history) - n:], snapshot["screen"].split("\n")[:-1]
+
+
 def session_has_other_workers(state: "State", session: str, exclude_worker: str, socket: Optional[str] = None) -> bool:
     """Check if other workers are using the same tmux session.
 
@@ -3353,20 +6586,7 @@ def session_has_other_workers(state: "State", session: str, exclude_worker: str,
     Returns:
         True if other workers exist in the same session (and socket), False otherwise
     """
-    for worker in state.workers:
-        if worker.name == exclude_worker:
-            continue
-        if not worker.tmux:
-            continue
-        if worker.tmux.session != session:
-            continue
-        # Check socket matches (both None or both same value)
-        worker_socket = worker.tmux.socket
-        if worker_socket != socket:
-            continue
-        # Found another worker in the same session/socket
-        return True
-    return False
+    return state.session_has_workers(session, socket, exclude={exclude_worker})
 
 
 def kill_tmux_session(session: str, socket: Optional[str] = None) -> None:
@@ -3376,108 +6596,111 @@ def kill_tmux_session(session: str, socket: Optional[str] = None) -> None:
         session: Tmux session name to kill
         socket: Optional tmux socket name
     """
-    cmd_prefix = tmux_cmd_prefix(socket)
-    subprocess.run(
-        cmd_prefix + ["kill-session", "-t", session],
-        capture_output=True
-    )
+    run_tmux(["kill-session", "-t", session], socket, capture_output=True)
+    invalidate_status_cache(socket)
 
 
-def wait_for_agent_ready(session: str, window: str, timeout: int = 30, socket: Optional[str] = None) -> bool:
+def wait_for_agent_ready(session: str, window: str, timeout: int = 30, socket: Optional[str] = None,
+                         profile: Optional[AgentProfile] = None,
+                         log_path: Optional[Path] = None) -> bool:
     """Wait for an agent CLI to be ready for input.
 
-    Detects readiness by looking for common prompt patterns:
+    Detects readiness with the profile's patterns (see AgentProfile), e.g.:
     - Claude Code: "> " prompt at start of line, or "bypass permissions" indicator
-    - Generic: Shell prompt patterns like "$ " or "> "
+    - Generic: Shell prompt patterns like "$ " or ">>> "
+
+    With log_path (the worker's pane log), output is matched as it is
+    written and the screen is captured to confirm a match straight away.
+    The screen is also captured on an adaptive schedule, which is all that
+    happens without a log (see READY_STREAM_INTERVAL). A not-ready prompt
+    (e.g. the theme picker) is dismissed with Enter.
 
     Args:
         session: Tmux session name
         window: Tmux window name
         timeout: Maximum seconds to wait
         socket: Optional tmux socket name
+        profile: Agent profile to detect readiness with (default: the
+            "default" profile, which knows every built-in pattern)
+        log_path: Pane log of the window (see pane_log_path())
 
     Returns:
         True if agent became ready, False if timeout
     """
-    import re
+    if profile is None:
+        profile = agent_profile([])
 
-    # Patterns that indicate the agent is ready for input
-    # Designed to be resilient to Claude Code version changes:
-    # - Match permission mode indicators (most reliable)
-    # - Match version banners (catches startup completion)
-    # - Match common prompt patterns
-    ready_patterns = [
-        # Claude Code permission mode indicators (most reliable, version-independent)
-        r"bypass\s+permissions",          # "bypass permissions on" or similar
-        r"permissions?\s+mode",           # "permission mode" variants
-        r"shift\+tab\s+to\s+cycle",       # UI hint in permission line
-        # Claude Code version banner (catches startup completion)
-        r"Claude\s+Code\s+v\d+",          # "Claude Code v2.1.4" etc
-        # Claude Code prompt patterns (ANSI-aware)
-        r"(?:^|\x1b\[[0-9;]*m)>\s",       # "> " prompt with optional ANSI
-        r"❯\s",                            # Unicode prompt character
-        # OpenCode CLI ready patterns
-        r"opencode\s+v\d+",               # "opencode v1.0.115" version banner
-        r"tab\s+switch\s+agent",          # UI hint at bottom
-        r"ctrl\+p\s+commands",            # UI hint at bottom
-        # Generic CLI prompts (ANSI-aware)
-        r"(?:^|\x1b\[[0-9;]*m)\$\s",      # Shell "$ " prompt
-        r"(?:^|\x1b\[[0-9;]*m)>>>\s",     # Python REPL ">>> "
-    ]
+    # Output written before now is covered by the first capture
+    offset = 0
+    if log_path is not None:
+        try:
+            offset = log_path.stat().st_size
+        except OSError:
+            pass
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    carry = ""
 
-    # Patterns that indicate the agent is NOT ready and is blocked on an
-    # interactive prompt (e.g., theme picker in fresh Docker containers).
-    # When detected, send Enter to dismiss and continue waiting.
-    not_ready_patterns = [
-        r"Choose the text style",           # First-time theme picker
-        r"looks best with your terminal",   # Theme picker subtitle
-        r"Select login method",             # Login/OAuth prompt
-        r"Paste code here",                 # OAuth code entry prompt
-    ]
+    interval = READY_POLL_MIN_INTERVAL
+    last_output = None
+    dismissed_output = None
+    dismissed_at = 0.0
 
     start = time.time()
-    while (time.time() - start) < timeout:
-        try:
-            output = tmux_capture_pane(session, window, socket=socket)
-            lines = output.split('\n')
-
-            # Check for not-ready patterns first (e.g., theme picker)
-            not_ready = False
-            for line in lines:
-                for pattern in not_ready_patterns:
-                    if re.search(pattern, line):
-                        not_ready = True
-                        break
-                if not_ready:
-                    break
-
-            if not_ready:
+    deadline = start + timeout
+    next_capture = start
+    while True:
+        now = time.time()
+        if now >= deadline:
+            return False
+
+        if log_path is not None:
+            data, offset = read_pane_log(log_path, offset)
+            if data:
+                text = carry + pane_output_text(decoder.decode(data))
+                carry = text[-READY_STREAM_CARRY:]
+                if profile.readiness(text) is not None:
+                    # Confirm on the screen, which also shows whether a
+                    # blocking prompt is still up
+                    next_capture = now
+                    carry = ""
+
+        if now >= next_capture:
+            try:
+                output = tmux_capture_pane(session, window, socket=socket)
+            except subprocess.CalledProcessError:
+                # Window might not exist yet, keep waiting
+                output = None
+
+            readiness = profile.readiness(output) if output is not None else None
+            if readiness:
+                return True
+            if readiness is False and (output != dismissed_output
+                                       or now - dismissed_at >= READY_DISMISS_RETRY):
                 # Dismiss the blocking prompt by sending Enter, then continue polling
                 try:
-                    cmd_prefix = tmux_cmd_prefix(socket)
-                    target = f"{session}:{window}"
-                    subprocess.run(
-                        cmd_prefix + ["send-keys", "-t", target, "Enter"],
+                    target = tmux_target(session, window)
+                    run_tmux(
+                        ["send-keys", "-t", target, "Enter"], socket,
                         capture_output=True,
                         check=True,
                     )
                 except subprocess.CalledProcessError:
                     pass
-                time.sleep(0.5)
-                continue
-
-            # Check each line for ready patterns
-            for line in lines:
-                for pattern in ready_patterns:
-                    if re.search(pattern, line):
-                        return True
-        except subprocess.CalledProcessError:
-            # Window might not exist yet, keep waiting
-            pass
-
-        time.sleep(0.5)
+                dismissed_output = output
+                dismissed_at = now
+                interval = READY_POLL_MIN_INTERVAL
+            elif log_path is None and output != last_output:
+                # The screen is changing: keep looking closely
+                interval = READY_POLL_MIN_INTERVAL
+            else:
+                interval = min(interval * 2, READY_POLL_MAX_INTERVAL)
+            last_output = output
+            next_capture = now + interval
 
-    return False
+        wake = next_capture
+        if log_path is not None:
+            wake = min(wake, now + READY_STREAM_INTERVAL)
+        time.sleep(max(0.0, min(wake, deadline) - time.time()))
 
 
 # =============================================================================
@@ -3528,6 +6751,64 @@ def process_alive(pid: int) -> bool:
         return True
 
 
+# =============================================================================
+# Parallel Fan-out
+# =============================================================================
+
+def non_negative_int(value: str) -> int:
+    """argparse type for sizes that may be 0."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {number}")
+    return number
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def run_parallel(items: list, fn, parallel: int = DEFAULT_PARALLEL) -> list[tuple[object, Optional[Exception]]]:
+    """Call fn(item) for every item, at most `parallel` at a time.
+
+    --all commands use this to run their per-worker tmux calls and signals
+    on a bounded thread pool. Results are returned in the order of items,
+    whatever order the calls finish in, so output stays deterministic.
+
+    Returns:
+        (result, None), or (None, exception) if fn raised, for each item
+    """
+    def call(item):
+        try:
+            return fn(item), None
+        except Exception as e:
+            return None, e
+
+    if len(items) <= 1 or parallel <= 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(parallel, len(items))) as executor:
+        return list(executor.map(call, items))
+
+
+def describe_error(error: Exception) -> str:
+    """One-line description of a per-worker failure."""
+    if isinstance(error, subprocess.CalledProcessError) and error.stderr:
+        stderr = error.stderr
+        if isinstance(stderr, bytes):
+            stderr = stderr.decode(errors="replace")
+        return stderr.strip()
+    return str(error)
+
+
 # =============================================================================
 # Status Refresh
 # =============================================================================
@@ -3541,7 +6822,8 @@ def refresh_worker_status(worker: Worker) -> str:
     if worker.tmux:
         # Check tmux window
         socket = worker.tmux.socket if worker.tmux else None
-        if tmux_window_exists(worker.tmux.session, worker.tmux.window, socket):
+        if tmux_window_exists(worker.tmux.session, worker.tmux.window, socket,
+                              pane_id=worker.tmux.pane_id):
             return "running"
         else:
             return "stopped"
@@ -3606,6 +6888,26 @@ def time_until(iso_str: str) -> str:
         return f"in {seconds // 86400}d"
 
 
+def format_bytes(size: Optional[int]) -> str:
+    """Convert a byte count to a human-readable size (e.g., "512B", "3.9M")."""
+    if size is None:
+        return "-"
+    value = float(size)
+    for unit in ("B", "K", "M"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}G"
+
+
+def print_table(headers: list[str], rows: list[dict]) -> None:
+    """Print rows as left-aligned columns under their headers, like `swarm ls`."""
+    col_widths = {h: max([len(h)] + [len(row[h]) for row in rows]) for h in headers}
+    print("  ".join(h.ljust(col_widths[h]) for h in headers))
+    for row in rows:
+        print("  ".join(row[h].ljust(col_widths[h]) for h in headers))
+
+
 def main() -> None:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -3636,6 +6938,10 @@ def main() -> None:
     spawn_p.add_argument("--tmux-socket", default=None,
                         help="Tmux socket name for isolation. Default: none (uses "
                              "default tmux server). Useful for testing.")
+    spawn_p.add_argument("--history-limit", type=non_negative_int, default=None, metavar="LINES",
+                        help="Scrollback lines kept for the worker's tmux pane. "
+                             "Default: tmux's history-limit option (2000 unless "
+                             "configured). Requires --tmux.")
     spawn_p.add_argument("--worktree", action="store_true",
                         help="Create isolated git worktree for this worker. Default: "
                              "false. Creates <repo>-worktrees/<name>/ with its own "
@@ -3698,6 +7004,10 @@ def main() -> None:
     ls_p.add_argument("--tag",
                      help="Filter by tag (exact match). Only workers with this tag "
                           "in their tag list are shown.")
+    ls_p.add_argument("--archived", action="store_true",
+                     help="List archived workers instead of live ones. Workers "
+                          "stopped longer than SWARM_ARCHIVE_AFTER (default 24h) "
+                          "are moved to the archive.")
 
     # status
     status_p = subparsers.add_parser(
@@ -3727,6 +7037,23 @@ def main() -> None:
     peek_p.add_argument("--all", action="store_true",
                         help="Peek all running tmux workers. Non-tmux and "
                              "non-running workers are silently skipped.")
+    peek_p.add_argument("--parallel", type=positive_int, default=DEFAULT_PARALLEL, metavar="N",
+                        help="With --all, capture N workers at a time. Default: %(default)s.")
+    peek_p.add_argument("--since-last", action="store_true",
+                        help="Print only output not shown by the previous --since-last "
+                             "peek of the worker (nothing if the screen is unchanged). "
+                             "Cursors are kept in ~/.swarm/peek/.")
+
+    # tmux-stats
+    tmux_stats_p = subparsers.add_parser(
+        "tmux-stats",
+        help="Show tmux memory and scrollback use",
+        description=TMUX_STATS_HELP_DESCRIPTION,
+        epilog=TMUX_STATS_HELP_EPILOG,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    tmux_stats_p.add_argument("--format", choices=["table", "json"], default="table",
+                              help="Output format. Default: table.")
 
     # send
     send_p = subparsers.add_parser(
@@ -3754,6 +7081,8 @@ def main() -> None:
                        help="Skip the pre-clear sequence (Escape + Ctrl-U) that is "
                             "normally sent before the text. Use this when sending to "
                             "programs that should not receive escape sequences.")
+    send_p.add_argument("--parallel", type=positive_int, default=DEFAULT_PARALLEL, metavar="N",
+                        help="With --all, send to N workers at a time. Default: %(default)s.")
 
     # interrupt
     int_p = subparsers.add_parser(
@@ -3770,6 +7099,8 @@ def main() -> None:
                        help="Send interrupt to all running tmux workers. Non-tmux "
                             "workers and non-running workers are silently skipped. "
                             "Cannot be used with a worker name.")
+    int_p.add_argument("--parallel", type=positive_int, default=DEFAULT_PARALLEL, metavar="N",
+                       help="With --all, interrupt N workers at a time. Default: %(default)s.")
 
     # eof
     eof_p = subparsers.add_parser(
@@ -3839,6 +7170,8 @@ def main() -> None:
                             "Only use when you're sure changes are not needed.")
     kill_p.add_argument("--all", action="store_true",
                        help="Kill all workers. Cannot be used with a worker name.")
+    kill_p.add_argument("--parallel", type=positive_int, default=DEFAULT_PARALLEL, metavar="N",
+                        help="With --all, stop N workers at a time. Default: %(default)s.")
 
     # wait
     wait_p = subparsers.add_parser(
@@ -4088,6 +7421,9 @@ def main() -> None:
                                help="Tmux session name. Default: hash-based for isolation.")
     ralph_spawn_p.add_argument("--tmux-socket", default=None,
                                help="Tmux socket name for isolation. Used in testing.")
+    ralph_spawn_p.add_argument("--history-limit", type=non_negative_int, default=None, metavar="LINES",
+                               help="Scrollback lines kept for the worker's tmux pane, also on each "
+                                    "new iteration. Default: tmux's history-limit option.")
     ralph_spawn_p.add_argument("--worktree", action=argparse.BooleanOptionalAction, default=True,
                                help="Create isolated git worktree for this worker. "
                                     "Default: True. Use --no-worktree to skip. "
@@ -4242,6 +7578,8 @@ def main() -> None:
         cmd_status(args)
     elif args.command == "peek":
         cmd_peek(args)
+    elif args.command == "tmux-stats":
+        cmd_tmux_stats(args)
     elif args.command == "send":
         cmd_send(args)
     elif args.command == "interrupt":
@@ -4299,9 +7637,10 @@ def _rollback_spawn(
         try:
             cmd_prefix = tmux_cmd_prefix(tmux_info.socket)
             subprocess.run(
-                cmd_prefix + ["kill-window", "-t", f"{tmux_info.session}:{tmux_info.window}"],
+                cmd_prefix + ["kill-window", "-t", tmux_target(tmux_info.session, tmux_info.pane)],
                 capture_output=True
             )
+            invalidate_status_cache(tmux_info.socket)
         except Exception as e:
             print(f"swarm: warning: rollback failed: could not kill tmux window: {e}", file=sys.stderr)
 
@@ -4341,6 +7680,11 @@ def cmd_spawn(args) -> None:
         print("swarm: error: no command provided (use -- command...)", file=sys.stderr)
         sys.exit(1)
 
+    history_limit = getattr(args, 'history_limit', None)
+    if history_limit is not None and not args.tmux:
+        print("swarm: error: --history-limit requires --tmux", file=sys.stderr)
+        sys.exit(1)
+
     # Load state and check for duplicate name
     state = State()
     if state.get_worker(args.name) is not None:
@@ -4413,8 +7757,10 @@ def cmd_spawn(args) -> None:
             # Spawn in tmux
             session = args.session if args.session else get_default_session_name()
             socket = args.tmux_socket
-            create_tmux_window(session, args.name, cwd, cmd, socket, env=env_dict)
-            tmux_info = TmuxInfo(session=session, window=args.name, socket=socket)
+            window_ids = create_tmux_window(session, args.name, cwd, cmd, socket, env=env_dict,
+                                            history_limit=history_limit)
+            tmux_info = TmuxInfo(session=session, window=args.name, socket=socket,
+                                 history_limit=history_limit, **window_ids)
         else:
             # Spawn as background process
             log_prefix = LOGS_DIR / args.name
@@ -4470,7 +7816,8 @@ def cmd_spawn(args) -> None:
     # Wait for agent to be ready if requested
     if args.ready_wait and tmux_info:
         socket = tmux_info.socket if tmux_info else None
-        if not wait_for_agent_ready(tmux_info.session, tmux_info.window, args.ready_timeout, socket):
+        if not wait_for_agent_ready(tmux_info.session, tmux_info.pane, args.ready_timeout, socket,
+                                    profile=agent_profile(cmd), log_path=pane_log_path(args.name)):
             print(f"swarm: warning: agent '{args.name}' did not become ready within {args.ready_timeout}s", file=sys.stderr)
 
     # Print success message
@@ -4544,20 +7891,34 @@ def cmd_ls(args) -> None:
     # Load state
     state = State()
 
-    # Refresh status for each worker
-    workers = []
-    for worker in state.workers:
-        worker.status = refresh_worker_status(worker)
-        workers.append(worker)
-
-    # Filter by status if not "all"
+    if getattr(args, 'archived', False):
+        # Archived workers are stopped by definition; a name that has been
+        # respawned since is listed from the live state instead
+        workers = [w for w in load_archived_workers() if state.get_worker(w.name) is None]
+        if args.tag:
+            workers = [w for w in workers if args.tag in w.tags]
+    else:
+        # Filter by tag if specified (indexed lookup on the sqlite backend), so
+        # only matching workers pay for a status refresh
+        candidates = state.find_workers(tag=args.tag) if args.tag else state.workers
+
+        # Refresh status for each worker
+        workers = []
+        with tmux_status_snapshot():
+            for worker in candidates:
+                worker.status = refresh_worker_status(worker)
+                workers.append(worker)
+
+        # Move workers that have been stopped long enough to the archive
+        archived = set(sweep_stopped_workers(state, workers))
+        if archived:
+            workers = [w for w in workers if w.name not in archived]
+
+    # Filter by status if not "all". Status is refreshed live, so the stored
+    # value cannot be used to narrow the candidates.
     if args.status != "all":
         workers = [w for w in workers if w.status == args.status]
 
-    # Filter by tag if specified
-    if args.tag:
-        workers = [w for w in workers if args.tag in w.tags]
-
     # Output based on format
     if args.format == "json":
         # JSON format
@@ -4666,26 +8027,130 @@ def cmd_status(args) -> None:
         sys.exit(1)
 
 
+def peek_cursor_path(name: str) -> Path:
+    """Path of the `peek --since-last` cursor for a worker."""
+    return PEEK_CURSORS_DIR / f"{name}.json"
+
+
+def load_peek_cursor(name: str) -> Optional[dict]:
+    """Read a worker's peek cursor, or None if it is missing or unreadable."""
+    try:
+        cursor = json.loads(peek_cursor_path(name).read_text())
+    except (OSError, ValueError):
+        return None
+    return cursor if isinstance(cursor, dict) else None
+
+
+def save_peek_cursor(name: str, cursor: dict) -> None:
+    """Write a worker's peek cursor atomically; failures are ignored."""
+    path = peek_cursor_path(name)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        PEEK_CURSORS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(cursor))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _line_hash(line: str) -> str:
+    return hashlib.md5(line.encode()).hexdigest()[:16]
+
+
+def peek_since_last(worker: Worker, history_size: int, history: list[str],
+                    screen: list[str]) -> tuple[list[str], dict]:
+    """Pick the lines of a capture that the worker's peek cursor has not shown.
+
+    The cursor records the pane's history size and hashes of the screen
+    lines last shown. Lines that scrolled into the history since then are
+    located by the size difference; the shown screen is expected to
+    continue there, and lines from the first one that differs are new. If
+    the history was trimmed or cleared, the shown lines are searched for
+    instead. Without a usable cursor the whole capture is new.
+
+    Returns:
+        Tuple of (new lines, cursor to save for the next call)
+    """
+    # tmux pads the screen with blank rows below the output
+    while screen and not screen[-1].strip():
+        screen = screen[:-1]
+    lines = history + screen
+    hashes = [_line_hash(line) for line in lines]
+    screen_hashes = hashes[len(history):]
+    new_cursor = {
+        "started": worker.started,
+        "history_size": history_size,
+        "screen_hash": _line_hash("\n".join(screen)),
+        "lines": screen_hashes,
+    }
+
+    cursor = load_peek_cursor(worker.name)
+    if not cursor or cursor.get("started") != worker.started:
+        return lines, new_cursor
+    seen = cursor.get("lines")
+    last_size = cursor.get("history_size")
+    if not isinstance(seen, list) or not isinstance(last_size, int):
+        return lines, new_cursor
+    if last_size == history_size and cursor.get("screen_hash") == new_cursor["screen_hash"]:
+        return [], new_cursor
+
+    def shown(start: int) -> int:
+        """Number of shown lines that continue at lines[start]."""
+        n = 0
+        while n < len(seen) and start + n < len(hashes) and hashes[start + n] == seen[n]:
+            n += 1
+        return n
+
+    start = len(history) - (history_size - last_size)
+    if history_size >= last_size and 0 <= start <= len(lines):
+        n = shown(start)
+        if n or not seen:
+            return lines[start + n:], new_cursor
+
+    # Scrollback was trimmed or cleared: take the latest place where most of
+    # the shown lines continue
+    best_start, best = None, 0
+    for start in range(len(lines) - 1, -1, -1):
+        n = shown(start)
+        if n > best:
+            best_start, best = start, n
+    if best_start is not None and best >= min(len(seen), 3):
+        return lines[best_start + best:], new_cursor
+    return lines, new_cursor
+
+
 def cmd_peek(args) -> None:
     """Peek at worker terminal output."""
     # Load state
     state = State()
+    since_last = getattr(args, "since_last", False)
 
     # Handle --all: peek all running tmux workers
     if args.all:
-        workers = [w for w in state.workers if w.tmux is not None]
-        for worker in workers:
-            # Check if tmux window is still alive
-            if not tmux_window_exists(worker.tmux.session, worker.tmux.window,
-                                       socket=worker.tmux.socket):
-                continue
-            # Capture pane content
-            try:
-                content = tmux_capture_pane(
-                    worker.tmux.session, worker.tmux.window,
-                    history_lines=args.lines, socket=worker.tmux.socket
-                )
-            except Exception:
+        # Skip workers whose tmux window is gone; one tmux call covers all
+        with tmux_status_snapshot():
+            workers = [
+                w for w in state.workers
+                if w.tmux is not None and tmux_window_exists(
+                    w.tmux.session, w.tmux.window, socket=w.tmux.socket, pane_id=w.tmux.pane_id)
+            ]
+
+        if since_last:
+            peek_all_since_last(workers, args.lines, getattr(args, "parallel", DEFAULT_PARALLEL))
+            sys.exit(0)
+
+        # Capture panes concurrently (unless a monitor just did), print in
+        # worker order
+        def capture(w: Worker) -> str:
+            snapshot = read_snapshot(w, args.lines)
+            if snapshot is not None:
+                return snapshot_content(snapshot, args.lines)
+            return tmux_capture_pane(w.tmux.session, w.tmux.pane,
+                                     history_lines=args.lines, socket=w.tmux.socket)
+
+        results = run_parallel(workers, capture, getattr(args, "parallel", DEFAULT_PARALLEL))
+        for worker, (content, error) in zip(workers, results):
+            if error is not None:
                 continue
             print(f"=== {worker.name} ===")
             print(content)
@@ -4706,23 +8171,160 @@ def cmd_peek(args) -> None:
         sys.exit(1)
 
     if not tmux_window_exists(worker.tmux.session, worker.tmux.window,
-                               socket=worker.tmux.socket):
+                               socket=worker.tmux.socket, pane_id=worker.tmux.pane_id):
         print(f"swarm: error: worker '{args.name}' is not running", file=sys.stderr)
         sys.exit(1)
 
-    try:
-        content = tmux_capture_pane(
-            worker.tmux.session, worker.tmux.window,
-            history_lines=args.lines, socket=worker.tmux.socket
-        )
-    except Exception as e:
-        print(f"swarm: error: failed to capture pane for '{args.name}': {e}", file=sys.stderr)
-        sys.exit(1)
+    snapshot = read_snapshot(worker, args.lines)
+    if since_last:
+        if snapshot is not None and snapshot["history_size"] is not None:
+            captures = [snapshot_capture(snapshot, args.lines)]
+        else:
+            captures = tmux_capture_panes([tmux_target(worker.tmux.session, worker.tmux.pane)],
+                                          args.lines, socket=worker.tmux.socket)
+        if captures is None:
+            print(f"swarm: error: failed to capture pane for '{args.name}'", file=sys.stderr)
+            sys.exit(1)
+        new_lines, cursor = peek_since_last(worker, *captures[0])
+        for line in new_lines:
+            print(line)
+        save_peek_cursor(worker.name, cursor)
+        sys.exit(0)
+
+    if snapshot is not None:
+        content = snapshot_content(snapshot, args.lines)
+    else:
+        try:
+            content = tmux_capture_pane(
+                worker.tmux.session, worker.tmux.pane,
+                history_lines=args.lines, socket=worker.tmux.socket
+            )
+        except Exception as e:
+            print(f"swarm: error: failed to capture pane for '{args.name}': {e}", file=sys.stderr)
+            sys.exit(1)
 
     print(content, end="")
     sys.exit(0)
 
 
+def peek_all_since_last(workers: list[Worker], lines: int, parallel: int) -> None:
+    """Print what `peek --since-last` has not shown yet for each worker.
+
+    Workers with a fresh monitor snapshot are not captured; the others with
+    one chained tmux call per socket (per TMUX_CAPTURE_BATCH workers).
+    Workers with no new output print nothing.
+    """
+    captured = {}
+    by_socket: dict[Optional[str], list[Worker]] = {}
+    for worker in workers:
+        snapshot = read_snapshot(worker, lines)
+        if snapshot is not None and snapshot["history_size"] is not None:
+            captured[worker.name] = snapshot_capture(snapshot, lines)
+        else:
+            by_socket.setdefault(worker.tmux.socket, []).append(worker)
+
+    def capture(group: list[Worker]) -> list:
+        socket = group[0].tmux.socket
+        targets = [tmux_target(w.tmux.session, w.tmux.pane) for w in group]
+        captures = tmux_capture_panes(targets, lines, socket=socket)
+        if captures is not None:
+            return captures
+        # A window closed since the listing; capture the rest one by one
+        results = []
+        for target in targets:
+            single = tmux_capture_panes([target], lines, socket=socket)
+            results.append(single[0] if single else None)
+        return results
+
+    groups = list(by_socket.values())
+    for group, (captures, error) in zip(groups, run_parallel(groups, capture, parallel)):
+        if error is None:
+            captured.update((w.name, c) for w, c in zip(group, captures))
+
+    for worker in workers:
+        if captured.get(worker.name) is None:
+            continue
+        new_lines, cursor = peek_since_last(worker, *captured[worker.name])
+        if new_lines:
+            print(f"=== {worker.name} ===")
+            for line in new_lines:
+                print(line)
+        save_peek_cursor(worker.name, cursor)
+
+
+def cmd_tmux_stats(args) -> None:
+    """Show tmux server memory and per-worker scrollback."""
+    state = State()
+    workers = [w for w in state.workers if w.tmux]
+
+    # One chained tmux call per socket
+    sockets = list(dict.fromkeys(w.tmux.socket for w in workers))
+    stats = {socket: tmux_server_stats(socket) for socket in sockets}
+
+    servers = []
+    for socket in sockets:
+        server = stats[socket]
+        if server is None:
+            continue
+        servers.append({
+            "socket": socket,
+            "pid": server["pid"],
+            "rss_bytes": server["rss_bytes"],
+            "panes": len(server["panes"]),
+            "history_lines": sum(p["history_size"] for p in server["panes"]),
+            "history_bytes": sum(p["history_bytes"] for p in server["panes"]),
+        })
+
+    windows = []
+    for worker in workers:
+        server = stats[worker.tmux.socket]
+        if server is None:
+            continue
+        for pane in server["panes"]:
+            if worker.tmux.pane_id is not None:
+                matches = pane.get("pane_id") == worker.tmux.pane_id
+            else:
+                matches = pane["session"] == worker.tmux.session and pane["window"] == worker.tmux.window
+            if matches:
+                windows.append({
+                    "worker": worker.name,
+                    "session": pane["session"],
+                    "window": pane["window"],
+                    "socket": worker.tmux.socket,
+                    "history_size": pane["history_size"],
+                    "history_limit": pane["history_limit"],
+                    "history_bytes": pane["history_bytes"],
+                })
+                break
+
+    if args.format == "json":
+        print(json.dumps({"servers": servers, "windows": windows}, indent=2))
+        return
+
+    if not servers:
+        return
+
+    print_table(["SOCKET", "PID", "RSS", "PANES", "HISTORY", "HISTORY MEM"], [{
+        "SOCKET": s["socket"] or "default",
+        "PID": str(s["pid"]),
+        "RSS": format_bytes(s["rss_bytes"]),
+        "PANES": str(s["panes"]),
+        "HISTORY": str(s["history_lines"]),
+        "HISTORY MEM": format_bytes(s["history_bytes"]),
+    } for s in servers])
+
+    if windows:
+        print()
+        print_table(["WORKER", "WINDOW", "SOCKET", "HISTORY", "LIMIT", "HISTORY MEM"], [{
+            "WORKER": w["worker"],
+            "WINDOW": f"{w['session']}:{w['window']}",
+            "SOCKET": w["socket"] or "default",
+            "HISTORY": str(w["history_size"]),
+            "LIMIT": str(w["history_limit"]),
+            "HISTORY MEM": format_bytes(w["history_bytes"]),
+        } for w in windows])
+
+
 def cmd_send(args) -> None:
     """Send text to worker."""
     # Load state
@@ -4754,10 +8356,14 @@ def cmd_send(args) -> None:
 
         workers = [worker]
 
-    # For each worker, validate and send
+    # Refresh status up front; with --all, one tmux call covers every worker
+    with tmux_status_snapshot(args.all):
+        statuses = {w.name: refresh_worker_status(w) for w in workers}
+
+    # Validate: only running workers receive text
+    targets = []
     for worker in workers:
-        # Refresh status and check if running
-        current_status = refresh_worker_status(worker)
+        current_status = statuses[worker.name]
 
         # Validation: worker is not running
         if current_status != "running":
@@ -4769,12 +8375,26 @@ def cmd_send(args) -> None:
                 print(f"swarm: error: worker '{worker.name}' is not running", file=sys.stderr)
                 sys.exit(1)
 
-        # Send text to tmux window
+        targets.append(worker)
+
+    # Send text to the tmux windows concurrently
+    def send(worker: Worker) -> None:
         socket = worker.tmux.socket if worker.tmux else None
-        tmux_send(worker.tmux.session, worker.tmux.window, args.text, enter=not args.no_enter, socket=socket, pre_clear=not args.raw)
+        tmux_send(worker.tmux.session, worker.tmux.pane, args.text, enter=not args.no_enter, socket=socket, pre_clear=not args.raw)
 
-        # Print confirmation
-        print(f"sent to {worker.name}")
+    results = run_parallel(targets, send, getattr(args, "parallel", DEFAULT_PARALLEL))
+
+    # Print confirmations in worker order, then failures
+    failed = []
+    for worker, (_, error) in zip(targets, results):
+        if error is None:
+            print(f"sent to {worker.name}")
+        else:
+            failed.append((worker.name, error))
+    for name, error in failed:
+        print(f"swarm: error: failed to send to '{name}': {describe_error(error)}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
 
 
 def cmd_interrupt(args) -> None:
@@ -4786,11 +8406,12 @@ def cmd_interrupt(args) -> None:
     if args.all:
         # Get all running tmux workers
         workers_to_interrupt = []
-        for worker in state.workers:
-            # Refresh status
-            actual_status = refresh_worker_status(worker)
-            if actual_status == "running" and worker.tmux:
-                workers_to_interrupt.append(worker)
+        with tmux_status_snapshot():
+            for worker in state.workers:
+                # Refresh status
+                actual_status = refresh_worker_status(worker)
+                if actual_status == "running" and worker.tmux:
+                    workers_to_interrupt.append(worker)
     else:
         # Get single worker by name
         if not args.name:
@@ -4815,17 +8436,28 @@ def cmd_interrupt(args) -> None:
 
         workers_to_interrupt = [worker]
 
-    # Send Ctrl-C to each worker
-    for worker in workers_to_interrupt:
-        session = worker.tmux.session
-        window = worker.tmux.window
-        socket = worker.tmux.socket if worker.tmux else None
-        cmd_prefix = tmux_cmd_prefix(socket)
-        subprocess.run(
-            cmd_prefix + ["send-keys", "-t", f"{session}:{window}", "C-c"],
-            capture_output=True
+    # Send Ctrl-C to each worker, concurrently
+    def interrupt(worker: Worker) -> None:
+        run_tmux(
+            ["send-keys", "-t", tmux_target(worker.tmux.session, worker.tmux.pane), "C-c"],
+            worker.tmux.socket,
+            capture_output=True,
+            check=True,
         )
-        print(f"interrupted {worker.name}")
+
+    results = run_parallel(workers_to_interrupt, interrupt,
+                           getattr(args, "parallel", DEFAULT_PARALLEL))
+
+    failed = []
+    for worker, (_, error) in zip(workers_to_interrupt, results):
+        if error is None:
+            print(f"interrupted {worker.name}")
+        else:
+            failed.append((worker.name, error))
+    for name, error in failed:
+        print(f"swarm: error: failed to interrupt '{name}': {describe_error(error)}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
 
 
 def cmd_eof(args) -> None:
@@ -4852,11 +8484,11 @@ def cmd_eof(args) -> None:
 
     # Send Ctrl-D
     session = worker.tmux.session
-    window = worker.tmux.window
+    window = worker.tmux.pane
     socket = worker.tmux.socket if worker.tmux else None
     cmd_prefix = tmux_cmd_prefix(socket)
     subprocess.run(
-        cmd_prefix + ["send-keys", "-t", f"{session}:{window}", "C-d"],
+        cmd_prefix + ["send-keys", "-t", tmux_target(session, window), "C-d"],
         capture_output=True
     )
     print(f"sent eof to {worker.name}")
@@ -4882,10 +8514,10 @@ def cmd_attach(args) -> None:
 
     # Select the window first
     session = worker.tmux.session
-    window = worker.tmux.window
+    window = worker.tmux.pane
     socket = worker.tmux.socket if worker.tmux else None
     cmd_prefix = tmux_cmd_prefix(socket)
-    subprocess.run(cmd_prefix + ["select-window", "-t", f"{session}:{window}"], check=True)
+    subprocess.run(cmd_prefix + ["select-window", "-t", tmux_target(session, window)], check=True)
 
     # Then attach to session (this replaces current process)
     if socket:
@@ -4908,26 +8540,44 @@ def cmd_logs(args) -> None:
     # Handle tmux workers
     if worker.tmux:
         socket = worker.tmux.socket if worker.tmux else None
-        if args.follow:
-            # Follow mode: poll every 1s, clear screen, show last 30 lines
+        pane_log = pane_log_path(worker.name)
+        if args.follow and pane_log.exists():
+            # Follow mode: stream new pane output from the pane log
             try:
-                while True:
-                    history = args.lines if args.history else 0
-                    output = tmux_capture_pane(worker.tmux.session, worker.tmux.window, history_lines=history, socket=socket)
+                follow_pane_log(pane_log)
+            except KeyboardInterrupt:
+                pass
+        elif args.follow:
+            # Follow mode without a pane log: poll every 1s, clear screen,
+            # show last 30 lines
+            try:
+                with tmux_control_pool():
+                    while True:
+                        history = args.lines if args.history else 0
+                        output = tmux_capture_pane(worker.tmux.session, worker.tmux.pane, history_lines=history, socket=socket)
 
-                    # Clear screen and print last 30 lines
-                    print("\033[2J\033[H", end="")  # ANSI clear
-                    lines = output.strip().split('\n')
-                    print('\n'.join(lines[-30:]))
+                        # Clear screen and print last 30 lines
+                        print("\033[2J\033[H", end="")  # ANSI clear
+                        lines = output.strip().split('\n')
+                        print('\n'.join(lines[-30:]))
 
-                    time.sleep(1)
+                        time.sleep(1)
             except KeyboardInterrupt:
                 # Clean exit on Ctrl-C
                 pass
+        elif pane_log.exists() and not tmux_window_exists(worker.tmux.session, worker.tmux.window, socket,
+                                                          pane_id=worker.tmux.pane_id):
+            # The window is gone: show what the pane printed before it died
+            output = tail_pane_log(pane_log, args.lines)
+            sys.stdout.write(output.decode(errors="replace"))
         else:
-            # Default or history mode
+            # Default or history mode, from a monitor's fresh snapshot if any
             history = args.lines if args.history else 0
-            output = tmux_capture_pane(worker.tmux.session, worker.tmux.window, history_lines=history, socket=socket)
+            snapshot = read_snapshot(worker, history)
+            if snapshot is not None:
+                output = snapshot_content(snapshot, history)
+            else:
+                output = tmux_capture_pane(worker.tmux.session, worker.tmux.pane, history_lines=history, socket=socket)
             print(output, end="")
 
     # Handle non-tmux workers
@@ -4946,6 +8596,53 @@ def cmd_logs(args) -> None:
                 sys.exit(1)
 
 
+def stop_worker_process(worker: Worker) -> bool:
+    """Kill a worker's tmux window, or send SIGTERM to its process.
+
+    Returns:
+        True if SIGTERM was sent to a live process, which then needs
+        wait_for_pids_to_exit()
+    """
+    if worker.tmux:
+        socket = worker.tmux.socket if worker.tmux else None
+        cmd_prefix = tmux_cmd_prefix(socket)
+        subprocess.run(
+            cmd_prefix + ["kill-window", "-t", tmux_kill_target(worker.tmux)],
+            capture_output=True
+        )
+        invalidate_status_cache(socket)
+        return False
+    if worker.pid:
+        try:
+            # First try graceful shutdown with SIGTERM
+            os.kill(worker.pid, signal.SIGTERM)
+            return True
+        except ProcessLookupError:
+            # Process already dead
+            pass
+    return False
+
+
+def wait_for_pids_to_exit(pids: list[int]) -> None:
+    """Wait up to 5 seconds for SIGTERMed processes, then SIGKILL the rest.
+
+    All processes share the one grace period.
+    """
+    pending = list(pids)
+    for _ in range(50):  # Check every 0.1 seconds
+        if not pending:
+            return
+        time.sleep(0.1)
+        pending = [pid for pid in pending if process_alive(pid)]
+    # Still alive after 5 seconds, use SIGKILL
+    for pid in pending:
+        if process_alive(pid):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
 def cmd_kill(args) -> None:
     """Kill worker processes.
 
@@ -4971,51 +8668,28 @@ def cmd_kill(args) -> None:
     # Track sessions to clean up (session, socket) tuples
     sessions_to_cleanup: set[tuple[str, Optional[str]]] = set()
 
-    # Kill each worker
+    # Kill tmux windows and send SIGTERM concurrently, then give every PID
+    # worker the same grace period instead of one after another
+    results = run_parallel(workers_to_kill, stop_worker_process,
+                           getattr(args, "parallel", DEFAULT_PARALLEL))
+    wait_for_pids_to_exit([w.pid for w, (signalled, _) in zip(workers_to_kill, results) if signalled])
+    failed = [(w, error) for w, (_, error) in zip(workers_to_kill, results) if error is not None]
+    workers_to_kill = [w for w, (_, error) in zip(workers_to_kill, results) if error is None]
+
+    # Update state, worktrees, ralph and heartbeat for each killed worker
     for worker in workers_to_kill:
         # Handle tmux workers
         if worker.tmux:
             socket = worker.tmux.socket if worker.tmux else None
             session = worker.tmux.session
-            cmd_prefix = tmux_cmd_prefix(socket)
-            subprocess.run(
-                cmd_prefix + ["kill-window", "-t", f"{session}:{worker.tmux.window}"],
-                capture_output=True
-            )
 
             # Check if we should clean up the session after killing this worker
             # We need to check against remaining workers (excluding those being killed)
             workers_being_killed = {w.name for w in workers_to_kill}
-            has_other = any(
-                w.name != worker.name and
-                w.name not in workers_being_killed and
-                w.tmux and
-                w.tmux.session == session and
-                w.tmux.socket == socket
-                for w in state.workers
-            )
+            has_other = state.session_has_workers(session, socket, exclude=workers_being_killed)
             if not has_other:
                 sessions_to_cleanup.add((session, socket))
 
-        # Handle non-tmux workers with PID
-        elif worker.pid:
-            try:
-                # First try graceful shutdown with SIGTERM
-                os.kill(worker.pid, signal.SIGTERM)
-
-                # Wait up to 5 seconds for process to die
-                for _ in range(50):  # Check every 0.1 seconds
-                    time.sleep(0.1)
-                    if not process_alive(worker.pid):
-                        break
-                else:
-                    # Process still alive after 5 seconds, use SIGKILL
-                    if process_alive(worker.pid):
-                        os.kill(worker.pid, signal.SIGKILL)
-            except ProcessLookupError:
-                # Process already dead
-                pass
-
         # Update worker status
         worker.status = "stopped"
 
@@ -5039,10 +8713,8 @@ def cmd_kill(args) -> None:
 
             if args.rm_worktree:
                 # Delete ralph state directory when --rm-worktree is specified
-                ralph_state_dir = RALPH_DIR / worker.name
                 try:
-                    import shutil
-                    shutil.rmtree(ralph_state_dir)
+                    remove_ralph_state(worker.name)
                 except OSError as e:
                     print(f"swarm: warning: cannot remove ralph state for '{worker.name}': {e}", file=sys.stderr)
             else:
@@ -5065,8 +8737,16 @@ def cmd_kill(args) -> None:
     for session, socket in sessions_to_cleanup:
         kill_tmux_session(session, socket=socket)
 
-    # Save updated state
-    state.save()
+    # Mark the killed workers stopped in one write, applied to the current
+    # state so concurrent changes to other workers are kept
+    with state.transaction() as st:
+        for worker in workers_to_kill:
+            mark_stopped(st, worker.name)
+
+    for worker, error in failed:
+        print(f"swarm: error: failed to kill '{worker.name}': {describe_error(error)}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
 
 
 def cmd_wait(args) -> None:
@@ -5074,7 +8754,8 @@ def cmd_wait(args) -> None:
     state = State()
 
     if args.all:
-        workers = [w for w in state.workers if refresh_worker_status(w) == "running"]
+        with tmux_status_snapshot():
+            workers = [w for w in state.workers if refresh_worker_status(w) == "running"]
     else:
         if not args.name:
             print("swarm: error: name required (or use --all)", file=sys.stderr)
@@ -5094,11 +8775,12 @@ def cmd_wait(args) -> None:
                 print(f"{name}: still running (timeout)")
             sys.exit(1)
 
-        for name in list(pending.keys()):
-            w = pending[name]
-            if refresh_worker_status(w) == "stopped":
-                print(f"{name}: exited")
-                del pending[name]
+        with tmux_status_snapshot(shared=True):
+            for name in list(pending.keys()):
+                w = pending[name]
+                if refresh_worker_status(w) == "stopped":
+                    print(f"{name}: exited")
+                    del pending[name]
 
         if pending:
             time.sleep(1)
@@ -5113,11 +8795,15 @@ def cmd_clean(args) -> None:
     # Determine which workers to clean
     workers_to_clean = []
 
+    # Refreshed statuses, persisted together with the removals below
+    refreshed_status: dict[str, str] = {}
+
     if args.all:
         # Refresh actual status before filtering
-        for w in state.workers:
-            w.status = refresh_worker_status(w)
-        state.save()
+        with tmux_status_snapshot():
+            for w in state.workers:
+                w.status = refresh_worker_status(w)
+                refreshed_status[w.name] = w.status
         # Get all workers with status "stopped"
         workers_to_clean = [w for w in state.workers if w.status == "stopped"]
     else:
@@ -5135,6 +8821,7 @@ def cmd_clean(args) -> None:
 
     # Track sessions to clean up (session, socket) tuples
     sessions_to_cleanup: set[tuple[str, Optional[str]]] = set()
+    cleaned: list[str] = []
 
     # Clean each worker
     for worker in workers_to_clean:
@@ -5157,14 +8844,7 @@ def cmd_clean(args) -> None:
             socket = worker.tmux.socket
             # Check against workers not being cleaned
             workers_being_cleaned = {w.name for w in workers_to_clean}
-            has_other = any(
-                w.name != worker.name and
-                w.name not in workers_being_cleaned and
-                w.tmux and
-                w.tmux.session == session and
-                w.tmux.socket == socket
-                for w in state.workers
-            )
+            has_other = state.session_has_workers(session, socket, exclude=workers_being_cleaned)
             if not has_other:
                 sessions_to_cleanup.add((session, socket))
 
@@ -5179,21 +8859,30 @@ def cmd_clean(args) -> None:
                     print(f"swarm: worktree at: {worktree_path}", file=sys.stderr)
                     print(f"swarm: use --force-dirty to remove anyway", file=sys.stderr)
 
-        # Remove log files if they exist
+        # Remove log files, the peek cursor and the pane snapshot if they exist
         stdout_log = LOGS_DIR / f"{worker.name}.stdout.log"
         stderr_log = LOGS_DIR / f"{worker.name}.stderr.log"
+        pane_log = pane_log_path(worker.name)
+        rotated_pane_log = pane_log.with_name(pane_log.name + ".1")
 
-        if stdout_log.exists():
-            stdout_log.unlink()
-        if stderr_log.exists():
-            stderr_log.unlink()
+        for log in (stdout_log, stderr_log, pane_log, rotated_pane_log,
+                    peek_cursor_path(worker.name), snapshot_path(worker.name)):
+            if log.exists():
+                log.unlink()
 
-        # Remove worker from state
-        state.remove_worker(worker.name)
+        # Removed from state below, together with the other cleaned workers
+        cleaned.append(worker.name)
 
         # Print success message
         print(f"cleaned {worker.name}")
 
+    # Apply refreshed statuses and removals in a single state write
+    with state.transaction() as st:
+        for name, status in refreshed_status.items():
+            st.update_worker(name, status=status)
+        for name in cleaned:
+            st.remove_worker(name)
+
     # Clean up empty tmux sessions
     for session, socket in sessions_to_cleanup:
         kill_tmux_session(session, socket=socket)
@@ -5203,13 +8892,13 @@ def cmd_respawn(args) -> None:
     """Respawn a dead worker.
 
     Re-spawns a worker using its original configuration (command, options, etc.).
-    The worker must exist in state. If --clean-first is specified, the old
-    worktree is removed before respawning.
+    The worker must exist in state or in the archive. If --clean-first is
+    specified, the old worktree is removed before respawning.
     """
     state = State()
 
-    # Get worker by name
-    worker = state.get_worker(args.name)
+    # Get worker by name, falling back to the archive
+    worker = state.get_worker(args.name) or get_archived_worker(args.name)
     if not worker:
         print(f"swarm: error: worker '{args.name}' not found", file=sys.stderr)
         sys.exit(1)
@@ -5223,9 +8912,10 @@ def cmd_respawn(args) -> None:
             socket = worker.tmux.socket if worker.tmux else None
             cmd_prefix = tmux_cmd_prefix(socket)
             subprocess.run(
-                cmd_prefix + ["kill-window", "-t", f"{worker.tmux.session}:{worker.tmux.window}"],
+                cmd_prefix + ["kill-window", "-t", tmux_target(worker.tmux.session, worker.tmux.pane)],
                 capture_output=True
             )
+            invalidate_status_cache(socket)
         elif worker.pid:
             try:
                 os.kill(worker.pid, signal.SIGTERM)
@@ -5259,10 +8949,8 @@ def cmd_respawn(args) -> None:
     original_tags = worker.tags
     original_tmux = worker.tmux
     original_worktree = worker.worktree
-    original_metadata = worker.metadata
-
-    # Remove old worker from state
-    state.remove_worker(args.name)
+    original_metadata = {k: v for k, v in worker.metadata.items()
+                         if k not in ("stopped_at", "archived_at")}
 
     # Determine working directory
     cwd = Path(original_cwd)
@@ -5298,8 +8986,10 @@ def cmd_respawn(args) -> None:
         # Spawn in tmux
         socket = original_tmux.socket if original_tmux else None
         try:
-            create_tmux_window(original_tmux.session, args.name, cwd, original_cmd, socket, env=original_env)
-            tmux_info = TmuxInfo(session=original_tmux.session, window=args.name, socket=socket)
+            window_ids = create_tmux_window(original_tmux.session, args.name, cwd, original_cmd, socket,
+                                            env=original_env, history_limit=original_tmux.history_limit)
+            tmux_info = TmuxInfo(session=original_tmux.session, window=args.name, socket=socket,
+                                 history_limit=original_tmux.history_limit, **window_ids)
         except subprocess.CalledProcessError as e:
             print(f"swarm: error: failed to create tmux window: {e}", file=sys.stderr)
             sys.exit(1)
@@ -5327,8 +9017,10 @@ def cmd_respawn(args) -> None:
         metadata=original_metadata,
     )
 
-    # Add to state
-    state.add_worker(new_worker)
+    # Replace the old worker with the new one in a single state write
+    with state.transaction() as st:
+        st.remove_worker(args.name)
+        st.add_worker(new_worker)
 
     # Print success message
     if tmux_info:
@@ -5533,11 +9225,9 @@ def _rollback_ralph_spawn(
     """
     # Remove ralph state first (last created)
     if ralph_state_created and worker_name:
-        ralph_state_dir = RALPH_DIR / worker_name
         try:
-            import shutil
-            if ralph_state_dir.exists():
-                shutil.rmtree(ralph_state_dir)
+            if has_ralph_state(worker_name):
+                remove_ralph_state(worker_name)
         except OSError as e:
             print(f"swarm: warning: rollback failed: could not remove ralph state: {e}", file=sys.stderr)
 
@@ -5553,9 +9243,10 @@ def _rollback_ralph_spawn(
         try:
             cmd_prefix = tmux_cmd_prefix(tmux_info.socket)
             subprocess.run(
-                cmd_prefix + ["kill-window", "-t", f"{tmux_info.session}:{tmux_info.window}"],
+                cmd_prefix + ["kill-window", "-t", tmux_target(tmux_info.session, tmux_info.pane)],
                 capture_output=True
             )
+            invalidate_status_cache(tmux_info.socket)
         except Exception as e:
             print(f"swarm: warning: rollback failed: could not kill tmux window: {e}", file=sys.stderr)
 
@@ -5627,9 +9318,10 @@ def cmd_ralph_spawn(args) -> None:
                 session = existing_worker.tmux.session
                 cmd_prefix = tmux_cmd_prefix(socket)
                 subprocess.run(
-                    cmd_prefix + ["kill-window", "-t", f"{session}:{existing_worker.tmux.window}"],
+                    cmd_prefix + ["kill-window", "-t", tmux_kill_target(existing_worker.tmux)],
                     capture_output=True
                 )
+                invalidate_status_cache(socket)
 
             # Remove worktree if present
             if existing_worker.worktree:
@@ -5650,11 +9342,9 @@ def cmd_ralph_spawn(args) -> None:
                 pass  # Malformed state, skip monitor cleanup
 
             # Remove ralph state if present
-            ralph_state_dir = RALPH_DIR / args.name
-            if ralph_state_dir.exists():
-                import shutil
+            if has_ralph_state(args.name):
                 try:
-                    shutil.rmtree(ralph_state_dir)
+                    remove_ralph_state(args.name)
                 except OSError as e:
                     print(f"swarm: warning: cannot remove ralph state for '{args.name}': {e}", file=sys.stderr)
 
@@ -5667,8 +9357,8 @@ def cmd_ralph_spawn(args) -> None:
                 save_heartbeat_state(heartbeat_state)
 
             # Remove worker from state
-            state.remove_worker(args.name)
-            state.save()
+            with state.transaction() as st:
+                st.remove_worker(args.name)
 
             print(f"replaced existing worker {args.name}")
         else:
@@ -5677,11 +9367,9 @@ def cmd_ralph_spawn(args) -> None:
 
     # Handle --clean-state flag: clear ralph state without affecting worker/worktree
     if getattr(args, 'clean_state', False):
-        ralph_state_dir = RALPH_DIR / args.name
-        if ralph_state_dir.exists():
-            import shutil
+        if has_ralph_state(args.name):
             try:
-                shutil.rmtree(ralph_state_dir)
+                remove_ralph_state(args.name)
                 print(f"cleared ralph state for {args.name}")
             except OSError as e:
                 print(f"swarm: warning: cannot remove ralph state for '{args.name}': {e}", file=sys.stderr)
@@ -5750,8 +9438,11 @@ def cmd_ralph_spawn(args) -> None:
         # Step 2: Create tmux window
         session = args.session if args.session else get_default_session_name()
         socket = args.tmux_socket
-        create_tmux_window(session, args.name, cwd, cmd, socket, env=env_dict)
-        tmux_info = TmuxInfo(session=session, window=args.name, socket=socket)
+        history_limit = getattr(args, 'history_limit', None)
+        window_ids = create_tmux_window(session, args.name, cwd, cmd, socket, env=env_dict,
+                                        history_limit=history_limit)
+        tmux_info = TmuxInfo(session=session, window=args.name, socket=socket,
+                             history_limit=history_limit, **window_ids)
 
         # Step 3: Add worker to state
         metadata = {
@@ -5803,10 +9494,8 @@ def cmd_ralph_spawn(args) -> None:
 
         # Step 6: Send the prompt to the worker for the first iteration
         prompt_content = Path(args.prompt_file).read_text()
-        baseline_content = send_prompt_to_worker(worker, prompt_content)
-
-        # Record baseline content for done-pattern self-match mitigation
-        ralph_state.prompt_baseline_content = baseline_content
+        # Record where the prompt ends for done-pattern self-match mitigation
+        ralph_state.prompt_baseline = send_prompt_to_worker(worker, prompt_content)
         save_ralph_state(ralph_state)
 
     except subprocess.CalledProcessError as e:
@@ -5840,7 +9529,8 @@ def cmd_ralph_spawn(args) -> None:
     # Wait for agent to be ready if requested
     if args.ready_wait:
         socket = tmux_info.socket if tmux_info else None
-        if not wait_for_agent_ready(tmux_info.session, tmux_info.window, args.ready_timeout, socket):
+        if not wait_for_agent_ready(tmux_info.session, tmux_info.pane, args.ready_timeout, socket,
+                                    profile=agent_profile(cmd), log_path=pane_log_path(args.name)):
             print(f"swarm: warning: agent '{args.name}' did not become ready within {args.ready_timeout}s", file=sys.stderr)
 
     # Determine launch mode
@@ -6067,11 +9757,16 @@ def cmd_ralph_status(args) -> None:
     # Show last 5 terminal lines when possibly stuck (screen unchanged >60s)
     if screen_change_seconds_ago is not None and screen_change_seconds_ago > 60 and worker and worker.tmux:
         try:
-            pane_content = tmux_capture_pane(
-                session=worker.tmux.session,
-                window=worker.tmux.window,
-                socket=worker.tmux.socket,
-            )
+            # The ralph monitor publishes the screen every poll
+            snapshot = read_snapshot(worker)
+            if snapshot is not None:
+                pane_content = snapshot["screen"]
+            else:
+                pane_content = tmux_capture_pane(
+                    session=worker.tmux.session,
+                    window=worker.tmux.pane,
+                    socket=worker.tmux.socket,
+                )
             lines = [l for l in pane_content.rstrip('\n').split('\n') if l.strip()]
             last_lines = lines[-5:] if len(lines) >= 5 else lines
             if last_lines:
@@ -6178,23 +9873,21 @@ def cmd_ralph_list(args) -> None:
     # Load swarm state
     state = State()
 
-    # Find all ralph workers by checking for ralph state files
-    ralph_workers = []
-    if RALPH_DIR.exists():
-        for worker_dir in RALPH_DIR.iterdir():
-            if worker_dir.is_dir():
-                state_file = worker_dir / "state.json"
-                if state_file.exists():
-                    ralph_state = load_ralph_state(worker_dir.name)
-                    if ralph_state:
-                        # Get the worker from swarm state (may not exist)
-                        worker = state.get_worker(ralph_state.worker_name)
-                        ralph_workers.append((ralph_state, worker))
+    # Find all ralph workers, pairing each with its swarm worker (may not exist)
+    ralph_workers = [
+        (ralph_state, state.get_worker(ralph_state.worker_name))
+        for ralph_state in list_ralph_states()
+    ]
 
     # Filter by ralph status if specified
     if args.status != "all":
         ralph_workers = [(rs, w) for rs, w in ralph_workers if rs.status == args.status]
 
+    # Refresh worker status with one tmux call per socket
+    live_workers = [w for _, w in ralph_workers if w]
+    with tmux_status_snapshot():
+        worker_statuses = {w.name: refresh_worker_status(w) for w in live_workers}
+
     # Output based on format
     if args.format == "json":
         # JSON format - include ralph state and worker info
@@ -6202,7 +9895,7 @@ def cmd_ralph_list(args) -> None:
         for ralph_state, worker in ralph_workers:
             entry = ralph_state.to_dict()
             if worker:
-                entry["worker_status"] = refresh_worker_status(worker)
+                entry["worker_status"] = worker_statuses[worker.name]
             else:
                 entry["worker_status"] = "removed"
             output.append(entry)
@@ -6222,7 +9915,7 @@ def cmd_ralph_list(args) -> None:
         for ralph_state, worker in ralph_workers:
             # WORKER_STATUS column
             if worker:
-                worker_status = refresh_worker_status(worker)
+                worker_status = worker_statuses[worker.name]
             else:
                 worker_status = "removed"
 
@@ -6277,28 +9970,30 @@ def cmd_ralph_clean(args) -> None:
         sys.exit(1)
 
     if args.all:
-        # Clean all ralph state directories
-        if not RALPH_DIR.exists():
+        # Clean all ralph state directories, and with the sqlite backend
+        # all ralph state rows
+        worker_names = set()
+        if RALPH_DIR.exists():
+            worker_names.update(d.name for d in RALPH_DIR.iterdir() if d.is_dir())
+        if STATE_BACKEND == "sqlite":
+            worker_names.update(rs.worker_name for rs in list_ralph_states())
+        if not worker_names:
             return
 
         state = State()
         cleaned = False
-        for worker_dir in sorted(RALPH_DIR.iterdir()):
-            if worker_dir.is_dir():
-                worker_name = worker_dir.name
-                # Check if worker is still running
-                worker = state.get_worker(worker_name)
-                if worker and refresh_worker_status(worker) == "running":
-                    print(f"swarm: warning: worker '{worker_name}' is still running (only ralph state removed)", file=sys.stderr)
-                import shutil
-                shutil.rmtree(worker_dir)
-                print(f"cleaned ralph state for {worker_name}")
-                cleaned = True
+        for worker_name in sorted(worker_names):
+            # Check if worker is still running
+            worker = state.get_worker(worker_name)
+            if worker and refresh_worker_status(worker) == "running":
+                print(f"swarm: warning: worker '{worker_name}' is still running (only ralph state removed)", file=sys.stderr)
+            remove_ralph_state(worker_name)
+            print(f"cleaned ralph state for {worker_name}")
+            cleaned = True
         return
 
     # Clean specific worker
-    ralph_state_dir = RALPH_DIR / args.name
-    if not ralph_state_dir.exists():
+    if not has_ralph_state(args.name):
         print(f"swarm: error: no ralph state found for worker '{args.name}'", file=sys.stderr)
         sys.exit(1)
 
@@ -6308,8 +10003,7 @@ def cmd_ralph_clean(args) -> None:
     if worker and refresh_worker_status(worker) == "running":
         print(f"swarm: warning: worker '{args.name}' is still running (only ralph state removed)", file=sys.stderr)
 
-    import shutil
-    shutil.rmtree(ralph_state_dir)
+    remove_ralph_state(args.name)
     print(f"cleaned ralph state for {args.name}")
 
 
@@ -6428,8 +10122,9 @@ def detect_inactivity(
     timeout: int,
     done_pattern: Optional[str] = None,
     check_done_continuous: bool = False,
-    prompt_baseline_content: str = "",
-    ralph_state: Optional["RalphState"] = None
+    prompt_baseline: Optional[PromptBaseline] = None,
+    ralph_state: Optional["RalphState"] = None,
+    capture: Optional[PaneCapture] = None
 ) -> str:
     """Detect if a worker has become inactive using screen-stable detection.
 
@@ -6437,22 +10132,27 @@ def detect_inactivity(
     waits until the screen has not changed for the specified timeout duration.
 
     Algorithm:
-    1. Capture last 20 lines of tmux pane every 2 seconds
+    1. Capture the tmux pane every 2 seconds (incrementally, see PaneCapture)
+       and take the last 20 lines of the screen
     2. Strip ANSI escape codes to normalize content
     3. Hash the normalized content (MD5)
     4. If hash unchanged for timeout seconds, trigger restart
     5. Any screen change resets the timer
-    6. If check_done_continuous, check done pattern each poll cycle
+    6. If check_done_continuous, check done pattern each poll cycle in the
+       output added since the previous one (see DoneScanner)
 
     Args:
         worker: The worker to monitor
         timeout: Seconds of screen stability before restart
         done_pattern: Optional regex pattern to check for completion
         check_done_continuous: If True, check done pattern during monitoring
-        prompt_baseline_content: Pane content snapshot captured after prompt injection.
-            When non-empty, done pattern is only checked against content after this
-            baseline prefix, preventing self-match against the prompt text itself.
+        prompt_baseline: Where the pane content ended after prompt injection.
+            When given, done pattern is only checked against content after
+            it, preventing self-match against the prompt text itself.
         ralph_state: Optional RalphState to update last_screen_change timestamp
+            (written through a RalphStateWriter)
+        capture: Optional PaneCapture of the worker's pane to poll, so the caller
+            can reuse its scrollback afterwards (see check_done_pattern)
 
     Returns:
         String indicating why monitoring ended:
@@ -6504,125 +10204,125 @@ def detect_inactivity(
         """Hash normalized content with MD5."""
         return hashlib.md5(content.encode()).hexdigest()
 
+    # Stuck, fatal and context patterns of the worker's agent CLI
+    profile = agent_profile(worker.cmd)
+
     # Track which stuck patterns have already been warned about this iteration
     warned_stuck_patterns: set = set()
 
     # Track last successfully captured content for window loss done-pattern check
     last_content: Optional[str] = None
 
-    while True:
-        # Check if worker is still running
-        if refresh_worker_status(worker) == "stopped":
-            return "exited"
-
-        try:
-            # Capture current output
-            current_output = tmux_capture_pane(
-                worker.tmux.session,
-                worker.tmux.window,
-                socket=socket
-            )
-            last_content = current_output
+    # Scrollback is only needed for continuous done-pattern checks; each poll
+    # fetches just the lines added since the previous one
+    if capture is None:
+        capture = PaneCapture(
+            worker.tmux.session,
+            worker.tmux.pane,
+            socket=socket,
+            history_lines=PANE_CAPTURE_HISTORY if done_regex else 0
+        )
+    done_scanner = DoneScanner(done_regex, prompt_baseline) if done_regex else None
 
-            # Check done pattern continuously if enabled
-            if done_regex:
-                # Capture with scrollback for done-pattern checking
-                try:
-                    full_output = tmux_capture_pane(
-                        worker.tmux.session,
-                        worker.tmux.window,
-                        history_lines=2000,
-                        socket=socket
-                    )
-                except subprocess.CalledProcessError:
-                    full_output = current_output
+    # Screen changes are written to ralph state at most every few seconds
+    state_writer = RalphStateWriter(ralph_state) if ralph_state is not None else None
 
-                # Strip baseline prefix to avoid self-matching against prompt text
-                if prompt_baseline_content and full_output.startswith(prompt_baseline_content):
-                    check_content = full_output[len(prompt_baseline_content):]
-                else:
-                    # Baseline isn't a prefix (terminal cleared or no baseline) — check full content
-                    check_content = full_output if not prompt_baseline_content else full_output
+    try:
+        while True:
+            # Check if worker is still running (alongside other monitors' checks)
+            with tmux_status_snapshot(shared=True):
+                status = refresh_worker_status(worker)
+            if status == "stopped":
+                return "exited"
 
-                if done_regex.search(check_content):
+            try:
+                # Capture current output and share it with peek, logs and status
+                new_lines, current_output = capture.poll()
+                last_content = current_output
+                publish_snapshot(worker, current_output,
+                                 capture.tail(SNAPSHOT_HISTORY_LINES), capture.history_size)
+
+                # Check done pattern continuously if enabled, in the output added
+                # since the last poll and after the prompt baseline
+                if done_scanner and done_scanner.check(capture, new_lines):
                     return "done_pattern"
 
-            # Normalize and hash the content
-            normalized = normalize_content(current_output)
-            current_hash = hash_content(normalized)
-
-            # Check for stuck patterns (warn once per pattern per iteration)
-            if ralph_state is not None:
-                for stuck_text, stuck_msg in STUCK_PATTERNS.items():
-                    if stuck_text in normalized and stuck_text not in warned_stuck_patterns:
-                        warned_stuck_patterns.add(stuck_text)
-                        log_ralph_iteration(
-                            ralph_state.worker_name, "WARN",
-                            message=f"iteration {ralph_state.current_iteration}: {stuck_msg}"
-                        )
-
-            # Check for fatal patterns (compaction, etc.) — immediate kill required
-            # Use full pane content (ANSI-stripped) instead of normalized (last 20 lines)
-            # because the fatal text may not be in the last 20 visible lines
-            full_clean = ansi_escape.sub('', current_output)
-            if any(p in full_clean for p in FATAL_PATTERNS):
-                return "compaction"
-
-            # Check context percentage if max_context is set
-            if ralph_state is not None and ralph_state.max_context is not None:
-                # Scan last 3 non-empty lines of full pane content for percentage pattern
-                # Use full_clean (not normalized) because normalized only has the last 20 lines,
-                # and in small panes the percentage text may be above that window.
-                # Filter out empty lines since tmux pads panes with trailing blanks.
-                non_empty_lines = [l for l in full_clean.split('\n') if l.strip()]
-                last_3_lines = non_empty_lines[-3:]
-                pct_pattern = re.compile(r'(\d+)%')
-                for line in last_3_lines:
-                    match = pct_pattern.search(line)
-                    if match:
-                        pct = int(match.group(1))
+                # Normalize and hash the content
+                normalized = normalize_content(current_output)
+                current_hash = hash_content(normalized)
+
+                # Stuck, fatal and context patterns in one scan of the screen.
+                # Use full pane content (ANSI-stripped): the fatal text and the
+                # context percentage may be above the last 20 lines
+                full_clean = ansi_escape.sub('', current_output)
+                stuck_found, fatal_found, context_percents = profile.scan_screen(full_clean)
+
+                # Check for stuck patterns (warn once per pattern per iteration)
+                if ralph_state is not None:
+                    for stuck_text, stuck_msg in stuck_found.items():
+                        if stuck_text not in warned_stuck_patterns:
+                            warned_stuck_patterns.add(stuck_text)
+                            log_ralph_iteration(
+                                ralph_state.worker_name, "WARN",
+                                message=f"iteration {ralph_state.current_iteration}: {stuck_msg}"
+                            )
+
+                # Check for fatal patterns (compaction, etc.) — immediate kill required
+                if fatal_found:
+                    return "compaction"
+
+                # Check context percentage if max_context is set
+                if ralph_state is not None and ralph_state.max_context is not None:
+                    # Percentages in the last 3 non-empty lines of the full pane
+                    # (in small panes the percentage text may be above the last
+                    # 20 lines; tmux pads panes with trailing blanks)
+                    for pct in context_percents:
                         kill_threshold = ralph_state.max_context + 15
                         if pct >= kill_threshold:
                             return "context_threshold"
                         if pct >= ralph_state.max_context and not ralph_state.context_nudge_sent:
                             return "context_nudge"
 
-            # Compare hashes
-            if current_hash != last_hash:
-                # Screen changed, reset timer
-                last_hash = current_hash
-                stable_start = None
-                # Track screen change timestamp in ralph state
-                if ralph_state is not None:
-                    ralph_state.last_screen_change = datetime.now(timezone.utc).isoformat()
-                    save_ralph_state(ralph_state)
-            else:
-                # Screen unchanged
-                if stable_start is None:
-                    stable_start = time.time()
-                elif (time.time() - stable_start) >= timeout:
-                    return "inactive"
-
-        except subprocess.CalledProcessError:
-            # Window might have closed — check done pattern against last content
-            if done_regex_for_window_loss and last_content is not None:
-                if prompt_baseline_content and last_content.startswith(prompt_baseline_content):
-                    check_content = last_content[len(prompt_baseline_content):]
+                # Compare hashes
+                if current_hash != last_hash:
+                    # Screen changed, reset timer
+                    last_hash = current_hash
+                    stable_start = None
+                    # Track screen change timestamp in ralph state
+                    if state_writer is not None:
+                        state_writer.screen_changed()
                 else:
-                    check_content = last_content
-                if done_regex_for_window_loss.search(check_content):
-                    return "done"
-            return "exited"
+                    # Screen unchanged
+                    if stable_start is None:
+                        stable_start = time.time()
+                    elif (time.time() - stable_start) >= timeout:
+                        return "inactive"
 
-        time.sleep(2)
+            except subprocess.CalledProcessError:
+                # Window might have closed — check done pattern against last content
+                if done_regex_for_window_loss and last_content is not None:
+                    check_content = last_content
+                    if prompt_baseline:
+                        # last_content is the screen, which follows the scrollback
+                        check_content = last_content[prompt_baseline.end_in(last_content, capture.history_size):]
+                    if done_regex_for_window_loss.search(check_content):
+                        return "done"
+                return "exited"
+
+            time.sleep(2)
+    finally:
+        if state_writer is not None:
+            state_writer.flush()
 
 
-def check_done_pattern(worker: Worker, pattern: str) -> bool:
+def check_done_pattern(worker: Worker, pattern: str, capture: Optional[PaneCapture] = None) -> bool:
     """Check if output matches done pattern.
 
     Args:
         worker: The worker to check
         pattern: Regex pattern to match
+        capture: Optional PaneCapture of the worker's pane (e.g. the one
+            detect_inactivity polled); only output since its last poll is fetched
 
     Returns:
         True if pattern matched in output, False otherwise
@@ -6635,9 +10335,12 @@ def check_done_pattern(worker: Worker, pattern: str) -> bool:
     socket = worker.tmux.socket
 
     try:
+        if capture is not None:
+            capture.poll()
+            return bool(re.search(pattern, capture.content(history_lines=1000)))
         output = tmux_capture_pane(
             worker.tmux.session,
-            worker.tmux.window,
+            worker.tmux.pane,
             history_lines=1000,  # Include scrollback
             socket=socket
         )
@@ -6678,11 +10381,11 @@ def kill_worker_for_ralph(worker: Worker, state: State) -> None:
     """
     if worker.tmux:
         socket = worker.tmux.socket
-        cmd_prefix = tmux_cmd_prefix(socket)
-        subprocess.run(
-            cmd_prefix + ["kill-window", "-t", f"{worker.tmux.session}:{worker.tmux.window}"],
+        run_tmux(
+            ["kill-window", "-t", tmux_kill_target(worker.tmux)], socket,
             capture_output=True
         )
+        invalidate_status_cache(socket)
 
 
 def spawn_worker_for_ralph(
@@ -6694,7 +10397,8 @@ def spawn_worker_for_ralph(
     session: str,
     socket: Optional[str],
     worktree_info: Optional[WorktreeInfo],
-    metadata: dict
+    metadata: dict,
+    history_limit: Optional[int] = None
 ) -> Worker:
     """Spawn a worker for a ralph loop iteration.
 
@@ -6710,13 +10414,15 @@ def spawn_worker_for_ralph(
         socket: Optional tmux socket
         worktree_info: Optional worktree info
         metadata: Worker metadata
+        history_limit: Scrollback lines for the pane (None: tmux's default)
 
     Returns:
         The created Worker object
     """
     # Create tmux window
-    create_tmux_window(session, name, cwd, cmd, socket, env=env)
-    tmux_info = TmuxInfo(session=session, window=name, socket=socket)
+    window_ids = create_tmux_window(session, name, cwd, cmd, socket, env=env, history_limit=history_limit)
+    tmux_info = TmuxInfo(session=session, window=name, socket=socket, history_limit=history_limit,
+                         **window_ids)
 
     # Create worker object
     worker = Worker(
@@ -6736,7 +10442,7 @@ def spawn_worker_for_ralph(
     return worker
 
 
-def send_prompt_to_worker(worker: Worker, prompt_content: str) -> str:
+def send_prompt_to_worker(worker: Worker, prompt_content: str) -> Optional[PromptBaseline]:
     """Send prompt content to a worker.
 
     Args:
@@ -6744,27 +10450,29 @@ def send_prompt_to_worker(worker: Worker, prompt_content: str) -> str:
         prompt_content: The prompt content to send
 
     Returns:
-        Pane content snapshot (with scrollback) after sending the prompt,
-        used as baseline for done-pattern filtering. Returns "" if the
-        worker has no tmux info or capture fails.
+        Where the pane content (with scrollback) ended after sending the
+        prompt, used as baseline for done-pattern filtering. Returns None
+        if the worker has no tmux info, the pane is blank or capture fails.
     """
     if not worker.tmux:
-        return ""
+        return None
 
     socket = worker.tmux.socket
 
     # Wait briefly for agent to be ready
     wait_for_agent_ready(
         worker.tmux.session,
-        worker.tmux.window,
+        worker.tmux.pane,
         timeout=30,
-        socket=socket
+        socket=socket,
+        profile=agent_profile(worker.cmd),
+        log_path=pane_log_path(worker.name)
     )
 
     # Send the prompt content
     tmux_send(
         worker.tmux.session,
-        worker.tmux.window,
+        worker.tmux.pane,
         prompt_content,
         enter=True,
         socket=socket,
@@ -6772,16 +10480,12 @@ def send_prompt_to_worker(worker: Worker, prompt_content: str) -> str:
     )
 
     # Capture pane content (with scrollback) after prompt injection for done-pattern baseline
+    capture = PaneCapture(worker.tmux.session, worker.tmux.pane, socket=socket)
     try:
-        pane_content = tmux_capture_pane(
-            worker.tmux.session,
-            worker.tmux.window,
-            history_lines=2000,
-            socket=socket
-        )
-        return pane_content
+        capture.poll()
     except subprocess.CalledProcessError:
-        return ""
+        return None
+    return PromptBaseline.from_content(capture.content(), capture.first_line())
 
 
 def cmd_ralph_run(args) -> None:
@@ -6879,7 +10583,9 @@ def _run_ralph_loop(args) -> None:
 
     # Main ralph loop - wrapped in try/finally to detect monitor disconnect (B5)
     try:
-        _run_ralph_loop_inner(args, original_cmd, original_cwd, original_env, original_tags, session, socket, original_worktree)
+        with tmux_control_pool():
+            _run_ralph_loop_inner(args, original_cmd, original_cwd, original_env, original_tags, session, socket, original_worktree,
+                                  original_tmux.history_limit)
     finally:
         # B5: Check for monitor disconnect - if we're exiting but worker is still running
         _check_monitor_disconnect(args.name)
@@ -6944,28 +10650,27 @@ def _run_preflight_check(worker_name: str) -> None:
     try:
         preflight_output = tmux_capture_pane(
             worker.tmux.session,
-            worker.tmux.window,
+            worker.tmux.pane,
             history_lines=100,
             socket=worker.tmux.socket
         )
         preflight_clean = re.sub(r'\x1b\[[0-9;]*m', '', preflight_output)
-        for stuck_text, stuck_msg in STUCK_PATTERNS.items():
-            if stuck_text in preflight_clean:
-                log_ralph_iteration(
-                    ralph_state.worker_name, "ERROR",
-                    message=f"iteration 1: pre-flight check failed — {stuck_msg}"
-                )
-                print(
-                    f"swarm: error: pre-flight check failed — {stuck_msg}\n"
-                    f"  fix: resolve the issue and re-run ralph spawn",
-                    file=sys.stderr
-                )
-                kill_worker_for_ralph(worker, state)
-                state.remove_worker(worker_name)
-                ralph_state.status = "failed"
-                ralph_state.exit_reason = "preflight_failed"
-                save_ralph_state(ralph_state)
-                sys.exit(1)
+        for stuck_msg in agent_profile(worker.cmd).stuck_matches(preflight_clean).values():
+            log_ralph_iteration(
+                ralph_state.worker_name, "ERROR",
+                message=f"iteration 1: pre-flight check failed — {stuck_msg}"
+            )
+            print(
+                f"swarm: error: pre-flight check failed — {stuck_msg}\n"
+                f"  fix: resolve the issue and re-run ralph spawn",
+                file=sys.stderr
+            )
+            kill_worker_for_ralph(worker, state)
+            state.remove_worker(worker_name)
+            ralph_state.status = "failed"
+            ralph_state.exit_reason = "preflight_failed"
+            save_ralph_state(ralph_state)
+            sys.exit(1)
     except subprocess.CalledProcessError:
         pass  # tmux capture failed, skip pre-flight
 
@@ -6978,7 +10683,8 @@ def _run_ralph_loop_inner(
     original_tags: list[str],
     session: str,
     socket: Optional[str],
-    original_worktree: Optional[WorktreeInfo]
+    original_worktree: Optional[WorktreeInfo],
+    history_limit: Optional[int] = None
 ) -> None:
     """Inner implementation of the ralph loop.
 
@@ -6994,6 +10700,7 @@ def _run_ralph_loop_inner(
         session: Tmux session name
         socket: Tmux socket path
         original_worktree: Original worktree info
+        history_limit: Scrollback lines for each iteration's pane
     """
     import re
 
@@ -7064,10 +10771,6 @@ def _run_ralph_loop_inner(
                 max_iterations=ralph_state.max_iterations
             )
 
-            # Remove old worker from state if it exists
-            if worker:
-                state.remove_worker(args.name)
-
             # Build metadata
             metadata = {
                 "ralph": True,
@@ -7085,16 +10788,18 @@ def _run_ralph_loop_inner(
                     session=session,
                     socket=socket,
                     worktree_info=original_worktree,
-                    metadata=metadata
+                    metadata=metadata,
+                    history_limit=history_limit
                 )
+                # Replace the previous iteration's worker in a single state write
                 state = State()
-                state.add_worker(worker)
+                with state.transaction() as st:
+                    st.remove_worker(args.name)
+                    st.add_worker(worker)
 
                 # Send prompt to the worker
-                baseline_content = send_prompt_to_worker(worker, prompt_content)
-
-                # Record baseline content for done-pattern self-match mitigation
-                ralph_state.prompt_baseline_content = baseline_content
+                # Record where the prompt ends for done-pattern self-match mitigation
+                ralph_state.prompt_baseline = send_prompt_to_worker(worker, prompt_content)
                 save_ralph_state(ralph_state)
 
             except Exception as e:
@@ -7125,14 +10830,24 @@ def _run_ralph_loop_inner(
                 continue
 
         # Monitor the worker - detect_inactivity blocks until worker exits, goes inactive,
-        # or done pattern matches (if check_done_continuous)
+        # or done pattern matches (if check_done_continuous). Its incremental pane
+        # capture keeps scrollback for the done-pattern check after it.
+        capture = None
+        if worker.tmux:
+            capture = PaneCapture(
+                worker.tmux.session,
+                worker.tmux.pane,
+                socket=worker.tmux.socket,
+                history_lines=PANE_CAPTURE_HISTORY if ralph_state.done_pattern else 0
+            )
         monitor_result = detect_inactivity(
             worker,
             ralph_state.inactivity_timeout,
             done_pattern=ralph_state.done_pattern,
             check_done_continuous=ralph_state.check_done_continuous,
-            prompt_baseline_content=ralph_state.prompt_baseline_content,
-            ralph_state=ralph_state
+            prompt_baseline=ralph_state.prompt_baseline,
+            ralph_state=ralph_state,
+            capture=capture
         )
 
         # Reload ralph state (could have been paused while monitoring)
@@ -7189,7 +10904,7 @@ def _run_ralph_loop_inner(
             if worker and worker.tmux:
                 tmux_send(
                     worker.tmux.session,
-                    worker.tmux.window,
+                    worker.tmux.pane,
                     nudge_text,
                     enter=True,
                     socket=worker.tmux.socket,
@@ -7267,7 +10982,7 @@ def _run_ralph_loop_inner(
 
             # Check for done pattern (after exit, non-continuous mode)
             if ralph_state.done_pattern and worker and not ralph_state.check_done_continuous:
-                if check_done_pattern(worker, ralph_state.done_pattern):
+                if check_done_pattern(worker, ralph_state.done_pattern, capture=capture):
                     print(f"[ralph] {args.name}: done pattern matched, stopping loop")
                     log_ralph_iteration(
                         args.name,
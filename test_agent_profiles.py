@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Tests for agent profiles.
+
+An AgentProfile holds the ready, not-ready, stuck, fatal and context
+patterns of one agent CLI; stuck, fatal and context patterns are found
+in one pass over the screen.
+agent_profile() picks the profile from the worker's cmd[0]; user profiles
+come from ~/.swarm/profiles.json.
+
+Test coverage:
+- Built-in profile selection, including env wrappers and unknown commands
+- readiness(), stuck_matches() and scan_screen()
+- User-defined profiles, overrides of built-in ones and invalid files
+- wait_for_agent_ready() and detect_inactivity() use the worker's profile
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+
+
+class ProfilesTestCase(unittest.TestCase):
+    """Base class: isolated PROFILES_FILE."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.profiles_file = self.temp_dir / "profiles.json"
+        self.patcher = patch.object(swarm, 'PROFILES_FILE', self.profiles_file)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        swarm._agent_profiles_cache.clear()
+        shutil.rmtree(self.temp_dir)
+
+    def write_profiles(self, profiles) -> None:
+        self.profiles_file.write_text(json.dumps(profiles))
+
+
+class TestBuiltinProfiles(ProfilesTestCase):
+    """Built-in profiles and their patterns."""
+
+    def test_selected_by_command(self):
+        self.assertEqual(swarm.agent_profile(["claude", "--verbose"]).name, "claude")
+        self.assertEqual(swarm.agent_profile(["/usr/local/bin/opencode"]).name, "opencode")
+        self.assertEqual(swarm.agent_profile(["bash"]).name, "shell")
+        self.assertEqual(swarm.agent_profile(["env", "A=1", "B=2", "claude"]).name, "claude")
+
+    def test_unknown_command_gets_default(self):
+        self.assertEqual(swarm.agent_profile(["./sandbox.sh", "claude"]).name, "default")
+        self.assertEqual(swarm.agent_profile([]).name, "default")
+        self.assertEqual(swarm.agent_profile(["bash", "-c", "sleep 1; claude"]).name, "default")
+
+    def test_readiness(self):
+        claude = swarm.agent_profile(["claude"])
+
+        self.assertTrue(claude.readiness("Claude Code v2.1.4\n> Try something"))
+        self.assertIsNone(claude.readiness("Loading...\necho > file"))
+        self.assertIsNone(claude.readiness(""))
+        # A blocking prompt wins even after a ready pattern
+        self.assertFalse(claude.readiness("> \nChoose the text style"))
+
+    def test_patterns_do_not_span_lines(self):
+        default = swarm.agent_profile(["sandbox.sh"])
+
+        for capture in [">\n", "Loading\n>\nmore", "$\n", ">>>\n", "❯\n",
+                        "bypass\npermissions", "Claude\nCode v2", "opencode\nv1"]:
+            with self.subTest(capture=capture):
+                self.assertIsNone(default.readiness(capture))
+        self.assertTrue(default.readiness("bypass \t permissions on"))
+
+    def test_profiles_only_know_their_own_patterns(self):
+        self.assertIsNone(swarm.agent_profile(["bash"]).readiness("bypass permissions on"))
+        self.assertIsNone(swarm.agent_profile(["claude"]).readiness("opencode v1.0.115"))
+        self.assertTrue(swarm.agent_profile(["sandbox.sh"]).readiness("opencode v1.0.115"))
+
+    def test_stuck_matches(self):
+        claude = swarm.agent_profile(["claude"])
+
+        found = claude.stuck_matches("Paste code here\n...\nSelect login method")
+
+        self.assertEqual(list(found), ["Select login method", "Paste code here"])
+        self.assertEqual(found["Paste code here"], swarm.STUCK_PATTERNS["Paste code here"])
+        self.assertEqual(claude.stuck_matches("all good"), {})
+        self.assertEqual(swarm.agent_profile(["opencode"]).stuck_matches("Select login method"), {})
+
+    def test_scan_screen(self):
+        claude = swarm.agent_profile(["claude"])
+        screen = "Select login method\n" + "x\n" * 20 + "Compacting conversation\n42% used\n\n"
+
+        stuck, fatal, percents = claude.scan_screen(screen)
+
+        # The stuck text is above the last 20 lines
+        self.assertEqual(stuck, {})
+        self.assertTrue(fatal)
+        self.assertEqual(percents, [42])
+        self.assertEqual(claude.scan_screen("Paste code here\n1% 2%\n3%"),
+                         ({"Paste code here": swarm.STUCK_PATTERNS["Paste code here"]}, False, [1, 3]))
+        self.assertEqual(swarm.agent_profile(["bash"]).scan_screen("Compacting conversation"),
+                         ({}, False, []))
+
+
+class TestUserProfiles(ProfilesTestCase):
+    """Profiles from PROFILES_FILE."""
+
+    def test_new_profile(self):
+        self.write_profiles({"aider": {"commands": ["aider"], "ready": [r"^aider> "],
+                                       "context": r"tokens: (\d+)%"}})
+
+        profile = swarm.agent_profile(["aider", "--model", "x"])
+
+        self.assertEqual(profile.name, "aider")
+        self.assertTrue(profile.readiness("aider> "))
+        self.assertIsNone(profile.readiness("> "))
+        self.assertEqual(profile.scan_screen("tokens: 7% of 200k")[2], [7])
+        self.assertEqual(profile.stuck_matches("Select login method"), {})
+
+    def test_override_builtin(self):
+        self.write_profiles({"claude": {"ready": ["READY"]}})
+
+        profile = swarm.agent_profile(["claude"])
+
+        self.assertTrue(profile.readiness("READY"))
+        self.assertIsNone(profile.readiness("bypass permissions on"))
+        # Fields not given keep the built-in values
+        self.assertTrue(profile.scan_screen("Compacting conversation")[1])
+
+    def test_user_profile_takes_command(self):
+        self.write_profiles({"wrapped": {"commands": ["claude"], "ready": ["OK"]}})
+
+        self.assertEqual(swarm.agent_profile(["claude"]).name, "wrapped")
+
+    def test_reloaded_when_file_changes(self):
+        self.write_profiles({"a": {"commands": ["agent"]}})
+        self.assertEqual(swarm.agent_profile(["agent"]).name, "a")
+
+        self.write_profiles({"b": {"commands": ["agent"]}})
+        os.utime(self.profiles_file, ns=(1, 1))
+        self.assertEqual(swarm.agent_profile(["agent"]).name, "b")
+
+    def test_invalid_files(self):
+        for content in ("{not json", json.dumps(["x"]), json.dumps({"x": {"ready": ["("]}}),
+                        json.dumps({"x": {"unknown": 1}})):
+            self.profiles_file.write_text(content)
+            swarm._agent_profiles_cache.clear()
+            with patch('sys.stderr', new_callable=io.StringIO) as stderr, \
+                 self.assertRaises(SystemExit) as ctx:
+                swarm.agent_profile(["claude"])
+            self.assertEqual(ctx.exception.code, 1)
+            self.assertIn("swarm: error: invalid agent profiles in", stderr.getvalue())
+
+
+class TestProfileUse(ProfilesTestCase):
+    """Readiness and monitoring use the worker's profile."""
+
+    def test_wait_for_agent_ready_with_profile(self):
+        shell = swarm.agent_profile(["bash"])
+
+        with patch('swarm.tmux_capture_pane', return_value="bypass permissions on"), \
+             patch('time.sleep'):
+            self.assertFalse(swarm.wait_for_agent_ready("s", "w", timeout=0.05, profile=shell))
+            self.assertTrue(swarm.wait_for_agent_ready("s", "w", timeout=0.05))
+
+    def test_monitor_uses_worker_profile(self):
+        worker = swarm.Worker(
+            name='w', status='running', cmd=['opencode'], started='2026-01-01T00:00:00',
+            cwd='/tmp', tmux=swarm.TmuxInfo(session='s', window='w'),
+        )
+
+        with patch('swarm.refresh_worker_status', return_value='running'), \
+             patch('swarm.tmux_capture_pane', return_value="Compacting conversation"), \
+             patch('swarm.publish_snapshot'), \
+             patch('time.time', side_effect=[0, 2]), \
+             patch('time.sleep'):
+            self.assertEqual(swarm.detect_inactivity(worker, timeout=1), "inactive")
+
+        worker.cmd = ['claude']
+        with patch('swarm.refresh_worker_status', return_value='running'), \
+             patch('swarm.tmux_capture_pane', return_value="Compacting conversation"), \
+             patch('swarm.publish_snapshot'), \
+             patch('time.sleep'):
+            self.assertEqual(swarm.detect_inactivity(worker, timeout=1), "compaction")
+
+
+if __name__ == "__main__":
+    unittest.main()
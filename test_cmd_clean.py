@@ -233,6 +233,41 @@ class TestCmdClean(unittest.TestCase):
         # Verify print was called for each cleaned worker
         self.assertEqual(mock_print.call_count, 2)
 
+    def test_clean_all_writes_state_once(self):
+        """Test cleaning many stopped workers does a single state write."""
+        state = swarm.State()
+        state.workers = [
+            swarm.Worker(name=f"dead-{i}", status="stopped", cmd=["echo"],
+                         started="2024-01-01T00:00:00", cwd="/tmp")
+            for i in range(500)
+        ]
+        state.workers.append(swarm.Worker(
+            name="alive", status="running", cmd=["echo"],
+            started="2024-01-01T00:00:00", cwd="/tmp", pid=12345))
+        state.save()
+
+        args = Mock()
+        args.name = None
+        args.all = True
+        args.rm_worktree = False
+
+        writes = []
+        original_replace = os.replace
+
+        def track_replace(src, dst):
+            if Path(dst) == swarm.STATE_FILE:
+                writes.append(dst)
+            return original_replace(src, dst)
+
+        with patch('swarm.refresh_worker_status',
+                   side_effect=lambda w: "running" if w.name == "alive" else "stopped"), \
+             patch('os.replace', side_effect=track_replace), \
+             patch('builtins.print'):
+            swarm.cmd_clean(args)
+
+        self.assertEqual(len(writes), 1)
+        self.assertEqual([w.name for w in swarm.State().workers], ["alive"])
+
     def test_clean_worker_becomes_running_during_refresh(self):
         """Test skipping worker that becomes running during refresh."""
         state = swarm.State()
@@ -1097,6 +1097,7 @@ class TestRunHeartbeatMonitor(unittest.TestCase):
         mock_worker = MagicMock()
         mock_worker.tmux.session = 'session'
         mock_worker.tmux.window = 'window'
+        mock_worker.tmux.pane = 'window'
         mock_worker.tmux.socket = None
         mock_state = MagicMock()
         mock_state.get_worker.return_value = mock_worker
@@ -1145,6 +1146,7 @@ class TestRunHeartbeatMonitor(unittest.TestCase):
         mock_worker = MagicMock()
         mock_worker.tmux.session = 'session'
         mock_worker.tmux.window = 'window'
+        mock_worker.tmux.pane = 'window'
         mock_worker.tmux.socket = None
         mock_state = MagicMock()
         mock_state.get_worker.return_value = mock_worker
@@ -1194,6 +1196,7 @@ class TestRunHeartbeatMonitor(unittest.TestCase):
         mock_worker = MagicMock()
         mock_worker.tmux.session = 'session'
         mock_worker.tmux.window = 'window'
+        mock_worker.tmux.pane = 'window'
         mock_worker.tmux.socket = None
         mock_state = MagicMock()
         mock_state.get_worker.return_value = mock_worker
@@ -1246,6 +1249,7 @@ class TestRunHeartbeatMonitor(unittest.TestCase):
         mock_worker = MagicMock()
         mock_worker.tmux.session = 'session'
         mock_worker.tmux.window = 'window'
+        mock_worker.tmux.pane = 'window'
         mock_worker.tmux.socket = None
         mock_state = MagicMock()
         mock_state.get_worker.return_value = mock_worker
@@ -1325,6 +1329,7 @@ class TestMonitorBeatCountAndLastBeatAt(unittest.TestCase):
         mock_worker = MagicMock()
         mock_worker.tmux.session = 'session'
         mock_worker.tmux.window = 'window'
+        mock_worker.tmux.pane = 'window'
         mock_worker.tmux.socket = None
         mock_state = MagicMock()
         mock_state.get_worker.return_value = mock_worker
@@ -1371,6 +1376,7 @@ class TestMonitorBeatCountAndLastBeatAt(unittest.TestCase):
         mock_worker = MagicMock()
         mock_worker.tmux.session = 'session'
         mock_worker.tmux.window = 'window'
+        mock_worker.tmux.pane = 'window'
         mock_worker.tmux.socket = None
         mock_state = MagicMock()
         mock_state.get_worker.return_value = mock_worker
@@ -1415,6 +1421,7 @@ class TestMonitorBeatCountAndLastBeatAt(unittest.TestCase):
         mock_worker = MagicMock()
         mock_worker.tmux.session = 'session'
         mock_worker.tmux.window = 'window'
+        mock_worker.tmux.pane = 'window'
         mock_worker.tmux.socket = None
         mock_state = MagicMock()
         mock_state.get_worker.return_value = mock_worker
@@ -50,6 +50,7 @@ class TestCmdLogsTmuxWorker(unittest.TestCase):
             patch.object(swarm, 'SWARM_DIR', Path(self.tmpdir)),
             patch.object(swarm, 'STATE_FILE', self.state_file),
             patch.object(swarm, 'LOGS_DIR', self.logs_dir),
+            patch.object(swarm, 'SNAPSHOTS_DIR', Path(self.tmpdir) / "snapshots"),
         ]
         for p in self.patches:
             p.start()
@@ -156,6 +157,7 @@ class TestCmdLogsPidWorker(unittest.TestCase):
             patch.object(swarm, 'SWARM_DIR', Path(self.tmpdir)),
             patch.object(swarm, 'STATE_FILE', self.state_file),
             patch.object(swarm, 'LOGS_DIR', self.logs_dir),
+            patch.object(swarm, 'SNAPSHOTS_DIR', Path(self.tmpdir) / "snapshots"),
         ]
         for p in self.patches:
             p.start()
@@ -73,11 +73,13 @@ def create_parser():
     send_p.add_argument("text")
     send_p.add_argument("--no-enter", action="store_true")
     send_p.add_argument("--all", action="store_true")
+    send_p.add_argument("--parallel", type=swarm.positive_int, default=swarm.DEFAULT_PARALLEL)
 
     # interrupt
     int_p = subparsers.add_parser("interrupt", help="Send Ctrl-C to worker")
     int_p.add_argument("name", nargs="?")
     int_p.add_argument("--all", action="store_true")
+    int_p.add_argument("--parallel", type=swarm.positive_int, default=swarm.DEFAULT_PARALLEL)
 
     # eof
     eof_p = subparsers.add_parser("eof", help="Send Ctrl-D to worker")
@@ -100,6 +102,7 @@ def create_parser():
     kill_p.add_argument("--rm-worktree", action="store_true")
     kill_p.add_argument("--force-dirty", action="store_true")
     kill_p.add_argument("--all", action="store_true")
+    kill_p.add_argument("--parallel", type=swarm.positive_int, default=swarm.DEFAULT_PARALLEL)
 
     # wait
     wait_p = subparsers.add_parser("wait", help="Wait for worker to finish")
@@ -431,6 +434,19 @@ class TestSendArgParsing(unittest.TestCase):
         self.assertEqual(args.text, "broadcast message")
         self.assertIsNone(args.name)
 
+    def test_send_parallel(self):
+        """Test send --parallel defaults and accepts a worker count."""
+        args = self.parser.parse_args(["send", "--all", "hi"])
+        self.assertEqual(args.parallel, swarm.DEFAULT_PARALLEL)
+        args = self.parser.parse_args(["send", "--all", "--parallel", "4", "hi"])
+        self.assertEqual(args.parallel, 4)
+
+    def test_send_parallel_must_be_positive(self):
+        """Test send --parallel rejects 0."""
+        with self.assertRaises(SystemExit):
+            with redirect_stderr(io.StringIO()):
+                self.parser.parse_args(["send", "--all", "--parallel", "0", "hi"])
+
 
 class TestInterruptArgParsing(unittest.TestCase):
     """Test interrupt command argument parsing."""
@@ -554,6 +570,11 @@ class TestKillArgParsing(unittest.TestCase):
         self.assertTrue(args.all)
         self.assertIsNone(args.name)
 
+    def test_kill_all_parallel(self):
+        """Test kill --all --parallel."""
+        args = self.parser.parse_args(["kill", "--all", "--parallel", "100"])
+        self.assertEqual(args.parallel, 100)
+
 
 class TestWaitArgParsing(unittest.TestCase):
     """Test wait command argument parsing."""
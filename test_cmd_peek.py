@@ -3,6 +3,7 @@
 
 import json
 import os
+import shutil
 import sys
 import tempfile
 import unittest
@@ -12,6 +13,7 @@ from io import StringIO
 
 # Import from swarm
 import swarm
+from tmux_test_helpers import TmuxServerTestCase, skip_if_no_tmux
 
 
 class TestCmdPeek(unittest.TestCase):
@@ -30,11 +32,13 @@ class TestCmdPeek(unittest.TestCase):
         self.state_file_patch = patch.object(swarm, 'STATE_FILE', self.state_file)
         self.state_lock_file_patch = patch.object(swarm, 'STATE_LOCK_FILE', Path(self.temp_dir) / "state.lock")
         self.logs_dir_patch = patch.object(swarm, 'LOGS_DIR', self.logs_dir)
+        self.snapshots_dir_patch = patch.object(swarm, 'SNAPSHOTS_DIR', Path(self.temp_dir) / "snapshots")
 
         self.swarm_dir_patch.start()
         self.state_file_patch.start()
         self.state_lock_file_patch.start()
         self.logs_dir_patch.start()
+        self.snapshots_dir_patch.start()
 
     def tearDown(self):
         """Clean up test fixtures."""
@@ -42,6 +46,7 @@ class TestCmdPeek(unittest.TestCase):
         self.state_file_patch.stop()
         self.state_lock_file_patch.stop()
         self.logs_dir_patch.stop()
+        self.snapshots_dir_patch.stop()
 
     def create_test_state(self, workers):
         """Helper to create test state file."""
@@ -65,6 +70,7 @@ class TestCmdPeek(unittest.TestCase):
         args.name = "dev"
         args.lines = 30
         args.all = False
+        args.since_last = False
 
         with patch.object(swarm, 'tmux_window_exists', return_value=True), \
              patch.object(swarm, 'tmux_capture_pane', return_value="hello world\n") as mock_capture, \
@@ -103,6 +109,8 @@ class TestCmdPeek(unittest.TestCase):
         args.name = None
         args.lines = 30
         args.all = True
+        args.since_last = False
+        args.parallel = swarm.DEFAULT_PARALLEL
 
         def capture_side_effect(session, window, history_lines=0, socket=None):
             return f"output from {window}\n"
@@ -137,6 +145,8 @@ class TestCmdPeek(unittest.TestCase):
         args.name = None
         args.lines = 100
         args.all = True
+        args.since_last = False
+        args.parallel = swarm.DEFAULT_PARALLEL
 
         with patch.object(swarm, 'tmux_window_exists', return_value=True), \
              patch.object(swarm, 'tmux_capture_pane', return_value="content\n") as mock_capture, \
@@ -156,6 +166,7 @@ class TestCmdPeek(unittest.TestCase):
         args.name = "ghost"
         args.lines = 30
         args.all = False
+        args.since_last = False
 
         with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
             with self.assertRaises(SystemExit) as cm:
@@ -179,6 +190,7 @@ class TestCmdPeek(unittest.TestCase):
         args.name = "bg-job"
         args.lines = 30
         args.all = False
+        args.since_last = False
 
         with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
             with self.assertRaises(SystemExit) as cm:
@@ -202,6 +214,7 @@ class TestCmdPeek(unittest.TestCase):
         args.name = "old"
         args.lines = 30
         args.all = False
+        args.since_last = False
 
         with patch.object(swarm, 'tmux_window_exists', return_value=False), \
              patch('sys.stderr', new_callable=StringIO) as mock_stderr:
@@ -227,6 +240,7 @@ class TestCmdPeek(unittest.TestCase):
         args.name = "dev"
         args.lines = 30
         args.all = False
+        args.since_last = False
 
         with patch.object(swarm, 'tmux_window_exists', return_value=True), \
              patch.object(swarm, 'tmux_capture_pane', side_effect=Exception("tmux error")), \
@@ -254,6 +268,7 @@ class TestCmdPeek(unittest.TestCase):
         args.name = "dev"
         args.lines = 30
         args.all = False
+        args.since_last = False
 
         with patch.object(swarm, 'tmux_window_exists', return_value=True), \
              patch.object(swarm, 'tmux_capture_pane', return_value=""), \
@@ -281,6 +296,8 @@ class TestCmdPeek(unittest.TestCase):
         args.name = None
         args.lines = 30
         args.all = True
+        args.since_last = False
+        args.parallel = swarm.DEFAULT_PARALLEL
 
         with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
             with self.assertRaises(SystemExit) as cm:
@@ -314,8 +331,10 @@ class TestCmdPeek(unittest.TestCase):
         args.name = None
         args.lines = 30
         args.all = True
+        args.since_last = False
+        args.parallel = swarm.DEFAULT_PARALLEL
 
-        def exists_side_effect(session, window, socket=None):
+        def exists_side_effect(session, window, socket=None, pane_id=None):
             return window == "alive"
 
         with patch.object(swarm, 'tmux_window_exists', side_effect=exists_side_effect), \
@@ -346,6 +365,7 @@ class TestCmdPeek(unittest.TestCase):
         args.name = "dev"
         args.lines = 30
         args.all = False
+        args.since_last = False
 
         with patch.object(swarm, 'tmux_window_exists', return_value=True) as mock_exists, \
              patch.object(swarm, 'tmux_capture_pane', return_value="content\n") as mock_capture, \
@@ -355,9 +375,141 @@ class TestCmdPeek(unittest.TestCase):
                 swarm.cmd_peek(args)
             self.assertEqual(cm.exception.code, 0)
 
-            mock_exists.assert_called_once_with("swarm", "dev", socket="my-socket")
+            mock_exists.assert_called_once_with("swarm", "dev", socket="my-socket", pane_id=None)
             mock_capture.assert_called_once_with("swarm", "dev", history_lines=30, socket="my-socket")
 
 
+
+class TestPeekSinceLast(unittest.TestCase):
+    """Test peek --since-last cursors."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.patches = [
+            patch.object(swarm, 'SWARM_DIR', self.temp_dir),
+            patch.object(swarm, 'STATE_FILE', self.temp_dir / "state.json"),
+            patch.object(swarm, 'STATE_LOCK_FILE', self.temp_dir / "state.lock"),
+            patch.object(swarm, 'PEEK_CURSORS_DIR', self.temp_dir / "peek"),
+            patch.object(swarm, 'SNAPSHOTS_DIR', self.temp_dir / "snapshots"),
+        ]
+        for p in self.patches:
+            p.start()
+        self.worker = swarm.Worker(
+            name="dev", status="running", cmd=["claude"], started="2026-01-10T12:00:00",
+            cwd="/tmp", tmux=swarm.TmuxInfo(session="swarm", window="dev"))
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def peek(self, history_size, history, screen):
+        new_lines, cursor = swarm.peek_since_last(self.worker, history_size, history, screen)
+        swarm.save_peek_cursor(self.worker.name, cursor)
+        return new_lines
+
+    def test_first_peek_shows_everything(self):
+        self.assertEqual(self.peek(2, ["h1", "h2"], ["a", "b", "", ""]), ["h1", "h2", "a", "b"])
+        self.assertTrue((self.temp_dir / "peek" / "dev.json").exists())
+
+    def test_unchanged_screen_shows_nothing(self):
+        self.peek(2, ["h1", "h2"], ["a", "b", ""])
+
+        self.assertEqual(self.peek(2, ["h1", "h2"], ["a", "b", ""]), [])
+
+    def test_appended_lines(self):
+        self.peek(0, [], ["$ make", "a", "", ""])
+
+        self.assertEqual(self.peek(0, [], ["$ make", "a", "b", "c"]), ["b", "c"])
+
+    def test_scrolled_lines_found_by_history_size(self):
+        self.peek(10, ["h9", "h10"], ["x", "x", "x"])
+
+        # Two lines scrolled off; repeated lines do not confuse the count
+        self.assertEqual(self.peek(12, ["h10", "x", "x"], ["x", "y", "z"]), ["y", "z"])
+
+    def test_changed_line_is_shown_again(self):
+        self.peek(0, [], ["$ make", "Building 10%"])
+
+        self.assertEqual(self.peek(0, [], ["$ make", "Building 50%"]), ["Building 50%"])
+
+    def test_trimmed_history_found_by_content(self):
+        self.peek(2000, ["old"], ["a", "b", "c", "d"])
+
+        # At history-limit the size no longer grows
+        self.assertEqual(self.peek(1990, ["a", "b"], ["c", "d", "e", "f"]), ["e", "f"])
+
+    def test_respawned_worker_starts_over(self):
+        self.peek(0, [], ["a"])
+        self.worker.started = "2026-01-11T09:00:00"
+
+        self.assertEqual(self.peek(0, [], ["a"]), ["a"])
+
+    def test_cmd_peek_all_batches_captures(self):
+        workers = [
+            swarm.Worker(name=f"w{i}", status="running", cmd=["claude"],
+                         started="2026-01-10T12:00:00", cwd="/tmp",
+                         tmux=swarm.TmuxInfo(session="swarm", window=f"w{i}"))
+            for i in range(3)
+        ]
+        with swarm.State().transaction() as st:
+            for w in workers:
+                st.add_worker(w)
+        for w in workers[:2]:
+            swarm.save_peek_cursor(w.name, swarm.peek_since_last(w, 0, [], ["same"])[1])
+
+        args = MagicMock()
+        args.all = True
+        args.lines = 30
+        args.since_last = True
+        args.parallel = swarm.DEFAULT_PARALLEL
+        captures = [(0, [], ["same"]), (0, [], ["same", "more"]), (0, [], ["first"])]
+
+        with patch.object(swarm, 'tmux_window_exists', return_value=True), \
+             patch.object(swarm, 'tmux_capture_panes', return_value=captures) as mock_capture, \
+             patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit) as cm:
+                swarm.cmd_peek(args)
+
+        self.assertEqual(cm.exception.code, 0)
+        mock_capture.assert_called_once_with(["swarm:w0", "swarm:w1", "swarm:w2"], 30, socket=None)
+        self.assertEqual(mock_stdout.getvalue(), "=== w1 ===\nmore\n=== w2 ===\nfirst\n")
+
+
+@skip_if_no_tmux
+class TestTmuxCapturePanes(TmuxServerTestCase):
+    """Test batched pane captures against a real tmux server."""
+
+    server_command = ["-x", "80", "-y", "10", "seq 1 25; sleep 60"]
+
+    def setUp(self):
+        super().setUp()
+        self.tmux("new-window", "-t", "s1", "-n", "w2", "echo only; sleep 60")
+        self.wait_for(lambda: "25" in self.capture() and "only" in self.capture("s1:w2"))
+
+    def capture_lines(self, target, lines):
+        return self.tmux("capture-pane", "-p", "-t", target, "-S", f"-{lines}")
+
+    def test_matches_separate_captures(self):
+        captures = swarm.tmux_capture_panes(["s1:w1", "s1:w2"], 5, socket=self.socket)
+
+        self.assertEqual(len(captures), 2)
+        for target, (size, history, screen) in zip(["s1:w1", "s1:w2"], captures):
+            self.assertEqual("".join(line + "\n" for line in history + screen),
+                             self.capture_lines(target, 5))
+        self.assertEqual(captures[0][0], 16)
+        self.assertEqual(captures[1], (0, [], captures[1][2]))
+
+    def test_batches_many_panes(self):
+        with patch.object(swarm, 'TMUX_CAPTURE_BATCH', 1):
+            captures = swarm.tmux_capture_panes(["s1:w1", "s1:w2"], 0, socket=self.socket)
+
+        self.assertEqual([c[1] for c in captures], [[], []])
+        self.assertEqual(captures[1][2][0], "only")
+
+    def test_missing_window(self):
+        self.assertIsNone(swarm.tmux_capture_panes(["s1:w1", "s1:gone"], 5, socket=self.socket))
+
+
 if __name__ == '__main__':
     unittest.main()
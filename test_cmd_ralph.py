@@ -3233,13 +3233,12 @@ class TestScreenChangeTracking(unittest.TestCase):
         # Should NOT show last output section
         self.assertNotIn('Last output:', output)
 
-    @patch('swarm.save_ralph_state')
     @patch('swarm.refresh_worker_status')
     @patch('swarm.tmux_capture_pane')
     @patch('time.time')
     @patch('time.sleep')
     def test_detect_inactivity_updates_last_screen_change_on_change(
-            self, mock_sleep, mock_time, mock_capture, mock_refresh, mock_save):
+            self, mock_sleep, mock_time, mock_capture, mock_refresh):
         """Test detect_inactivity updates ralph_state.last_screen_change when screen changes."""
         mock_refresh.return_value = 'running'
         # Iter 1: 'output 1' (new vs None → change)
@@ -3265,13 +3264,97 @@ class TestScreenChangeTracking(unittest.TestCase):
             prompt_file='/path/to/prompt.md',
             max_iterations=10
         )
+        swarm.save_ralph_state(ralph_state)
 
         result = swarm.detect_inactivity(worker, timeout=1, ralph_state=ralph_state)
         self.assertEqual(result, "inactive")
         # last_screen_change should have been set (not None)
         self.assertIsNotNone(ralph_state.last_screen_change)
-        # save_ralph_state should have been called when screen changed
-        self.assertTrue(mock_save.called)
+        # The last screen change is saved when monitoring ends
+        saved = swarm.load_ralph_state('test-worker')
+        self.assertEqual(saved.last_screen_change, ralph_state.last_screen_change)
+
+    def _saved_ralph_state(self):
+        ralph_state = swarm.RalphState(
+            worker_name='test-worker',
+            prompt_file='/path/to/prompt.md',
+            max_iterations=10,
+            current_iteration=1
+        )
+        swarm.save_ralph_state(ralph_state)
+        return ralph_state
+
+    def test_state_writer_coalesces_screen_changes(self):
+        """Test RalphStateWriter writes screen changes at most once per flush interval."""
+        writer = swarm.RalphStateWriter(self._saved_ralph_state(), flush_interval=60)
+
+        with patch('swarm.save_ralph_state', wraps=swarm.save_ralph_state) as mock_save:
+            for _ in range(10):
+                writer.screen_changed()
+            # Only the first change is written right away
+            self.assertEqual(mock_save.call_count, 1)
+            self.assertTrue(writer.dirty)
+
+            writer.flush()
+            self.assertEqual(mock_save.call_count, 2)
+            self.assertFalse(writer.dirty)
+            writer.flush()
+            self.assertEqual(mock_save.call_count, 2)
+
+        self.assertEqual(swarm.load_ralph_state('test-worker').last_screen_change,
+                         writer.ralph_state.last_screen_change)
+
+    def test_state_writer_flushes_after_interval(self):
+        """Test a screen change is written once the flush interval has passed."""
+        writer = swarm.RalphStateWriter(self._saved_ralph_state(), flush_interval=15)
+
+        with patch('time.monotonic', side_effect=[100.0, 110.0, 116.0]):
+            writer.screen_changed()
+            writer.screen_changed()
+            self.assertTrue(writer.dirty)
+            writer.screen_changed()
+            self.assertFalse(writer.dirty)
+
+    def test_state_writer_keeps_concurrent_pause(self):
+        """Test flushing a screen change keeps a pause saved by another process."""
+        ralph_state = self._saved_ralph_state()
+        writer = swarm.RalphStateWriter(ralph_state)
+
+        # `swarm ralph pause` in another process
+        paused = swarm.load_ralph_state('test-worker')
+        paused.status = "paused"
+        swarm.save_ralph_state(paused)
+
+        writer.screen_changed()
+        writer.flush()
+
+        saved = swarm.load_ralph_state('test-worker')
+        self.assertEqual(saved.status, "paused")
+        self.assertEqual(saved.last_screen_change, ralph_state.last_screen_change)
+
+    def test_state_writer_saves_status_change_immediately(self):
+        """Test a status or iteration change is saved in full right away."""
+        ralph_state = self._saved_ralph_state()
+        writer = swarm.RalphStateWriter(ralph_state, flush_interval=60)
+        writer.screen_changed()
+
+        ralph_state.current_iteration = 2
+        ralph_state.exit_reason = "compaction"
+        writer.screen_changed()
+
+        saved = swarm.load_ralph_state('test-worker')
+        self.assertEqual(saved.current_iteration, 2)
+        self.assertEqual(saved.exit_reason, "compaction")
+        self.assertFalse(writer.dirty)
+
+    def test_state_writer_does_not_recreate_removed_state(self):
+        """Test flushing after ralph clean removed the state does not write it again."""
+        writer = swarm.RalphStateWriter(self._saved_ralph_state())
+        swarm.remove_ralph_state('test-worker')
+
+        writer.screen_changed()
+
+        self.assertIsNone(swarm.load_ralph_state('test-worker'))
 
     @patch('swarm.save_ralph_state')
     @patch('swarm.refresh_worker_status')
@@ -5505,7 +5588,7 @@ class TestRalphRunMainLoop(unittest.TestCase):
             return 'stopped'
 
         inactivity_count = [0]
-        def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             inactivity_count[0] += 1
             if inactivity_count[0] == 1:
                 return "inactive"  # First check shows inactivity
@@ -6415,8 +6498,8 @@ class TestScreenStableInactivityDetection(unittest.TestCase):
         sig = inspect.signature(swarm.detect_inactivity)
         params = list(sig.parameters.keys())
         self.assertNotIn('mode', params, "mode parameter should be removed")
-        self.assertEqual(params, ['worker', 'timeout', 'done_pattern', 'check_done_continuous', 'prompt_baseline_content', 'ralph_state'],
-                         "Should have worker, timeout, done_pattern, check_done_continuous, prompt_baseline_content, and ralph_state params")
+        self.assertEqual(params, ['worker', 'timeout', 'done_pattern', 'check_done_continuous', 'prompt_baseline', 'ralph_state', 'capture'],
+                         "Should have worker, timeout, done_pattern, check_done_continuous, prompt_baseline, ralph_state, and capture params")
 
     @patch('swarm.refresh_worker_status')
     @patch('swarm.tmux_capture_pane')
@@ -7590,7 +7673,7 @@ class TestRalphRunIntegration(unittest.TestCase):
 
         detect_calls = []
 
-        def capture_detect_inactivity(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def capture_detect_inactivity(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             """Capture detect_inactivity calls."""
             detect_calls.append({
                 'worker_name': worker.name,
@@ -7939,7 +8022,7 @@ class TestRalphInactivityRestartIntegration(unittest.TestCase):
         # - First call: return "inactive" (inactivity detected) - triggers kill then restart
         # - Second call: return "exited" (worker exited) - loop completes
         detect_call_count = [0]
-        def mock_detect_inactivity(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def mock_detect_inactivity(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             detect_call_count[0] += 1
             operations.append({
                 'op': 'detect_inactivity',
@@ -8094,7 +8177,7 @@ class TestRalphInactivityRestartIntegration(unittest.TestCase):
             )
 
         detect_count = [0]
-        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             detect_count[0] += 1
             if detect_count[0] == 1:
                 return "inactive"  # Trigger restart on first call
@@ -8578,7 +8661,7 @@ class TestRalphStateFlowIntegration(unittest.TestCase):
         # Then on iteration 2, max_iterations is reached, loop exits
         detect_calls = [0]
 
-        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             detect_calls[0] += 1
             # Always return "exited" (worker exited) to advance iterations
             return "exited"
@@ -9042,7 +9125,7 @@ class TestRalphLoopDetectInactivityIntegration(unittest.TestCase):
         kill_calls = []
         detect_calls = []
 
-        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             """Simulate detect_inactivity with blocking and return 'exited' (worker exit)."""
             detect_calls.append({
                 'worker': worker.name,
@@ -9157,7 +9240,7 @@ class TestRalphLoopDetectInactivityIntegration(unittest.TestCase):
         kill_calls = []
         detect_call_count = [0]
 
-        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def mock_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             """Return 'inactive' on first call (inactivity), 'exited' on second (exit)."""
             detect_call_count[0] += 1
             time.sleep(0.1)  # Brief blocking for realism
@@ -9274,7 +9357,7 @@ class TestRalphLoopDetectInactivityIntegration(unittest.TestCase):
         detect_start_times = []
         detect_end_times = []
 
-        def mock_detect_with_blocking(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def mock_detect_with_blocking(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             """Simulate detect_inactivity that blocks for 0.5 seconds."""
             detect_start_times.append(time.time())
             # This simulates the blocking behavior of real detect_inactivity
@@ -9842,7 +9925,7 @@ class TestRalphLoopContinuousDonePattern(unittest.TestCase):
         args = Namespace(name='flag-test-worker')
         detect_calls = []
 
-        def capture_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline_content="", ralph_state=None):
+        def capture_detect(worker, timeout, done_pattern=None, check_done_continuous=False, prompt_baseline=None, ralph_state=None, capture=None):
             detect_calls.append({
                 'timeout': timeout,
                 'done_pattern': done_pattern,
@@ -11189,7 +11272,7 @@ class TestDonePatternBaseline(unittest.TestCase):
                         timeout=60,
                         done_pattern="/done",
                         check_done_continuous=True,
-                        prompt_baseline_content=baseline
+                        prompt_baseline=swarm.PromptBaseline.from_content(baseline)
                     )
                     self.assertEqual(result, "exited",
                         "Done pattern in prompt text should not trigger match when baseline is set")
@@ -11218,7 +11301,7 @@ class TestDonePatternBaseline(unittest.TestCase):
                         timeout=60,
                         done_pattern="/done",
                         check_done_continuous=True,
-                        prompt_baseline_content=baseline
+                        prompt_baseline=swarm.PromptBaseline.from_content(baseline)
                     )
                     self.assertEqual(result, "done_pattern",
                         "Done pattern in agent output (after baseline) should trigger match")
@@ -11237,27 +11320,31 @@ class TestDonePatternBaseline(unittest.TestCase):
                         timeout=60,
                         done_pattern="/done",
                         check_done_continuous=True,
-                        prompt_baseline_content=""
+                        prompt_baseline=None
                     )
                     self.assertEqual(result, "done_pattern",
                         "Done pattern should match anywhere when baseline is empty")
 
     def test_baseline_recorded_after_prompt_injection(self):
-        """Test that send_prompt_to_worker returns pane content string for baseline."""
+        """Test that send_prompt_to_worker returns where the pane content ends."""
         worker = self._make_worker('test-worker')
 
-        pane_after_send = "line 1\nline 2\nline 3\nline 4\nline 5"
+        pane_after_send = "line 1\nline 2\nline 3\nline 4\nline 5\n\n\n"
 
         with patch('swarm.wait_for_agent_ready'):
             with patch('swarm.tmux_send'):
-                with patch('swarm.tmux_capture_pane', return_value=pane_after_send):
-                    baseline = swarm.send_prompt_to_worker(worker, "test prompt")
-
-        self.assertEqual(baseline, pane_after_send,
-            "Should return pane content string after sending prompt")
-
-    def test_baseline_returns_empty_for_non_tmux_worker(self):
-        """Test that send_prompt_to_worker returns empty string for non-tmux worker."""
+                with patch('swarm.run_tmux', return_value=MagicMock(returncode=1)):
+                    with patch('swarm.tmux_capture_pane', return_value=pane_after_send):
+                        baseline = swarm.send_prompt_to_worker(worker, "test prompt")
+
+        self.assertEqual(baseline, swarm.PromptBaseline.from_content(pane_after_send),
+            "Should describe the pane content after sending prompt")
+        self.assertEqual((baseline.column, baseline.tail), (6, 5))
+        # A full capture does not tell the line numbers
+        self.assertIsNone(baseline.line)
+
+    def test_baseline_returns_none_for_non_tmux_worker(self):
+        """Test that send_prompt_to_worker returns None for non-tmux worker."""
         worker = swarm.Worker(
             name='test-worker',
             status='running',
@@ -11268,55 +11355,82 @@ class TestDonePatternBaseline(unittest.TestCase):
         )
 
         baseline = swarm.send_prompt_to_worker(worker, "test prompt")
-        self.assertEqual(baseline, "", "Should return empty string for non-tmux worker")
+        self.assertIsNone(baseline, "Should return None for non-tmux worker")
 
-    def test_baseline_returns_empty_on_capture_error(self):
-        """Test that send_prompt_to_worker returns empty string if pane capture fails."""
+    def test_baseline_returns_none_on_capture_error(self):
+        """Test that send_prompt_to_worker returns None if pane capture fails."""
         worker = self._make_worker('test-worker')
 
         with patch('swarm.wait_for_agent_ready'):
             with patch('swarm.tmux_send'):
-                with patch('swarm.tmux_capture_pane',
-                           side_effect=subprocess.CalledProcessError(1, 'tmux')):
-                    baseline = swarm.send_prompt_to_worker(worker, "test prompt")
+                with patch('swarm.run_tmux', return_value=MagicMock(returncode=1)):
+                    with patch('swarm.tmux_capture_pane',
+                               side_effect=subprocess.CalledProcessError(1, 'tmux')):
+                        baseline = swarm.send_prompt_to_worker(worker, "test prompt")
 
-        self.assertEqual(baseline, "", "Should return empty string on capture error")
+        self.assertIsNone(baseline, "Should return None on capture error")
 
-    def test_ralph_state_has_prompt_baseline_content_field(self):
-        """Test RalphState has prompt_baseline_content field with correct default."""
+    def test_ralph_state_has_prompt_baseline_field(self):
+        """Test RalphState has prompt_baseline field with correct default."""
         state = swarm.RalphState(
             worker_name='test',
             prompt_file='/path/to/prompt.md',
             max_iterations=10
         )
-        self.assertEqual(state.prompt_baseline_content, "",
-            "prompt_baseline_content should default to empty string")
+        self.assertIsNone(state.prompt_baseline,
+            "prompt_baseline should default to None")
 
-    def test_ralph_state_prompt_baseline_content_roundtrip(self):
-        """Test prompt_baseline_content survives round-trip through dict serialization."""
+    def test_ralph_state_prompt_baseline_roundtrip(self):
+        """Test prompt_baseline survives round-trip through dict serialization."""
+        baseline = swarm.PromptBaseline.from_content("line 1\nline 2\nline 3\n", first_line=40)
         original = swarm.RalphState(
             worker_name='test',
             prompt_file='/path/to/prompt.md',
             max_iterations=10,
-            prompt_baseline_content="line 1\nline 2\nline 3\n"
+            prompt_baseline=baseline
         )
-        d = original.to_dict()
-        self.assertEqual(d['prompt_baseline_content'], "line 1\nline 2\nline 3\n")
+        d = json.loads(json.dumps(original.to_dict()))
+        self.assertEqual(d['prompt_baseline']['line'], 42)
+        self.assertNotIn('prompt_baseline_content', d)
 
         restored = swarm.RalphState.from_dict(d)
-        self.assertEqual(restored.prompt_baseline_content, "line 1\nline 2\nline 3\n")
+        self.assertEqual(restored.prompt_baseline, baseline)
 
     def test_ralph_state_from_dict_defaults_baseline_when_missing(self):
-        """Test from_dict defaults prompt_baseline_content to empty string for old state files."""
+        """Test from_dict defaults prompt_baseline to None for old state files."""
         d = {
             'worker_name': 'test',
             'prompt_file': '/path/to/prompt.md',
             'max_iterations': 10,
-            # prompt_baseline_content is missing (old state format)
+            # prompt_baseline is missing (old state format)
         }
         state = swarm.RalphState.from_dict(d)
-        self.assertEqual(state.prompt_baseline_content, "",
-            "Should default to empty string when field is missing from old state files")
+        self.assertIsNone(state.prompt_baseline,
+            "Should default to None when field is missing from old state files")
+
+    def test_ralph_state_from_dict_converts_baseline_content(self):
+        """Test from_dict turns the full baseline text of old state files into a PromptBaseline."""
+        content = "line 1\nline 2\nline 3\n"
+        d = {
+            'worker_name': 'test',
+            'prompt_file': '/path/to/prompt.md',
+            'max_iterations': 10,
+            'prompt_baseline_content': content,
+        }
+        state = swarm.RalphState.from_dict(d)
+        self.assertEqual(state.prompt_baseline, swarm.PromptBaseline.from_content(content))
+        self.assertEqual(state.prompt_baseline.end_in(content + "more"), len("line 1\nline 2\nline 3"))
+
+    def test_ralph_state_file_stays_small(self):
+        """Test the baseline of a full 2000-line scrollback adds little to the state file."""
+        content = "".join(f"line {i}: " + "x" * 100 + "\n" for i in range(2000))
+        state = swarm.RalphState(
+            worker_name='test',
+            prompt_file='/path/to/prompt.md',
+            max_iterations=10,
+            prompt_baseline=swarm.PromptBaseline.from_content(content, first_line=0)
+        )
+        self.assertLess(len(json.dumps(state.to_dict(), indent=2)), 2048)
 
     def test_done_pattern_baseline_with_regex_pattern(self):
         """Test baseline filtering works with regex done patterns."""
@@ -11350,7 +11464,7 @@ class TestDonePatternBaseline(unittest.TestCase):
                         timeout=60,
                         done_pattern=r"SWARM_DONE_\w+",
                         check_done_continuous=True,
-                        prompt_baseline_content=baseline
+                        prompt_baseline=swarm.PromptBaseline.from_content(baseline)
                     )
                     self.assertEqual(result, "exited",
                         "Regex done pattern in prompt should not match with baseline filtering")
@@ -11374,7 +11488,7 @@ class TestDonePatternBaseline(unittest.TestCase):
                         timeout=60,
                         done_pattern="/done",
                         check_done_continuous=True,
-                        prompt_baseline_content=baseline
+                        prompt_baseline=swarm.PromptBaseline.from_content(baseline)
                     )
                     self.assertEqual(result, "done_pattern",
                         "When terminal cleared (baseline not prefix), should check full content")
@@ -12113,7 +12227,7 @@ class TestFatalPatternDetection(unittest.TestCase):
         # First detect_inactivity returns "compaction", second returns "exited" (normal)
         inactivity_count = [0]
         def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False,
-                            prompt_baseline_content="", ralph_state=None):
+                            prompt_baseline=None, ralph_state=None, capture=None):
             inactivity_count[0] += 1
             if inactivity_count[0] == 1:
                 return "compaction"
@@ -12180,7 +12294,7 @@ class TestFatalPatternDetection(unittest.TestCase):
 
         # detect_inactivity returns "compaction" on first call, then loop hits max_iterations
         def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False,
-                            prompt_baseline_content="", ralph_state=None):
+                            prompt_baseline=None, ralph_state=None, capture=None):
             return "compaction"
 
         with patch('swarm.refresh_worker_status', return_value='stopped'):
@@ -12239,7 +12353,7 @@ class TestFatalPatternDetection(unittest.TestCase):
         args = Namespace(name='ralph-worker')
 
         def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False,
-                            prompt_baseline_content="", ralph_state=None):
+                            prompt_baseline=None, ralph_state=None, capture=None):
             return "compaction"
 
         with patch('swarm.refresh_worker_status', return_value='stopped'):
@@ -12517,7 +12631,7 @@ class TestMaxContextEnforcement(unittest.TestCase):
         # First call returns context_nudge, second returns exited (normal completion)
         call_count = [0]
         def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False,
-                            prompt_baseline_content="", ralph_state=None):
+                            prompt_baseline=None, ralph_state=None, capture=None):
             call_count[0] += 1
             if call_count[0] == 1:
                 return "context_nudge"
@@ -12576,7 +12690,7 @@ class TestMaxContextEnforcement(unittest.TestCase):
         # First call returns context_threshold, then exited
         call_count = [0]
         def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False,
-                            prompt_baseline_content="", ralph_state=None):
+                            prompt_baseline=None, ralph_state=None, capture=None):
             call_count[0] += 1
             if call_count[0] == 1:
                 return "context_threshold"
@@ -12650,7 +12764,7 @@ class TestMaxContextEnforcement(unittest.TestCase):
         # Worker exits normally, then on next iteration check state
         call_count = [0]
         def mock_inactivity(w, t, done_pattern=None, check_done_continuous=False,
-                            prompt_baseline_content="", ralph_state=None):
+                            prompt_baseline=None, ralph_state=None, capture=None):
             call_count[0] += 1
             return "exited"
 
@@ -13045,7 +13159,7 @@ class TestWindowLossDonePatternCheck(unittest.TestCase):
             worker, timeout=180,
             done_pattern="ALL_DONE",
             check_done_continuous=False,
-            prompt_baseline_content=baseline
+            prompt_baseline=swarm.PromptBaseline.from_content(baseline)
         )
         # ALL_DONE only appears in baseline prefix which is stripped, so no match
         self.assertEqual(result, "exited")
@@ -3,6 +3,7 @@
 
 import json
 import os
+import subprocess
 import sys
 import tempfile
 import unittest
@@ -155,6 +156,7 @@ class TestCmdSend(unittest.TestCase):
         args.text = "hello all"
         args.no_enter = False
         args.all = True
+        args.parallel = swarm.DEFAULT_PARALLEL
         args.raw = False
 
         def mock_refresh(worker):
@@ -178,6 +180,46 @@ class TestCmdSend(unittest.TestCase):
             self.assertIn("sent to w1", output)
             self.assertIn("sent to w2", output)
 
+    def test_send_all_reports_failures_after_successes(self):
+        """Test --all sends to every worker and reports failures at the end."""
+        workers = [
+            swarm.Worker(
+                name=name,
+                status="running",
+                cmd=["bash"],
+                started="2026-01-10T12:00:00",
+                cwd="/tmp",
+                tmux=swarm.TmuxInfo(session="swarm", window=name)
+            )
+            for name in ("w1", "w2", "w3")
+        ]
+        self.create_test_state(workers)
+
+        args = MagicMock()
+        args.name = None
+        args.text = "hello"
+        args.no_enter = False
+        args.all = True
+        args.parallel = 3
+        args.raw = False
+
+        def fake_send(session, window, text, **kwargs):
+            if window == "w2":
+                raise subprocess.CalledProcessError(1, ["tmux"], "", "can't find window: w2\n")
+
+        with patch.object(swarm, 'tmux_send', side_effect=fake_send) as mock_send, \
+             patch.object(swarm, 'refresh_worker_status', return_value="running"), \
+             patch('sys.stdout', new_callable=StringIO) as mock_stdout, \
+             patch('sys.stderr', new_callable=StringIO) as mock_stderr:
+
+            with self.assertRaises(SystemExit) as ctx:
+                swarm.cmd_send(args)
+
+        self.assertEqual(ctx.exception.code, 1)
+        self.assertEqual(mock_send.call_count, 3)
+        self.assertEqual(mock_stdout.getvalue(), "sent to w1\nsent to w3\n")
+        self.assertIn("failed to send to 'w2': can't find window: w2", mock_stderr.getvalue())
+
     def test_send_worker_not_found(self):
         """Test error when worker is not found."""
         self.create_test_state([])
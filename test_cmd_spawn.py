@@ -827,8 +827,8 @@ class TestEnvPropagation(unittest.TestCase):
 
                     mock_run.assert_called_once()
                     call_args = mock_run.call_args[0][0]
-                    # The last element is the command string
-                    cmd_str = call_args[-1]
+                    # The command string follows the -c <cwd> option
+                    cmd_str = call_args[call_args.index("-c") + 2]
                     self.assertIn("env ", cmd_str)
                     self.assertIn("FOO=bar", cmd_str)
                     self.assertIn("BAZ=qux", cmd_str)
@@ -846,7 +846,7 @@ class TestEnvPropagation(unittest.TestCase):
 
                     mock_run.assert_called_once()
                     call_args = mock_run.call_args[0][0]
-                    cmd_str = call_args[-1]
+                    cmd_str = call_args[call_args.index("-c") + 2]
                     self.assertNotIn("env ", cmd_str)
                     self.assertEqual(cmd_str, "echo hello")
 
@@ -862,7 +862,7 @@ class TestEnvPropagation(unittest.TestCase):
 
                     mock_run.assert_called_once()
                     call_args = mock_run.call_args[0][0]
-                    cmd_str = call_args[-1]
+                    cmd_str = call_args[call_args.index("-c") + 2]
                     self.assertNotIn("env ", cmd_str)
                     self.assertEqual(cmd_str, "echo hello")
 
@@ -878,7 +878,7 @@ class TestEnvPropagation(unittest.TestCase):
 
                     mock_run.assert_called_once()
                     call_args = mock_run.call_args[0][0]
-                    cmd_str = call_args[-1]
+                    cmd_str = call_args[call_args.index("-c") + 2]
                     self.assertIn("env ", cmd_str)
                     # shlex.quote should wrap value with spaces in quotes
                     self.assertIn("'hello world'", cmd_str)
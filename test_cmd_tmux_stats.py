@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Tests for per-worker scrollback limits and `swarm tmux-stats`.
+
+spawn and ralph spawn accept --history-limit, which create_tmux_window()
+applies to the new pane (tmux reads history-limit only when a pane is
+created). tmux-stats reports each socket's tmux server memory and the
+scrollback held by every worker's pane.
+
+Test coverage:
+- create_tmux_window() sets the pane's history-limit and restores the session's own
+- tmux_server_stats() against a real tmux server
+- --history-limit is stored with the worker and reused by respawn and ralph iterations
+- tmux-stats table and JSON output
+"""
+
+import io
+import json
+import unittest
+from argparse import Namespace
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+from tmux_test_helpers import TmuxServerTestCase, TmuxTestCase, new_socket, skip_if_no_tmux
+
+
+def run_stats(fmt: str = "table") -> str:
+    out = io.StringIO()
+    with redirect_stdout(out):
+        swarm.cmd_tmux_stats(Namespace(format=fmt))
+    return out.getvalue()
+
+
+@skip_if_no_tmux
+class TestHistoryLimitTmux(TmuxServerTestCase):
+    """History limits and stats on a real tmux server."""
+
+    def history_limit(self, window: str) -> int:
+        return int(self.tmux("display-message", "-p", "-t", f"s1:{window}", "#{history_limit}"))
+
+    def test_window_gets_history_limit(self):
+        swarm.create_tmux_window("s1", "w2", Path("/tmp"), ["cat"], self.socket, history_limit=123)
+        swarm.create_tmux_window("s1", "w3", Path("/tmp"), ["cat"], self.socket)
+
+        self.assertEqual(self.history_limit("w2"), 123)
+        self.assertEqual(self.history_limit("w3"), self.history_limit("w1"))
+        # The session does not keep the override
+        self.assertEqual(self.tmux("show-options", "-t", "s1", "-v", "history-limit"), "")
+        # pipe-pane still targets the new pane
+        self.assertEqual(self.tmux("display-message", "-p", "-t", "s1:w2", "#{pane_pipe}").strip(), "1")
+
+    def test_session_value_is_restored(self):
+        self.tmux("set-option", "-t", "s1", "history-limit", "777")
+
+        swarm.create_tmux_window("s1", "w2", Path("/tmp"), ["cat"], self.socket, history_limit=0)
+
+        self.assertEqual(self.history_limit("w2"), 0)
+        self.assertEqual(self.tmux("show-options", "-t", "s1", "-v", "history-limit").strip(), "777")
+
+    def test_server_stats(self):
+        swarm.create_tmux_window("s1", "w2", Path("/tmp"), ["sh", "-c", "seq 500; cat"], self.socket, history_limit=100)
+        self.wait_for(lambda: "500" in self.capture("s1:w2"))
+
+        stats = swarm.tmux_server_stats(self.socket)
+
+        self.assertEqual(stats["pid"], int(self.tmux("display-message", "-p", "#{pid}")))
+        self.assertGreater(stats["rss_bytes"], 0)
+        panes = {p["window"]: p for p in stats["panes"]}
+        self.assertEqual(set(panes), {"w1", "w2"})
+        self.assertEqual(panes["w2"]["history_limit"], 100)
+        self.assertGreater(panes["w2"]["history_size"], 0)
+        self.assertLessEqual(panes["w2"]["history_size"], 100)
+        self.assertGreater(panes["w2"]["history_bytes"], 0)
+
+    def test_no_server(self):
+        self.assertIsNone(swarm.tmux_server_stats(new_socket()))
+
+    def test_cmd_tmux_stats_json(self):
+        self.add_tmux_worker("w1", socket=self.socket)
+        self.add_tmux_worker("gone", socket=self.socket)
+
+        result = json.loads(run_stats("json"))
+
+        self.assertEqual(len(result["servers"]), 1)
+        self.assertEqual(result["servers"][0]["socket"], self.socket)
+        self.assertEqual(result["servers"][0]["panes"], 1)
+        self.assertEqual([w["worker"] for w in result["windows"]], ["w1"])
+        self.assertEqual(result["windows"][0]["history_limit"], self.history_limit("w1"))
+
+
+class TestHistoryLimitSpawn(TmuxTestCase):
+    """--history-limit is passed to tmux and kept with the worker."""
+
+    def spawn_args(self, **overrides) -> Namespace:
+        args = dict(name="w", cmd=["--", "cat"], tmux=True, session="s1", tmux_socket=None,
+                    ready_wait=False, worktree=False, cwd=None, env=[], tags=[],
+                    history_limit=500)
+        args.update(overrides)
+        return Namespace(**args)
+
+    @patch('swarm.create_tmux_window')
+    def test_spawn_stores_history_limit(self, mock_create):
+        with redirect_stdout(io.StringIO()):
+            swarm.cmd_spawn(self.spawn_args())
+
+        self.assertEqual(mock_create.call_args.kwargs["history_limit"], 500)
+        self.assertEqual(swarm.State().get_worker("w").tmux.history_limit, 500)
+
+    def test_spawn_without_tmux_is_rejected(self):
+        with patch('sys.stderr', new_callable=io.StringIO) as stderr, \
+             self.assertRaises(SystemExit) as ctx:
+            swarm.cmd_spawn(self.spawn_args(tmux=False))
+
+        self.assertEqual(ctx.exception.code, 1)
+        self.assertIn("--history-limit requires --tmux", stderr.getvalue())
+
+    def test_parser_rejects_negative(self):
+        with patch('sys.argv', ['swarm', 'spawn', '--name', 'w', '--tmux',
+                                '--history-limit', '-1', '--', 'cat']), \
+             patch('sys.stderr', new_callable=io.StringIO), \
+             self.assertRaises(SystemExit) as ctx:
+            swarm.main()
+        self.assertEqual(ctx.exception.code, 2)
+
+    @patch('swarm.create_tmux_window')
+    def test_respawn_reuses_history_limit(self, mock_create):
+        self.add_tmux_worker("w", history_limit=300)
+        with swarm.State().transaction() as st:
+            st.get_worker("w").status = "stopped"
+
+        with patch('swarm.refresh_worker_status', return_value="stopped"), \
+             redirect_stdout(io.StringIO()):
+            swarm.cmd_respawn(Namespace(name="w", clean_first=False))
+
+        self.assertEqual(mock_create.call_args.kwargs["history_limit"], 300)
+        self.assertEqual(swarm.State().get_worker("w").tmux.history_limit, 300)
+
+    @patch('swarm.create_tmux_window')
+    def test_ralph_iteration_reuses_history_limit(self, mock_create):
+        worker = swarm.spawn_worker_for_ralph(
+            name="r", cmd=["cat"], cwd=Path("/tmp"), env={}, tags=[], session="s1",
+            socket=None, worktree_info=None, metadata={}, history_limit=250,
+        )
+
+        self.assertEqual(mock_create.call_args.kwargs["history_limit"], 250)
+        self.assertEqual(worker.tmux.history_limit, 250)
+
+    def test_old_state_loads_without_history_limit(self):
+        worker = swarm.Worker.from_dict({
+            "name": "w", "status": "running", "cmd": ["cat"], "started": "2026-01-01T00:00:00",
+            "cwd": "/tmp", "tmux": {"session": "s1", "window": "w", "socket": None},
+        })
+        self.assertIsNone(worker.tmux.history_limit)
+
+
+class TestCmdTmuxStats(TmuxTestCase):
+    """Output of tmux-stats from mocked server stats."""
+
+    STATS = {
+        "pid": 4242,
+        "rss_bytes": 12 * 1024 * 1024,
+        "panes": [
+            {"session": "s1", "window": "dev", "history_size": 1500,
+             "history_limit": 2000, "history_bytes": 200 * 1024},
+            {"session": "other", "window": "vim", "history_size": 10,
+             "history_limit": 2000, "history_bytes": 1024},
+        ],
+    }
+
+    @patch('swarm.tmux_server_stats')
+    def test_table(self, mock_stats):
+        mock_stats.return_value = self.STATS
+        self.add_tmux_worker("dev")
+
+        lines = run_stats().splitlines()
+
+        self.assertEqual(lines[0].split(), ["SOCKET", "PID", "RSS", "PANES", "HISTORY", "HISTORY", "MEM"])
+        self.assertEqual(lines[1].split(), ["default", "4242", "12.0M", "2", "1510", "201.0K"])
+        self.assertEqual(lines[2], "")
+        self.assertEqual(lines[4].split(), ["dev", "s1:dev", "default", "1500", "2000", "200.0K"])
+        mock_stats.assert_called_once_with(None)
+
+    @patch('swarm.tmux_server_stats')
+    def test_one_call_per_socket(self, mock_stats):
+        mock_stats.return_value = self.STATS
+        self.add_tmux_worker("dev")
+        self.add_tmux_worker("a", socket="x")
+        self.add_tmux_worker("b", socket="x")
+
+        run_stats()
+
+        self.assertEqual([c.args for c in mock_stats.call_args_list], [(None,), ("x",)])
+
+    @patch('swarm.tmux_server_stats', return_value=None)
+    def test_no_server_prints_nothing(self, mock_stats):
+        self.add_tmux_worker("dev")
+
+        self.assertEqual(run_stats(), "")
+        self.assertEqual(json.loads(run_stats("json")), {"servers": [], "windows": []})
+
+    def test_format_bytes(self):
+        self.assertEqual(swarm.format_bytes(None), "-")
+        self.assertEqual(swarm.format_bytes(512), "512B")
+        self.assertEqual(swarm.format_bytes(1536), "1.5K")
+        self.assertEqual(swarm.format_bytes(3 * 1024 ** 3), "3.0G")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,10 @@ Tests the low-level functions that other commands depend on:
 - spawn_process: Background process spawning
 - process_alive: Process status checking
 - tmux_send: Sending text to tmux windows
+- run_parallel: Bounded, ordered fan-out for --all commands
 - tmux_window_exists: Checking tmux window existence
+- tmux_list_windows / tmux_status_snapshot: Batched tmux status probe
+- probe_tmux_windows: Status cache shared between swarm processes
 - update_worker_atomic: Atomic state updates
 - create_worktree: Git worktree creation
 - get_git_root: Git repository root detection
@@ -21,6 +24,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, call, patch
 
 import swarm
+from state_test_helpers import make_worker
 
 
 class TestSpawnProcess(unittest.TestCase):
@@ -178,6 +182,8 @@ class TestProcessAlive(unittest.TestCase):
 class TestTmuxSend(unittest.TestCase):
     """Test the tmux_send function."""
 
+    CURSOR = ["display-message", "-p", "-t", "test-session:test-window", "#{cursor_x},#{cursor_y}", ";"]
+
     @patch('subprocess.run')
     @patch('time.sleep')
     def test_tmux_send_with_enter(self, mock_sleep, mock_run):
@@ -186,12 +192,13 @@ class TestTmuxSend(unittest.TestCase):
 
         swarm.tmux_send("test-session", "test-window", "hello world", enter=True, pre_clear=False)
 
-        # Should be called twice: once for text, once for Enter
+        # Should be called twice: once for cursor + text, once for Enter
         self.assertEqual(mock_run.call_count, 2)
 
-        # First call: send text
+        # First call: read the cursor and send text in one chained command
         first_call = mock_run.call_args_list[0]
-        self.assertEqual(first_call[0][0], ["tmux", "send-keys", "-t", "test-session:test-window", "-l", "hello world"])
+        self.assertEqual(first_call[0][0], ["tmux"] + self.CURSOR +
+                         ["send-keys", "-t", "test-session:test-window", "-l", "hello world"])
 
         # Second call: send Enter
         second_call = mock_run.call_args_list[1]
@@ -220,12 +227,13 @@ class TestTmuxSend(unittest.TestCase):
         # First call should include -L flag
         first_call = mock_run.call_args_list[0]
         self.assertEqual(first_call[0][0],
-                        ["tmux", "-L", "custom-socket", "send-keys", "-t", "test-session:test-window", "-l", "hello"])
+                        ["tmux", "-L", "custom-socket"] + self.CURSOR +
+                        ["send-keys", "-t", "test-session:test-window", "-l", "hello"])
 
     @patch('subprocess.run')
     @patch('time.sleep')
     def test_tmux_send_multiline_has_longer_delay(self, mock_sleep, mock_run):
-        """Test tmux_send uses longer delay for multiline content."""
+        """Test tmux_send waits longer for multiline content when the cursor is unknown."""
         mock_run.return_value = MagicMock(returncode=0)
 
         # Send multiline content
@@ -237,7 +245,7 @@ class TestTmuxSend(unittest.TestCase):
     @patch('subprocess.run')
     @patch('time.sleep')
     def test_tmux_send_single_line_has_shorter_delay(self, mock_sleep, mock_run):
-        """Test tmux_send uses shorter delay for single line content."""
+        """Test tmux_send waits at most 0.1s for single line content."""
         mock_run.return_value = MagicMock(returncode=0)
 
         # Send single line content
@@ -246,33 +254,119 @@ class TestTmuxSend(unittest.TestCase):
         # Check that sleep was called with 0.1 for single line
         mock_sleep.assert_called_with(0.1)
 
+    @patch('subprocess.run')
+    @patch('time.sleep')
+    def test_tmux_send_enter_follows_cursor(self, mock_sleep, mock_run):
+        """Test Enter is sent as soon as the cursor has moved and settled."""
+        positions = iter(["0,0\n", "5,0\n", "11,0\n", "11,0\n"])
+
+        def run(cmd, **kwargs):
+            if "display-message" in cmd:
+                return MagicMock(returncode=0, stdout=next(positions))
+            return MagicMock(returncode=0, stdout="")
+
+        mock_run.side_effect = run
+
+        swarm.tmux_send("test-session", "test-window", "hello world", enter=True, pre_clear=False)
+
+        # Chained send, three cursor polls, then Enter
+        self.assertEqual(mock_run.call_count, 5)
+        self.assertEqual(mock_run.call_args_list[-1][0][0],
+                         ["tmux", "send-keys", "-t", "test-session:test-window", "Enter"])
+        for call in mock_sleep.call_args_list:
+            self.assertLessEqual(call[0][0], swarm.TMUX_SEND_POLL_INTERVAL)
+
+    @patch('subprocess.run')
+    def test_tmux_send_trailing_semicolon_is_literal(self, mock_run):
+        """Test a trailing ';' is escaped so tmux does not read it as a separator."""
+        mock_run.return_value = MagicMock(returncode=0)
+
+        swarm.tmux_send("test-session", "test-window", "echo hi;", enter=False, pre_clear=False)
+
+        self.assertEqual(mock_run.call_args[0][0],
+                         ["tmux", "send-keys", "-t", "test-session:test-window", "-l", "echo hi\\;"])
+
+    @patch('subprocess.run')
+    def test_tmux_send_leading_dash_is_not_a_flag(self, mock_run):
+        """Test text starting with '-' follows '--' so tmux does not parse it as flags."""
+        mock_run.return_value = MagicMock(returncode=0)
+
+        swarm.tmux_send("test-session", "test-window", "- item", enter=False, pre_clear=False)
+
+        self.assertEqual(mock_run.call_args[0][0],
+                         ["tmux", "send-keys", "-t", "test-session:test-window", "-l", "--", "- item"])
+
+    @patch('subprocess.run')
+    @patch('time.sleep')
+    def test_tmux_send_large_text_is_pasted(self, mock_sleep, mock_run):
+        """Test text above the paste threshold goes through a named paste buffer."""
+        mock_run.return_value = MagicMock(returncode=0)
+        text = "x" * (swarm.TMUX_PASTE_THRESHOLD + 1)
+
+        swarm.tmux_send("test-session", "test-window", text, enter=True, pre_clear=True)
+
+        self.assertEqual(mock_run.call_count, 2)
+        target = "test-session:test-window"
+        buffer = "swarm-test-session-test-window"
+        first_call = mock_run.call_args_list[0]
+        self.assertEqual(first_call[0][0],
+                         ["tmux"] + self.CURSOR +
+                         ["load-buffer", "-b", buffer, "-", ";",
+                          "send-keys", "-t", target, "Escape", ";",
+                          "send-keys", "-t", target, "C-u", ";",
+                          "paste-buffer", "-p", "-d", "-b", buffer, "-t", target])
+        self.assertEqual(first_call[1]["input"], text)
+        self.assertEqual(mock_run.call_args_list[1][0][0],
+                         ["tmux", "send-keys", "-t", target, "Enter"])
+
+    @patch('subprocess.run')
+    def test_tmux_send_paste_can_be_forced(self, mock_run):
+        """Test paste=True pastes short text and paste=False types long text."""
+        mock_run.return_value = MagicMock(returncode=0)
+
+        swarm.tmux_send("s", "w", "short", enter=False, pre_clear=False, paste=True)
+        self.assertIn("paste-buffer", mock_run.call_args[0][0])
+
+        swarm.tmux_send("s", "w", "x" * 5000, enter=False, pre_clear=False, paste=False)
+        self.assertEqual(mock_run.call_args[0][0][:5], ["tmux", "send-keys", "-t", "s:w", "-l"])
+
+    @patch('subprocess.run')
+    def test_tmux_send_failed_paste_deletes_buffer(self, mock_run):
+        """Test the paste buffer is deleted when pasting fails."""
+        def run(cmd, **kwargs):
+            if "paste-buffer" in cmd:
+                raise subprocess.CalledProcessError(1, cmd, "", "can't find window")
+            return MagicMock(returncode=0)
+
+        mock_run.side_effect = run
+
+        with self.assertRaises(subprocess.CalledProcessError):
+            swarm.tmux_send("s", "w", "text", enter=False, pre_clear=False, paste=True)
+
+        self.assertEqual(mock_run.call_args[0][0], ["tmux", "delete-buffer", "-b", "swarm-s-w"])
+
     @patch('subprocess.run')
     @patch('time.sleep')
     def test_tmux_send_pre_clear_sends_escape_and_ctrl_u(self, mock_sleep, mock_run):
-        """Test tmux_send with pre_clear=True sends Escape + Ctrl-U before text."""
+        """Test tmux_send with pre_clear=True chains Escape + Ctrl-U before text."""
         mock_run.return_value = MagicMock(returncode=0)
 
         swarm.tmux_send("test-session", "test-window", "hello", enter=True, pre_clear=True)
 
-        # Should be called 4 times: Escape, C-u, text, Enter
-        self.assertEqual(mock_run.call_count, 4)
+        # Should be called twice: cursor + Escape + C-u + text, then Enter
+        self.assertEqual(mock_run.call_count, 2)
 
         target = "test-session:test-window"
 
-        # First call: Escape
+        # First call: one chained command
         self.assertEqual(mock_run.call_args_list[0][0][0],
-                        ["tmux", "send-keys", "-t", target, "Escape"])
+                        ["tmux"] + self.CURSOR +
+                        ["send-keys", "-t", target, "Escape", ";",
+                         "send-keys", "-t", target, "C-u", ";",
+                         "send-keys", "-t", target, "-l", "hello"])
 
-        # Second call: Ctrl-U
+        # Second call: Enter
         self.assertEqual(mock_run.call_args_list[1][0][0],
-                        ["tmux", "send-keys", "-t", target, "C-u"])
-
-        # Third call: literal text
-        self.assertEqual(mock_run.call_args_list[2][0][0],
-                        ["tmux", "send-keys", "-t", target, "-l", "hello"])
-
-        # Fourth call: Enter
-        self.assertEqual(mock_run.call_args_list[3][0][0],
                         ["tmux", "send-keys", "-t", target, "Enter"])
 
     @patch('subprocess.run')
@@ -282,16 +376,14 @@ class TestTmuxSend(unittest.TestCase):
 
         swarm.tmux_send("test-session", "test-window", "hello", enter=False, pre_clear=True)
 
-        # Should be called 3 times: Escape, C-u, text (no Enter)
-        self.assertEqual(mock_run.call_count, 3)
+        # One chained command: Escape, C-u, text (no Enter)
+        mock_run.assert_called_once()
 
         target = "test-session:test-window"
-        self.assertEqual(mock_run.call_args_list[0][0][0],
-                        ["tmux", "send-keys", "-t", target, "Escape"])
-        self.assertEqual(mock_run.call_args_list[1][0][0],
-                        ["tmux", "send-keys", "-t", target, "C-u"])
-        self.assertEqual(mock_run.call_args_list[2][0][0],
-                        ["tmux", "send-keys", "-t", target, "-l", "hello"])
+        self.assertEqual(mock_run.call_args[0][0],
+                        ["tmux", "send-keys", "-t", target, "Escape", ";",
+                         "send-keys", "-t", target, "C-u", ";",
+                         "send-keys", "-t", target, "-l", "hello"])
 
     @patch('subprocess.run')
     @patch('time.sleep')
@@ -302,8 +394,8 @@ class TestTmuxSend(unittest.TestCase):
         # Call without specifying pre_clear — should default to True
         swarm.tmux_send("test-session", "test-window", "hello", enter=True)
 
-        # Should be 4 calls: Escape, C-u, text, Enter
-        self.assertEqual(mock_run.call_count, 4)
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertIn("C-u", mock_run.call_args_list[0][0][0])
 
     @patch('subprocess.run')
     @patch('time.sleep')
@@ -313,15 +405,15 @@ class TestTmuxSend(unittest.TestCase):
 
         swarm.tmux_send("sess", "win", "hello", enter=True, socket="my-sock", pre_clear=True)
 
-        # All 4 calls should use -L my-sock prefix
-        self.assertEqual(mock_run.call_count, 4)
+        # Both calls should use -L my-sock prefix
+        self.assertEqual(mock_run.call_count, 2)
         for call in mock_run.call_args_list:
             cmd = call[0][0]
             self.assertEqual(cmd[0:3], ["tmux", "-L", "my-sock"])
 
 
 class TestTmuxWindowExists(unittest.TestCase):
-    """Test the tmux_window_exists function."""
+    """Test the tmux_window_exists function (has-session path)."""
 
     @patch('subprocess.run')
     def test_tmux_window_exists_returns_true(self, mock_run):
@@ -359,6 +451,339 @@ class TestTmuxWindowExists(unittest.TestCase):
         )
 
 
+class TestTmuxStatusSnapshot(unittest.TestCase):
+    """Test the batched list-panes status probe."""
+
+    @patch('subprocess.run')
+    def test_list_windows_parses_output(self, mock_run):
+        """Test tmux_list_windows maps (session, window) to each pane's pid and dead flag."""
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout="swarm\tw1\t%1\t100\t0\nswarm\tw 2\t%2\t101\t1\nswarm\tw1\t%3\t102\t0\n",
+            stderr="")
+
+        windows = swarm.tmux_list_windows("sock")
+
+        self.assertEqual(windows, {
+            ("swarm", "w1"): {"%1": (100, False), "%3": (102, False)},
+            ("swarm", "w 2"): {"%2": (101, True)},
+        })
+        mock_run.assert_called_once_with(
+            ["tmux", "-L", "sock", "list-panes", "-a", "-F",
+             "#{session_name}\t#{window_name}\t#{pane_id}\t#{pane_pid}\t#{pane_dead}"],
+            capture_output=True, text=True,
+        )
+
+    @patch('subprocess.run')
+    def test_list_windows_without_server_is_empty(self, mock_run):
+        """Test tmux_list_windows returns no windows when no server is running."""
+        mock_run.return_value = MagicMock(
+            returncode=1, stdout="", stderr="no server running on /tmp/tmux-0/sock\n")
+
+        self.assertEqual(swarm.tmux_list_windows("sock"), {})
+
+    @patch('subprocess.run')
+    def test_list_windows_other_error_is_unknown(self, mock_run):
+        """Test tmux_list_windows returns None on unexpected failures."""
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="unknown option\n")
+
+        self.assertIsNone(swarm.tmux_list_windows())
+
+    @patch('subprocess.run')
+    def test_snapshot_runs_one_call_per_socket(self, mock_run):
+        """Test N workers cost one list-panes call per distinct socket."""
+        listing = "".join(f"swarm\tw{i}\t%{i}\t{1000 + i}\t0\n" for i in range(0, 200, 2))
+        mock_run.return_value = MagicMock(returncode=0, stdout=listing, stderr="")
+        workers = [make_worker(f"w{i}", session="swarm") for i in range(200)]
+        workers.append(make_worker("other", session="swarm", socket="second"))
+
+        with swarm.tmux_status_snapshot():
+            statuses = [swarm.refresh_worker_status(w) for w in workers]
+
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(statuses[:4], ["running", "stopped", "running", "stopped"])
+        self.assertEqual(statuses[-1], "stopped")
+
+    @patch('subprocess.run')
+    def test_snapshot_matches_exact_name_and_live_pane(self, mock_run):
+        """Test prefixes of other windows and exited panes count as stopped."""
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="swarm\twork-longer\t%1\t100\t0\nswarm\tdead\t%2\t101\t1\n", stderr="")
+
+        with swarm.tmux_status_snapshot():
+            self.assertFalse(swarm.tmux_window_exists("swarm", "work"))
+            self.assertFalse(swarm.tmux_window_exists("swarm", "dead"))
+            self.assertTrue(swarm.tmux_window_exists("swarm", "work-longer"))
+
+    @patch('subprocess.run')
+    def test_snapshot_finds_pane_in_split_window(self, mock_run):
+        """Test a worker's pane counts even when another pane of its window is active."""
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="swarm\tw1\t%1\t100\t0\nswarm\tw1\t%4\t103\t0\nswarm\tw2\t%2\t101\t1\n",
+            stderr="")
+
+        with swarm.tmux_status_snapshot():
+            self.assertTrue(swarm.tmux_window_exists("swarm", "w1", pane_id="%1"))
+            self.assertTrue(swarm.tmux_window_exists("swarm", "w1", pane_id="%4"))
+            self.assertFalse(swarm.tmux_window_exists("swarm", "w1", pane_id="%2"))
+            self.assertFalse(swarm.tmux_window_exists("swarm", "w2", pane_id="%2"))
+
+    @patch('subprocess.run')
+    def test_snapshot_falls_back_to_has_session(self, mock_run):
+        """Test sockets that cannot be listed are probed per window."""
+        mock_run.side_effect = [
+            MagicMock(returncode=1, stdout="", stderr="unexpected\n"),
+            MagicMock(returncode=0),
+        ]
+
+        with swarm.tmux_status_snapshot():
+            self.assertTrue(swarm.tmux_window_exists("swarm", "w1"))
+
+        self.assertEqual(mock_run.call_args_list[1],
+                         call(["tmux", "has-session", "-t", "swarm:w1"], capture_output=True))
+
+    @patch('subprocess.run')
+    def test_snapshot_ends_with_context(self, mock_run):
+        """Test tmux_window_exists probes live again after the snapshot."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        with swarm.tmux_status_snapshot():
+            self.assertFalse(swarm.tmux_window_exists("swarm", "w1"))
+
+        mock_run.return_value = MagicMock(returncode=0)
+        self.assertTrue(swarm.tmux_window_exists("swarm", "w1"))
+        self.assertIsNone(swarm._tmux_windows_snapshot)
+
+    @patch('subprocess.run')
+    def test_disabled_snapshot_uses_has_session(self, mock_run):
+        """Test tmux_status_snapshot(False) leaves single-worker probes alone."""
+        mock_run.return_value = MagicMock(returncode=0)
+
+        with swarm.tmux_status_snapshot(False):
+            self.assertTrue(swarm.tmux_window_exists("swarm", "w1"))
+
+        mock_run.assert_called_once_with(
+            ["tmux", "has-session", "-t", "swarm:w1"], capture_output=True)
+
+
+class TestStatusCache(unittest.TestCase):
+    """Test the status cache shared between swarm processes."""
+
+    LISTING = "swarm\tw1\t%1\t100\t0\n"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = Path(self.temp_dir.name) / "status.cache"
+        self.now = 1000.0
+        self.patches = [
+            patch.object(swarm, 'STATUS_CACHE_FILE', self.cache_file),
+            patch.object(swarm, 'STATUS_CACHE_TTL', "1"),
+            patch.object(swarm, '_status_cache_invalidated', {}),
+            patch('time.time', side_effect=lambda: self.now),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        self.temp_dir.cleanup()
+
+    def listing(self, stdout=LISTING):
+        return MagicMock(returncode=0, stdout=stdout, stderr="")
+
+    def exists(self, *args, **kwargs):
+        """Check a window in its own shared snapshot, as one monitor poll does."""
+        with swarm.tmux_status_snapshot(shared=True):
+            return swarm.tmux_window_exists(*args, **kwargs)
+
+    @patch('subprocess.run')
+    def test_probe_is_shared_within_ttl(self, mock_run):
+        """Test a fresh cached listing answers without running tmux."""
+        mock_run.return_value = self.listing()
+
+        self.assertTrue(self.exists("swarm", "w1"))
+        self.now += 0.9
+        self.assertTrue(self.exists("swarm", "w1"))
+        self.assertFalse(self.exists("swarm", "w2"))
+
+        self.assertEqual(mock_run.call_count, 1)
+        entry = json.loads(self.cache_file.read_text())[""]
+        self.assertEqual(entry["probed_at"], 1000.0)
+        self.assertEqual(entry["windows"], [["swarm", "w1", 100, False, "%1"]])
+
+    @patch('subprocess.run')
+    def test_cached_listing_keeps_every_pane(self, mock_run):
+        """Test a cached listing still holds all panes of a split window."""
+        mock_run.return_value = self.listing("swarm\tw1\t%1\t100\t0\nswarm\tw1\t%2\t101\t0\n")
+
+        self.assertTrue(self.exists("swarm", "w1", pane_id="%2"))
+        self.assertTrue(self.exists("swarm", "w1", pane_id="%1"))
+
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch('subprocess.run')
+    def test_stale_listing_is_probed_again(self, mock_run):
+        """Test staleness is bounded by the TTL."""
+        mock_run.return_value = self.listing()
+        self.exists("swarm", "w1")
+
+        self.now += 1.5
+        mock_run.return_value = self.listing("")
+        self.assertFalse(self.exists("swarm", "w1"))
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch('subprocess.run')
+    def test_listing_from_the_future_is_ignored(self, mock_run):
+        """Test a clock step backwards does not extend a listing's life."""
+        mock_run.return_value = self.listing()
+        self.exists("swarm", "w1")
+
+        self.now -= 60
+        self.exists("swarm", "w1")
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch('subprocess.run')
+    def test_sockets_are_cached_separately(self, mock_run):
+        """Test each socket has its own listing."""
+        mock_run.side_effect = [self.listing(), self.listing("")]
+
+        self.assertTrue(self.exists("swarm", "w1"))
+        self.assertFalse(self.exists("swarm", "w1", socket="other"))
+
+        self.assertEqual(sorted(json.loads(self.cache_file.read_text())), ["", "other"])
+
+    @patch('subprocess.run')
+    def test_window_changes_invalidate(self, mock_run):
+        """Test creating or killing a window drops the cached listing."""
+        mock_run.return_value = self.listing("")
+        self.assertFalse(self.exists("swarm", "w1"))
+
+        swarm.create_tmux_window("swarm", "w1", Path("/tmp"), ["true"])
+        self.assertFalse(self.cache_file.exists())
+
+        mock_run.return_value = self.listing()
+        self.assertTrue(self.exists("swarm", "w1"))
+
+    @patch('subprocess.run')
+    def test_listing_older_than_own_change_is_ignored(self, mock_run):
+        """Test a listing written by another process before our change is not used."""
+        mock_run.return_value = self.listing("")
+        self.exists("swarm", "w1")
+        cached = self.cache_file.read_text()
+
+        self.now += 0.1
+        swarm.invalidate_status_cache()
+        self.cache_file.write_text(cached)  # a concurrent writer's older probe
+
+        mock_run.return_value = self.listing()
+        self.assertTrue(self.exists("swarm", "w1"))
+
+    @patch('subprocess.run')
+    def test_interactive_checks_ask_tmux(self, mock_run):
+        """Test checks outside a shared snapshot ignore a fresh cached listing."""
+        mock_run.return_value = self.listing()
+        self.assertTrue(self.exists("swarm", "w1"))
+
+        mock_run.return_value = None
+        mock_run.side_effect = [MagicMock(returncode=1), self.listing("")]
+        self.assertFalse(swarm.tmux_window_exists("swarm", "w1"))
+        with swarm.tmux_status_snapshot():
+            self.assertFalse(swarm.tmux_window_exists("swarm", "w1"))
+        self.assertEqual(mock_run.call_count, 3)
+
+    @patch('subprocess.run')
+    def test_failed_listing_is_not_cached(self, mock_run):
+        """Test has-session is used and nothing cached when tmux cannot be listed."""
+        mock_run.side_effect = [
+            MagicMock(returncode=1, stdout="", stderr="unexpected\n"),
+            MagicMock(returncode=0),
+        ]
+
+        self.assertTrue(self.exists("swarm", "w1"))
+        self.assertFalse(self.cache_file.exists())
+
+    @patch('subprocess.run')
+    def test_corrupt_cache_is_ignored(self, mock_run):
+        """Test an unreadable cache file is treated as empty."""
+        self.cache_file.write_text("{not json")
+        mock_run.return_value = self.listing()
+
+        self.assertTrue(self.exists("swarm", "w1"))
+        self.assertIn("probed_at", self.cache_file.read_text())
+
+    def test_invalid_ttl_exits(self):
+        """Test a malformed SWARM_STATUS_CACHE_TTL is reported."""
+        with patch.object(swarm, 'STATUS_CACHE_TTL', "soon"), \
+             patch('sys.stderr') as mock_stderr:
+            with self.assertRaises(SystemExit) as ctx:
+                swarm.get_status_cache_ttl()
+        self.assertEqual(ctx.exception.code, 1)
+
+
+class TestRunParallel(unittest.TestCase):
+    """Test the run_parallel fan-out helper."""
+
+    def test_results_in_item_order(self):
+        """Test results follow the item order, not completion order."""
+        import time as real_time
+
+        def work(n):
+            real_time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        results = swarm.run_parallel([1, 2, 3, 4], work, parallel=4)
+
+        self.assertEqual(results, [(10, None), (20, None), (30, None), (40, None)])
+
+    def test_errors_are_returned_per_item(self):
+        """Test an exception for one item does not stop the others."""
+        def work(n):
+            if n == 2:
+                raise ValueError("bad item")
+            return n
+
+        results = swarm.run_parallel([1, 2, 3], work, parallel=2)
+
+        self.assertEqual(results[0], (1, None))
+        self.assertIsNone(results[1][0])
+        self.assertIsInstance(results[1][1], ValueError)
+        self.assertEqual(results[2], (3, None))
+
+    def test_concurrency_is_bounded(self):
+        """Test no more than `parallel` calls run at once."""
+        import threading
+        import time as real_time
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def work(n):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            real_time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+        swarm.run_parallel(list(range(12)), work, parallel=3)
+
+        self.assertEqual(peak[0], 3)
+
+    def test_parallel_one_runs_inline(self):
+        """Test parallel=1 runs on the calling thread."""
+        import threading
+        threads = swarm.run_parallel([1, 2], lambda n: threading.current_thread(), parallel=1)
+
+        self.assertEqual({t for t, _ in threads}, {threading.current_thread()})
+
+    def test_describe_error_uses_tmux_stderr(self):
+        """Test a failed tmux command is described by its stderr."""
+        error = subprocess.CalledProcessError(1, ["tmux"], b"", b"can't find window: w\n")
+
+        self.assertEqual(swarm.describe_error(error), "can't find window: w")
+        self.assertEqual(swarm.describe_error(OSError("boom")), "boom")
+
+
 class TestUpdateWorker(unittest.TestCase):
     """Test the update_worker method of State (atomic updates)."""
 
@@ -622,7 +1047,7 @@ class TestRefreshWorkerStatus(unittest.TestCase):
         result = swarm.refresh_worker_status(worker)
 
         self.assertEqual(result, "running")
-        mock_exists.assert_called_once_with("swarm", "w1", None)
+        mock_exists.assert_called_once_with("swarm", "w1", None, pane_id=None)
 
     @patch('swarm.tmux_window_exists')
     def test_refresh_tmux_worker_stopped(self, mock_exists):
@@ -710,7 +1135,7 @@ class TestRefreshWorkerStatus(unittest.TestCase):
         result = swarm.refresh_worker_status(worker)
 
         self.assertEqual(result, "running")
-        mock_exists.assert_called_once_with("swarm", "w1", "custom-socket")
+        mock_exists.assert_called_once_with("swarm", "w1", "custom-socket", pane_id=None)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ import sys
 import tempfile
 import time
 import unittest
+from io import StringIO
 from pathlib import Path
 from unittest.mock import patch, Mock
 from argparse import Namespace
@@ -150,6 +151,89 @@ class TestCmdKill(unittest.TestCase):
                     self.assertEqual(state.get_worker("worker1").status, "stopped")
                     self.assertEqual(state.get_worker("worker2").status, "stopped")
 
+    def test_kill_all_pid_workers_share_grace_period(self):
+        """Test --all SIGTERMs every PID worker, then waits once for all of them."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_file = Path(tmpdir) / "state.json"
+
+            with patch.object(swarm, 'SWARM_DIR', Path(tmpdir)), \
+                 patch.object(swarm, 'STATE_FILE', state_file), \
+                 patch.object(swarm, 'LOGS_DIR', Path(tmpdir) / "logs"):
+
+                state = swarm.State()
+                for i in range(20):
+                    state.add_worker(swarm.Worker(
+                        name=f"worker{i}",
+                        status="running",
+                        cmd=["sleep", "1000"],
+                        started="2026-01-10T12:00:00Z",
+                        cwd="/tmp",
+                        pid=10000 + i,
+                    ))
+
+                # Every process ignores SIGTERM
+                with patch('os.kill') as mock_kill, \
+                     patch.object(swarm, 'process_alive', return_value=True), \
+                     patch('time.sleep') as mock_sleep, \
+                     patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+
+                    args = Namespace(name=None, all=True, rm_worktree=False, parallel=4)
+                    swarm.cmd_kill(args)
+
+                # One 5 second grace period in total, not one per worker
+                self.assertEqual(mock_sleep.call_count, 50)
+                for i in range(20):
+                    self.assertIn(unittest.mock.call(10000 + i, signal.SIGTERM), mock_kill.call_args_list)
+                    self.assertIn(unittest.mock.call(10000 + i, signal.SIGKILL), mock_kill.call_args_list)
+
+                # Output follows state order
+                self.assertEqual(mock_stdout.getvalue().splitlines(),
+                                 [f"killed worker{i}" for i in range(20)])
+                state = swarm.State()
+                self.assertTrue(all(w.status == "stopped" for w in state.workers))
+
+    def test_kill_all_reports_failures_per_worker(self):
+        """Test a worker that cannot be signalled is reported and left running."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_file = Path(tmpdir) / "state.json"
+
+            with patch.object(swarm, 'SWARM_DIR', Path(tmpdir)), \
+                 patch.object(swarm, 'STATE_FILE', state_file), \
+                 patch.object(swarm, 'LOGS_DIR', Path(tmpdir) / "logs"):
+
+                state = swarm.State()
+                for name, pid in (("mine", 101), ("foreign", 102)):
+                    state.add_worker(swarm.Worker(
+                        name=name,
+                        status="running",
+                        cmd=["sleep", "1000"],
+                        started="2026-01-10T12:00:00Z",
+                        cwd="/tmp",
+                        pid=pid,
+                    ))
+
+                def fake_kill(pid, sig):
+                    if pid == 102:
+                        raise PermissionError("Operation not permitted")
+
+                with patch('os.kill', side_effect=fake_kill), \
+                     patch.object(swarm, 'process_alive', return_value=False), \
+                     patch('time.sleep'), \
+                     patch('sys.stdout', new_callable=StringIO) as mock_stdout, \
+                     patch('sys.stderr', new_callable=StringIO) as mock_stderr:
+
+                    args = Namespace(name=None, all=True, rm_worktree=False)
+                    with self.assertRaises(SystemExit) as ctx:
+                        swarm.cmd_kill(args)
+
+                self.assertEqual(ctx.exception.code, 1)
+                self.assertEqual(mock_stdout.getvalue(), "killed mine\n")
+                self.assertIn("failed to kill 'foreign': Operation not permitted",
+                              mock_stderr.getvalue())
+                state = swarm.State()
+                self.assertEqual(state.get_worker("mine").status, "stopped")
+                self.assertEqual(state.get_worker("foreign").status, "running")
+
     def test_kill_with_rm_worktree(self):
         """Test killing a worker and removing its worktree."""
         with tempfile.TemporaryDirectory() as tmpdir:
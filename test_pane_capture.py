@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Tests for incremental tmux pane capture (PaneCapture).
+
+Monitors poll a pane every few seconds; PaneCapture fetches only the
+scrollback lines added since its previous poll, together with the visible
+screen, and keeps the last `history_lines` lines itself.
+
+Test coverage:
+- content() matches a full `capture-pane -S -N` of a real pane
+- Later polls return only new lines and fetch a small span
+- Bursts larger than the span, cleared history and a full history
+  (history-limit reached) are realigned
+- Fallback to full captures when the incremental call fails
+- DoneScanner searches only new output and skips the prompt baseline
+- PromptBaseline finds the end of the prompt by line number and hash
+- detect_inactivity and check_done_pattern through a PaneCapture
+"""
+
+import re
+import subprocess
+import unittest
+from unittest.mock import MagicMock, patch
+
+import swarm
+from tmux_test_helpers import TmuxServerTestCase, skip_if_no_tmux
+
+
+@skip_if_no_tmux
+class TestPaneCaptureTmux(TmuxServerTestCase):
+    """PaneCapture against a real pane."""
+
+    server_command = ["-x", "80", "-y", "10", "bash --norc --noprofile"]
+
+    def run_in_pane(self, command: str, marker: str, window: str = "w1") -> None:
+        self.tmux("send-keys", "-t", f"s1:{window}", f"{command}; echo {marker}", "Enter")
+        self.wait_for(lambda: f"\n{marker}\n" in self.tmux("capture-pane", "-p", "-t", f"s1:{window}", "-S", "-"))
+
+    def full_capture(self, lines: int, window: str = "w1") -> str:
+        return self.tmux("capture-pane", "-p", "-t", f"s1:{window}", "-S", f"-{lines}")
+
+    def test_first_poll_matches_full_capture(self):
+        self.run_in_pane("seq 1 30", "DONE1")
+        capture = swarm.PaneCapture("s1", "w1", socket=self.socket, history_lines=100)
+
+        new_lines, screen = capture.poll()
+
+        self.assertEqual(capture.content(), self.full_capture(100))
+        self.assertEqual(screen, self.capture())
+        self.assertEqual(new_lines, list(capture.history))
+        self.assertEqual(capture.history_size, len(new_lines))
+        self.assertIsNotNone(capture.cursor_y)
+
+    def test_later_polls_return_new_lines_only(self):
+        self.run_in_pane("seq 1 30", "DONE1")
+        capture = swarm.PaneCapture("s1", "w1", socket=self.socket, history_lines=100)
+        capture.poll()
+
+        self.assertEqual(capture.poll()[0], [])
+
+        # New output pushes the top of the screen into the scrollback
+        self.run_in_pane("seq 101 105", "DONE2")
+        top = capture.screen.splitlines()[0]
+        new_lines, screen = capture.poll()
+
+        self.assertIn("101", screen)
+        self.assertEqual(new_lines[0], top)
+        self.assertEqual(len(new_lines), 7)
+        self.assertEqual(capture.content(), self.full_capture(100))
+
+    def test_span_adapts_to_output(self):
+        capture = swarm.PaneCapture("s1", "w1", socket=self.socket, history_lines=1000)
+        capture.poll()
+        self.assertEqual(capture._span, swarm.PANE_CAPTURE_MIN_SPAN)
+
+        # A burst far larger than the span is still fetched completely
+        self.run_in_pane("seq 1 400", "DONE1")
+        capture.poll()
+
+        self.assertEqual(capture.content(), self.full_capture(1000))
+        self.assertGreater(capture._span, swarm.PANE_CAPTURE_MIN_SPAN)
+
+    def test_history_limit_reached(self):
+        # history-limit applies to panes created after it is set
+        self.tmux("set-option", "-g", "history-limit", "50")
+        self.tmux("new-window", "-t", "s1", "-n", "w2", "bash --norc --noprofile")
+        self.run_in_pane("seq 1 200", "DONE1", window="w2")
+        capture = swarm.PaneCapture("s1", "w2", socket=self.socket, history_lines=100)
+        capture.poll()
+        self.assertGreaterEqual(capture.history_size, 45)
+        kept = len(capture.history)
+
+        self.run_in_pane("seq 1001 1020", "DONE2", window="w2")
+        new_lines, _ = capture.poll()
+
+        self.assertIn("1001", new_lines)
+        # The kept lines go on past what tmux still holds
+        self.assertEqual(len(capture.history), kept + len(new_lines))
+        self.assertEqual(capture.content(capture.history_size),
+                         self.full_capture(capture.history_size, window="w2"))
+
+    def test_cleared_history(self):
+        self.run_in_pane("seq 1 30", "DONE1")
+        capture = swarm.PaneCapture("s1", "w1", socket=self.socket, history_lines=100)
+        capture.poll()
+
+        self.tmux("clear-history", "-t", "s1:w1")
+        self.run_in_pane("seq 501 530", "DONE2")
+        new_lines, _ = capture.poll()
+
+        self.assertIn("515", new_lines)
+        self.assertNotIn("15", new_lines)
+
+    def test_visible_only(self):
+        self.run_in_pane("seq 1 30", "DONE1")
+        capture = swarm.PaneCapture("s1", "w1", socket=self.socket, history_lines=0)
+
+        self.assertEqual(capture.poll(), ([], self.capture()))
+        self.assertEqual(capture.content(), capture.screen)
+
+    def test_missing_window_raises(self):
+        capture = swarm.PaneCapture("s1", "missing", socket=self.socket)
+
+        with self.assertRaises(subprocess.CalledProcessError):
+            capture.poll()
+
+    def test_done_scanner(self):
+        self.run_in_pane("echo 'print ALL''_DONE when finished'", "DONE1")
+        baseline_capture = swarm.PaneCapture("s1", "w1", socket=self.socket)
+        baseline_capture.poll()
+        baseline = swarm.PromptBaseline.from_content(baseline_capture.content(),
+                                                     baseline_capture.first_line())
+        scanner = swarm.DoneScanner(re.compile("ALL_DONE"), baseline)
+        capture = swarm.PaneCapture("s1", "w1", socket=self.socket)
+
+        self.assertFalse(scanner.check(capture, capture.poll()[0]))
+        # Output fills the blank rows that were below the prompt
+        self.run_in_pane("seq 1 300", "DONE2")
+        self.assertFalse(scanner.check(capture, capture.poll()[0]))
+        self.run_in_pane("echo ALL''_DONE", "DONE3")
+        self.assertTrue(scanner.check(capture, capture.poll()[0]))
+        self.assertEqual(capture.restarts, 1)
+
+    def test_through_control_pool(self):
+        self.run_in_pane("seq 1 30", "DONE1")
+        capture = swarm.PaneCapture("s1", "w1", socket=self.socket, history_lines=100)
+
+        with swarm.tmux_control_pool():
+            capture.poll()
+
+        self.assertEqual(capture.content(), self.full_capture(100))
+
+
+class TestPaneCaptureNewLines(unittest.TestCase):
+    """Picking new lines out of a fetched span."""
+
+    def make_capture(self, history: list[str], size: int) -> swarm.PaneCapture:
+        capture = swarm.PaneCapture("s", "w", history_lines=100)
+        capture.history.extend(history)
+        capture.history_size = size
+        return capture
+
+    def test_growth_below_limit(self):
+        capture = self.make_capture(["a", "b"], 2)
+
+        self.assertEqual(capture._new_lines(4, 2000, ["a", "b", "c", "d"]), ["c", "d"])
+        self.assertEqual(capture._new_lines(2, 2000, ["a", "b"]), [])
+
+    def test_growth_beyond_span(self):
+        capture = self.make_capture(["a"], 1)
+
+        self.assertIsNone(capture._new_lines(80, 2000, [str(i) for i in range(64)]))
+
+    def test_growth_not_following_known_lines_is_aligned(self):
+        # The history was cleared and refilled beyond its old size
+        capture = self.make_capture(["a", "b"], 2)
+
+        self.assertIsNone(capture._new_lines(4, 2000, ["x", "y", "z", "w"]))
+        self.assertEqual(capture._new_lines(3, 2000, ["x", "a", "b"]), [])
+
+    def test_full_history_aligns_on_known_lines(self):
+        capture = self.make_capture(["x", "y", "z"], 2000)
+
+        self.assertEqual(capture._new_lines(1800, 2000, ["w", "x", "y", "z", "n1", "n2"]),
+                         ["n1", "n2"])
+        self.assertEqual(capture._new_lines(2000, 2000, ["x", "y", "z"]), [])
+        self.assertIsNone(capture._new_lines(2000, 2000, ["n1", "n2"]))
+
+    def test_first_poll(self):
+        capture = swarm.PaneCapture("s", "w")
+
+        self.assertIsNone(capture._new_lines(5, 2000, ["a"] * 5))
+
+
+class TestPaneCaptureFallback(unittest.TestCase):
+    """Full captures when the incremental call cannot be used."""
+
+    def test_falls_back_to_full_captures(self):
+        def mock_capture(session, window, history_lines=0, socket=None):
+            return "h1\nh2\nscreen\n" if history_lines else "screen\n"
+
+        with patch.object(swarm, 'run_tmux', return_value=MagicMock(returncode=1)), \
+             patch.object(swarm, 'tmux_capture_pane', side_effect=mock_capture):
+            capture = swarm.PaneCapture("s", "w")
+            new_lines, screen = capture.poll()
+
+        self.assertEqual(screen, "screen\n")
+        self.assertEqual(new_lines, ["h1", "h2", "screen"])
+        self.assertEqual(capture.content(), "h1\nh2\nscreen\n")
+        self.assertIsNone(capture.history_size)
+
+
+class RecordingRegex:
+    """Regex wrapper that records the texts searched."""
+
+    def __init__(self, pattern: str):
+        self.regex = re.compile(pattern)
+        self.searched = []
+
+    def search(self, text: str):
+        self.searched.append(text)
+        return self.regex.search(text)
+
+
+class TestDoneScanner(unittest.TestCase):
+    """Incremental done-pattern search."""
+
+    def setUp(self):
+        self.capture = swarm.PaneCapture("s", "w")
+        self.capture.restarts = 1
+
+    def poll(self, new_lines: list[str], screen: str) -> list[str]:
+        self.capture.history.extend(new_lines)
+        self.capture.screen = screen
+        return new_lines
+
+    def test_searches_only_new_output(self):
+        regex = RecordingRegex("/done")
+        scanner = swarm.DoneScanner(regex)
+        self.assertFalse(scanner.check(self.capture, self.poll([f"line {i}" for i in range(1000)], "$ \n")))
+
+        self.assertFalse(scanner.check(self.capture, self.poll(["new 1", "new 2"], "$ \n")))
+        self.assertTrue(scanner.check(self.capture, self.poll([], "/done\n")))
+
+        searched = regex.searched[1].split("\n")
+        self.assertEqual(len(searched), swarm.DONE_SCAN_OVERLAP_LINES + 2 + 2)
+        self.assertEqual(searched[-3:], ["new 2", "$ ", ""])
+
+    def test_match_spanning_lines(self):
+        scanner = swarm.DoneScanner(re.compile("ALL\nDONE"))
+        scanner.check(self.capture, self.poll(["x", "ALL"], ""))
+
+        self.assertTrue(scanner.check(self.capture, self.poll(["DONE"], "")))
+
+    def test_skips_baseline(self):
+        baseline = "prompt: print /done\n> \n"
+        scanner = swarm.DoneScanner(re.compile("/done"), swarm.PromptBaseline.from_content(baseline))
+
+        self.assertFalse(scanner.check(self.capture, self.poll(["prompt: print /done"], "> \n")))
+        # The prompt scrolls into the scrollback
+        self.assertFalse(scanner.check(self.capture, self.poll(["> "], "working\n")))
+        self.assertTrue(scanner.check(self.capture, self.poll(["working"], "/done\n")))
+
+    def test_baseline_ending_on_screen(self):
+        baseline = "h\nprompt /done\nmore /done"
+        scanner = swarm.DoneScanner(re.compile("/done"), swarm.PromptBaseline.from_content(baseline))
+
+        self.assertFalse(scanner.check(self.capture, self.poll(["h"], "prompt /done\nmore /done\n")))
+        self.assertFalse(scanner.check(self.capture, self.poll([], "prompt /done\nmore /done\n")))
+        # Output after the baseline on its last line
+        self.assertTrue(scanner.check(self.capture, self.poll([], "prompt /done\nmore /done /done\n")))
+
+    def test_baseline_not_a_prefix_searches_all(self):
+        scanner = swarm.DoneScanner(re.compile("/done"), swarm.PromptBaseline.from_content("prompt\n"))
+
+        self.assertTrue(scanner.check(self.capture, self.poll(["cleared", "/done"], "$ \n")))
+
+    def test_restart_searches_kept_content_again(self):
+        scanner = swarm.DoneScanner(re.compile("/done"), swarm.PromptBaseline.from_content("prompt /done\n"))
+        self.assertFalse(scanner.check(self.capture, self.poll(["prompt /done"], "$ \n")))
+
+        # Realigned from a cleared history that no longer starts with the baseline
+        self.capture.history.clear()
+        self.capture.restarts += 1
+        self.assertTrue(scanner.check(self.capture, self.poll(["/done"], "$ \n")))
+
+
+class TestPromptBaseline(unittest.TestCase):
+    """Finding the end of a prompt baseline again."""
+
+    def test_from_content(self):
+        baseline = swarm.PromptBaseline.from_content("a\nb\n> \n\n\n", first_line=10)
+
+        self.assertEqual((baseline.line, baseline.column, baseline.tail), (12, 1, 3))
+        self.assertIsNone(swarm.PromptBaseline.from_content(" \n\n"))
+
+    def test_found_at_recorded_line(self):
+        baseline = swarm.PromptBaseline.from_content("prompt\n> \n", first_line=0)
+        content = "prompt\n> working\nprompt\n>"
+
+        self.assertEqual(baseline.end_in(content, 0), len("prompt\n>"))
+
+    def test_found_after_lines_moved(self):
+        lines = [f"line {i}" for i in range(30)]
+        baseline = swarm.PromptBaseline.from_content("\n".join(lines) + "\n", first_line=0)
+        # tmux dropped the oldest 5 lines, and output followed
+        content = "\n".join(lines[5:] + ["output"])
+
+        self.assertEqual(baseline.end_in(content, 0), content.index("\noutput"))
+        self.assertEqual(baseline.end_in(content), content.index("\noutput"))
+
+    def test_not_found(self):
+        baseline = swarm.PromptBaseline.from_content("prompt\n")
+
+        self.assertEqual(baseline.end_in("cleared\n/done\n"), 0)
+        self.assertEqual(baseline.end_in(""), 0)
+
+
+class TestMonitorsUseCapture(unittest.TestCase):
+    """detect_inactivity and check_done_pattern poll a shared PaneCapture."""
+
+    def setUp(self):
+        self.worker = swarm.Worker(
+            name='w', status='running', cmd=['claude'], started='2024-01-15T10:30:00',
+            cwd='/tmp', tmux=swarm.TmuxInfo(session='s', window='w'))
+
+    def test_detect_inactivity_checks_captured_scrollback(self):
+        capture = swarm.PaneCapture("s", "w")
+        capture.history.extend(["prompt", "All tasks complete"])
+
+        with patch('swarm.refresh_worker_status', return_value='running'), \
+             patch.object(swarm.PaneCapture, 'poll', return_value=([], "$ \n")) as mock_poll, \
+             patch('swarm.tmux_capture_pane') as mock_full, \
+             patch('time.sleep'):
+            result = swarm.detect_inactivity(self.worker, timeout=60,
+                                             done_pattern="All tasks complete",
+                                             check_done_continuous=True, capture=capture)
+
+        self.assertEqual(result, "done_pattern")
+        mock_poll.assert_called_once()
+        mock_full.assert_not_called()
+
+    def test_check_done_pattern_uses_capture(self):
+        capture = swarm.PaneCapture("s", "w")
+        capture.history.extend(["All tasks complete"] + ["work"] * 1000)
+
+        with patch.object(swarm.PaneCapture, 'poll', return_value=([], "")), \
+             patch('swarm.tmux_capture_pane') as mock_full:
+            # Only the last 1000 scrollback lines are checked, as before
+            self.assertFalse(swarm.check_done_pattern(self.worker, "All tasks complete", capture=capture))
+            capture.history.append("All tasks complete")
+            self.assertTrue(swarm.check_done_pattern(self.worker, "All tasks complete", capture=capture))
+
+        mock_full.assert_not_called()
+
+    def test_check_done_pattern_capture_error(self):
+        capture = swarm.PaneCapture("s", "w")
+
+        with patch.object(swarm.PaneCapture, 'poll',
+                          side_effect=subprocess.CalledProcessError(1, 'tmux')):
+            self.assertFalse(swarm.check_done_pattern(self.worker, "x", capture=capture))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Tests for tmux worker pane logs.
+
+create_tmux_window() attaches `tmux pipe-pane` to every new window, so all
+pane output is appended to LOGS_DIR/<name>.pane.log (rotated to .1 at
+PANE_LOG_MAX_BYTES). `swarm logs` follows it and shows it after the window
+is gone.
+
+Test coverage:
+- Pane output reaches the log through a real tmux server, and rotates
+- Reading by byte offset, including across a rotation
+- Tail of a log with its rotated part
+- logs shows the pane log once the window is gone
+- logs --follow streams appended output
+- clean removes pane logs
+"""
+
+import io
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+from tmux_test_helpers import TmuxServerTestCase, TmuxTestCase, skip_if_no_tmux
+
+
+class PaneLogTestCase(TmuxTestCase):
+    """Base class: isolated SWARM_DIR and LOGS_DIR."""
+
+    def write_log(self, name: str, data: bytes, rotated: bytes = None) -> Path:
+        swarm.LOGS_DIR.mkdir(exist_ok=True)
+        path = swarm.pane_log_path(name)
+        path.write_bytes(data)
+        if rotated is not None:
+            path.with_name(path.name + ".1").write_bytes(rotated)
+        return path
+
+
+@skip_if_no_tmux
+class TestPipePane(TmuxServerTestCase):
+    """Pane output is written to the log by a real tmux server."""
+
+    def test_output_reaches_log_and_survives_window(self):
+        swarm.create_tmux_window("s1", "w2", Path("/tmp"),
+                                 ["bash", "-c", "echo first; echo '#{x}' second"],
+                                 socket=self.socket)
+        log = swarm.pane_log_path("w2")
+
+        self.wait_for(lambda: log.exists() and b"second" in log.read_bytes())
+        self.assertIn(b"first\r\n", log.read_bytes())
+        self.assertIn(b"#{x} second", log.read_bytes())
+
+    def test_log_rotates_at_size_cap(self):
+        with patch.object(swarm, 'PANE_LOG_MAX_BYTES', 2000):
+            swarm.create_tmux_window(
+                "s1", "w2", Path("/tmp"),
+                ["bash", "-c", "for i in $(seq 1 300); do echo line-$i; sleep 0.001; done; sleep 5"],
+                socket=self.socket)
+        log = swarm.pane_log_path("w2")
+        rotated = log.with_name(log.name + ".1")
+
+        self.wait_for(lambda: log.exists() and b"line-300" in log.read_bytes())
+        self.assertTrue(rotated.exists())
+        self.assertLessEqual(rotated.stat().st_size, 2000)
+        self.assertLessEqual(log.stat().st_size, 2000)
+
+
+class TestReadPaneLog(PaneLogTestCase):
+    """Byte-offset reads and tails."""
+
+    def test_reads_from_offset(self):
+        path = self.write_log("w", b"one\ntwo\n")
+
+        data, offset = swarm.read_pane_log(path)
+        self.assertEqual((data, offset), (b"one\ntwo\n", 8))
+
+        with open(path, "ab") as f:
+            f.write(b"three\n")
+        self.assertEqual(swarm.read_pane_log(path, offset), (b"three\n", 14))
+        self.assertEqual(swarm.read_pane_log(path, 14), (b"", 14))
+
+    def test_rotation_restarts_at_beginning(self):
+        path = self.write_log("w", b"x" * 100)
+
+        # The writer renamed the full log away and started a new one
+        path.rename(path.with_name(path.name + ".1"))
+        path.write_bytes(b"new\n")
+
+        self.assertEqual(swarm.read_pane_log(path, 100), (b"new\n", 4))
+
+    def test_missing_log(self):
+        self.assertEqual(swarm.read_pane_log(self.temp_dir / "missing.pane.log", 10), (b"", 0))
+
+    def test_tail_includes_rotated_part(self):
+        path = self.write_log("w", b"c\nd\n", rotated=b"a\nb\n")
+
+        self.assertEqual(swarm.tail_pane_log(path, 3), b"b\nc\nd\n")
+        self.assertEqual(swarm.tail_pane_log(path, 1), b"d\n")
+
+
+class TestLogsCommand(PaneLogTestCase):
+    """swarm logs with a pane log."""
+
+    def test_shows_pane_log_when_window_is_gone(self):
+        self.add_tmux_worker("w", session="swarm-test")
+        self.write_log("w", b"".join(b"line %d\n" % i for i in range(50)))
+
+        args = Namespace(name="w", history=False, lines=3, follow=False)
+        with patch.object(swarm, 'tmux_window_exists', return_value=False), \
+             patch.object(swarm, 'tmux_capture_pane') as mock_capture, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_logs(args)
+
+        mock_capture.assert_not_called()
+        self.assertEqual(mock_stdout.getvalue(), "line 47\nline 48\nline 49\n")
+
+    def test_live_window_is_still_captured(self):
+        self.add_tmux_worker("w", session="swarm-test")
+        self.write_log("w", b"old\n")
+
+        args = Namespace(name="w", history=False, lines=3, follow=False)
+        with patch.object(swarm, 'tmux_window_exists', return_value=True), \
+             patch.object(swarm, 'tmux_capture_pane', return_value="screen") as mock_capture, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_logs(args)
+
+        mock_capture.assert_called_once()
+        self.assertEqual(mock_stdout.getvalue(), "screen")
+
+    def test_follow_streams_new_output(self):
+        self.add_tmux_worker("w", session="swarm-test")
+        path = self.write_log("w", b"before\n")
+        appends = [b"during 1\n", b"during 2\n"]
+
+        def fake_sleep(seconds):
+            if not appends:
+                raise KeyboardInterrupt()
+            with open(path, "ab") as f:
+                f.write(appends.pop(0))
+
+        args = Namespace(name="w", history=False, lines=1000, follow=True)
+        with patch.object(swarm, 'tmux_capture_pane') as mock_capture, \
+             patch('time.sleep', side_effect=fake_sleep), \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_logs(args)
+
+        mock_capture.assert_not_called()
+        self.assertEqual(mock_stdout.getvalue(), "before\nduring 1\nduring 2\n")
+
+    def test_follow_switches_to_new_file_after_rotation(self):
+        self.add_tmux_worker("w", session="swarm-test")
+        path = self.write_log("w", b"a\n")
+        steps = ["rotate", "append"]
+
+        def fake_sleep(seconds):
+            if not steps:
+                raise KeyboardInterrupt()
+            step = steps.pop(0)
+            if step == "rotate":
+                with open(path, "ab") as f:
+                    f.write(b"b\n")
+                path.rename(path.with_name(path.name + ".1"))
+                path.write_bytes(b"c\n")
+            else:
+                with open(path, "ab") as f:
+                    f.write(b"d\n")
+
+        args = Namespace(name="w", history=False, lines=1000, follow=True)
+        with patch('time.sleep', side_effect=fake_sleep), \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_logs(args)
+
+        self.assertEqual(mock_stdout.getvalue(), "a\nb\nc\nd\n")
+
+    def test_clean_removes_pane_logs(self):
+        self.add_tmux_worker("w", session="swarm-test")
+        path = self.write_log("w", b"x\n", rotated=b"y\n")
+
+        args = Namespace(name="w", all=False, rm_worktree=False)
+        with patch.object(swarm, 'refresh_worker_status', return_value="stopped"), \
+             patch('sys.stdout', new_callable=io.StringIO):
+            swarm.cmd_clean(args)
+
+        self.assertFalse(path.exists())
+        self.assertFalse(path.with_name(path.name + ".1").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
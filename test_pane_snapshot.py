@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Tests for pane snapshots published by monitors.
+
+The ralph and heartbeat monitors publish each pane capture to
+SNAPSHOTS_DIR/<name>; peek, logs and ralph status print a fresh enough
+snapshot instead of capturing the pane again.
+
+Test coverage:
+- Publish/read round trip, rendered like capture-pane output
+- Stale snapshots, snapshots of another pane, and snapshots without
+  enough scrollback are not used
+- SWARM_SNAPSHOT_MAX_AGE=0 disables them; invalid values are rejected
+- detect_inactivity publishes its captures
+- peek, logs and ralph status read them instead of calling tmux
+"""
+
+import io
+import json
+import unittest
+from argparse import Namespace
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import make_worker
+from tmux_test_helpers import TmuxTestCase
+
+
+class SnapshotTestCase(TmuxTestCase):
+    """Base class: isolated SWARM_DIR and SNAPSHOTS_DIR."""
+
+    def setUp(self):
+        super().setUp()
+        self.worker = make_worker("dev", session="swarm")
+
+    def extra_patches(self) -> list:
+        return super().extra_patches() + [
+            patch.object(swarm, 'SNAPSHOTS_DIR', self.temp_dir / "snapshots"),
+            patch.object(swarm, 'PEEK_CURSORS_DIR', self.temp_dir / "peek"),
+            patch.object(swarm, 'SNAPSHOT_MAX_AGE', "5"),
+        ]
+
+    def age_snapshot(self, seconds: float) -> None:
+        path = swarm.snapshot_path("dev")
+        data = json.loads(path.read_text())
+        data["captured_at"] = (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+        path.write_text(json.dumps(data))
+
+
+class TestSnapshotFiles(SnapshotTestCase):
+    """Publishing and reading snapshots."""
+
+    def test_round_trip(self):
+        swarm.publish_snapshot(self.worker, "a\nb\n\n", ["h1", "h2", "h3"], 3)
+
+        snapshot = swarm.read_snapshot(self.worker, 2)
+
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(snapshot["screen"], "a\nb\n\n")
+        self.assertEqual(len(snapshot["hash"]), 32)
+        self.assertEqual(swarm.snapshot_content(snapshot, 2), "h2\nh3\na\nb\n\n")
+        self.assertEqual(swarm.snapshot_content(snapshot), "a\nb\n\n")
+        self.assertEqual(swarm.snapshot_capture(snapshot, 30), (3, ["h1", "h2", "h3"], ["a", "b", ""]))
+        self.assertEqual(list((self.temp_dir / "snapshots").iterdir()), [swarm.snapshot_path("dev")])
+
+    def test_history_is_bounded(self):
+        history = [str(i) for i in range(500)]
+
+        swarm.publish_snapshot(self.worker, "s\n", history, 500)
+
+        snapshot = json.loads(swarm.snapshot_path("dev").read_text())
+        self.assertEqual(snapshot["history"], history[-swarm.SNAPSHOT_HISTORY_LINES:])
+
+    def test_stale_snapshot_is_ignored(self):
+        swarm.publish_snapshot(self.worker, "a\n", [], 0)
+        self.age_snapshot(10)
+
+        self.assertIsNone(swarm.read_snapshot(self.worker))
+
+    def test_other_pane_is_ignored(self):
+        swarm.publish_snapshot(self.worker, "a\n", [], 0)
+
+        respawned = swarm.Worker(
+            name="dev", status="running", cmd=["claude"], started="2026-01-11T08:00:00",
+            cwd="/tmp", tmux=swarm.TmuxInfo(session="swarm", window="dev"))
+        other_socket = swarm.Worker(
+            name="dev", status="running", cmd=["claude"], started="2026-01-10T12:00:00",
+            cwd="/tmp", tmux=swarm.TmuxInfo(session="swarm", window="dev", socket="test"))
+        self.assertIsNone(swarm.read_snapshot(respawned))
+        self.assertIsNone(swarm.read_snapshot(other_socket))
+
+    def test_missing_scrollback_is_not_made_up(self):
+        # Heartbeat snapshots have the screen only
+        swarm.publish_snapshot(self.worker, "a\n")
+
+        self.assertIsNotNone(swarm.read_snapshot(self.worker))
+        self.assertIsNone(swarm.read_snapshot(self.worker, 30))
+
+        # A pane with a short history is fully covered
+        swarm.publish_snapshot(self.worker, "a\n", ["h1"], 1)
+        self.assertIsNotNone(swarm.read_snapshot(self.worker, 30))
+
+    def test_disabled(self):
+        swarm.publish_snapshot(self.worker, "a\n", [], 0)
+
+        with patch.object(swarm, 'SNAPSHOT_MAX_AGE', "0"):
+            self.assertIsNone(swarm.read_snapshot(self.worker))
+
+    def test_invalid_max_age(self):
+        with patch.object(swarm, 'SNAPSHOT_MAX_AGE', "soon"), \
+             patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            with self.assertRaises(SystemExit):
+                swarm.get_snapshot_max_age()
+        self.assertIn("invalid SWARM_SNAPSHOT_MAX_AGE", mock_stderr.getvalue())
+
+    def test_corrupt_snapshot_is_ignored(self):
+        (self.temp_dir / "snapshots").mkdir()
+        swarm.snapshot_path("dev").write_text("{not json")
+
+        self.assertIsNone(swarm.read_snapshot(self.worker))
+
+
+class TestMonitorsPublish(SnapshotTestCase):
+    """Monitors publish what they capture."""
+
+    def test_detect_inactivity_publishes_screen_and_scrollback(self):
+        capture = swarm.PaneCapture("swarm", "dev")
+        capture.history.extend(["h1", "h2"])
+        capture.history_size = 2
+
+        with patch('swarm.refresh_worker_status', side_effect=['running', 'stopped']), \
+             patch.object(swarm.PaneCapture, 'poll', return_value=([], "screen\n")), \
+             patch('time.sleep'):
+            swarm.detect_inactivity(self.worker, timeout=60, capture=capture)
+
+        snapshot = swarm.read_snapshot(self.worker, 30)
+        self.assertEqual(swarm.snapshot_content(snapshot, 30), "h1\nh2\nscreen\n")
+
+
+class TestReadersUseSnapshots(SnapshotTestCase):
+    """peek, logs and ralph status print fresh snapshots."""
+
+    def setUp(self):
+        super().setUp()
+        self.worker = self.add_tmux_worker("dev", session="swarm")
+        swarm.publish_snapshot(self.worker, "working\n", ["h1", "h2"], 2)
+
+    def test_peek(self):
+        args = Namespace(name="dev", lines=30, all=False, since_last=False)
+        with patch.object(swarm, 'tmux_window_exists', return_value=True), \
+             patch.object(swarm, 'tmux_capture_pane') as mock_capture, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit):
+                swarm.cmd_peek(args)
+
+        mock_capture.assert_not_called()
+        self.assertEqual(mock_stdout.getvalue(), "h1\nh2\nworking\n")
+
+    def test_peek_all_since_last(self):
+        args = Namespace(name=None, lines=30, all=True, since_last=True, parallel=4)
+        with patch.object(swarm, 'tmux_window_exists', return_value=True), \
+             patch.object(swarm, 'tmux_capture_panes') as mock_capture, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit):
+                swarm.cmd_peek(args)
+
+        mock_capture.assert_not_called()
+        self.assertEqual(mock_stdout.getvalue(), "=== dev ===\nh1\nh2\nworking\n")
+
+    def test_peek_captures_when_stale(self):
+        self.age_snapshot(60)
+        args = Namespace(name="dev", lines=30, all=False, since_last=False)
+        with patch.object(swarm, 'tmux_window_exists', return_value=True), \
+             patch.object(swarm, 'tmux_capture_pane', return_value="live\n") as mock_capture, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit):
+                swarm.cmd_peek(args)
+
+        mock_capture.assert_called_once()
+        self.assertEqual(mock_stdout.getvalue(), "live\n")
+
+    def test_logs(self):
+        args = Namespace(name="dev", history=False, lines=1000, follow=False)
+        with patch.object(swarm, 'tmux_capture_pane') as mock_capture, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_logs(args)
+
+        mock_capture.assert_not_called()
+        self.assertEqual(mock_stdout.getvalue(), "working\n")
+
+    def test_ralph_status_last_output(self):
+        swarm.save_ralph_state(swarm.RalphState(
+            worker_name="dev", prompt_file="/tmp/prompt.md", max_iterations=10,
+            current_iteration=1, status="running", started="2026-01-10T12:00:00",
+            last_screen_change=(datetime.now(timezone.utc) - timedelta(seconds=120)).isoformat()))
+
+        with patch.object(swarm, 'tmux_capture_pane') as mock_capture, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_ralph_status(Namespace(name="dev"))
+
+        mock_capture.assert_not_called()
+        self.assertIn("Last output:\n  working\n", mock_stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Tests for the single-pass pattern scanner.
+
+PatternScanner finds many literal substrings and regexes in one pass over
+a text. AgentProfile uses it for the stuck, fatal and context patterns of
+a pane capture, and the heartbeat monitor for its unconsumed message.
+
+Test coverage:
+- literal_trie_regex() prefers the longest literal
+- Overlapping, nested and duplicate literals are all reported
+- Bounds and special characters
+- non_empty_line_spans()
+- Empty scanners and empty literals
+"""
+
+import random
+import re
+import unittest
+
+import swarm
+
+
+class TestLiteralTrieRegex(unittest.TestCase):
+    """Prefix trie of literals as a regex."""
+
+    def test_shared_prefixes(self):
+        self.assertEqual(swarm.literal_trie_regex(["ab", "abc"]), "ab(?:c)?")
+        self.assertEqual(swarm.literal_trie_regex(["ab", "ac"]), "a(?:b|c)")
+
+    def test_longest_match(self):
+        regex = re.compile(swarm.literal_trie_regex(["a.b", "a.bcd", "x"]))
+
+        self.assertEqual(regex.match("a.bcd").group(), "a.bcd")
+        self.assertEqual(regex.match("a.bc").group(), "a.b")
+        self.assertIsNone(regex.match("axb"))
+
+
+class TestPatternScanner(unittest.TestCase):
+    """Literals in one pass."""
+
+    def test_overlapping_literals(self):
+        scanner = swarm.PatternScanner({"she": "she", "he": "he", "hers": "hers", "h": "h"})
+
+        hits = scanner.scan("ushers")
+
+        self.assertEqual(hits[0], ("she", 1))
+        self.assertCountEqual(hits[1:], [("h", 2), ("he", 2), ("hers", 2)])
+
+    def test_duplicate_literals(self):
+        scanner = swarm.PatternScanner({"a": "err", "b": "err"})
+
+        self.assertEqual(scanner.scan("an err"), [("a", 3), ("b", 3)])
+
+    def test_special_characters(self):
+        scanner = swarm.PatternScanner({"q": "(y/n)?", "dot": "a.b"})
+
+        self.assertEqual(scanner.scan("axb (y/n)? a.b"), [("q", 4), ("dot", 11)])
+
+    def test_bounds(self):
+        scanner = swarm.PatternScanner({"ab": "ab"})
+
+        self.assertEqual(scanner.scan("ab ab ab", 1), [("ab", 3), ("ab", 6)])
+        self.assertEqual(scanner.scan("ab ab ab", 0, 7), [("ab", 0), ("ab", 3)])
+
+    def test_empty(self):
+        self.assertEqual(swarm.PatternScanner({}).scan("anything"), [])
+        self.assertEqual(swarm.PatternScanner({"e": ""}).scan("anything"), [])
+
+    def test_same_as_separate_searches(self):
+        rng = random.Random(7)
+        words = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(30)]
+        scanner = swarm.PatternScanner({str(i): w for i, w in enumerate(words)})
+
+        for _ in range(50):
+            text = "".join(rng.choice("abc\n") for _ in range(60))
+            found = {(int(name), pos) for name, pos in scanner.scan(text)}
+            expected = {(i, m.start()) for i, w in enumerate(words)
+                        for m in re.finditer(f"(?={re.escape(w)})", text)}
+            self.assertEqual(found, expected)
+
+
+class TestNonEmptyLineSpans(unittest.TestCase):
+    """Offsets of the last non-blank lines."""
+
+    def test_spans(self):
+        text = "one\n\ntwo\n  \nthree\n\n"
+
+        spans = swarm.non_empty_line_spans(text, 2)
+
+        self.assertEqual([text[s:e] for s, e in spans], ["two", "three"])
+        self.assertEqual(swarm.non_empty_line_spans("\n \n", 3), [])
+        self.assertEqual(swarm.non_empty_line_spans("only", 3), [(0, 4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
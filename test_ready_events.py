@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Tests for event-driven readiness detection.
+
+wait_for_agent_ready() matches the worker's pane log as output arrives
+and captures the screen only to confirm a match. Without a log it
+captures on an adaptive schedule that starts fast and backs off while the
+screen stays the same.
+
+Test coverage:
+- pane_output_text() turns raw terminal output into matchable text
+- Adaptive capture schedule, reset by screen changes
+- Not-ready prompts are dismissed again only after a change or a delay
+- Pane log matches trigger an immediate capture; a prompt followed by a
+  line break is not a match
+- Readiness from a real tmux pane log, with few captures
+"""
+
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+from tmux_test_helpers import TmuxServerTestCase, skip_if_no_tmux
+
+
+class FakeClock:
+    """time.time() and time.sleep() that only move when slept."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class ReadyTestCase(unittest.TestCase):
+    """Base class: fake clock and recorded captures."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.clock = FakeClock()
+        self.captures = []
+        self.screens = None
+        self.patches = [
+            patch('time.time', self.clock.time),
+            patch('time.sleep', self.clock.sleep),
+            patch('swarm.tmux_capture_pane', side_effect=self.capture),
+            patch('swarm.run_tmux'),
+        ]
+        for p in self.patches:
+            p.start()
+        self.run_tmux = swarm.run_tmux
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def capture(self, *args, **kwargs) -> str:
+        self.captures.append(round(self.clock.now - 1000.0, 3))
+        return self.screens(self.clock.now - 1000.0)
+
+    def enter_times(self) -> int:
+        return len([c for c in self.run_tmux.call_args_list if "Enter" in c.args[0]])
+
+
+class TestPaneOutputText(unittest.TestCase):
+    """Raw pane output to plain text."""
+
+    def test_colors_dropped(self):
+        self.assertEqual(swarm.pane_output_text("\x1b[1;32m> \x1b[0mhi"), "> hi")
+
+    def test_cursor_movement_starts_a_line(self):
+        self.assertEqual(swarm.pane_output_text("loading\x1b[2K\x1b[1G> "), "loading\n\n> ")
+        self.assertEqual(swarm.pane_output_text("a\r\nb\rc"), "a\n\nb\nc")
+
+    def test_osc_dropped(self):
+        self.assertEqual(swarm.pane_output_text("\x1b]0;title\x07$ "), "\n$ ")
+
+
+class TestAdaptivePolling(ReadyTestCase):
+    """Capture schedule without a pane log."""
+
+    def test_backs_off_while_unchanged(self):
+        self.screens = lambda t: "starting"
+
+        self.assertFalse(swarm.wait_for_agent_ready("s", "w", timeout=10))
+
+        self.assertEqual(self.captures[:5], [0.0, 0.05, 0.15, 0.35, 0.75])
+        self.assertEqual(self.captures[5:8], [1.55, 2.55, 3.55])
+        # Fewer captures than polling every 0.5s
+        self.assertLess(len(self.captures), 20)
+
+    def test_change_resets_interval(self):
+        self.screens = lambda t: "loading" if t < 1.5 else f"step {int(t * 100)}"
+
+        swarm.wait_for_agent_ready("s", "w", timeout=2)
+
+        after_change = [t for t in self.captures if t >= 1.5]
+        gaps = {round(b - a, 3) for a, b in zip(after_change[1:], after_change[2:])}
+        self.assertEqual(gaps, {swarm.READY_POLL_MIN_INTERVAL})
+
+    def test_ready_returns_on_first_capture(self):
+        self.screens = lambda t: "bypass permissions on"
+
+        self.assertTrue(swarm.wait_for_agent_ready("s", "w", timeout=10))
+        self.assertEqual(self.captures, [0.0])
+
+    def test_not_ready_prompt_dismissed_once_per_screen(self):
+        self.screens = lambda t: "Choose the text style"
+
+        swarm.wait_for_agent_ready("s", "w", timeout=5)
+
+        # At 0s, then not before READY_DISMISS_RETRY seconds (at 2.55s),
+        # instead of on each of the 12 captures
+        self.assertEqual(len(self.captures), 12)
+        self.assertEqual(self.enter_times(), 2)
+
+    def test_not_ready_then_ready(self):
+        self.screens = lambda t: "Select login method" if t < 0.3 else "bypass permissions on"
+
+        self.assertTrue(swarm.wait_for_agent_ready("s", "w", timeout=10))
+        self.assertEqual(self.enter_times(), 1)
+
+
+class TestPaneLogStream(ReadyTestCase):
+    """Matching output from the pane log."""
+
+    def setUp(self):
+        super().setUp()
+        self.log = self.temp_dir / "w.pane.log"
+        self.log.write_bytes(b"previous iteration: bypass permissions on\n")
+        self.writes = {}
+
+    def write_at(self, t: float, data: bytes) -> None:
+        self.writes[t] = data
+
+    def sleep_and_write(self, seconds: float) -> None:
+        before = self.clock.now - 1000.0
+        FakeClock.sleep(self.clock, seconds)
+        after = self.clock.now - 1000.0
+        for t, data in self.writes.items():
+            if before < t <= after:
+                with open(self.log, "ab") as f:
+                    f.write(data)
+
+    def test_match_in_log_captures_at_once(self):
+        self.screens = lambda t: "Claude Code v2.1.0" if t >= 3.0 else "starting"
+        self.write_at(3.0, b"\x1b[1mClaude Code\x1b[0m v2.1.0\r\n")
+
+        with patch('time.sleep', self.sleep_and_write):
+            self.assertTrue(swarm.wait_for_agent_ready("s", "w", timeout=10, log_path=self.log))
+
+        # Found within one stream read, not at the next scheduled capture
+        self.assertLess(self.captures[-1] - 3.0, swarm.READY_STREAM_INTERVAL + 0.001)
+        # Output already in the log before the wait is not matched
+        self.assertEqual(self.captures[:2], [0.0, 0.1])
+
+    def test_match_across_reads(self):
+        self.screens = lambda t: "bypass permissions on" if t >= 2.0 else "starting"
+        self.write_at(1.99, b"bypass perm")
+        self.write_at(2.0, b"issions on\n")
+
+        with patch('time.sleep', self.sleep_and_write):
+            self.assertTrue(swarm.wait_for_agent_ready("s", "w", timeout=10, log_path=self.log))
+
+        self.assertLess(self.captures[-1] - 2.0, swarm.READY_STREAM_INTERVAL + 0.001)
+
+    def test_prompt_before_line_break_is_not_a_match(self):
+        self.screens = lambda t: "starting"
+        with patch('time.sleep', self.sleep_and_write):
+            swarm.wait_for_agent_ready("s", "w", timeout=5, log_path=self.log)
+        scheduled, self.captures = self.captures, []
+
+        self.clock.now = 1000.0
+        self.write_at(3.0, b"\x1b[1m>\x1b[0m\r\n$\r\nbypass\r\npermissions\r\n")
+        with patch('time.sleep', self.sleep_and_write):
+            self.assertFalse(swarm.wait_for_agent_ready("s", "w", timeout=5, log_path=self.log))
+
+        # No early capture: the stream saw nothing worth confirming
+        self.assertEqual(self.captures, scheduled)
+
+    def test_missing_log_falls_back_to_polling(self):
+        self.screens = lambda t: "bypass permissions on" if t >= 1.0 else "starting"
+
+        self.assertTrue(swarm.wait_for_agent_ready("s", "w", timeout=10,
+                                                   log_path=self.temp_dir / "none.pane.log"))
+        self.assertEqual(self.captures[-1], 1.5)
+
+
+@skip_if_no_tmux
+class TestReadyFromTmux(TmuxServerTestCase):
+    """Readiness of a real tmux window through its pane log."""
+
+    def test_ready_from_pane_log(self):
+        ids = swarm.create_tmux_window(
+            "s1", "w2", Path("/tmp"), ["sh", "-c", "sleep 1.5; echo 'Claude Code v2.0.76'; cat"],
+            self.socket)
+        real_capture = swarm.tmux_capture_pane
+
+        with patch('swarm.tmux_capture_pane', side_effect=real_capture) as mock_capture:
+            start = time.time()
+            ready = swarm.wait_for_agent_ready("s1", ids.get("pane_id", "w2"), timeout=10,
+                                               socket=self.socket,
+                                               log_path=swarm.pane_log_path("w2"))
+            elapsed = time.time() - start
+
+        self.assertTrue(ready)
+        self.assertLess(elapsed, 3.0)
+        # Backed-off captures plus one to confirm, instead of one every 0.5s
+        self.assertLessEqual(mock_capture.call_count, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
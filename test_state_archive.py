@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Unit tests for the stopped-worker archive.
+
+Workers stopped for longer than SWARM_ARCHIVE_AFTER are moved by `swarm ls`
+from the state backend into ~/.swarm/archive/YYYY-MM.jsonl.gz, listed with
+`swarm ls --archived` and restored by `swarm respawn`.
+
+Test coverage:
+- Kill and ls record when a worker was first seen stopped
+- Only workers stopped longer than the archive age are archived
+- Archiving works on every state backend
+- ls --archived lists archived workers, latest record per name
+- respawn restores an archived worker
+- Damaged archive files are read up to the damage
+"""
+
+import argparse
+import gzip
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import StateTestCase, make_worker
+
+
+def ls_args(**kwargs) -> argparse.Namespace:
+    defaults = {"format": "names", "status": "all", "tag": None, "archived": False}
+    defaults.update(kwargs)
+    return argparse.Namespace(**defaults)
+
+
+class ArchiveTestCase(StateTestCase):
+    """Base class: isolated SWARM_DIR, live status taken from the stored value."""
+
+    def extra_patches(self) -> list:
+        return [
+            patch.object(swarm, 'ARCHIVE_AFTER', "1h"),
+            patch.object(swarm, 'refresh_worker_status', side_effect=lambda w: w.status),
+        ]
+
+    def add_workers(self, *workers) -> None:
+        state = swarm.State()
+        with state.transaction() as st:
+            for worker in workers:
+                st.add_worker(worker)
+
+    def run_ls(self, **kwargs) -> list[str]:
+        out = io.StringIO()
+        with patch('sys.stdout', out):
+            swarm.cmd_ls(ls_args(**kwargs))
+        return out.getvalue().split()
+
+    def state_names(self) -> list[str]:
+        return [w.name for w in swarm.State().workers]
+
+
+class TestStoppedAt(ArchiveTestCase):
+    """The time a worker stopped is recorded once."""
+
+    def test_ls_stamps_newly_stopped_worker(self):
+        self.add_workers(make_worker("done", status="stopped"), make_worker("live", status="running"))
+
+        self.assertEqual(self.run_ls(), ["done", "live"])
+
+        state = swarm.State()
+        self.assertIn("stopped_at", state.get_worker("done").metadata)
+        self.assertNotIn("stopped_at", state.get_worker("live").metadata)
+        self.assertFalse(self.archive_dir.exists())
+
+    def test_existing_stamp_is_kept(self):
+        worker = make_worker("done", status="stopped", stopped_ago=timedelta(minutes=5))
+        self.add_workers(worker)
+
+        self.run_ls()
+
+        self.assertEqual(swarm.State().get_worker("done").metadata["stopped_at"],
+                         worker.metadata["stopped_at"])
+
+    def test_mark_stopped_sets_status_and_stamp(self):
+        self.add_workers(make_worker("w", status="running"))
+
+        state = swarm.State()
+        with state.transaction() as st:
+            swarm.mark_stopped(st, "w")
+            swarm.mark_stopped(st, "ghost")
+
+        worker = swarm.State().get_worker("w")
+        self.assertEqual(worker.status, "stopped")
+        self.assertIn("stopped_at", worker.metadata)
+
+
+class TestArchiveSweep(ArchiveTestCase):
+    """ls moves workers stopped longer than the archive age."""
+
+    def test_old_stopped_worker_is_archived(self):
+        self.add_workers(
+            make_worker("old", status="stopped", stopped_ago=timedelta(hours=2)),
+            make_worker("recent", status="stopped", stopped_ago=timedelta(minutes=5)),
+            make_worker("live", status="running"),
+        )
+
+        self.assertEqual(self.run_ls(), ["recent", "live"])
+
+        self.assertEqual(self.state_names(), ["recent", "live"])
+        archives = list(self.archive_dir.glob("*.jsonl.gz"))
+        self.assertEqual([p.name for p in archives], [f"{datetime.now():%Y-%m}.jsonl.gz"])
+        with gzip.open(archives[0], "rt") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["name"] for r in records], ["old"])
+        self.assertIn("archived_at", records[0]["metadata"])
+
+    def test_archiving_disabled(self):
+        self.add_workers(make_worker("old", status="stopped", stopped_ago=timedelta(days=30)))
+
+        with patch.object(swarm, 'ARCHIVE_AFTER', "off"):
+            self.run_ls()
+
+        self.assertEqual(self.state_names(), ["old"])
+        self.assertFalse(self.archive_dir.exists())
+
+    def test_invalid_archive_age_exits(self):
+        with patch.object(swarm, 'ARCHIVE_AFTER', "soon"), \
+             patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            with self.assertRaises(SystemExit) as ctx:
+                swarm.get_archive_after()
+        self.assertEqual(ctx.exception.code, 1)
+        self.assertIn("invalid SWARM_ARCHIVE_AFTER 'soon'", mock_stderr.getvalue())
+
+    def test_respawned_worker_is_not_archived(self):
+        old = make_worker("w", status="stopped", stopped_ago=timedelta(hours=2))
+        self.add_workers(old)
+        state = swarm.State()
+
+        # The worker is respawned after this ls loaded its stale copy
+        respawned = make_worker("w", status="running")
+        respawned.started = datetime.now().isoformat()
+        with swarm.State().transaction() as st:
+            st.remove_worker("w")
+            st.add_worker(respawned)
+
+        self.assertEqual(swarm.sweep_stopped_workers(state, state.workers), [])
+        self.assertEqual(swarm.State().get_worker("w").status, "running")
+
+
+class TestArchiveBackends(unittest.TestCase):
+    """Archiving goes through the state transaction on every backend."""
+
+    def test_all_backends(self):
+        for backend in swarm.STATE_BACKENDS:
+            with self.subTest(backend=backend):
+                case = ArchiveTestCase()
+                case.backend = backend
+                case.setUp()
+                try:
+                    case.add_workers(make_worker("old", status="stopped", stopped_ago=timedelta(hours=2)),
+                                     make_worker("live", status="running"))
+                    self.assertEqual(case.run_ls(), ["live"])
+                    self.assertEqual(case.state_names(), ["live"])
+                    self.assertEqual([w.name for w in swarm.load_archived_workers()], ["old"])
+                finally:
+                    case.tearDown()
+
+
+class TestLsArchived(ArchiveTestCase):
+    """ls --archived lists the archive."""
+
+    def test_lists_archived_workers(self):
+        self.add_workers(make_worker("a", status="stopped", stopped_ago=timedelta(hours=2), tags=["x"]),
+                         make_worker("b", status="stopped", stopped_ago=timedelta(hours=3)),
+                         make_worker("live", status="running"))
+        self.run_ls()
+
+        self.assertEqual(self.run_ls(archived=True), ["a", "b"])
+        self.assertEqual(self.run_ls(archived=True, tag="x"), ["a"])
+        self.assertEqual(self.run_ls(archived=True, status="running"), [])
+
+    def test_latest_record_per_name(self):
+        for command in (["first"], ["second"]):
+            worker = make_worker("w", status="stopped", stopped_ago=timedelta(hours=2))
+            worker.cmd = command
+            self.add_workers(worker)
+            self.run_ls()
+
+        out = io.StringIO()
+        with patch('sys.stdout', out):
+            swarm.cmd_ls(ls_args(archived=True, format="json"))
+        listed = json.loads(out.getvalue())
+        self.assertEqual([(w["name"], w["cmd"]) for w in listed], [("w", ["second"])])
+
+    def test_name_back_in_state_is_not_listed(self):
+        self.add_workers(make_worker("w", status="stopped", stopped_ago=timedelta(hours=2)))
+        self.run_ls()
+        self.add_workers(make_worker("w", status="running"))
+
+        self.assertEqual(self.run_ls(archived=True), [])
+
+    def test_damaged_archive_is_read_up_to_damage(self):
+        self.add_workers(make_worker("kept", status="stopped", stopped_ago=timedelta(hours=2)))
+        self.run_ls()
+        archive = next(self.archive_dir.glob("*.jsonl.gz"))
+        with open(archive, "ab") as f:
+            f.write(b"\x1f\x8b garbage")
+
+        with patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            names = [w.name for w in swarm.load_archived_workers()]
+
+        self.assertEqual(names, ["kept"])
+        self.assertIn("is damaged", mock_stderr.getvalue())
+
+
+class TestRespawnArchived(ArchiveTestCase):
+    """respawn restores workers from the archive."""
+
+    def test_respawn_restores_archived_worker(self):
+        worker = make_worker("w", status="stopped", stopped_ago=timedelta(hours=2), tags=["keep"])
+        worker.metadata["custom"] = "value"
+        self.add_workers(worker)
+        self.run_ls()
+        self.assertEqual(self.state_names(), [])
+
+        args = argparse.Namespace(name="w", clean_first=False)
+        with patch.object(swarm, 'spawn_process', return_value=4321), \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_respawn(args)
+
+        self.assertIn("respawned w (pid: 4321)", mock_stdout.getvalue())
+        restored = swarm.State().get_worker("w")
+        self.assertEqual(restored.status, "running")
+        self.assertEqual(restored.pid, 4321)
+        self.assertEqual(restored.tags, ["keep"])
+        self.assertEqual(restored.metadata, {"custom": "value"})
+        self.assertEqual(self.run_ls(archived=True), [])
+
+    def test_respawn_unknown_worker_still_fails(self):
+        args = argparse.Namespace(name="ghost", clean_first=False)
+        with patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            with self.assertRaises(SystemExit):
+                swarm.cmd_respawn(args)
+        self.assertIn("worker 'ghost' not found", mock_stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Unit tests for the in-process state cache and the worker name index.
+
+Loading an unchanged state.json reuses the already-decoded workers (keyed on
+the file's inode, mtime and size), and State.get_worker() looks workers up
+through a name index instead of scanning the list.
+
+Test coverage:
+- Unchanged state file is not parsed again
+- Any write (in-process or not) invalidates the cache
+- Freshly written files are not cached (timestamp granularity)
+- Cached workers are copied, so changes do not leak between State objects
+- get_worker() stays correct across list mutations
+"""
+
+import json
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import StateTestCase, make_worker
+
+
+class StateCacheTestCase(StateTestCase):
+    """Base class: isolated SWARM_DIR with the json backend."""
+
+    def write_state(self, workers, age: float = 10.0) -> None:
+        """Save workers and backdate the file so it is old enough to cache."""
+        state = swarm.State()
+        state.workers = workers
+        state.save()
+        past = time.time() - age
+        os.utime(self.state_file, (past, past))
+
+    def count_parses(self):
+        """Patch Worker.from_dict to count decoded workers."""
+        calls = []
+        original = swarm.Worker.from_dict
+
+        def tracking(d):
+            calls.append(d["name"])
+            return original(d)
+
+        return calls, patch.object(swarm.Worker, 'from_dict', side_effect=tracking)
+
+
+class TestStateCache(StateCacheTestCase):
+    """Loads of an unchanged state file skip parsing."""
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        self.write_state([make_worker(f"w{i}") for i in range(20)])
+        swarm.State()  # populate the cache
+
+        calls, from_dict_patch = self.count_parses()
+        with from_dict_patch, patch('json.load') as json_load:
+            for _ in range(10):
+                state = swarm.State()
+                self.assertEqual(len(state.workers), 20)
+
+        self.assertEqual(calls, [])
+        json_load.assert_not_called()
+
+    def test_generation_is_cached(self):
+        self.write_state([make_worker("a")])
+        generation = swarm.State().generation
+
+        self.assertEqual(swarm.State().generation, generation)
+
+    def test_write_invalidates_cache(self):
+        self.write_state([make_worker("a")])
+        swarm.State()
+
+        swarm.State().add_worker(make_worker("b"))
+
+        self.assertEqual([w.name for w in swarm.State().workers], ["a", "b"])
+
+    def test_external_write_invalidates_cache(self):
+        self.write_state([make_worker("a")])
+        swarm.State()
+
+        # Another process replaces the file with a different document
+        data = {"generation": 7, "workers": [make_worker("other").to_dict()]}
+        tmp_path = self.state_file.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, self.state_file)
+
+        state = swarm.State()
+        self.assertEqual([w.name for w in state.workers], ["other"])
+        self.assertEqual(state.generation, 7)
+
+    def test_fresh_file_is_not_cached(self):
+        state = swarm.State()
+        state.workers = [make_worker("a")]
+        state.save()  # mtime is now
+
+        swarm.State()
+        self.assertNotIn(self.state_file, swarm._state_cache)
+
+        calls, from_dict_patch = self.count_parses()
+        with from_dict_patch:
+            swarm.State()
+        self.assertEqual(calls, ["a"])
+
+    def test_cached_workers_are_copies(self):
+        self.write_state([make_worker("a")])
+        swarm.State()
+
+        first = swarm.State()
+        first.get_worker("a").status = "stopped"
+        second = swarm.State()
+
+        self.assertEqual(second.get_worker("a").status, "running")
+        self.assertIsNot(first.get_worker("a"), second.get_worker("a"))
+
+    def test_cache_is_per_state_file(self):
+        self.write_state([make_worker("a")])
+        swarm.State()
+
+        other_file = self.temp_dir / "other.json"
+        with patch.object(swarm, 'STATE_FILE', other_file):
+            self.assertEqual(swarm.State().workers, [])
+
+
+class TestGetWorkerIndex(StateCacheTestCase):
+    """get_worker() uses a name index that follows list changes."""
+
+    def test_lookup(self):
+        self.write_state([make_worker(f"w{i}") for i in range(100)])
+        state = swarm.State()
+
+        self.assertEqual(state.get_worker("w57").name, "w57")
+        self.assertIsNone(state.get_worker("missing"))
+
+    def test_first_duplicate_wins(self):
+        state = swarm.State()
+        first = make_worker("dup")
+        state.workers = [first, make_worker("dup", status="stopped")]
+
+        self.assertIs(state.get_worker("dup"), first)
+
+    def test_follows_append_and_remove(self):
+        state = swarm.State()
+        state.workers = [make_worker("a")]
+        self.assertIsNotNone(state.get_worker("a"))
+
+        state.workers.append(make_worker("b"))
+        self.assertEqual(state.get_worker("b").name, "b")
+
+        state.workers.remove(state.get_worker("a"))
+        self.assertIsNone(state.get_worker("a"))
+        self.assertEqual(state.get_worker("b").name, "b")
+
+    def test_follows_in_place_replacement(self):
+        state = swarm.State()
+        state.workers = [make_worker("a"), make_worker("b")]
+        self.assertIsNotNone(state.get_worker("a"))
+
+        state.workers[0] = make_worker("c")
+
+        self.assertEqual(state.get_worker("b").name, "b")
+        self.assertIsNone(state.get_worker("a"))
+
+    def test_follows_mutations(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.add_worker(make_worker("b"))
+        state.update_worker("a", status="stopped")
+        state.remove_worker("b")
+
+        self.assertEqual(state.get_worker("a").status, "stopped")
+        self.assertIsNone(state.get_worker("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,8 @@ Test coverage:
 - Exclusive lock prevents simultaneous file access
 - Concurrent state updates preserve all changes
 - Lock is released even if exception occurs
+- Readers load atomic snapshots without the exclusive lock
+- State.transaction() batches mutations into one write
 - Corrupt state file recovery (backup + reset)
 """
 
@@ -26,6 +28,7 @@ from pathlib import Path
 from unittest.mock import patch
 
 import swarm
+from state_test_helpers import StateTestCase, make_worker
 
 
 class TestStateLocking(unittest.TestCase):
@@ -475,5 +478,206 @@ class TestCrashSafeWrites(unittest.TestCase):
         self.assertEqual(data['workers'][0]['name'], 'existing-worker')
 
 
+class TestLockFreeReads(StateTestCase):
+    """Readers load generation-stamped snapshots without the exclusive lock."""
+
+    def test_save_increments_generation(self):
+        state = swarm.State()
+        self.assertEqual(state.generation, 0)
+
+        state.add_worker(make_worker("a"))
+        state.update_worker("a", status="stopped")
+
+        with open(self.state_file) as f:
+            self.assertEqual(json.load(f)["generation"], 2)
+        self.assertEqual(swarm.State().generation, 2)
+
+    def test_stale_save_still_advances_generation(self):
+        stale = swarm.State()
+        swarm.State().add_worker(make_worker("a"))  # generation 1
+
+        stale.save()
+
+        self.assertEqual(swarm.State().generation, 2)
+
+    def test_reader_not_blocked_by_writer_lock(self):
+        swarm.State().add_worker(make_worker("a"))
+        loaded = []
+
+        with swarm.state_file_lock():
+            reader = threading.Thread(target=lambda: loaded.append(swarm.State()))
+            reader.start()
+            reader.join(timeout=2.0)
+            self.assertFalse(reader.is_alive(), "Reader blocked on the writer's lock")
+
+        self.assertEqual([w.name for w in loaded[0].workers], ["a"])
+
+    def test_sharded_reader_waits_for_writer(self):
+        with patch.object(swarm, 'STATE_BACKEND', "sharded"):
+            swarm.State().add_worker(make_worker("a"))
+            loaded = []
+
+            with swarm.state_file_lock():
+                reader = threading.Thread(target=lambda: loaded.append(swarm.State()))
+                reader.start()
+                reader.join(timeout=0.3)
+                # Shared lock: a multi-file snapshot is never read mid-write
+                self.assertTrue(reader.is_alive())
+            reader.join(timeout=2.0)
+
+            self.assertEqual([w.name for w in loaded[0].workers], ["a"])
+
+    def test_concurrent_readers_during_writer_loop(self):
+        """50 readers always see complete, monotonically advancing snapshots."""
+        state = swarm.State()
+        state.workers = [make_worker(f"w{i}", "g1") for i in range(20)]
+        state.save()
+
+        stop = threading.Event()
+        errors = []
+        reads = []
+
+        def writer():
+            try:
+                for _ in range(20):
+                    current = swarm.State()
+                    status = f"g{current.generation + 1}"
+                    for worker in current.workers:
+                        worker.status = status
+                    current.save()
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+            finally:
+                stop.set()
+
+        def reader():
+            last_generation = 0
+            count = 0
+            try:
+                while not stop.is_set() or count == 0:
+                    snapshot = swarm.State()
+                    statuses = {w.status for w in snapshot.workers}
+                    if len(snapshot.workers) != 20 or statuses != {f"g{snapshot.generation}"}:
+                        errors.append(f"torn snapshot: {snapshot.generation} {statuses}")
+                    if snapshot.generation < last_generation:
+                        errors.append(f"generation went back: {last_generation} -> {snapshot.generation}")
+                    last_generation = snapshot.generation
+                    count += 1
+                    time.sleep(0.001)  # Let the writer get the GIL
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+            reads.append(count)
+
+        with patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            threads = [threading.Thread(target=reader) for _ in range(50)]
+            threads.append(threading.Thread(target=writer))
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=60)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(reads), 50)
+        self.assertNotIn("corrupt", mock_stderr.getvalue())
+        self.assertEqual(swarm.State().generation, 21)
+
+
+class TestStateTransaction(StateTestCase):
+    """State.transaction() holds the lock once and writes once."""
+
+    def setUp(self):
+        super().setUp()
+        state = swarm.State()
+        state.workers = [make_worker(f"w{i}") for i in range(5)]
+        state.save()
+
+    def count_writes(self):
+        """Patch os.replace to count writes of the state file."""
+        writes = []
+        original_replace = os.replace
+
+        def track_replace(src, dst):
+            if Path(dst) == self.state_file:
+                writes.append(dst)
+            return original_replace(src, dst)
+
+        return writes, patch('os.replace', side_effect=track_replace)
+
+    def test_many_mutations_write_once(self):
+        state = swarm.State()
+        writes, replace_patch = self.count_writes()
+
+        with replace_patch:
+            with state.transaction() as st:
+                for i in range(4):
+                    st.remove_worker(f"w{i}")
+                st.update_worker("w4", status="stopped")
+                st.add_worker(make_worker("new"))
+
+        self.assertEqual(len(writes), 1)
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], ["w4", "new"])
+        self.assertEqual(loaded.get_worker("w4").status, "stopped")
+
+    def test_transaction_applies_to_current_state(self):
+        stale = swarm.State()
+        swarm.State().add_worker(make_worker("concurrent"))
+
+        with stale.transaction() as st:
+            st.update_worker("w0", status="stopped")
+
+        loaded = swarm.State()
+        self.assertIsNotNone(loaded.get_worker("concurrent"))
+        self.assertEqual(loaded.get_worker("w0").status, "stopped")
+
+    def test_exception_discards_changes(self):
+        state = swarm.State()
+        writes, replace_patch = self.count_writes()
+
+        with replace_patch, self.assertRaises(ValueError):
+            with state.transaction() as st:
+                st.remove_worker("w0")
+                raise ValueError("abort")
+
+        self.assertEqual(writes, [])
+        self.assertIsNotNone(swarm.State().get_worker("w0"))
+
+    def test_no_mutations_no_write(self):
+        writes, replace_patch = self.count_writes()
+
+        with replace_patch:
+            with swarm.State().transaction():
+                pass
+
+        self.assertEqual(writes, [])
+
+    def test_nested_transaction_joins_outer(self):
+        state = swarm.State()
+        writes, replace_patch = self.count_writes()
+
+        with replace_patch:
+            with state.transaction() as outer:
+                outer.remove_worker("w0")
+                with outer.transaction() as inner:
+                    inner.remove_worker("w1")
+
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(len(swarm.State().workers), 3)
+
+    def test_sharded_transaction_writes_through(self):
+        with patch.object(swarm, 'STATE_BACKEND', "sharded"):
+            state = swarm.State()  # migrates the five workers
+            with state.transaction() as st:
+                st.remove_worker("w0")
+                st.update_worker("w1", status="stopped")
+                # Written through before the block ends (State() here would
+                # wait on the lock this transaction holds)
+                self.assertFalse(swarm.ShardedStateStore().shard_path("w0").exists())
+
+            loaded = swarm.State()
+            self.assertEqual(len(loaded.workers), 4)
+            self.assertEqual(loaded.get_worker("w1").status, "stopped")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""Unit tests for the journal (append-only) state backend.
+
+With SWARM_STATE_BACKEND=journal, state.json is a checkpoint and each
+mutation appends one JSON line to ~/.swarm/state.journal. Ralph and
+heartbeat state are journaled the same way, next to their state files.
+
+Test coverage:
+- Mutations append small records instead of rewriting state.json
+- Loading replays the journal on top of the checkpoint
+- Compaction folds the journal into the checkpoint past the size threshold
+- Torn final records are ignored and truncated by the next append
+- Ralph/heartbeat saves append only changed fields and keep concurrent edits
+- Transactions append all their records in one write
+"""
+
+import io
+import json
+import os
+import subprocess
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import StateTestCase, make_worker
+
+
+class JournalStateTestCase(StateTestCase):
+    """Base class: isolated SWARM_DIR with the journal backend enabled."""
+
+    backend = "journal"
+
+    def journal_records(self) -> list[dict]:
+        return [json.loads(line) for line in self.journal_file.read_text().splitlines()]
+
+
+class TestJournalMutations(JournalStateTestCase):
+    """Mutations are small appends replayed on load."""
+
+    def test_mutations_append_records(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.add_worker(make_worker("b"))
+        state.update_worker("a", status="stopped")
+        state.remove_worker("b")
+
+        self.assertFalse(self.state_file.exists())
+        ops = [(r["gen"], r["op"]) for r in self.journal_records()]
+        self.assertEqual(ops, [(1, "add"), (2, "add"), (3, "put"), (4, "remove")])
+
+        loaded = swarm.State()
+        self.assertEqual([(w.name, w.status) for w in loaded.workers], [("a", "stopped")])
+        self.assertEqual(loaded.generation, 4)
+
+    def test_mutation_does_not_rewrite_checkpoint(self):
+        state = swarm.State()
+        for i in range(20):
+            state.add_worker(make_worker(f"w{i}"))
+        state.save()  # checkpoint
+        checkpoint = self.state_file.read_bytes()
+
+        swarm.State().update_worker("w5", status="stopped")
+
+        self.assertEqual(self.state_file.read_bytes(), checkpoint)
+        self.assertEqual(len(self.journal_records()), 1)
+        self.assertEqual(swarm.State().get_worker("w5").status, "stopped")
+
+    def test_existing_state_json_is_first_checkpoint(self):
+        self.state_file.write_text(json.dumps({
+            "generation": 9,
+            "workers": [make_worker("legacy").to_dict()],
+        }))
+
+        state = swarm.State()
+        state.add_worker(make_worker("new"))
+
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], ["legacy", "new"])
+        self.assertEqual(self.journal_records()[0]["gen"], 10)
+
+    def test_add_existing_name_moves_to_end(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.add_worker(make_worker("b"))
+        state.add_worker(make_worker("a", status="stopped"))
+
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], ["b", "a"])
+        self.assertEqual(loaded.get_worker("a").status, "stopped")
+
+    def test_writer_catches_up_with_other_writers(self):
+        stale = swarm.State()
+        swarm.State().add_worker(make_worker("other"))
+
+        stale.add_worker(make_worker("mine"))
+
+        self.assertEqual([w.name for w in swarm.State().workers], ["other", "mine"])
+
+    def test_unsaved_changes_are_not_recorded(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state = swarm.State()
+        state.get_worker("a").tags = ["unsaved"]
+
+        state.update_worker("a", status="stopped")
+
+        self.assertEqual(swarm.State().get_worker("a").tags, [])
+
+    def test_transaction_appends_once(self):
+        state = swarm.State()
+        for name in ("a", "b", "c"):
+            state.add_worker(make_worker(name))
+        size = self.journal_file.stat().st_size
+
+        appends = []
+        original = swarm.StateJournal.append
+
+        def track_append(journal, records):
+            appends.append(len(records))
+            return original(journal, records)
+
+        with patch.object(swarm.StateJournal, 'append', track_append):
+            with state.transaction() as st:
+                st.remove_worker("a")
+                st.remove_worker("b")
+                st.update_worker("c", status="stopped")
+
+        self.assertEqual(appends, [3])
+        self.assertGreater(self.journal_file.stat().st_size, size)
+        self.assertEqual([(w.name, w.status) for w in swarm.State().workers], [("c", "stopped")])
+
+    def test_failed_transaction_appends_nothing(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        size = self.journal_file.stat().st_size
+
+        with self.assertRaises(ValueError):
+            with state.transaction() as st:
+                st.remove_worker("a")
+                raise ValueError("abort")
+
+        self.assertEqual(self.journal_file.stat().st_size, size)
+        self.assertIsNotNone(swarm.State().get_worker("a"))
+
+
+class TestJournalCompaction(JournalStateTestCase):
+    """The journal is folded into the checkpoint past the size threshold."""
+
+    def test_compaction_past_threshold(self):
+        with patch.object(swarm, 'JOURNAL_COMPACT_BYTES', 2048):
+            state = swarm.State()
+            for i in range(20):
+                state.add_worker(make_worker(f"w{i}"))
+
+        self.assertTrue(self.state_file.exists())
+        self.assertLess(self.journal_file.stat().st_size, 2048)
+        checkpoint = json.loads(self.state_file.read_text())
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], [f"w{i}" for i in range(20)])
+        self.assertEqual(loaded.generation, 20)
+        self.assertLessEqual(checkpoint["generation"], 20)
+
+    def test_records_already_in_checkpoint_are_not_replayed(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.remove_worker("a")
+        old_journal = self.journal_file.read_bytes()
+        state.add_worker(make_worker("b"))
+        state.save()  # checkpoint at generation 4, empty journal
+
+        # A reader that opened the journal before compaction replaced it
+        # sees the old records with the new checkpoint
+        self.journal_file.write_bytes(old_journal)
+
+        self.assertEqual([w.name for w in swarm.State().workers], ["b"])
+
+    def test_save_writes_checkpoint(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.workers = [make_worker("x"), make_worker("y")]
+        state.save()
+
+        self.assertEqual(self.journal_file.read_bytes(), b"")
+        data = json.loads(self.state_file.read_text())
+        self.assertEqual([w["name"] for w in data["workers"]], ["x", "y"])
+        self.assertEqual(data["generation"], 2)
+
+
+class TestJournalRecovery(JournalStateTestCase):
+    """Torn and corrupt records do not break loading."""
+
+    def test_torn_final_record_is_ignored(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        with open(self.journal_file, "ab") as f:
+            f.write(b'{"gen":2,"op":"add","worker":{"name":"b"')  # crash mid-write
+
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], ["a"])
+        self.assertEqual(loaded.generation, 1)
+
+    def test_next_append_truncates_torn_record(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        with open(self.journal_file, "ab") as f:
+            f.write(b'{"gen":2,"op":"ad')
+
+        swarm.State().add_worker(make_worker("b"))
+
+        self.assertEqual([r["gen"] for r in self.journal_records()], [1, 2])
+        self.assertEqual([w.name for w in swarm.State().workers], ["a", "b"])
+
+    def test_corrupt_record_is_skipped_with_warning(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        with open(self.journal_file, "ab") as f:
+            f.write(b"not json\n")
+        state.add_worker(make_worker("b"))
+
+        with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            loaded = swarm.State()
+
+        self.assertEqual([w.name for w in loaded.workers], ["a", "b"])
+        self.assertIn("corrupt record in state.journal", stderr.getvalue())
+
+    def test_torn_record_via_cli(self):
+        """ls works after a crash left a torn record (as in test_state_file_recovery)."""
+        state = swarm.State()
+        state.add_worker(make_worker("survivor"))
+        with open(self.journal_file, "ab") as f:
+            f.write(b'{"gen":2,"op":"remove","na')
+
+        env = os.environ.copy()
+        env["SWARM_DIR"] = str(self.temp_dir)
+        env["SWARM_STATE_BACKEND"] = "journal"
+        result = subprocess.run(
+            [str(Path(__file__).parent / "swarm.py"), "ls", "--format", "names"],
+            capture_output=True, text=True, env=env,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ["survivor"])
+
+
+class TestJournaledDocuments(JournalStateTestCase):
+    """Ralph and heartbeat state are journaled as changed fields."""
+
+    def make_ralph_state(self) -> swarm.RalphState:
+        return swarm.RalphState(worker_name="agent", prompt_file="PROMPT.md", max_iterations=10)
+
+    def ralph_journal(self) -> Path:
+        return swarm.RALPH_DIR / "agent" / "state.journal"
+
+    def test_first_save_writes_checkpoint(self):
+        swarm.save_ralph_state(self.make_ralph_state())
+
+        self.assertTrue(swarm.get_ralph_state_path("agent").exists())
+        self.assertFalse(self.ralph_journal().exists())
+
+    def test_updates_append_changed_fields(self):
+        ralph_state = self.make_ralph_state()
+        swarm.save_ralph_state(ralph_state)
+        checkpoint = swarm.get_ralph_state_path("agent").read_bytes()
+
+        ralph_state.last_screen_change = "2026-01-01T00:00:02+00:00"
+        swarm.save_ralph_state(ralph_state)
+        ralph_state.last_screen_change = "2026-01-01T00:00:04+00:00"
+        swarm.save_ralph_state(ralph_state)
+
+        self.assertEqual(swarm.get_ralph_state_path("agent").read_bytes(), checkpoint)
+        records = [json.loads(l) for l in self.ralph_journal().read_text().splitlines()]
+        self.assertEqual(records, [
+            {"set": {"last_screen_change": "2026-01-01T00:00:02+00:00"}},
+            {"set": {"last_screen_change": "2026-01-01T00:00:04+00:00"}},
+        ])
+        loaded = swarm.load_ralph_state("agent")
+        self.assertEqual(loaded.last_screen_change, "2026-01-01T00:00:04+00:00")
+
+    def test_unchanged_save_appends_nothing(self):
+        ralph_state = self.make_ralph_state()
+        swarm.save_ralph_state(ralph_state)
+        swarm.save_ralph_state(ralph_state)
+
+        self.assertFalse(self.ralph_journal().exists())
+
+    def test_concurrent_pause_is_kept(self):
+        monitor_state = self.make_ralph_state()
+        swarm.save_ralph_state(monitor_state)
+
+        # Another process pauses the loop
+        with patch.object(swarm, '_journal_views', {}):
+            paused = swarm.load_ralph_state("agent")
+            paused.status = "paused"
+            swarm.save_ralph_state(paused)
+
+        # The monitor saves its stale copy with only a timestamp changed
+        monitor_state.last_screen_change = "2026-01-01T00:00:02+00:00"
+        swarm.save_ralph_state(monitor_state)
+
+        loaded = swarm.load_ralph_state("agent")
+        self.assertEqual(loaded.status, "paused")
+        self.assertEqual(loaded.last_screen_change, "2026-01-01T00:00:02+00:00")
+
+    def test_document_compaction(self):
+        ralph_state = self.make_ralph_state()
+        swarm.save_ralph_state(ralph_state)
+
+        with patch.object(swarm, 'JOURNAL_COMPACT_BYTES', 512):
+            for i in range(30):
+                ralph_state.current_iteration = i
+                swarm.save_ralph_state(ralph_state)
+
+        self.assertLess(self.ralph_journal().stat().st_size, 512)
+        self.assertEqual(swarm.load_ralph_state("agent").current_iteration, 29)
+
+    def test_heartbeat_state_is_journaled(self):
+        heartbeat_state = swarm.HeartbeatState(worker_name="agent", interval_seconds=60)
+        swarm.save_heartbeat_state(heartbeat_state)
+        heartbeat_state.beat_count = 3
+        swarm.save_heartbeat_state(heartbeat_state)
+
+        journal = swarm.HEARTBEATS_DIR / "agent.journal"
+        self.assertEqual(json.loads(journal.read_text()), {"set": {"beat_count": 3}})
+        self.assertEqual(swarm.load_heartbeat_state("agent").beat_count, 3)
+        self.assertEqual([h.beat_count for h in swarm.list_heartbeat_states()], [3])
+
+        self.assertTrue(swarm.delete_heartbeat_state("agent"))
+        self.assertFalse(journal.exists())
+        self.assertIsNone(swarm.load_heartbeat_state("agent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
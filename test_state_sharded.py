@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Unit tests for the sharded (per-worker file) state backend.
+
+With SWARM_STATE_BACKEND=sharded, each worker is stored in its own file under
+~/.swarm/workers/ so that add/remove/update touch a single small file.
+
+Test coverage:
+- Mutations write only the affected worker's shard
+- Listing order follows insertion order across loads
+- Legacy state.json is migrated transparently
+- Corrupt shards are quarantined instead of breaking every load
+- Concurrent adds preserve all workers
+- Writes reload workers changed by another State first
+"""
+
+import io
+import json
+import os
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import StateTestCase, make_worker
+
+
+class ShardedStateTestCase(StateTestCase):
+    """Base class: isolated SWARM_DIR with the sharded backend enabled."""
+
+    backend = "sharded"
+
+    def shard_names(self) -> list[str]:
+        return sorted(p.name for p in self.workers_dir.glob("*.json"))
+
+
+class TestShardedMutations(ShardedStateTestCase):
+    """Mutations touch only the affected worker's shard."""
+
+    def test_add_worker_writes_one_shard(self):
+        state = swarm.State()
+        for i in range(50):
+            state.add_worker(make_worker(f"w{i}"))
+
+        replaced = []
+        original_replace = os.replace
+
+        def track_replace(src, dst):
+            replaced.append(Path(dst).name)
+            return original_replace(src, dst)
+
+        with patch('os.replace', side_effect=track_replace):
+            state.add_worker(make_worker("new"))
+
+        # Only the new shard and the tiny manifest are written
+        self.assertEqual(sorted(replaced), ["MANIFEST", "new.json"])
+        self.assertEqual(len(self.shard_names()), 51)
+        self.assertFalse(self.state_file.exists())
+
+    def test_update_worker_rewrites_only_its_shard(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.add_worker(make_worker("b"))
+        b_before = (self.workers_dir / "b.json").read_text()
+
+        state.update_worker("a", status="stopped")
+
+        self.assertEqual((self.workers_dir / "b.json").read_text(), b_before)
+        self.assertEqual(swarm.State().get_worker("a").status, "stopped")
+        # In-memory copy is refreshed as well
+        self.assertEqual(state.get_worker("a").status, "stopped")
+
+    def test_update_missing_worker_is_noop(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.update_worker("ghost", status="stopped")
+        self.assertEqual(self.shard_names(), ["a.json"])
+
+    def test_remove_worker_deletes_shard(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.add_worker(make_worker("b"))
+
+        state.remove_worker("a")
+
+        self.assertEqual(self.shard_names(), ["b.json"])
+        self.assertEqual([w.name for w in state.workers], ["b"])
+        self.assertEqual([w.name for w in swarm.State().workers], ["b"])
+
+    def test_insertion_order_preserved(self):
+        state = swarm.State()
+        for name in ["zeta", "alpha", "mid"]:
+            state.add_worker(make_worker(name))
+        state.remove_worker("alpha")
+        state.add_worker(make_worker("alpha"))
+
+        self.assertEqual([w.name for w in swarm.State().workers],
+                         ["zeta", "mid", "alpha"])
+
+    def test_save_replaces_registry(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.add_worker(make_worker("b"))
+
+        state.workers = [w for w in state.workers if w.name != "a"]
+        state.workers.append(make_worker("c"))
+        state.save()
+
+        self.assertEqual(self.shard_names(), ["b.json", "c.json"])
+        self.assertEqual([w.name for w in swarm.State().workers], ["b", "c"])
+
+    def test_writes_see_workers_added_by_another_state(self):
+        first = swarm.State()
+        second = swarm.State()
+        first.add_worker(make_worker("a", session="s1"))
+
+        second.add_worker(make_worker("b"))
+        self.assertEqual([w.name for w in second.workers], ["a", "b"])
+        self.assertTrue(second.session_has_workers("s1"))
+
+        first.add_worker(make_worker("c"))
+        second.update_worker("b", status="stopped")
+        self.assertIsNotNone(second.get_worker("c"))
+        self.assertEqual([w.name for w in first.workers], ["a", "b", "c"])
+
+        first.remove_worker("c")
+        second.remove_worker("a")
+        self.assertEqual([w.name for w in second.workers], ["b"])
+        self.assertEqual([w.name for w in swarm.State().workers], ["b"])
+
+    def test_worker_name_is_encoded_in_filename(self):
+        state = swarm.State()
+        state.add_worker(make_worker("team/a"))
+
+        self.assertEqual(self.shard_names(), ["team%2Fa.json"])
+        self.assertIsNotNone(swarm.State().get_worker("team/a"))
+
+    def test_concurrent_adds_preserve_all_workers(self):
+        errors = []
+
+        def add(i):
+            try:
+                swarm.State().add_worker(make_worker(f"w{i}"))
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=add, args=(i,)) for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(swarm.State().workers), 10)
+
+
+class TestShardedMigration(ShardedStateTestCase):
+    """Legacy state.json is imported transparently."""
+
+    def test_migrates_legacy_state_file(self):
+        legacy = {"workers": [make_worker("first").to_dict(),
+                              make_worker("second", "stopped").to_dict()]}
+        self.state_file.write_text(json.dumps(legacy))
+
+        state = swarm.State()
+
+        self.assertEqual([w.name for w in state.workers], ["first", "second"])
+        self.assertEqual(state.get_worker("second").status, "stopped")
+        self.assertEqual(self.shard_names(), ["first.json", "second.json"])
+        self.assertFalse(self.state_file.exists())
+        self.assertTrue((self.temp_dir / "state.json.migrated").exists())
+
+    def test_migration_runs_once(self):
+        self.state_file.write_text(json.dumps({"workers": [make_worker("a").to_dict()]}))
+        swarm.State().remove_worker("a")
+
+        # A stray legacy file appearing later is not re-imported
+        self.state_file.write_text(json.dumps({"workers": [make_worker("a").to_dict()]}))
+        self.assertEqual(swarm.State().workers, [])
+
+    def test_fresh_install_creates_manifest(self):
+        state = swarm.State()
+
+        self.assertEqual(state.workers, [])
+        manifest = json.loads((self.workers_dir / "MANIFEST").read_text())
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(manifest["next_seq"], 0)
+
+
+class TestShardedCorruption(ShardedStateTestCase):
+    """Corrupt shards are quarantined, other workers still load."""
+
+    def test_corrupt_shard_is_skipped_and_quarantined(self):
+        state = swarm.State()
+        state.add_worker(make_worker("good"))
+        (self.workers_dir / "bad.json").write_text("{not json")
+
+        with patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            loaded = swarm.State()
+
+        self.assertEqual([w.name for w in loaded.workers], ["good"])
+        self.assertIn("corrupt worker state file bad.json", mock_stderr.getvalue())
+        self.assertTrue((self.workers_dir / "bad.json.corrupted").exists())
+        self.assertEqual(self.shard_names(), ["good.json"])
+
+
+class TestStateBackendSelection(unittest.TestCase):
+    """SWARM_STATE_BACKEND selects the store."""
+
+    def test_default_backend_is_json(self):
+        with patch.object(swarm, 'STATE_BACKEND', "json"):
+            self.assertIsInstance(swarm.get_state_store(), swarm.JsonStateStore)
+
+    def test_sharded_backend(self):
+        with patch.object(swarm, 'STATE_BACKEND', "sharded"):
+            self.assertIsInstance(swarm.get_state_store(), swarm.ShardedStateStore)
+
+    def test_unknown_backend_exits(self):
+        with patch.object(swarm, 'STATE_BACKEND', "nosuch"), \
+             patch('sys.stderr', new_callable=io.StringIO) as mock_stderr:
+            with self.assertRaises(SystemExit) as ctx:
+                swarm.get_state_store()
+        self.assertEqual(ctx.exception.code, 1)
+        self.assertIn("unknown state backend 'nosuch'", mock_stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Unit tests for the SQLite state backend.
+
+With SWARM_STATE_BACKEND=sqlite, workers, ralph state and heartbeat state are
+rows in ~/.swarm/state.db (WAL mode) instead of JSON files.
+
+Test coverage:
+- Worker add/update/remove round trips and insertion order
+- Lookups by name, tag and tmux session use indexes without loading every worker
+- Loading needs no state file lock
+- Ralph and heartbeat state are stored as rows
+- ralph clean removes ralph state rows
+- Legacy JSON state is migrated transparently
+- Concurrent adds preserve all workers
+"""
+
+import argparse
+import io
+import json
+import sqlite3
+import threading
+import unittest
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import StateTestCase, make_worker
+
+
+class SqliteStateTestCase(StateTestCase):
+    """Base class: isolated SWARM_DIR with the sqlite backend enabled."""
+
+    backend = "sqlite"
+
+    def query_plan(self, sql: str, params) -> str:
+        conn = sqlite3.connect(str(self.db_file))
+        try:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        finally:
+            conn.close()
+        return " ".join(row[-1] for row in rows)
+
+
+class TestSqliteWorkers(SqliteStateTestCase):
+    """Worker rows round-trip through State."""
+
+    def test_add_update_remove(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        state.add_worker(make_worker("b"))
+
+        state.update_worker("a", status="stopped")
+        state.remove_worker("b")
+
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], ["a"])
+        self.assertEqual(loaded.get_worker("a").status, "stopped")
+        self.assertEqual(state.get_worker("a").status, "stopped")
+        self.assertIsNone(state.get_worker("b"))
+
+    def test_insertion_order_preserved(self):
+        state = swarm.State()
+        for name in ["zeta", "alpha", "mid"]:
+            state.add_worker(make_worker(name))
+        state.remove_worker("alpha")
+        state.add_worker(make_worker("alpha"))
+
+        self.assertEqual([w.name for w in swarm.State().workers],
+                         ["zeta", "mid", "alpha"])
+
+    def test_save_replaces_registry(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a", tags=["x"]))
+        state.add_worker(make_worker("b"))
+
+        state.workers = [w for w in state.workers if w.name != "a"]
+        state.workers.append(make_worker("c"))
+        state.save()
+
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], ["b", "c"])
+        self.assertEqual(loaded.find_workers(tag="x"), [])
+
+    def test_changes_to_fetched_worker_are_saved(self):
+        swarm.State().add_worker(make_worker("a"))
+
+        state = swarm.State()
+        worker = state.get_worker("a")
+        worker.status = "stopped"
+        state.save()
+
+        self.assertEqual(swarm.State().get_worker("a").status, "stopped")
+
+    def test_database_uses_wal(self):
+        swarm.State().add_worker(make_worker("a"))
+
+        conn = sqlite3.connect(str(self.db_file))
+        try:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(mode, "wal")
+        self.assertFalse(self.state_file.exists())
+
+    def test_load_takes_no_file_lock(self):
+        swarm.State().add_worker(make_worker("a"))
+
+        with patch.object(swarm, 'state_file_lock', side_effect=AssertionError("locked")):
+            state = swarm.State()
+            self.assertEqual([w.name for w in state.workers], ["a"])
+
+    def test_transaction_commits_once(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+        generation = state.generation
+
+        with state.transaction() as st:
+            st.remove_worker("a")
+            st.add_worker(make_worker("b"))
+            st.update_worker("b", status="stopped")
+
+        self.assertEqual(state.generation, generation + 1)
+        loaded = swarm.State()
+        self.assertEqual([w.name for w in loaded.workers], ["b"])
+        self.assertEqual(loaded.get_worker("b").status, "stopped")
+
+    def test_transaction_rolls_back_on_error(self):
+        state = swarm.State()
+        state.add_worker(make_worker("a"))
+
+        with self.assertRaises(ValueError):
+            with state.transaction() as st:
+                st.remove_worker("a")
+                raise ValueError("abort")
+
+        self.assertIsNotNone(swarm.State().get_worker("a"))
+
+    def test_concurrent_adds_preserve_all_workers(self):
+        swarm.State().get_worker("init")  # create the database up front
+        errors = []
+
+        def add(i):
+            try:
+                swarm.State().add_worker(make_worker(f"w{i}"))
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=add, args=(i,)) for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(swarm.State().workers), 10)
+
+
+class TestSqliteIndexedLookups(SqliteStateTestCase):
+    """Queries are answered from indexes without loading every worker."""
+
+    def setUp(self):
+        super().setUp()
+        state = swarm.State()
+        state.add_worker(make_worker("api", tags=["team-a"], session="s1"))
+        state.add_worker(make_worker("web", tags=["team-b"], session="s1", socket="sock"))
+        state.add_worker(make_worker("db", tags=["team-a", "slow"], session="s2"))
+
+    def test_lookups_do_not_load_all_workers(self):
+        with patch.object(swarm.SqliteStateStore, 'load',
+                          side_effect=AssertionError("full load")):
+            state = swarm.State()
+            self.assertEqual(state.get_worker("web").name, "web")
+            self.assertEqual([w.name for w in state.find_workers(tag="team-a")],
+                             ["api", "db"])
+            self.assertTrue(state.session_has_workers("s1", None))
+            self.assertFalse(state.session_has_workers("s1", None, exclude={"api"}))
+
+    def test_session_lookup_matches_socket(self):
+        state = swarm.State()
+        self.assertTrue(swarm.session_has_other_workers(state, "s1", "api", socket="sock"))
+        self.assertFalse(swarm.session_has_other_workers(state, "s1", "web", socket="sock"))
+        self.assertFalse(swarm.session_has_other_workers(state, "s2", "db"))
+
+    def test_find_by_status(self):
+        state = swarm.State()
+        state.update_worker("web", status="stopped")
+        self.assertEqual([w.name for w in state.find_workers(status="stopped")], ["web"])
+        self.assertEqual([w.name for w in state.find_workers(status="running", tag="team-a")],
+                         ["api", "db"])
+
+    def test_find_returns_fetched_worker(self):
+        state = swarm.State()
+        worker = state.get_worker("api")
+        self.assertIs(state.find_workers(tag="team-a")[0], worker)
+        self.assertIs(state.workers[0], worker)
+
+    def test_queries_use_indexes(self):
+        tag_plan = self.query_plan(
+            "SELECT w.data FROM workers w JOIN worker_tags t "
+            "ON t.name = w.name AND t.tag = ? ORDER BY w.seq", ("team-a",))
+        session_plan = self.query_plan(
+            "SELECT name FROM workers WHERE tmux_session = ? AND tmux_socket IS ?",
+            ("s1", None))
+        status_plan = self.query_plan(
+            "SELECT data FROM workers WHERE status = ? ORDER BY seq", ("running",))
+
+        self.assertIn("worker_tags", tag_plan)
+        self.assertNotIn("SCAN t", tag_plan)
+        self.assertIn("workers_by_tmux", session_plan)
+        self.assertIn("workers_by_status", status_plan)
+
+    def test_ls_tag_refreshes_only_matching_workers(self):
+        args = argparse.Namespace(format="names", status="all", tag="team-b")
+        with patch.object(swarm, 'refresh_worker_status', side_effect=lambda w: w.status) as mock_refresh, \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            swarm.cmd_ls(args)
+
+        self.assertEqual(mock_stdout.getvalue(), "web\n")
+        self.assertEqual(mock_refresh.call_count, 1)
+
+
+class TestSqliteRalphAndHeartbeat(SqliteStateTestCase):
+    """Ralph and heartbeat state are rows in the same database."""
+
+    def test_ralph_state_round_trip(self):
+        swarm.save_ralph_state(swarm.RalphState(worker_name="b", prompt_file="P.md",
+                                                max_iterations=3))
+        swarm.save_ralph_state(swarm.RalphState(worker_name="a", prompt_file="P.md",
+                                                max_iterations=5))
+
+        self.assertEqual(swarm.load_ralph_state("a").max_iterations, 5)
+        self.assertEqual([rs.worker_name for rs in swarm.list_ralph_states()], ["a", "b"])
+        self.assertFalse((self.temp_dir / "ralph" / "a" / "state.json").exists())
+
+    def test_remove_ralph_state_deletes_row_and_log(self):
+        swarm.save_ralph_state(swarm.RalphState(worker_name="a", prompt_file="P.md",
+                                                max_iterations=5))
+        swarm.log_ralph_iteration("a", "START", iteration=1, max_iterations=5)
+
+        swarm.remove_ralph_state("a")
+
+        self.assertIsNone(swarm.load_ralph_state("a"))
+        self.assertFalse((self.temp_dir / "ralph" / "a").exists())
+
+    def test_remove_ralph_state_without_directory(self):
+        swarm.save_ralph_state(swarm.RalphState(worker_name="a", prompt_file="P.md",
+                                                max_iterations=5))
+
+        self.assertTrue(swarm.has_ralph_state("a"))
+        swarm.remove_ralph_state("a")
+
+        self.assertIsNone(swarm.load_ralph_state("a"))
+        self.assertFalse(swarm.has_ralph_state("a"))
+
+    def test_ralph_clean_removes_row(self):
+        swarm.save_ralph_state(swarm.RalphState(worker_name="w1", prompt_file="P.md",
+                                                max_iterations=5))
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            swarm.cmd_ralph_clean(argparse.Namespace(name="w1", all=False))
+
+        self.assertIn("cleaned ralph state for w1", stdout.getvalue())
+        self.assertIsNone(swarm.load_ralph_state("w1"))
+
+    def test_ralph_clean_all_removes_rows(self):
+        for name in ("w1", "w2"):
+            swarm.save_ralph_state(swarm.RalphState(worker_name=name, prompt_file="P.md",
+                                                    max_iterations=5))
+        swarm.log_ralph_iteration("w2", "START", iteration=1, max_iterations=5)
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            swarm.cmd_ralph_clean(argparse.Namespace(name=None, all=True))
+
+        self.assertEqual(stdout.getvalue(),
+                         "cleaned ralph state for w1\ncleaned ralph state for w2\n")
+        self.assertEqual(swarm.list_ralph_states(), [])
+        self.assertFalse((self.temp_dir / "ralph" / "w2").exists())
+
+    def test_heartbeat_state_round_trip(self):
+        hb = swarm.HeartbeatState(worker_name="a", interval_seconds=60,
+                                  message="continue", created_at="2026-01-01T00:00:00+00:00")
+        swarm.save_heartbeat_state(hb)
+
+        self.assertEqual(swarm.load_heartbeat_state("a").message, "continue")
+        self.assertEqual([h.worker_name for h in swarm.list_heartbeat_states()], ["a"])
+        self.assertTrue(swarm.delete_heartbeat_state("a"))
+        self.assertFalse(swarm.delete_heartbeat_state("a"))
+        self.assertIsNone(swarm.load_heartbeat_state("a"))
+        self.assertFalse((self.temp_dir / "heartbeats").exists())
+
+
+class TestSqliteMigration(SqliteStateTestCase):
+    """Legacy JSON state is imported when the database is created."""
+
+    def test_migrates_legacy_files(self):
+        legacy = {"workers": [make_worker("first").to_dict(),
+                              make_worker("second", "stopped", tags=["t"]).to_dict()]}
+        self.state_file.write_text(json.dumps(legacy))
+        ralph_path = self.temp_dir / "ralph" / "first" / "state.json"
+        ralph_path.parent.mkdir(parents=True)
+        ralph_path.write_text(json.dumps(swarm.RalphState(
+            worker_name="first", prompt_file="P.md", max_iterations=7).to_dict()))
+        hb_dir = self.temp_dir / "heartbeats"
+        hb_dir.mkdir()
+        (hb_dir / "first.json").write_text(json.dumps(swarm.HeartbeatState(
+            worker_name="first", interval_seconds=30, message="go",
+            created_at="2026-01-01T00:00:00+00:00").to_dict()))
+
+        state = swarm.State()
+
+        self.assertEqual([w.name for w in state.workers], ["first", "second"])
+        self.assertEqual([w.name for w in state.find_workers(tag="t")], ["second"])
+        self.assertEqual(swarm.load_ralph_state("first").max_iterations, 7)
+        self.assertEqual(swarm.load_heartbeat_state("first").interval_seconds, 30)
+        self.assertFalse(self.state_file.exists())
+        self.assertTrue((self.temp_dir / "state.json.migrated").exists())
+
+    def test_migration_runs_once(self):
+        self.state_file.write_text(json.dumps({"workers": [make_worker("a").to_dict()]}))
+        swarm.State().remove_worker("a")
+
+        # A stray legacy file appearing later is not re-imported
+        self.state_file.write_text(json.dumps({"workers": [make_worker("a").to_dict()]}))
+        self.assertEqual(swarm.State().workers, [])
+
+
+class TestSqliteBackendSelection(unittest.TestCase):
+    """SWARM_STATE_BACKEND=sqlite selects the store."""
+
+    def test_sqlite_backend(self):
+        with patch.object(swarm, 'STATE_BACKEND', "sqlite"):
+            self.assertIsInstance(swarm.get_state_store(), swarm.SqliteStateStore)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -78,7 +78,7 @@ class TestCmdInterrupt(unittest.TestCase):
                 # Verify tmux send-keys was called correctly
                 mock_run.assert_called_once_with(
                     ["tmux", "send-keys", "-t", "swarm:test-worker", "C-c"],
-                    capture_output=True
+                    capture_output=True, check=True
                 )
 
                 # Verify output
@@ -184,16 +184,48 @@ class TestCmdInterrupt(unittest.TestCase):
                 self.assertEqual(mock_run.call_count, 2)
                 mock_run.assert_any_call(
                     ["tmux", "send-keys", "-t", "swarm:worker-1", "C-c"],
-                    capture_output=True
+                    capture_output=True, check=True
                 )
                 mock_run.assert_any_call(
                     ["tmux", "send-keys", "-t", "swarm:worker-2", "C-c"],
-                    capture_output=True
+                    capture_output=True, check=True
                 )
 
                 # Verify output
                 self.assertEqual(mock_print.call_count, 2)
 
+    def test_interrupt_all_reports_failed_send(self):
+        """Test interrupt --all reports workers whose send-keys failed."""
+        workers = [
+            swarm.Worker(
+                name=name,
+                status="running",
+                cmd=["echo", name],
+                started="2026-01-10T00:00:00",
+                cwd="/tmp",
+                tmux=swarm.TmuxInfo(session="swarm", window=name)
+            )
+            for name in ("worker-1", "worker-2")
+        ]
+        self._create_test_state(workers)
+
+        def mock_send(cmd, **kwargs):
+            if "swarm:worker-2" in cmd:
+                raise subprocess.CalledProcessError(1, cmd, b"", b"can't find pane")
+            return Mock(returncode=0)
+
+        with patch('subprocess.run', side_effect=mock_send), \
+             patch.object(swarm, 'refresh_worker_status', return_value="running"), \
+             patch('builtins.print') as mock_print:
+            with self.assertRaises(SystemExit) as cm:
+                swarm.cmd_interrupt(Namespace(name=None, all=True))
+
+        self.assertEqual(cm.exception.code, 1)
+        printed = [c.args[0] for c in mock_print.call_args_list]
+        self.assertIn("interrupted worker-1", printed)
+        self.assertNotIn("interrupted worker-2", printed)
+        self.assertTrue(any("failed to interrupt 'worker-2'" in line for line in printed))
+
 
 class TestCmdEof(unittest.TestCase):
     """Test cmd_eof function."""
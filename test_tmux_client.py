@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Tests for the persistent tmux control-mode client.
+
+Long-running loops run tmux commands through TmuxClient (one `tmux -C`
+connection per socket) inside tmux_control_pool(); run_tmux() falls back
+to a plain subprocess whenever the connection cannot be used.
+
+Test coverage:
+- Commands, output and errors over a real control-mode connection
+- Chained commands (";" arguments) follow tmux's argv rules
+- Large text is pasted through a named buffer, which is then deleted
+- Argument quoting round-trips through the tmux parser
+- run_tmux() matches subprocess.run() results (text/bytes, check)
+- Without a pool run_tmux() is exactly subprocess.run()
+- Fallback when there is no server, and reconnect after it restarts
+"""
+
+import subprocess
+import unittest
+from unittest.mock import MagicMock, patch
+
+import swarm
+from tmux_test_helpers import TmuxServerTestCase, new_socket, skip_if_no_tmux
+
+
+class TmuxClientTestCase(TmuxServerTestCase):
+    """Base class: a control-mode client for the private tmux server."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = swarm.TmuxClient(self.socket, "s1")
+
+    def tearDown(self):
+        self.client.close()
+        super().tearDown()
+
+
+@skip_if_no_tmux
+class TestTmuxClient(TmuxClientTestCase):
+    """Commands over a real control-mode connection."""
+
+    def test_command_output(self):
+        returncode, output = self.client.run(
+            ["list-windows", "-a", "-F", "#{session_name}\t#{window_name}"])
+
+        self.assertEqual(returncode, 0)
+        self.assertEqual(output, "s1\tw1\n")
+        self.assertTrue(self.client.connected())
+
+    def test_command_error(self):
+        returncode, output = self.client.run(["has-session", "-t", "s1:missing"])
+
+        self.assertEqual(returncode, 1)
+        self.assertIn("can't find window", output)
+
+    def test_connection_is_reused(self):
+        self.client.run(["has-session", "-t", "s1"])
+        proc = self.client._proc
+
+        for _ in range(5):
+            self.assertEqual(self.client.run(["has-session", "-t", "s1:w1"])[0], 0)
+
+        self.assertIs(self.client._proc, proc)
+
+    def test_quoting_round_trip(self):
+        text = "~/a 'b' \"c\" $HOME \\ x; # {y} #{pane_id} é"
+
+        self.client.run(["send-keys", "-t", "s1:w1", "-l", text])
+        self.client.run(["send-keys", "-t", "s1:w1", "Enter"])
+
+        self.wait_for(lambda: text in self.capture())
+
+    def test_chained_commands(self):
+        returncode, output = self.client.run(
+            ["display-message", "-p", "a", ";", "display-message", "-p", "b;",
+             "display-message", "-p", "c\\;"])
+
+        self.assertEqual(returncode, 0)
+        self.assertEqual(output, "a\nb\nc;\n")
+
+    def test_chain_stops_at_error(self):
+        returncode, output = self.client.run(
+            ["has-session", "-t", "s1", ";", "has-session", "-t", "s1:missing", ";",
+             "display-message", "-p", "never"])
+
+        self.assertEqual(returncode, 1)
+        self.assertIn("can't find window", output)
+        # The connection is still in step with tmux
+        self.assertEqual(self.client.run(["display-message", "-p", "next"]), (0, "next\n"))
+
+    def test_command_line_follows_argv_rules(self):
+        line, count = swarm.TmuxClient.command_line(["a", ";", "b;", "c\\;", "d"])
+
+        self.assertEqual(line, "'a' ; 'b' ; 'c;' 'd'")
+        self.assertEqual(count, 3)
+
+    def test_reconnects_after_server_restart(self):
+        self.client.run(["has-session", "-t", "s1"])
+        self.tmux("kill-server")
+
+        # The command was not delivered, so the caller must fall back
+        self.assertIsNone(self.client.run(["has-session", "-t", "s1"]))
+
+        # The old server may still be shutting down
+        self.wait_for(self.start_server)
+        self.client._retry_at = 0.0
+        self.assertEqual(self.client.run(["has-session", "-t", "s1:w1"]), (0, ""))
+
+    def test_no_server_returns_none_and_backs_off(self):
+        client = swarm.TmuxClient(new_socket())
+
+        self.assertIsNone(client.run(["has-session"]))
+        with patch('subprocess.Popen') as mock_popen:
+            self.assertIsNone(client.run(["has-session"]))
+        mock_popen.assert_not_called()
+
+
+@skip_if_no_tmux
+class TestControlPool(TmuxClientTestCase):
+    """run_tmux() inside tmux_control_pool()."""
+
+    def test_pool_avoids_subprocess(self):
+        with swarm.tmux_control_pool():
+            with patch('subprocess.run') as mock_run:
+                result = swarm.run_tmux(["has-session", "-t", "s1:w1"], self.socket,
+                                        capture_output=True)
+                output = swarm.tmux_capture_pane("s1", "w1", socket=self.socket)
+            mock_run.assert_not_called()
+            self.assertEqual(result.returncode, 0)
+            self.assertIsInstance(output, str)
+
+            client = swarm._tmux_clients[self.socket]
+            self.assertEqual(client.session, "s1")
+        self.assertIsNone(swarm._tmux_clients)
+        self.assertFalse(client.connected())
+
+    def test_results_match_subprocess(self):
+        args = ["list-windows", "-a", "-F", "#{window_name}"]
+        direct = swarm.run_tmux(args, self.socket, capture_output=True, text=True)
+        raw = swarm.run_tmux(args, self.socket, capture_output=True)
+
+        with swarm.tmux_control_pool():
+            pooled = swarm.run_tmux(args, self.socket, capture_output=True, text=True)
+            pooled_raw = swarm.run_tmux(args, self.socket, capture_output=True)
+
+        self.assertEqual(pooled.returncode, direct.returncode)
+        self.assertEqual(pooled.stdout, direct.stdout)
+        self.assertEqual(pooled_raw.stdout, raw.stdout)
+        self.assertEqual(pooled.args, ["tmux", "-L", self.socket] + args)
+
+    def test_check_raises(self):
+        with swarm.tmux_control_pool():
+            with self.assertRaises(subprocess.CalledProcessError) as ctx:
+                swarm.run_tmux(["send-keys", "-t", "s1:missing", "x"], self.socket,
+                               capture_output=True, check=True)
+        self.assertIn(b"can't find window", ctx.exception.stderr)
+
+    def test_tmux_send_through_pool(self):
+        with swarm.tmux_control_pool(), patch('time.sleep'):
+            swarm.tmux_send("s1", "w1", "hello pool", socket=self.socket)
+
+        self.wait_for(lambda: "hello pool" in self.capture())
+
+    def test_tmux_send_matches_subprocess(self):
+        for text in ("one;", "two \\;", "~/three"):
+            swarm.tmux_send("s1", "w1", text, socket=self.socket)
+            with swarm.tmux_control_pool():
+                swarm.tmux_send("s1", "w1", text.upper(), socket=self.socket)
+
+        expected = ["one;", "ONE;", "two \\;", "TWO \\;", "~/three", "~/THREE"]
+        self.wait_for(lambda: all(line in self.capture() for line in expected))
+        lines = self.capture().splitlines()
+        for text in expected:
+            self.assertIn(text, lines)
+
+    def test_large_text_is_pasted(self):
+        text = "".join(f"- line {i} ~/$HOME;\n" for i in range(200))
+        self.assertGreater(len(text), swarm.TMUX_PASTE_THRESHOLD)
+
+        with swarm.tmux_control_pool():
+            swarm.tmux_send("s1", "w1", text, enter=False, socket=self.socket, pre_clear=False)
+
+        self.wait_for(lambda: "- line 199 ~/$HOME;" in self.capture())
+        buffers = self.tmux("list-buffers", "-F", "#{buffer_name}")
+        self.assertNotIn("swarm-s1-w1", buffers)
+
+    def test_disabled_by_environment(self):
+        with patch.object(swarm, 'TMUX_CONTROL_MODE', "0"), swarm.tmux_control_pool():
+            self.assertIsNone(swarm._tmux_clients)
+
+
+class TestRunTmuxWithoutPool(unittest.TestCase):
+    """Outside a pool run_tmux() is subprocess.run() with the socket prefix."""
+
+    @patch('subprocess.run')
+    def test_passes_through(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=0)
+
+        result = swarm.run_tmux(["has-session", "-t", "s:w"], "sock", capture_output=True)
+
+        self.assertIs(result, mock_run.return_value)
+        mock_run.assert_called_once_with(
+            ["tmux", "-L", "sock", "has-session", "-t", "s:w"], capture_output=True)
+
+    @patch('subprocess.run')
+    def test_falls_back_when_client_unavailable(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=0)
+
+        with swarm.tmux_control_pool(), \
+             patch.object(swarm.TmuxClient, 'run', return_value=None):
+            swarm.run_tmux(["kill-window", "-t", "s:w"], None, capture_output=True)
+
+        mock_run.assert_called_once_with(["tmux", "kill-window", "-t", "s:w"], capture_output=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
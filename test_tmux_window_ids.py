@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Tests for targeting tmux workers by window and pane ID.
+
+create_tmux_window() records the new window's "@N" and pane's "%N" IDs,
+which are stored in TmuxInfo. Commands then target the pane ID, so a
+worker keeps its pane even if another window takes the same name.
+Workers from older state, without IDs, are targeted by name.
+
+Test coverage:
+- create_tmux_window() returns the IDs tmux assigned
+- Send, capture and kill reach the right pane when names are shared
+- Existence checks reject a pane ID that now belongs to another window
+- A worker whose window was split is still running
+- tmux_target(), TmuxInfo.pane and tmux_kill_target() fallbacks
+- Old state loads without IDs
+"""
+
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import make_worker
+from tmux_test_helpers import TmuxServerTestCase, skip_if_no_tmux
+
+
+@skip_if_no_tmux
+class TestPaneIdTmux(TmuxServerTestCase):
+    """Pane IDs on a real tmux server."""
+
+    def spawn(self, window: str) -> swarm.TmuxInfo:
+        ids = swarm.create_tmux_window("s1", window, Path("/tmp"), ["cat"], self.socket)
+        return swarm.TmuxInfo(session="s1", window=window, socket=self.socket, **ids)
+
+    def test_create_returns_ids(self):
+        info = self.spawn("w2")
+
+        self.assertEqual(
+            self.tmux("display-message", "-p", "-t", "s1:w2", "#{window_id} #{pane_id}").split(),
+            [info.window_id, info.pane_id],
+        )
+        self.assertEqual(info.pane, info.pane_id)
+        # pipe-pane still targets the new pane
+        self.assertEqual(self.tmux("display-message", "-p", "-t", info.pane_id, "#{pane_pipe}").strip(), "1")
+
+    def test_shared_name_targets_own_pane(self):
+        first = self.spawn("dup")
+        second = self.spawn("dup")
+        self.assertNotEqual(first.pane_id, second.pane_id)
+
+        with patch('time.sleep'):
+            swarm.tmux_send("s1", first.pane, "to first", socket=self.socket)
+        self.wait_for(lambda: "to first" in self.capture(first.pane_id))
+        self.assertNotIn("to first", self.capture(second.pane_id))
+        self.assertIn("to first", swarm.tmux_capture_pane("s1", first.pane, socket=self.socket))
+
+        self.tmux("kill-window", "-t", swarm.tmux_kill_target(second))
+        panes = self.tmux("list-panes", "-a", "-F", "#{pane_id}").split()
+        self.assertIn(first.pane_id, panes)
+        self.assertNotIn(second.pane_id, panes)
+
+    def test_large_text_pasted_by_pane_id(self):
+        info = self.spawn("w2")
+        text = "".join(f"- line {i}\n" for i in range(400))
+        self.assertGreater(len(text), swarm.TMUX_PASTE_THRESHOLD)
+
+        with swarm.tmux_control_pool():
+            swarm.tmux_send("s1", info.pane, text, enter=False, socket=self.socket, pre_clear=False)
+
+        self.wait_for(lambda: "- line 399" in self.capture(info.pane_id))
+
+    def test_exists_checks_name_and_pane(self):
+        info = self.spawn("w2")
+        other = self.tmux("display-message", "-p", "-t", "s1:w1", "#{pane_id}").strip()
+
+        self.assertTrue(swarm.tmux_window_exists("s1", "w2", self.socket, pane_id=info.pane_id))
+        self.assertFalse(swarm.tmux_window_exists("s1", "w2", self.socket, pane_id=other))
+        self.assertFalse(swarm.tmux_window_exists("s1", "w2", self.socket, pane_id="%999"))
+
+        with patch.object(swarm, 'STATUS_CACHE_TTL', "60"), swarm.tmux_status_snapshot(shared=True):
+            swarm.invalidate_status_cache(self.socket)
+            self.assertTrue(swarm.tmux_window_exists("s1", "w2", self.socket, pane_id=info.pane_id))
+            self.assertFalse(swarm.tmux_window_exists("s1", "w2", self.socket, pane_id=other))
+            swarm.invalidate_status_cache(self.socket)
+
+    def test_split_window_keeps_worker_running(self):
+        info = self.spawn("w2")
+        # The user splits the worker's window; the new pane becomes active
+        self.tmux("split-window", "-t", info.pane_id, "cat")
+        worker = make_worker("w2", session="s1", socket=self.socket,
+                             window_id=info.window_id, pane_id=info.pane_id)
+
+        self.assertEqual(swarm.refresh_worker_status(worker), "running")
+        with patch.object(swarm, 'STATUS_CACHE_TTL', "60"), swarm.tmux_status_snapshot(shared=True):
+            swarm.invalidate_status_cache(self.socket)
+            self.assertEqual(swarm.refresh_worker_status(worker), "running")
+            swarm.invalidate_status_cache(self.socket)
+        with swarm.tmux_status_snapshot():
+            self.assertEqual(swarm.refresh_worker_status(worker), "running")
+
+    def test_kill_target_ignores_reused_pane_id(self):
+        info = self.spawn("w2")
+        # The pane ID now belongs to w1, e.g. after a server restart
+        stale = swarm.TmuxInfo(session="s1", window="w2", socket=self.socket,
+                               pane_id=self.tmux("display-message", "-p", "-t", "s1:w1", "#{pane_id}").strip())
+
+        self.assertEqual(swarm.tmux_kill_target(info), info.pane_id)
+        self.assertEqual(swarm.tmux_kill_target(stale), "s1:w2")
+
+
+class TestPaneIdTargets(unittest.TestCase):
+    """Target strings and fallbacks for workers without IDs."""
+
+    def test_tmux_target(self):
+        self.assertEqual(swarm.tmux_target("s1", "w1"), "s1:w1")
+        self.assertEqual(swarm.tmux_target("s1", "%3"), "%3")
+
+    def test_pane_falls_back_to_window(self):
+        self.assertEqual(swarm.TmuxInfo(session="s1", window="w1").pane, "w1")
+        self.assertEqual(swarm.TmuxInfo(session="s1", window="w1", pane_id="%3").pane, "%3")
+
+    def test_kill_target_without_pane_id(self):
+        with patch('swarm.tmux_window_exists') as mock_exists:
+            target = swarm.tmux_kill_target(swarm.TmuxInfo(session="s1", window="w1"))
+
+        self.assertEqual(target, "s1:w1")
+        mock_exists.assert_not_called()
+
+    def test_old_state_loads_without_ids(self):
+        worker = swarm.Worker.from_dict({
+            "name": "w", "status": "running", "cmd": ["cat"], "started": "2026-01-01T00:00:00",
+            "cwd": "/tmp", "tmux": {"session": "s1", "window": "w", "socket": None},
+        })
+        self.assertIsNone(worker.tmux.window_id)
+        self.assertIsNone(worker.tmux.pane_id)
+        self.assertEqual(worker.tmux.pane, "w")
+
+    def test_ids_round_trip(self):
+        worker = swarm.Worker(
+            name="w", status="running", cmd=["cat"], started="2026-01-01T00:00:00", cwd="/tmp",
+            tmux=swarm.TmuxInfo(session="s1", window="w", window_id="@2", pane_id="%5"),
+        )
+        loaded = swarm.Worker.from_dict(worker.to_dict())
+        self.assertEqual((loaded.tmux.window_id, loaded.tmux.pane_id), ("@2", "%5"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Shared fixtures for the tests that use tmux.
+
+TmuxTestCase isolates SWARM_DIR like StateTestCase, plus the status
+cache, and records tmux workers with add_tmux_worker(). TmuxServerTestCase
+also starts a private tmux server with session s1 and window w1 running
+`server_command`, and has helpers to run tmux on it and to poll its panes.
+Test files subclass them and add their own patches in extra_patches().
+"""
+
+import shutil
+import subprocess
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+import swarm
+from state_test_helpers import StateTestCase, make_worker
+
+
+skip_if_no_tmux = unittest.skipUnless(shutil.which("tmux"), "tmux not installed")
+
+
+def new_socket() -> str:
+    """Return the name of a tmux socket no server is listening on."""
+    return f"swarm-test-{uuid.uuid4().hex[:8]}"
+
+
+class TmuxTestCase(StateTestCase):
+    """Base class: isolated SWARM_DIR and status cache."""
+
+    def extra_patches(self) -> list:
+        return [patch.object(swarm, 'STATUS_CACHE_FILE', self.temp_dir / "status.cache")]
+
+    def add_tmux_worker(self, name: str, session: str = "s1", socket: str = None,
+                        **tmux_fields) -> swarm.Worker:
+        """Record a running tmux worker in window `name` of `session`.
+
+        tmux_fields are further TmuxInfo fields, e.g. pane_id.
+        """
+        worker = make_worker(name, session=session, socket=socket, **tmux_fields)
+        with swarm.State().transaction() as st:
+            st.add_worker(worker)
+        return worker
+
+
+class TmuxServerTestCase(TmuxTestCase):
+    """Base class: also a private tmux server with session s1, window w1."""
+
+    server_command = ["cat"]  # new-session arguments after the window name
+
+    def setUp(self):
+        super().setUp()
+        self.socket = new_socket()
+        self.start_server(check=True)
+
+    def tearDown(self):
+        subprocess.run(["tmux", "-L", self.socket, "kill-server"], capture_output=True)
+        super().tearDown()
+
+    def start_server(self, check: bool = False) -> bool:
+        """Start the private server; returns whether tmux did."""
+        result = subprocess.run(
+            ["tmux", "-L", self.socket, "new-session", "-d", "-s", "s1", "-n", "w1"]
+            + self.server_command,
+            check=check, capture_output=True,
+        )
+        return result.returncode == 0
+
+    def tmux(self, *args) -> str:
+        """Run tmux on the private server and return its output."""
+        return subprocess.run(["tmux", "-L", self.socket] + list(args),
+                              capture_output=True, text=True).stdout
+
+    def capture(self, target: str = "s1:w1") -> str:
+        return self.tmux("capture-pane", "-p", "-t", target)
+
+    def wait_for(self, predicate, timeout: float = 5.0) -> None:
+        """Poll predicate until it is true; fail the test after timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() >= deadline:
+                self.fail("condition not reached")
+            time.sleep(0.05)
+